@@ -0,0 +1,8 @@
+-- Crédito consumido por cada análise premium (origem devolvida por _consume_one_credit)
+-- dependencies.recover_analysis_sessions devolve o crédito das sessões que
+-- falharam sem resultado (job esgotado / sessão órfã) e zera a coluna
+-- (idempotente: só quem zera devolve)
+
+ALTER TABLE analysis_sessions ADD COLUMN IF NOT EXISTS credit_consumed JSONB;
+
+comment on column analysis_sessions.credit_consumed is 'Crédito consumido ({"source": "usage"|"balance", ...}); NULL depois de devolvido';
@@ -0,0 +1,11 @@
+-- Reuso do cache parcial por similaridade (MinHash + LSH)
+-- Ver similarity_index.py / SIMILARITY_CACHE_ENABLED
+
+ALTER TABLE partial_cache ADD COLUMN IF NOT EXISTS minhash JSONB;            -- Assinatura MinHash (64 inteiros)
+ALTER TABLE partial_cache ADD COLUMN IF NOT EXISTS lsh_buckets TEXT[];       -- 'tactical:03:9f1c...' por banda
+ALTER TABLE partial_cache ADD COLUMN IF NOT EXISTS similarity_meta JSONB;    -- {area, level, gap_tokens} do guarda de qualidade
+
+-- Índice GIN para a busca por sobreposição de buckets (lsh_buckets && ARRAY[...])
+CREATE INDEX IF NOT EXISTS idx_partial_cache_lsh_buckets ON partial_cache USING GIN (lsh_buckets);
+
+comment on column partial_cache.lsh_buckets is 'Buckets LSH da assinatura MinHash para reuso por similaridade';
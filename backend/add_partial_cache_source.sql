@@ -0,0 +1,6 @@
+-- Origem das entradas do cache parcial ('live' = tráfego real, 'prewarm' = cache_prewarm.py)
+-- Permite medir quantos hits do tráfego real vieram do pre-warming
+
+ALTER TABLE partial_cache ADD COLUMN IF NOT EXISTS source VARCHAR(10) NOT NULL DEFAULT 'live';
+
+CREATE INDEX IF NOT EXISTS idx_partial_cache_source ON partial_cache(source) WHERE source <> 'live';
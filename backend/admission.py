@@ -0,0 +1,238 @@
+"""
+Admission Control - Backpressure das análises premium
+
+🎯 PROBLEMA:
+- A única proteção era o limite por IP do slowapi (10/minute). Num pico de
+  marketing aceitávamos tudo, consumíamos os créditos e todas as análises
+  ficavam lentas juntas até estourar o timeout
+
+✅ SOLUÇÃO:
+1. Conta as análises vivas do processo: `running` (pipeline executando) e
+   `waiting` (aceitas, ainda não iniciadas - ex: na fila de jobs)
+2. Capacidade efetiva = ADMISSION_MAX_INFLIGHT x folga dos provedores de IA.
+   Com a fila de jobs ligada, quem executa são os JOB_QUEUE_WORKERS: o limite
+   é o menor dos dois (senão aceitaríamos "slots" que só esperam na fila e o
+   início estimado/Retry-After sairiam subestimados).
+   A folga vem da taxa de erros transitórios (429/503/timeout) das chamadas
+   de LLM no último minuto (ProviderHeadroom, alimentado por call_llm)
+3. Decisão ANTES de consumir o crédito:
+   - há slot -> executa agora
+   - fila de jobs ligada e fila com espaço (ADMISSION_MAX_QUEUED) -> aceita
+     na fila com horário estimado de início
+   - senão -> 429 + Retry-After (estimado pela duração média das análises)
+4. Estado exposto em GET /api/admin/admission
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_INFLIGHT = int(os.getenv("ADMISSION_MAX_INFLIGHT", "4"))
+ADMISSION_MAX_QUEUED = int(os.getenv("ADMISSION_MAX_QUEUED", "20"))
+ADMISSION_WAITING_TTL_SECONDS = int(os.getenv("ADMISSION_WAITING_TTL_SECONDS", "600"))
+ADMISSION_DEFAULT_DURATION_SECONDS = float(os.getenv("ADMISSION_DEFAULT_DURATION_SECONDS", "60"))
+PROVIDER_HEADROOM_WINDOW_SECONDS = int(os.getenv("PROVIDER_HEADROOM_WINDOW_SECONDS", "60"))
+PROVIDER_HEADROOM_MIN_SAMPLES = int(os.getenv("PROVIDER_HEADROOM_MIN_SAMPLES", "5"))
+
+
+class ProviderHeadroom:
+    """Folga dos provedores de IA: 1 - taxa de erros transitórios na janela recente."""
+
+    def __init__(self,
+                 window_seconds: int = PROVIDER_HEADROOM_WINDOW_SECONDS,
+                 min_samples: int = PROVIDER_HEADROOM_MIN_SAMPLES):
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: Deque[Tuple[float, str, bool]] = deque()
+
+    def record(self, provider: str, transient_error: bool) -> None:
+        now = time.time()
+        with self._lock:
+            self._samples.append((now, provider, transient_error))
+            self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    def headroom(self) -> float:
+        """0.0 (todos os provedores saturados) .. 1.0 (sem erros transitórios)."""
+        with self._lock:
+            self._trim(time.time())
+            total = len(self._samples)
+            errors = sum(1 for _, _, transient in self._samples if transient)
+        if total < self.min_samples:
+            return 1.0
+        return 1.0 - errors / total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.time())
+            by_provider: Dict[str, Dict[str, int]] = {}
+            for _, provider, transient in self._samples:
+                counters = by_provider.setdefault(provider, {"calls": 0, "transient_errors": 0})
+                counters["calls"] += 1
+                counters["transient_errors"] += int(transient)
+        return {"headroom": round(self.headroom(), 3), "window_seconds": self.window_seconds, "providers": by_provider}
+
+
+class AdmissionDecision:
+    def __init__(self, admitted: bool, queued: bool = False, retry_after: int = 0,
+                 estimated_start_seconds: int = 0, reason: str = ""):
+        self.admitted = admitted
+        self.queued = queued
+        self.retry_after = retry_after
+        self.estimated_start_seconds = estimated_start_seconds
+        self.reason = reason
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "retry_after": self.retry_after,
+            "estimated_start_seconds": self.estimated_start_seconds,
+            "reason": self.reason,
+        }
+
+
+class AdmissionController:
+    """Decide se uma nova análise roda agora, entra na fila ou recebe 429."""
+
+    def __init__(self,
+                 max_inflight: int = ADMISSION_MAX_INFLIGHT,
+                 max_queued: int = ADMISSION_MAX_QUEUED,
+                 headroom: ProviderHeadroom = None,
+                 queue_enabled: Optional[bool] = None,
+                 queue_workers: Optional[int] = None):
+        self.max_inflight = max(max_inflight, 1)
+        self.max_queued = max_queued
+        self.provider_headroom = headroom or ProviderHeadroom()
+        self._queue_enabled = queue_enabled
+        self._queue_workers = queue_workers
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiting: Dict[str, float] = {}  # session_id -> admitido em
+        self._avg_duration = ADMISSION_DEFAULT_DURATION_SECONDS
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def _queue_available(self) -> bool:
+        if self._queue_enabled is not None:
+            return self._queue_enabled
+        from job_queue import JOB_QUEUE_ENABLED
+        return JOB_QUEUE_ENABLED
+
+    def _inflight_limit(self) -> int:
+        """ADMISSION_MAX_INFLIGHT, limitado pelos workers quando a execução é pela fila."""
+        if not self._queue_available():
+            return self.max_inflight
+        workers = self._queue_workers
+        if workers is None:
+            from job_queue import JOB_QUEUE_WORKERS
+            workers = JOB_QUEUE_WORKERS
+        return max(1, min(self.max_inflight, workers))
+
+    def capacity(self) -> int:
+        """Slots de execução simultânea, reduzidos quando os provedores estão saturados."""
+        return max(1, math.floor(self._inflight_limit() * self.provider_headroom.headroom()))
+
+    def _expire_waiting(self, now: float) -> None:
+        """Aceitas que nunca começaram neste processo (job pego por outro worker, request abortada)."""
+        for session_id, admitted_at in list(self._waiting.items()):
+            if now - admitted_at > ADMISSION_WAITING_TTL_SECONDS:
+                del self._waiting[session_id]
+
+    # ------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------
+
+    def try_admit(self, session_id: str) -> AdmissionDecision:
+        """Reserva um lugar para a sessão (ou recusa). Chamar antes de consumir o crédito."""
+        if not ADMISSION_ENABLED:
+            return AdmissionDecision(True, reason="disabled")
+
+        capacity = self.capacity()
+        max_queued = self.max_queued if self._queue_available() else 0
+        now = time.time()
+        with self._lock:
+            self._expire_waiting(now)
+            load = self._running + len(self._waiting)
+            if load < capacity + max_queued:
+                self._waiting[session_id] = now
+                if load < capacity:
+                    self.admitted += 1
+                    return AdmissionDecision(True, reason="slot livre")
+                self.queued += 1
+                rounds = math.ceil((load - capacity + 1) / capacity)
+                return AdmissionDecision(
+                    True, queued=True,
+                    estimated_start_seconds=int(rounds * self._avg_duration),
+                    reason="na fila",
+                )
+
+            self.rejected += 1
+            rounds = math.ceil((load - capacity - max_queued + 1) / capacity)
+            wait = int(min(max(rounds * self._avg_duration, 5), 600))
+            return AdmissionDecision(
+                False, retry_after=wait, estimated_start_seconds=wait,
+                reason="capacidade esgotada",
+            )
+
+    def release(self, session_id: str) -> None:
+        """Devolve a reserva de uma sessão que não chegou a ser processada."""
+        with self._lock:
+            self._waiting.pop(session_id, None)
+
+    @contextmanager
+    def running(self, session_id: str):
+        """Marca a sessão como em execução durante o bloco (e mede a duração)."""
+        start = time.monotonic()
+        with self._lock:
+            self._waiting.pop(session_id, None)
+            self._running += 1
+        try:
+            yield
+        finally:
+            duration = time.monotonic() - start
+            with self._lock:
+                self._running -= 1
+                # Média móvel exponencial da duração das análises (estimativas de espera)
+                self._avg_duration = 0.8 * self._avg_duration + 0.2 * duration
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._expire_waiting(time.time())
+            state = {
+                "running": self._running,
+                "waiting": len(self._waiting),
+                "avg_duration_seconds": round(self._avg_duration, 1),
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "rejected": self.rejected,
+            }
+        state.update({
+            "enabled": ADMISSION_ENABLED,
+            "max_inflight": self.max_inflight,
+            "inflight_limit": self._inflight_limit(),
+            "capacity": self.capacity(),
+            "max_queued": self.max_queued if self._queue_available() else 0,
+            "provider_headroom": self.provider_headroom.stats(),
+        })
+        return state
+
+
+# Instâncias globais
+provider_headroom = ProviderHeadroom()
+admission_controller = AdmissionController(headroom=provider_headroom)
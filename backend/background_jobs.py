@@ -0,0 +1,112 @@
+"""
+Background Jobs - Tarefas periódicas do processo (threads daemon)
+
+Uso:
+    from background_jobs import register_periodic_job
+    register_periodic_job("cache_eviction", 3600, run_eviction)
+
+As tarefas registradas são iniciadas no startup do FastAPI (main.py) e
+paradas no shutdown. Cada execução roda isolada: exceções são logadas e a
+próxima execução acontece normalmente.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """Executa `fn()` a cada `interval_seconds` numa thread daemon."""
+
+    def __init__(self, name: str, interval_seconds: float, fn: Callable[[], object], initial_delay: float = 0.0):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.fn = fn
+        self.initial_delay = initial_delay
+        self.last_run: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=f"job-{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"⏰ Job [{self.name}] iniciado (intervalo {self.interval_seconds:.0f}s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def run_once(self) -> None:
+        start = time.perf_counter()
+        try:
+            self.fn()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = f"{type(e).__name__}: {e}"
+            logger.error(f"❌ Job [{self.name}] falhou: {e}")
+        finally:
+            self.runs += 1
+            self.last_run = time.time()
+            self.last_duration_ms = (time.perf_counter() - start) * 1000
+
+    def _loop(self) -> None:
+        if self.initial_delay and self._stop.wait(self.initial_delay):
+            return
+        while not self._stop.is_set():
+            self.run_once()
+            if self._stop.wait(self.interval_seconds):
+                return
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval_seconds": self.interval_seconds,
+            "running": bool(self._thread and self._thread.is_alive()),
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+        }
+
+
+_jobs: Dict[str, PeriodicJob] = {}
+_jobs_lock = threading.Lock()
+
+
+def register_periodic_job(name: str, interval_seconds: float, fn: Callable[[], object], initial_delay: float = 0.0) -> PeriodicJob:
+    """Registra (ou substitui) uma tarefa periódica. Não inicia - ver start_background_jobs()."""
+    with _jobs_lock:
+        job = PeriodicJob(name, interval_seconds, fn, initial_delay)
+        _jobs[name] = job
+        return job
+
+
+def start_background_jobs() -> None:
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    for job in jobs:
+        job.start()
+
+
+def stop_background_jobs() -> None:
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+    for job in jobs:
+        job.stop()
+
+
+def background_jobs_status() -> List[dict]:
+    with _jobs_lock:
+        return [job.status() for job in _jobs.values()]
@@ -0,0 +1,192 @@
+"""
+Cache Codec - Formato compacto dos resultados em `cached_analyses`
+
+🎯 PROBLEMA:
+- `cv_otimizado_completo` era gravado como documento HTML completo, com o
+  CSS_V13 inteiro (~4 KB) embutido em TODAS as linhas (inclusive o preview
+  do /api/analyze-free), além do texto original do CV
+
+✅ SOLUÇÃO:
+1. O HTML do CV é guardado só como corpo + referência da folha de estilo
+   (`_cv_compact`) e remontado na leitura:
+   - fmt "md": markdown do formatador (`_cv_markdown`), o menor possível,
+     com a versão do renderer que o reproduz (`renderer`)
+   - fmt "html": corpo HTML já renderizado (linhas antigas / fallback)
+   Só compacta quando a remontagem reproduz o HTML original byte a byte;
+   qualquer outro conteúdo (markdown puro, mensagens de erro) fica como está.
+2. zstd opcional (CACHE_ZSTD_ENABLED=true + pacote `zstandard`) para textos
+   grandes: corpo do CV e `cv_text_original`. `job_description` continua em
+   texto puro porque é lida em vários lugares (histórico, pre-warm).
+3. Migração das linhas existentes: scripts/migrate_cache_compact.py
+
+Folhas de estilo: STYLESHEETS mapeia versão -> CSS. Ao alterar o CSS_V13 de
+forma incompatível, crie uma nova versão em styles.py e mantenha a antiga
+aqui para as linhas já gravadas continuarem idênticas.
+
+Renderers de markdown: mesma regra. Linhas md sem `renderer` foram gravadas
+com o format_text_to_html V11 (congelado em cv_html_legacy.py). Mudou a saída
+do cv_to_html? Crie uma nova versão em CURRENT_MARKDOWN_RENDERER e congele a
+anterior em _markdown_renderers().
+"""
+
+from __future__ import annotations
+
+import base64
+import logging
+import os
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # Dependência opcional
+    zstandard = None
+
+CACHE_ZSTD_ENABLED = os.getenv("CACHE_ZSTD_ENABLED", "false").lower() == "true"
+CACHE_ZSTD_MIN_BYTES = int(os.getenv("CACHE_ZSTD_MIN_BYTES", "2048"))
+CACHE_ZSTD_LEVEL = int(os.getenv("CACHE_ZSTD_LEVEL", "6"))
+
+COMPACT_KEY = "_cv_compact"
+MARKDOWN_KEY = "_cv_markdown"
+ZSTD_PREFIX = "zstd+b64:"
+
+CURRENT_STYLESHEET = "v13"
+CURRENT_MARKDOWN_RENDERER = "ast1"  # cv_markdown.cv_to_html
+LEGACY_MARKDOWN_RENDERER = "v11"    # linhas md gravadas antes da AST (sem `renderer`)
+_BODY_MARKER = "\x00"
+
+
+class CacheCodecError(Exception):
+    """Entrada compactada que não pode ser lida neste processo."""
+
+
+def _stylesheets() -> Dict[str, str]:
+    from styles import CSS_V13
+    return {"v13": CSS_V13}
+
+
+def render_cv_html(body_html: str, stylesheet_version: str = CURRENT_STYLESHEET) -> str:
+    """Envelope HTML do CV (CSS inline) usado pelo frontend. Fonte única do template."""
+    css = _stylesheets().get(stylesheet_version)
+    if css is None:
+        raise CacheCodecError(f"Folha de estilo desconhecida: {stylesheet_version}")
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        {css}
+    </style>
+</head>
+<body>
+    <div class="cv-paper-sheet">
+        {body_html}
+    </div>
+</body>
+</html>"""
+
+
+def _render_ast1(markdown: str) -> str:
+    from cv_markdown import cv_to_html, parse_cv_markdown
+    return cv_to_html(parse_cv_markdown(markdown)) if markdown else ""
+
+
+def _markdown_renderers() -> Dict[str, Callable[[str], str]]:
+    from cv_html_legacy import format_text_to_html_v11
+    return {"v11": format_text_to_html_v11, "ast1": _render_ast1}
+
+
+def _markdown_to_body(markdown: str, renderer: str = CURRENT_MARKDOWN_RENDERER) -> str:
+    render = _markdown_renderers().get(renderer)
+    if render is None:
+        raise CacheCodecError(f"Renderer de markdown desconhecido: {renderer}")
+    return render(markdown)
+
+
+# ============================================================
+# TEXTO (zstd opcional)
+# ============================================================
+
+def encode_text(text: Optional[str]) -> Optional[str]:
+    """Comprime textos grandes quando o zstd está habilitado; senão devolve o original."""
+    if not text or not CACHE_ZSTD_ENABLED or zstandard is None:
+        return text
+    raw = text.encode("utf-8")
+    if len(raw) < CACHE_ZSTD_MIN_BYTES:
+        return text
+    packed = ZSTD_PREFIX + base64.b64encode(
+        zstandard.ZstdCompressor(level=CACHE_ZSTD_LEVEL).compress(raw)
+    ).decode("ascii")
+    return packed if len(packed) < len(text) else text
+
+
+def decode_text(value: Optional[str]) -> Optional[str]:
+    """Inverso de encode_text (aceita texto puro de linhas antigas)."""
+    if not isinstance(value, str) or not value.startswith(ZSTD_PREFIX):
+        return value
+    if zstandard is None:
+        raise CacheCodecError("Entrada comprimida com zstd, mas o pacote `zstandard` não está instalado")
+    raw = base64.b64decode(value[len(ZSTD_PREFIX):])
+    return zstandard.ZstdDecompressor().decompress(raw).decode("utf-8")
+
+
+# ============================================================
+# RESULT_JSON
+# ============================================================
+
+def _split_envelope(html: str) -> Optional[tuple]:
+    """(versão, corpo) se o HTML é exatamente o envelope de alguma folha de estilo."""
+    for version in _stylesheets():
+        prefix, suffix = render_cv_html(_BODY_MARKER, version).split(_BODY_MARKER)
+        if html.startswith(prefix) and html.endswith(suffix) and len(html) >= len(prefix) + len(suffix):
+            return version, html[len(prefix):len(html) - len(suffix)]
+    return None
+
+
+def compact_result(result_json: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Versão compacta do result_json para gravação (não altera o dict recebido).
+
+    Idempotente: um resultado já compacto volta igual.
+    """
+    compact = dict(result_json)
+    markdown = compact.pop(MARKDOWN_KEY, None)
+    html = compact.get("cv_otimizado_completo")
+    if COMPACT_KEY in compact or not isinstance(html, str):
+        return compact
+
+    envelope = _split_envelope(html)
+    if envelope is None:
+        return compact
+    version, body_html = envelope
+
+    fmt, body = "html", body_html
+    if markdown:
+        try:
+            if _markdown_to_body(markdown) == body_html:
+                fmt, body = "md", markdown
+        except Exception as e:  # Renderer indisponível: fica com o corpo HTML
+            logger.debug(f"Markdown do CV não verificado ({e}), gravando corpo HTML")
+
+    compact.pop("cv_otimizado_completo")
+    compact[COMPACT_KEY] = {"css": version, "fmt": fmt, "body": encode_text(body)}
+    if fmt == "md":
+        compact[COMPACT_KEY]["renderer"] = CURRENT_MARKDOWN_RENDERER
+    return compact
+
+
+def expand_result(result_json: Dict[str, Any]) -> Dict[str, Any]:
+    """Remonta `cv_otimizado_completo` de um result_json compacto (linhas antigas passam direto)."""
+    if not isinstance(result_json, dict) or COMPACT_KEY not in result_json:
+        return result_json
+    expanded = dict(result_json)
+    packed = expanded.pop(COMPACT_KEY)
+    body = decode_text(packed["body"])
+    if packed.get("fmt") == "md":
+        # Sempre o renderer que gerou a linha (sem versão = V11, anterior à AST)
+        body_html = _markdown_to_body(body, packed.get("renderer", LEGACY_MARKDOWN_RENDERER))
+    else:
+        body_html = body
+    expanded["cv_otimizado_completo"] = render_cv_html(body_html, packed.get("css", CURRENT_STYLESHEET))
+    return expanded
@@ -0,0 +1,248 @@
+"""
+Cache Eviction - Política de remoção com orçamento de linhas/bytes
+
+🎯 PROBLEMA:
+- `cleanup_old_cache` ignorava `max_entries`
+- Linhas expiradas de `partial_cache` só eram removidas quando alguém as lia
+
+✅ SOLUÇÃO:
+1. Varredura de TTL (cached_analyses por last_used, partial_cache por created_at)
+2. Corte até o orçamento de linhas e/ou bytes, removendo primeiro as menos
+   usadas: LRU (last_used) ou LFU (hit_count, depois last_used)
+3. DELETEs em lotes limitados (CACHE_EVICTION_BATCH_SIZE x CACHE_EVICTION_MAX_BATCHES
+   por execução) para não travar o banco
+4. dry_run=True só reporta o que seria removido e quanto espaço seria liberado
+
+Agendamento: CACHE_EVICTION_ENABLED=true registra o job em background_jobs
+Tamanho em bytes: RPC cache_table_size (create_cache_eviction_rpc.sql); sem
+ela o orçamento de bytes é ignorado e o relatório mostra bytes=None.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_EVICTION_ENABLED = os.getenv("CACHE_EVICTION_ENABLED", "false").lower() == "true"
+CACHE_EVICTION_INTERVAL_MINUTES = int(os.getenv("CACHE_EVICTION_INTERVAL_MINUTES", "60"))
+CACHE_EVICTION_BATCH_SIZE = int(os.getenv("CACHE_EVICTION_BATCH_SIZE", "500"))
+CACHE_EVICTION_MAX_BATCHES = int(os.getenv("CACHE_EVICTION_MAX_BATCHES", "20"))
+CACHE_EVICTION_STRATEGY = os.getenv("CACHE_EVICTION_STRATEGY", "lru").lower()
+
+
+def _env_int(name: str, default: int) -> int:
+    value = int(os.getenv(name, str(default)))
+    return value if value > 0 else 0
+
+
+class EvictionPolicy:
+    """Regras de remoção de uma tabela de cache (0 = orçamento desligado)."""
+
+    def __init__(self,
+                 table: str,
+                 ttl_column: str,
+                 ttl_days: float,
+                 max_rows: int = 0,
+                 max_bytes: int = 0,
+                 strategy: str = CACHE_EVICTION_STRATEGY):
+        if strategy not in ("lru", "lfu"):
+            raise ValueError(f"Estratégia de eviction inválida: {strategy}")
+        self.table = table
+        self.ttl_column = ttl_column
+        self.ttl_days = ttl_days
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.strategy = strategy
+
+
+def _partial_cache_ttl_days() -> float:
+    """TTL do cache parcial + maior janela SWR (entradas vencidas ainda podem ser servidas)."""
+    from cache_manager import CacheManager
+
+    ttl = CacheManager.PARTIAL_CACHE_TTL
+    if CacheManager.PARTIAL_CACHE_SWR_ENABLED and CacheManager.PARTIAL_CACHE_SWR_GRACE:
+        ttl += max(CacheManager.PARTIAL_CACHE_SWR_GRACE.values())
+    return ttl.total_seconds() / 86400
+
+
+def default_policies() -> List[EvictionPolicy]:
+    return [
+        EvictionPolicy(
+            table="cached_analyses",
+            ttl_column="last_used",
+            ttl_days=_env_int("CACHE_TTL_DAYS", 60),
+            max_rows=_env_int("CACHE_MAX_ENTRIES", 10000),
+            max_bytes=_env_int("CACHE_MAX_MB", 0) * 1024 * 1024,
+        ),
+        EvictionPolicy(
+            table="partial_cache",
+            ttl_column="created_at",
+            ttl_days=_partial_cache_ttl_days(),
+            max_rows=_env_int("PARTIAL_CACHE_MAX_ENTRIES", 5000),
+            max_bytes=_env_int("PARTIAL_CACHE_MAX_MB", 0) * 1024 * 1024,
+        ),
+    ]
+
+
+class CacheEvictor:
+    """Executa as políticas de remoção sobre o Supabase."""
+
+    def __init__(self,
+                 supabase=None,
+                 batch_size: int = CACHE_EVICTION_BATCH_SIZE,
+                 max_batches: int = CACHE_EVICTION_MAX_BATCHES):
+        self.supabase = supabase or get_supabase_client()
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+
+    # ------------------------------------------------------------
+    # MEDIÇÕES
+    # ------------------------------------------------------------
+
+    def _count(self, policy: EvictionPolicy, older_than: Optional[str] = None) -> int:
+        query = self.supabase.table(policy.table).select("id", count="exact")
+        if older_than:
+            query = query.lt(policy.ttl_column, older_than)
+        return query.limit(1).execute().count or 0
+
+    def _table_bytes(self, policy: EvictionPolicy) -> Optional[int]:
+        try:
+            response = self.supabase.rpc("cache_table_size", {"p_table": policy.table}).execute()
+            return int(response.data) if response.data is not None else None
+        except Exception as e:
+            logger.debug(f"RPC cache_table_size indisponível: {e}")
+            return None
+
+    # ------------------------------------------------------------
+    # REMOÇÃO EM LOTES
+    # ------------------------------------------------------------
+
+    def _eviction_order(self, query, policy: EvictionPolicy):
+        if policy.strategy == "lfu":
+            query = query.order("hit_count").order("last_used")
+        else:
+            query = query.order("last_used")
+        return query
+
+    def _delete_batches(self, policy: EvictionPolicy, limit: int, older_than: Optional[str], batches_left: int) -> tuple:
+        """Remove até `limit` linhas em lotes. Retorna (removidas, lotes usados)."""
+        removed = 0
+        batches = 0
+        while removed < limit and batches < batches_left:
+            query = self.supabase.table(policy.table).select("id")
+            if older_than:
+                query = query.lt(policy.ttl_column, older_than).order(policy.ttl_column)
+            else:
+                query = self._eviction_order(query, policy)
+            response = query.limit(min(self.batch_size, limit - removed)).execute()
+            ids = [row["id"] for row in response.data or []]
+            if not ids:
+                break
+            self.supabase.table(policy.table).delete().in_("id", ids).execute()
+            removed += len(ids)
+            batches += 1
+        return removed, batches
+
+    # ------------------------------------------------------------
+    # EXECUÇÃO
+    # ------------------------------------------------------------
+
+    def evict(self, policy: EvictionPolicy, dry_run: bool = False) -> Dict[str, Any]:
+        """Aplica TTL + orçamento numa tabela e devolve o relatório."""
+        cutoff = (datetime.utcnow() - timedelta(days=float(policy.ttl_days))).isoformat()
+
+        rows_before = self._count(policy)
+        bytes_before = self._table_bytes(policy)
+        avg_row_bytes = (bytes_before / rows_before) if bytes_before and rows_before else None
+
+        ttl_candidates = self._count(policy, older_than=cutoff) if policy.ttl_days else 0
+        rows_after_ttl = rows_before - ttl_candidates
+
+        # Orçamento: o que for maior entre excesso de linhas e excesso de bytes
+        budget_candidates = max(rows_after_ttl - policy.max_rows, 0) if policy.max_rows else 0
+        if policy.max_bytes and avg_row_bytes:
+            bytes_after_ttl = bytes_before - ttl_candidates * avg_row_bytes
+            if bytes_after_ttl > policy.max_bytes:
+                budget_candidates = max(
+                    budget_candidates,
+                    math.ceil((bytes_after_ttl - policy.max_bytes) / avg_row_bytes),
+                )
+
+        report: Dict[str, Any] = {
+            "table": policy.table,
+            "strategy": policy.strategy,
+            "dry_run": dry_run,
+            "rows_before": rows_before,
+            "bytes_before": bytes_before,
+            "ttl_days": policy.ttl_days,
+            "max_rows": policy.max_rows or None,
+            "max_bytes": policy.max_bytes or None,
+            "ttl_candidates": ttl_candidates,
+            "budget_candidates": budget_candidates,
+        }
+
+        if dry_run:
+            would_remove = ttl_candidates + budget_candidates
+            report["would_remove"] = would_remove
+            report["estimated_bytes_reclaimed"] = int(would_remove * avg_row_bytes) if avg_row_bytes else None
+            if budget_candidates:
+                preview = self._eviction_order(
+                    self.supabase.table(policy.table).select("id, last_used, hit_count"), policy
+                ).limit(min(budget_candidates, 5)).execute()
+                report["budget_preview"] = preview.data or []
+            return report
+
+        batches_left = self.max_batches
+        ttl_removed, used = self._delete_batches(policy, ttl_candidates, cutoff, batches_left) if ttl_candidates else (0, 0)
+        batches_left -= used
+        budget_removed, used_budget = (
+            self._delete_batches(policy, budget_candidates, None, batches_left) if budget_candidates else (0, 0)
+        )
+        removed = ttl_removed + budget_removed
+
+        report.update({
+            "ttl_removed": ttl_removed,
+            "budget_removed": budget_removed,
+            "batches": used + used_budget,
+            "pending": (ttl_candidates + budget_candidates) - removed,  # Fica para a próxima execução
+            "estimated_bytes_reclaimed": int(removed * avg_row_bytes) if avg_row_bytes else None,
+        })
+        logger.info(
+            f"🧹 Eviction [{policy.table}]: {ttl_removed} por TTL + {budget_removed} por orçamento "
+            f"({report['batches']} lote(s), pendentes {report['pending']})"
+        )
+        return report
+
+    def run(self, policies: List[EvictionPolicy] = None, dry_run: bool = False) -> Dict[str, Any]:
+        """Executa todas as políticas. Erro numa tabela não impede as outras."""
+        if not self.supabase:
+            return {"error": "Supabase não configurado", "tables": []}
+
+        tables = []
+        for policy in policies or default_policies():
+            try:
+                tables.append(self.evict(policy, dry_run=dry_run))
+            except Exception as e:
+                logger.error(f"❌ Erro no eviction de {policy.table}: {e}")
+                tables.append({"table": policy.table, "error": str(e)})
+        return {"timestamp": datetime.utcnow().isoformat(), "dry_run": dry_run, "tables": tables}
+
+
+def register_cache_eviction_job() -> None:
+    """Registra o eviction periódico (se CACHE_EVICTION_ENABLED=true)."""
+    if not CACHE_EVICTION_ENABLED:
+        return
+    from background_jobs import register_periodic_job
+    register_periodic_job(
+        "cache_eviction",
+        CACHE_EVICTION_INTERVAL_MINUTES * 60,
+        lambda: CacheEvictor().run(),
+        initial_delay=60,
+    )
@@ -25,21 +25,35 @@ Reduz custos de processamento em 60-80% mantendo UX fluida
 
 import hashlib
 import json
-import re
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 import os
-from supabase import create_client
 import logging
 from io import BytesIO
 
+from supabase_client import get_supabase_client
+from cache_codec import compact_result, encode_text, expand_result
+from keyword_engine import keyword_engine, normalize_for_cache
+from cache_usage import is_missing_function, partial_lookup_stats, record_hit
+from refresh_queue import partial_cache_refresh_queue
+from similarity_index import (
+    SIMILARITY_CACHE_ENABLED,
+    SIMILARITY_CACHE_THRESHOLD,
+    SIMILARITY_MAX_CANDIDATES,
+    estimate_jaccard,
+    lsh_buckets,
+    minhash_signature,
+    passes_quality_guard,
+    shingles,
+    tokenize,
+)
+
 logger = logging.getLogger(__name__)
 
 class CacheManager:
     def __init__(self):
-        self.supabase_url = os.getenv("SUPABASE_URL")
-        self.supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # Corrigido nome da variável
-        self.supabase = create_client(self.supabase_url, self.supabase_key)
+        # Cliente compartilhado do processo (sem create_client por instância)
+        self.supabase = get_supabase_client()
         
     # ============================================================
     # CACHE STRATEGY UTILITIES
@@ -56,7 +70,7 @@ class CacheManager:
             True se deve usar cache, False se deve processar sempre pela IA
         """
         # Componentes seguros para cache (conteúdo estático/reutilizável)
-        cached_components = {'library', 'tactical'}
+        cached_components = {'library', 'tactical', 'competitor_digest'}
         
         # Componentes que exigem personalização máxima (sempre processar pela IA)
         personal_components = {'diagnosis', 'cv_writer'}
@@ -77,37 +91,8 @@ class CacheManager:
     # ============================================================
     
     def _normalize_string(self, text: str) -> str:
-        """Normaliza texto para comparação de cache inteligente."""
-        if not text:
-            return ""
-        
-        # Converte para minúsculas
-        text = text.lower()
-        
-        # Remove pontuação e caracteres especiais
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        # Remove stopwords comuns
-        stopwords = {
-            'de', 'para', 'the', 'and', 'or', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
-            'by', 'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
-            'may', 'might', 'must', 'can', 'shall', 'um', 'uma', 'uns', 'umas', 'o', 'a',
-            'os', 'as', 'em', 'no', 'na', 'nos', 'nas', 'por', 'pelo', 'pela', 'pelas',
-            'como', 'com', 'sem', 'se', 'mas', 'mais', 'menos', 'muito', 'muita', 'muito',
-            'pouco', 'pouca', 'poucos', 'poucas', 'também', 'tambem', 'ainda', 'já', 'ja',
-            'sobre', 'entre', 'após', 'apos', 'ate', 'até', 'desde', 'durante', 'através',
-            'atraves', 'contra', 'sem', 'sob', 'sobre', 'depois', 'antes', 'durante'
-        }
-        
-        # Divide em palavras e remove stopwords
-        words = [word.strip() for word in text.split() if word.strip() not in stopwords]
-        
-        # Ordena alfabeticamente para garantir consistência
-        words.sort()
-        
-        # Junta as palavras normalizadas
-        return ' '.join(words)
+        """Normaliza texto para comparação de cache inteligente (stopwords pré-construídas)."""
+        return normalize_for_cache(text)
 
     # ============================================================
     # CACHE PARCIAL INTELIGENTE (Fase 2)
@@ -195,6 +180,14 @@ class CacheManager:
                 "gaps_signature": hashlib.md5("".join(sorted(gap_texts)).encode()).hexdigest()
             }
             
+        elif component_type == "competitor_digest":
+            # Digest do CV de concorrente: chave é o hash do arquivo (competitor_digest.py)
+            normalized = {
+                "type": "competitor_digest",
+                "file_hash": data.get("file_hash", ""),
+                "version": data.get("version", ""),
+            }
+            
         else:
             # Fallback para hash genérico
             normalized = {"type": component_type, "data": str(data)}
@@ -203,54 +196,110 @@ class CacheManager:
         return hashlib.sha256(input_string.encode()).hexdigest()
     
     def _extract_keywords(self, text: str) -> List[str]:
-        """Extrai palavras-chave relevantes do texto da vaga para matching de cache"""
-        text_lower = text.lower()
-        
-        # Extrair cargo principal (primeiras palavras antes de local/salário)
-        # Ex: "Desenvolvedor Full Stack Sênior" -> ["desenvolvedor", "full", "stack", "senior"]
-        title_match = re.search(r'^(?:vaga:\s*)?([^\n-]+)', text_lower)
-        title_keywords = []
-        if title_match:
-            title = title_match.group(1)
-            # Manter apenas palavras significativas do título
-            title_words = re.findall(r'\b(desenvolvedor|engenheiro|analista|gerente|coordenador|especialista|consultor|representante|assistente|auxiliar|operador|técnico|full|stack|backend|frontend|mobile|web|software|dados|devops|cloud|security|ux|ui|product|project|scrum|master|hr|rh|vendas|comercial|marketing|financeiro|contábil|administrativo|logística|supply|chain)\b', title)
-            title_keywords = title_words[:4]  # Primeiras 4 palavras do cargo
-        
-        # Detectar nível de senioridade
-        level_keywords = []
-        if any(word in text_lower for word in ['senior', 'sênior', 'sr']):
-            level_keywords.append('senior')
-        elif any(word in text_lower for word in ['pleno', 'pl']):
-            level_keywords.append('pleno')
-        elif any(word in text_lower for word in ['junior', 'júnior', 'jr']):
-            level_keywords.append('junior')
-        
-        # Tecnologias mencionadas
-        tech_patterns = [
-            r'\b(react|angular|vue)\b',
-            r'\b(node|python|java|go|rust|php|ruby|c\+\+|c#|\.net)\b',
-            r'\b(sql|nosql|mongodb|postgres|mysql)\b',
-            r'\b(aws|azure|gcp|cloud|docker|kubernetes)\b',
-            r'\b(agile|scrum|kanban)\b'
-        ]
-        
-        tech_keywords = []
-        for pattern in tech_patterns:
-            matches = re.findall(pattern, text_lower)
-            tech_keywords.extend(matches)
-        
-        # Combinar todos os keywords e remover duplicatas mantendo ordem
-        all_keywords = title_keywords + level_keywords + tech_keywords[:3]
-        seen = set()
-        unique_keywords = []
-        for kw in all_keywords:
-            if kw not in seen:
-                seen.add(kw)
-                unique_keywords.append(kw)
-        
-        return unique_keywords[:6]  # Limitar a 6 keywords para não ser muito específico
+        """
+        Extrai palavras-chave relevantes do texto da vaga para matching de cache
+        
+        Cargo (até 4 palavras do título) + senioridade + até 3 tecnologias, no
+        máximo 6 keywords. Ex: "Desenvolvedor Full Stack Sênior" ->
+        ["desenvolvedor", "full", "stack", "senior", ...]
+        """
+        return keyword_engine.extract_keywords(text)
+    
+    # TTL padrão do cache parcial
+    PARTIAL_CACHE_TTL = timedelta(days=7)
     
-    def check_partial_cache(self, component_type: str, data: Dict[str, Any], required_keys: List[str] = None) -> Optional[Dict[str, Any]]:
+    # Stale-while-revalidate: depois do TTL, a entrada ainda é servida dentro da
+    # janela de tolerância enquanto uma atualização roda em background
+    PARTIAL_CACHE_SWR_ENABLED = os.getenv("PARTIAL_CACHE_SWR_ENABLED", "true").lower() == "true"
+    PARTIAL_CACHE_SWR_GRACE = {
+        "library": timedelta(days=int(os.getenv("PARTIAL_CACHE_SWR_GRACE_DAYS_LIBRARY", "14"))),
+        "tactical": timedelta(days=int(os.getenv("PARTIAL_CACHE_SWR_GRACE_DAYS_TACTICAL", "7"))),
+    }
+
+    def _partial_entry_state(self, component_type: str, cache_entry: Dict[str, Any], required_keys: List[str] = None) -> tuple:
+        """
+        Classifica uma linha de partial_cache (chaves obrigatórias + TTL + janela SWR).
+        
+        Args:
+            component_type: Tipo do componente
+            cache_entry: Linha retornada pelo Supabase
+            required_keys: Chaves obrigatórias que devem estar presentes e preenchidas
+            
+        Returns:
+            ("fresh", dados) dentro do TTL; ("stale", dados) vencida mas dentro da
+            janela SWR (servir + atualizar em background); ("invalid", None) se
+            corrompida ou fora da janela (deve ser removida)
+        """
+        component_hash = cache_entry.get("component_hash", "")
+        cached_data = cache_entry.get("result_json", {})
+        
+        # save_partial_cache grava result_json serializado; normaliza para dict
+        if isinstance(cached_data, str):
+            try:
+                cached_data = json.loads(cached_data)
+            except json.JSONDecodeError:
+                cached_data = {}
+        if not isinstance(cached_data, dict):
+            cached_data = {}
+        
+        # VALIDAÇÃO DE CHAVES OBRIGATÓRIAS (Regra de Ouro)
+        if required_keys:
+            missing_keys = []
+            invalid_keys = []
+            
+            for key in required_keys:
+                if key not in cached_data:
+                    missing_keys.append(key)
+                elif not cached_data[key]:  # Verifica se está preenchida (não None, não vazia)
+                    invalid_keys.append(key)
+            
+            # Se faltar alguma chave obrigatória, considera CACHE MISS
+            if missing_keys or invalid_keys:
+                logger.warning(f"⚠️ Cache corrompido [{component_type}]. Chaves faltando: {missing_keys}, Chaves vazias: {invalid_keys}")
+                return "invalid", None
+        
+        # Verificar TTL (7 dias) e janela SWR
+        created_at = cache_entry.get("created_at")
+        if created_at:
+            try:
+                created_time = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+                age = datetime.now(created_time.tzinfo) - created_time
+                if age > self.PARTIAL_CACHE_TTL:
+                    grace = self.PARTIAL_CACHE_SWR_GRACE.get(component_type) if self.PARTIAL_CACHE_SWR_ENABLED else None
+                    if grace and age <= self.PARTIAL_CACHE_TTL + grace:
+                        logger.info(f"♻️ Cache vencido dentro da janela SWR [{component_type}]: {component_hash[:8]}...")
+                        return "stale", cached_data
+                    logger.info(f"⏰ Cache expirado [{component_type}]: {component_hash[:8]}...")
+                    return "invalid", None
+            except Exception as ttl_error:
+                logger.warning(f"⚠️ Erro ao verificar TTL: {ttl_error}")
+        
+        return "fresh", cached_data
+
+    def _validate_partial_entry(self, component_type: str, cache_entry: Dict[str, Any], required_keys: List[str] = None) -> Optional[Dict[str, Any]]:
+        """Dados da linha apenas se estiver dentro do TTL (sem SWR), senão None."""
+        state, cached_data = self._partial_entry_state(component_type, cache_entry, required_keys)
+        return cached_data if state == "fresh" else None
+
+    def _schedule_partial_refresh(self, component_type: str, data: Dict[str, Any], component_hash: str) -> None:
+        """Enfileira a regeneração de uma entrada vencida (deduplicada por component_hash)."""
+        if partial_cache_refresh_queue.enqueue(component_hash, self._refresh_partial_entry, component_type, dict(data)):
+            logger.info(f"🔄 Refresh em background agendado [{component_type}]: {component_hash[:8]}...")
+
+    def _refresh_partial_entry(self, component_type: str, data: Dict[str, Any]) -> None:
+        from llm_core import regenerate_partial_component
+        
+        result = regenerate_partial_component(component_type, data)
+        if result:
+            self.save_partial_cache_safe(component_type, data, result, overwrite=True)
+
+    def check_partial_cache(
+        self,
+        component_type: str,
+        data: Dict[str, Any],
+        required_keys: List[str] = None,
+        retry: bool = False,
+    ) -> Optional[Dict[str, Any]]:
         """
         Verifica cache parcial para um componente específico com validação de estratégia e chaves obrigatórias
         
@@ -258,6 +307,8 @@ class CacheManager:
             component_type: Tipo do componente
             data: Dados para gerar hash
             required_keys: Lista de chaves obrigatórias que devem estar presentes e preenchidas
+            retry: Nova tentativa de um lookup já contado (ex: check_partial_cache_many
+                   deu MISS); não conta outro lookup em partial_lookup_stats
             
         Returns:
             Dados do cache ou None se não encontrado/inválido/estratégia proíbe cache
@@ -274,52 +325,102 @@ class CacheManager:
             
             if response.data and len(response.data) > 0:
                 cache_entry = response.data[0]
-                cached_data = cache_entry.get("result_json", {})
+                state, cached_data = self._partial_entry_state(component_type, cache_entry, required_keys)
                 
-                # VALIDAÇÃO DE CHAVES OBRIGATÓRIAS (Regra de Ouro)
-                if required_keys:
-                    missing_keys = []
-                    invalid_keys = []
-                    
-                    for key in required_keys:
-                        if key not in cached_data:
-                            missing_keys.append(key)
-                        elif not cached_data[key]:  # Verifica se está preenchida (não None, não vazia)
-                            invalid_keys.append(key)
-                    
-                    # Se faltar alguma chave obrigatória, considera CACHE MISS
-                    if missing_keys or invalid_keys:
-                        logger.warning(f"⚠️ Cache corrompido [{component_type}]. Chaves faltando: {missing_keys}, Chaves vazias: {invalid_keys}")
-                        
-                        # Delete entrada corrompida imediatamente
-                        try:
-                            self.supabase.table("partial_cache").delete().eq("id", cache_entry["id"]).execute()
-                            logger.info(f"🗑️ Entrada corrompida removida do cache: {component_hash[:8]}...")
-                        except Exception as delete_error:
-                            logger.error(f"❌ Erro ao remover entrada corrompida: {delete_error}")
-                        
-                        return None  # CACHE MISS por entrada corrompida
+                if state == "stale":
+                    self._schedule_partial_refresh(component_type, data, component_hash)
                 
-                # Verificar TTL (7 dias)
-                created_at = cache_entry.get("created_at")
-                if created_at:
+                if cached_data is None:
+                    partial_lookup_stats.record(component_type, hit=False, retry=retry)
+                    # Entrada corrompida/expirada: remover imediatamente
                     try:
-                        created_time = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                        if datetime.now(created_time.tzinfo) - created_time > timedelta(days=7):
-                            # Cache expirado, remover e retornar miss
-                            self.supabase.table("partial_cache").delete().eq("id", cache_entry["id"]).execute()
-                            logger.info(f"⏰ Cache expirado removido: {component_hash[:8]}...")
-                            return None
-                    except Exception as ttl_error:
-                        logger.warning(f"⚠️ Erro ao verificar TTL: {ttl_error}")
+                        self.supabase.table("partial_cache").delete().eq("id", cache_entry["id"]).execute()
+                        logger.info(f"🗑️ Entrada inválida removida do cache: {component_hash[:8]}...")
+                    except Exception as delete_error:
+                        logger.error(f"❌ Erro ao remover entrada inválida: {delete_error}")
+                    return None
                 
+                record_hit("partial_cache", cache_entry.get("id"), cache_entry.get("hit_count"))
+                partial_lookup_stats.record(
+                    component_type, hit=True, prewarmed=cache_entry.get("source") == "prewarm", retry=retry
+                )
                 logger.info(f"✅ CACHE PARCIAL HIT [{component_type}]: {component_hash[:8]}...")
                 return cached_data
+            
+            partial_lookup_stats.record(component_type, hit=False, retry=retry)
                 
         except Exception as e:
             logger.error(f"❌ Erro ao verificar cache parcial [{component_type}]: {e}")
         
         return None  # CACHE MISS
+
+    def check_partial_cache_many(self, data: Dict[str, Any], components: Dict[str, Optional[List[str]]]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Verifica o cache parcial de vários componentes com uma única query.
+        
+        Calcula todos os hashes antes, busca as linhas com um `in_`, valida
+        chaves obrigatórias e TTL por linha e remove as inválidas num único DELETE.
+        
+        Args:
+            data: Dados para gerar os hashes (mesmo payload para todos os componentes)
+            components: Mapa componente -> chaves obrigatórias
+                        (ex: {"library": ["biblioteca_tecnica"], "tactical": [...]})
+            
+        Returns:
+            Mapa componente -> dados do cache (None para miss/inválido/estratégia proíbe cache)
+        """
+        results: Dict[str, Optional[Dict[str, Any]]] = {component: None for component in components}
+        
+        # Hashes apenas dos componentes autorizados pela estratégia
+        hash_to_component: Dict[str, str] = {}
+        for component_type in components:
+            if not self.should_use_cache(component_type):
+                logger.info(f"🚫 Cache ignorado para [{component_type}] por exigir personalização máxima")
+                continue
+            hash_to_component[self.generate_component_hash(component_type, data)] = component_type
+        
+        if not hash_to_component:
+            return results
+        
+        try:
+            response = self.supabase.table("partial_cache").select("*").in_(
+                "component_hash", list(hash_to_component.keys())
+            ).execute()
+        except Exception as e:
+            logger.error(f"❌ Erro ao verificar cache parcial em lote {list(components)}: {e}")
+            return results
+        
+        invalid_ids = []
+        for cache_entry in response.data or []:
+            component_type = hash_to_component.get(cache_entry.get("component_hash"))
+            if not component_type or results[component_type] is not None:
+                continue
+            
+            state, cached_data = self._partial_entry_state(component_type, cache_entry, components[component_type])
+            if state == "invalid":
+                invalid_ids.append(cache_entry["id"])
+                continue
+            if state == "stale":
+                self._schedule_partial_refresh(component_type, data, cache_entry["component_hash"])
+            
+            record_hit("partial_cache", cache_entry.get("id"), cache_entry.get("hit_count"))
+            partial_lookup_stats.record(component_type, hit=True, prewarmed=cache_entry.get("source") == "prewarm")
+            logger.info(f"✅ CACHE PARCIAL HIT [{component_type}]: {cache_entry['component_hash'][:8]}...")
+            results[component_type] = cached_data
+        
+        for component_type in hash_to_component.values():
+            if results[component_type] is None:
+                partial_lookup_stats.record(component_type, hit=False)
+        
+        # Remoção em lote das entradas corrompidas/expiradas
+        if invalid_ids:
+            try:
+                self.supabase.table("partial_cache").delete().in_("id", invalid_ids).execute()
+                logger.info(f"🗑️ {len(invalid_ids)} entrada(s) inválida(s) removida(s) do cache parcial")
+            except Exception as delete_error:
+                logger.error(f"❌ Erro ao remover entradas inválidas: {delete_error}")
+        
+        return results
     
     def save_partial_cache(self, component_type: str, data: Dict[str, Any], result: Dict[str, Any]) -> bool:
         """
@@ -350,6 +451,9 @@ class CacheManager:
                 "last_used": datetime.utcnow().isoformat()
             }
             
+            if SIMILARITY_CACHE_ENABLED and component_type in self.SIMILARITY_COMPONENTS:
+                cache_entry.update(self._similarity_columns(component_type, data))
+            
             response = self.supabase.table("partial_cache").insert(cache_entry).execute()
             
             if response.data:
@@ -361,8 +465,15 @@ class CacheManager:
             
         return False
     
-    def save_partial_cache_safe(self, component_type: str, data: Dict[str, Any], result: Dict[str, Any]) -> bool:
-        """Salva no cache com proteção contra race condition usando UPSERT."""
+    def save_partial_cache_safe(self, component_type: str, data: Dict[str, Any], result: Dict[str, Any], source: str = None, overwrite: bool = False) -> bool:
+        """
+        Salva no cache com proteção contra race condition usando UPSERT.
+        
+        Args:
+            source: Origem da entrada ('prewarm' para o pre-warming; None = tráfego real)
+            overwrite: Substitui resultado/created_at de uma entrada existente
+                       (refresh do SWR), preservando hit_count
+        """
         try:
             component_hash = self.generate_component_hash(component_type, data)
             
@@ -374,12 +485,20 @@ class CacheManager:
                 "hit_count": 1,
                 "last_used": datetime.utcnow().isoformat()
             }
+            if source:
+                cache_entry["source"] = source
+            
+            if SIMILARITY_CACHE_ENABLED and component_type in self.SIMILARITY_COMPONENTS:
+                cache_entry.update(self._similarity_columns(component_type, data))
             
-            # UPSERT: Se já existe, não sobrescreve. Se não existe, cria.
+            if overwrite:
+                cache_entry.pop("hit_count")  # Mantém a popularidade acumulada da entrada
+            
+            # UPSERT: Se já existe, não sobrescreve (exceto refresh). Se não existe, cria.
             response = self.supabase.table("partial_cache").upsert(
                 cache_entry,
                 on_conflict="component_hash",  # Chave única
-                ignore_duplicates=True  # Ignora se já existe
+                ignore_duplicates=not overwrite  # Ignora se já existe
             ).execute()
             
             return True
@@ -387,6 +506,116 @@ class CacheManager:
             logger.error(f"❌ Erro ao salvar cache parcial [{component_type}]: {e}")
             return False
     
+    # ============================================================
+    # REUSO POR SIMILARIDADE (MinHash + LSH)
+    # ============================================================
+    
+    # Componentes cujo resultado pode ser reaproveitado entre vagas parecidas
+    SIMILARITY_COMPONENTS = {'library', 'tactical'}
+    
+    def _similarity_features(self, component_type: str, data: Dict[str, Any]) -> tuple:
+        """
+        Features para MinHash + metadados do guarda de qualidade.
+        
+        Returns:
+            (conjunto de features, meta {"area", "level", "gap_tokens"})
+        """
+        gaps = data.get("gaps_fatais", [])
+        gap_limit = 2 if component_type == "library" else 3  # Mesmo recorte do generate_component_hash
+        gap_tokens = set()
+        if isinstance(gaps, list):
+            for gap in gaps[:gap_limit]:
+                gap_text = gap.get("titulo", gap.get("erro", "")) if isinstance(gap, dict) else str(gap)
+                gap_tokens.update(tokenize(gap_text))
+        
+        meta = {
+            "area": self._normalize_string(data.get("area", "")),
+            "level": "",
+            "gap_tokens": sorted(gap_tokens),
+        }
+        features = {f"gap:{token}" for token in gap_tokens}
+        
+        if component_type == "tactical":
+            job_desc = data.get("job_description", "")
+            levels = [kw for kw in self._extract_keywords(job_desc) if kw in ('senior', 'pleno', 'junior')]
+            meta["level"] = levels[0] if levels else ""
+            features.update(shingles(job_desc))
+        else:
+            features.update(f"area:{token}" for token in meta["area"].split())
+        
+        return features, meta
+    
+    def _similarity_columns(self, component_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Colunas minhash/lsh_buckets/similarity_meta para gravar junto da entrada."""
+        features, meta = self._similarity_features(component_type, data)
+        signature = minhash_signature(features)
+        if not signature:
+            return {}
+        return {
+            "minhash": signature,
+            "lsh_buckets": lsh_buckets(component_type, signature),
+            "similarity_meta": meta,
+        }
+    
+    def find_similar_partial_cache(self,
+                                   component_type: str,
+                                   data: Dict[str, Any],
+                                   required_keys: List[str] = None,
+                                   threshold: float = None) -> Optional[Dict[str, Any]]:
+        """
+        Busca no cache parcial uma entrada de vaga/gaps quase idênticos.
+        
+        Candidatos vêm da sobreposição de buckets LSH; o melhor acima do
+        threshold que passar no guarda de qualidade e na validação normal
+        (chaves obrigatórias + TTL) é reaproveitado.
+        
+        Args:
+            component_type: 'library' ou 'tactical'
+            data: Mesmo payload usado em generate_component_hash (com gaps preenchidos)
+            required_keys: Chaves obrigatórias do resultado
+            threshold: Similaridade mínima (padrão: SIMILARITY_CACHE_THRESHOLD)
+            
+        Returns:
+            Dados do cache ou None
+        """
+        if not SIMILARITY_CACHE_ENABLED or component_type not in self.SIMILARITY_COMPONENTS:
+            return None
+        if not self.supabase:
+            return None
+        
+        threshold = SIMILARITY_CACHE_THRESHOLD if threshold is None else threshold
+        features, meta = self._similarity_features(component_type, data)
+        signature = minhash_signature(features)
+        if not signature:
+            return None
+        
+        try:
+            response = self.supabase.table("partial_cache").select("*").eq(
+                "component_type", component_type
+            ).ov(
+                "lsh_buckets", lsh_buckets(component_type, signature)
+            ).limit(SIMILARITY_MAX_CANDIDATES).execute()
+        except Exception as e:
+            logger.error(f"❌ Erro na busca por similaridade [{component_type}]: {e}")
+            return None
+        
+        scored = []
+        for cache_entry in response.data or []:
+            score = estimate_jaccard(signature, cache_entry.get("minhash") or [])
+            if score >= threshold and passes_quality_guard(meta, cache_entry.get("similarity_meta") or {}):
+                scored.append((score, cache_entry))
+        
+        for score, cache_entry in sorted(scored, key=lambda x: x[0], reverse=True):
+            cached_data = self._validate_partial_entry(component_type, cache_entry, required_keys)
+            if cached_data is not None:
+                record_hit("partial_cache", cache_entry.get("id"), cache_entry.get("hit_count"))
+                partial_lookup_stats.record(component_type, hit=True, prewarmed=cache_entry.get("source") == "prewarm", similar=True)
+                logger.info(f"✅ CACHE PARCIAL SIMILAR HIT [{component_type}]: {cache_entry['component_hash'][:8]}... (similaridade {score:.2f})")
+                return cached_data
+        
+        logger.info(f"🔍 Cache por similaridade MISS [{component_type}] ({len(response.data or [])} candidato(s), threshold {threshold:.2f})")
+        return None
+    
     def generate_input_hash(self, cv_text: str, job_description: str, model_version: str = "gemini-2.0-flash") -> str:
         """
         Gera hash SHA256 dos dados de entrada para deduplicação
@@ -426,14 +655,12 @@ class CacheManager:
             if response.data and len(response.data) > 0:
                 cache_entry = response.data[0]
                 
-                # DESATIVADO: Update on Read para máxima velocidade
-                # self.supabase.table("cached_analyses").update({
-                #     "hit_count": cache_entry["hit_count"] + 1,
-                #     "last_used": datetime.utcnow().isoformat()
-                # }).eq("id", cache_entry["id"]).execute()
+                # hit_count/last_used: acumulado em memória e gravado em lote (write-behind)
+                record_hit("cached_analyses", cache_entry.get("id"), cache_entry.get("hit_count"))
                 
                 logger.info(f"Cache HIT: Hash {input_hash[:8]}... (instantâneo)")
-                return cache_entry["result_json"]
+                # Remonta o HTML do CV a partir do formato compacto (cache_codec)
+                return expand_result(cache_entry["result_json"])
             
             logger.info(f"Cache MISS: Hash {input_hash[:8]}...")
             return None
@@ -470,12 +697,13 @@ class CacheManager:
             if original_filename and "_original_filename" not in result_json:
                 result_json["_original_filename"] = original_filename
             
+            # Formato compacto: corpo do CV + versão do CSS, textos grandes com zstd opcional
             cache_data = {
                 "input_hash": input_hash,
                 "user_id": user_id,
-                "cv_text_original": cv_text,
+                "cv_text_original": encode_text(cv_text),
                 "job_description": job_description,
-                "result_json": result_json,
+                "result_json": compact_result(result_json),
                 "model_version": model_version,
                 "created_at": datetime.utcnow().isoformat(),
                 "last_used": datetime.utcnow().isoformat()
@@ -494,31 +722,44 @@ class CacheManager:
             logger.error(f"Erro ao salvar no cache: {e}")
             return False
     
+    def has_session_analysis(self, session_id: str) -> bool:
+        """True se a análise desta sessão (result_json._session_id) já foi gravada no histórico."""
+        try:
+            response = self.supabase.table("cached_analyses").select("id").eq(
+                "result_json->>_session_id", session_id
+            ).limit(1).execute()
+            return bool(response.data)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao verificar histórico da sessão {session_id}: {e}")
+            return False
+    
     def cleanup_old_cache(self, days: int = 60, max_entries: int = 10000) -> bool:
         """
         Limpa entradas antigas do cache para controlar espaço no banco
         
         Args:
             days: Remove entradas mais antigas que X dias (padrão: 60 dias = 2 meses)
-            max_entries: Mantém no máximo X entradas mais recentes
+            max_entries: Mantém no máximo X entradas (remove as menos usadas - LRU)
         """
+        from cache_eviction import CacheEvictor, EvictionPolicy
+        
         try:
             # Validação para garantir que days seja um número
             if not isinstance(days, (int, float)):
                 days = 60  # valor padrão
-                
-            # 1. Remove entradas mais antigas que X dias
-            cutoff_date = datetime.utcnow() - timedelta(days=float(days))
             
-            response = self.supabase.table("cached_analyses").delete().lt("last_used", cutoff_date).execute()
-            
-            if response.data:
-                removed_count = len(response.data)
-                logger.info(f"Cache cleanup: Removidas {removed_count} entradas antigas (> {days} dias)")
-                return True
-            else:
-                logger.info("Cache cleanup: Nenhuma entrada antiga encontrada")
-                return True
+            policy = EvictionPolicy(
+                table="cached_analyses",
+                ttl_column="last_used",
+                ttl_days=days,
+                max_rows=max_entries,
+            )
+            report = CacheEvictor(self.supabase).evict(policy)
+            logger.info(
+                f"Cache cleanup: Removidas {report['ttl_removed']} entradas antigas (> {days} dias) "
+                f"e {report['budget_removed']} acima do limite de {max_entries}"
+            )
+            return True
                 
         except Exception as e:
             logger.error(f"❌ Erro ao limpar cache: {e}")
@@ -560,59 +801,50 @@ class CacheManager:
             logger.error(f"Erro ao contar histórico: {e}")
             return 0
     
-    def get_cache_stats(self) -> Dict[str, Any]:
+    def get_cache_stats(self, top_n: int = 5) -> Dict[str, Any]:
         """
         Retorna estatísticas de uso do cache para identificar áreas populares.
         
+        Agregação feita no banco (RPC `get_cache_stats_rpc` sobre os contadores
+        de create_cache_stats_counters.sql): custo proporcional ao número de
+        áreas, não de linhas. Sem a migração NÃO há fallback varrendo
+        cached_analyses: o retorno traz `error` ("rpc missing") para o
+        problema aparecer no /admin em vez de custar O(linhas) em silêncio.
+        
         Returns:
-            Dict com total de entradas e top 5 áreas mais buscadas
+            Dict com total de entradas e top N áreas mais buscadas
         """
         try:
-            # Busca todas as análises - vamos filtrar no Python para evitar erros de sintaxe
-            response = self.supabase.table("cached_analyses").select("result_json").execute()
-            
-            if not response.data:
-                return {
-                    "total_entries": 0,
-                    "top_areas": [],
-                    "timestamp": datetime.utcnow().isoformat()
-                }
-            
-            # Processa resultados para contar áreas
-            areas = {}
-            valid_entries = 0
-            
-            for item in response.data:
-                result_json = item.get("result_json", {})
-                
-                # Handle caso seja string JSON
-                if isinstance(result_json, str):
-                    try:
-                        result_json = json.loads(result_json)
-                    except json.JSONDecodeError:
-                        continue
-                
-                # Verifica se tem área válida
-                area = result_json.get("area", "")
-                if area and area != "unknown" and area.strip():
-                    areas[area] = areas.get(area, 0) + 1
-                    valid_entries += 1
-            
-            # Ordena por popularidade e pega top 5
-            top_areas_sorted = sorted(areas.items(), key=lambda x: x[1], reverse=True)[:5]
-            top_areas = [{"area": k, "count": v} for k, v in top_areas_sorted]
-            
-            return {
-                "total_entries": valid_entries,
-                "top_areas": top_areas,
-                "timestamp": datetime.utcnow().isoformat()
-            }
-            
+            response = self.supabase.rpc("get_cache_stats_rpc", {"p_top_areas": top_n}).execute()
+            stats = response.data if isinstance(response.data, dict) else {}
+            if not stats:
+                raise ValueError(f"Resposta inesperada da RPC get_cache_stats_rpc: {response.data!r}")
+            stats["timestamp"] = datetime.utcnow().isoformat()
+            return stats
         except Exception as e:
-            logger.error(f"❌ Erro ao buscar estatísticas do cache: {e}")
+            if is_missing_function(e):
+                logger.error(
+                    "❌ RPC get_cache_stats_rpc não existe. Aplique create_cache_stats_counters.sql."
+                )
+                error = "rpc missing"
+            else:
+                logger.error(f"❌ Erro ao buscar estatísticas do cache: {e}")
+                error = str(e)
             return {
                 "total_entries": 0,
                 "top_areas": [],
                 "timestamp": datetime.utcnow().isoformat(),
-                "error": str(e)
+                "error": error
             }
+
+
+# Instância global LAZY (mesmo padrão do storage_manager)
+_cache_manager_instance = None
+
+def get_cache_manager() -> CacheManager:
+    """Factory function que retorna o CacheManager compartilhado do processo."""
+    global _cache_manager_instance
+    if _cache_manager_instance is None:
+        _cache_manager_instance = CacheManager()
+        logger.info("🗄️ CacheManager criado (lazy initialization)")
+    return _cache_manager_instance
@@ -0,0 +1,265 @@
+"""
+Cache Pre-Warming - Pré-aquece Library/Tactical das combinações mais comuns
+
+🎯 PROBLEMA:
+- /api/admin/cache-stats existe "para análise de pre-warming", mas nada
+  pré-aquecia: o primeiro usuário de cada (área, gaps) paga a latência da IA
+
+✅ SOLUÇÃO:
+1. Lê as top áreas de get_cache_stats e as análises recentes dessas áreas
+2. Agrupa por component_hash (área + assinatura de gaps / keywords da vaga) e
+   ordena pela frequência no histórico
+3. Na janela fora de pico (PREWARM_HOURS, UTC), gera com a IA só o que ainda
+   não está em `partial_cache`, respeitando o teto de custo
+   (PREWARM_MAX_LLM_CALLS por execução e PREWARM_MAX_LLM_CALLS_PER_DAY)
+4. Salva com source='prewarm' (add_partial_cache_source.sql) para o relatório
+   separar os hits do tráfego real servidos por entradas pré-aquecidas
+
+Relatório: GET /api/admin/cache-prewarm (ganho de hit rate no tráfego real)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "false").lower() == "true"
+PREWARM_HOURS = os.getenv("PREWARM_HOURS", "3-6")  # Janela UTC "início-fim" (fim exclusivo)
+PREWARM_INTERVAL_MINUTES = int(os.getenv("PREWARM_INTERVAL_MINUTES", "30"))
+PREWARM_TOP_AREAS = int(os.getenv("PREWARM_TOP_AREAS", "5"))
+PREWARM_HISTORY_LIMIT = int(os.getenv("PREWARM_HISTORY_LIMIT", "500"))
+PREWARM_MIN_FREQUENCY = int(os.getenv("PREWARM_MIN_FREQUENCY", "2"))
+PREWARM_MAX_LLM_CALLS = int(os.getenv("PREWARM_MAX_LLM_CALLS", "10"))
+PREWARM_MAX_LLM_CALLS_PER_DAY = int(os.getenv("PREWARM_MAX_LLM_CALLS_PER_DAY", "60"))
+
+PREWARM_COMPONENTS = ("library", "tactical")
+
+# Hashes por `in_` (vão na URL do PostgREST: centenas de SHA-256 estouram o limite)
+ALREADY_CACHED_CHUNK_SIZE = 100
+
+
+def _in_offpeak_window(now: datetime = None, hours: str = PREWARM_HOURS) -> bool:
+    """True se a hora UTC atual está na janela fora de pico (aceita janela que vira o dia, ex: 22-4)."""
+    hour = (now or datetime.utcnow()).hour
+    try:
+        start, end = (int(h) for h in hours.split("-"))
+    except ValueError:
+        logger.warning(f"⚠️ PREWARM_HOURS inválido: {hours!r}")
+        return False
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class CachePrewarmer:
+    """Escolhe as combinações mais frequentes e gera as que faltam no cache parcial."""
+
+    def __init__(self, cache_manager=None):
+        from cache_manager import get_cache_manager
+        self.cache_manager = cache_manager or get_cache_manager()
+        self._lock = threading.Lock()
+        self._calls_day: Optional[str] = None
+        self._calls_today = 0
+        self.last_report: Optional[Dict[str, Any]] = None
+
+    # ------------------------------------------------------------
+    # CANDIDATOS
+    # ------------------------------------------------------------
+
+    def _recent_analyses(self, areas: List[str]) -> List[Dict[str, Any]]:
+        supabase = self.cache_manager.supabase
+        response = supabase.table("cached_analyses").select(
+            "job_description, area:result_json->>area, gaps:result_json->gaps_fatais"
+        ).in_("result_json->>area", areas).order("created_at", desc=True).limit(PREWARM_HISTORY_LIMIT).execute()
+        return response.data or []
+
+    def candidates(self) -> List[Dict[str, Any]]:
+        """
+        Combinações (componente, payload) ordenadas pela frequência no histórico.
+
+        O payload de cada grupo é o da análise mais recente (representante do arquétipo).
+        """
+        stats = self.cache_manager.get_cache_stats(top_n=PREWARM_TOP_AREAS)
+        areas = [item["area"] for item in stats.get("top_areas", [])]
+        if not areas:
+            return []
+
+        frequency: Counter = Counter()
+        representative: Dict[tuple, Dict[str, Any]] = {}
+        for row in self._recent_analyses(areas):
+            gaps = row.get("gaps")
+            if isinstance(gaps, str):
+                try:
+                    gaps = json.loads(gaps)
+                except json.JSONDecodeError:
+                    gaps = []
+            if not gaps:
+                continue
+            data = {
+                "area": row.get("area") or "",
+                "job_description": row.get("job_description") or "",
+                "gaps_fatais": gaps,
+            }
+            for component_type in PREWARM_COMPONENTS:
+                key = (component_type, self.cache_manager.generate_component_hash(component_type, data))
+                frequency[key] += 1
+                representative.setdefault(key, data)  # Mais recente primeiro
+
+        return [
+            {"component_type": key[0], "component_hash": key[1], "frequency": count, "data": representative[key]}
+            for key, count in frequency.most_common()
+            if count >= PREWARM_MIN_FREQUENCY
+        ]
+
+    def _already_cached(self, component_hashes: List[str]) -> set:
+        if not component_hashes:
+            return set()
+        cached = set()
+        for start in range(0, len(component_hashes), ALREADY_CACHED_CHUNK_SIZE):
+            chunk = component_hashes[start:start + ALREADY_CACHED_CHUNK_SIZE]
+            response = self.cache_manager.supabase.table("partial_cache").select("component_hash").in_(
+                "component_hash", chunk
+            ).execute()
+            cached.update(row["component_hash"] for row in response.data or [])
+        return cached
+
+    # ------------------------------------------------------------
+    # ORÇAMENTO
+    # ------------------------------------------------------------
+
+    def _reserve_call(self) -> bool:
+        """Reserva uma chamada de IA no teto diário."""
+        with self._lock:
+            today = datetime.utcnow().strftime("%Y-%m-%d")
+            if self._calls_day != today:
+                self._calls_day, self._calls_today = today, 0
+            if self._calls_today >= PREWARM_MAX_LLM_CALLS_PER_DAY:
+                return False
+            self._calls_today += 1
+            return True
+
+    # ------------------------------------------------------------
+    # EXECUÇÃO
+    # ------------------------------------------------------------
+
+    def run(self, force: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Executa um ciclo de pre-warming.
+
+        Args:
+            force: Ignora a janela fora de pico
+            dry_run: Só lista o que seria gerado (sem chamar a IA)
+        """
+        report: Dict[str, Any] = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "dry_run": dry_run,
+            "candidates": 0,
+            "already_cached": 0,
+            "generated": [],
+            "skipped_budget": 0,
+            "failed": 0,
+        }
+
+        if not force and not _in_offpeak_window():
+            report["skipped"] = f"fora da janela {PREWARM_HOURS} UTC"
+            return report
+        if not self.cache_manager.supabase:
+            report["skipped"] = "Supabase não configurado"
+            return report
+
+        candidates = self.candidates()
+        cached = self._already_cached([c["component_hash"] for c in candidates])
+        missing = [c for c in candidates if c["component_hash"] not in cached]
+        report["candidates"] = len(candidates)
+        report["already_cached"] = len(candidates) - len(missing)
+
+        from llm_core import regenerate_partial_component
+
+        calls = 0
+        for candidate in missing:
+            entry = {
+                "component_type": candidate["component_type"],
+                "component_hash": candidate["component_hash"][:8],
+                "area": candidate["data"]["area"],
+                "frequency": candidate["frequency"],
+            }
+            if dry_run:
+                report["generated"].append(entry)
+                continue
+            if calls >= PREWARM_MAX_LLM_CALLS or not self._reserve_call():
+                report["skipped_budget"] += 1
+                continue
+
+            calls += 1
+            try:
+                result = regenerate_partial_component(candidate["component_type"], candidate["data"])
+            except Exception as e:
+                logger.error(f"❌ Pre-warm falhou [{candidate['component_type']}]: {e}")
+                result = None
+            if result and self.cache_manager.save_partial_cache_safe(
+                candidate["component_type"], candidate["data"], result, source="prewarm"
+            ):
+                report["generated"].append(entry)
+            else:
+                report["failed"] += 1
+
+        report["llm_calls"] = calls
+        logger.info(
+            f"🔥 Pre-warm: {len(report['generated'])} gerado(s), {report['already_cached']} já em cache, "
+            f"{report['skipped_budget']} adiado(s) pelo teto de custo"
+        )
+        self.last_report = report
+        return report
+
+    def report(self) -> Dict[str, Any]:
+        """Entradas pré-aquecidas, hits recebidos e ganho de hit rate no tráfego real."""
+        from cache_usage import partial_lookup_stats
+
+        prewarmed = {"entries": 0, "hits": 0}
+        try:
+            response = self.cache_manager.supabase.table("partial_cache").select(
+                "hit_count"
+            ).eq("source", "prewarm").execute()
+            rows = response.data or []
+            prewarmed["entries"] = len(rows)
+            prewarmed["hits"] = sum(max((row.get("hit_count") or 1) - 1, 0) for row in rows)  # Nasce com 1
+        except Exception as e:
+            prewarmed["error"] = str(e)
+
+        return {
+            "prewarmed": prewarmed,
+            "live_traffic": partial_lookup_stats.report(),
+            "calls_today": self._calls_today if self._calls_day == datetime.utcnow().strftime("%Y-%m-%d") else 0,
+            "last_run": self.last_report,
+        }
+
+
+_prewarmer_instance: Optional[CachePrewarmer] = None
+
+
+def get_cache_prewarmer() -> CachePrewarmer:
+    """Factory lazy do CachePrewarmer do processo."""
+    global _prewarmer_instance
+    if _prewarmer_instance is None:
+        _prewarmer_instance = CachePrewarmer()
+    return _prewarmer_instance
+
+
+def register_cache_prewarm_job() -> None:
+    """Registra o pre-warming periódico (se PREWARM_ENABLED=true). Só age na janela fora de pico."""
+    if not PREWARM_ENABLED:
+        return
+    from background_jobs import register_periodic_job
+    register_periodic_job(
+        "cache_prewarm",
+        PREWARM_INTERVAL_MINUTES * 60,
+        lambda: get_cache_prewarmer().run(),
+        initial_delay=120,
+    )
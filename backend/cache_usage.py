@@ -0,0 +1,234 @@
+"""
+Cache Usage - Contadores de hit e last_used com escrita adiada (write-behind)
+
+🎯 PROBLEMA:
+- O "update on read" de hit_count/last_used em check_cache foi desativado
+  (um UPDATE síncrono por hit era lento demais), então o eviction LRU/LFU e a
+  análise de popularidade ficaram sem dados
+
+✅ SOLUÇÃO:
+- `record_hit()` só acumula em memória (nenhuma escrita no caminho de leitura)
+- A cada CACHE_HIT_FLUSH_SECONDS um job em background grava tudo de uma vez
+  por tabela via RPC `flush_cache_hits` (create_cache_hits_rpc.sql):
+  hit_count += n, last_used = GREATEST(last_used, visto)
+- Sem a RPC (função não criada no banco), cai para um UPDATE por linha
+  (ainda fora do caminho de leitura); erro transitório da RPC devolve o lote
+  inteiro para o próximo ciclo
+- O acumulador é esvaziado também no shutdown do processo
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Tuple
+
+from supabase_client import get_supabase_client
+
+logger = logging.getLogger(__name__)
+
+CACHE_HIT_TRACKING_ENABLED = os.getenv("CACHE_HIT_TRACKING_ENABLED", "true").lower() == "true"
+CACHE_HIT_FLUSH_SECONDS = float(os.getenv("CACHE_HIT_FLUSH_SECONDS", "5"))
+CACHE_HIT_MAX_PENDING = int(os.getenv("CACHE_HIT_MAX_PENDING", "5000"))
+
+TRACKED_TABLES = ("cached_analyses", "partial_cache")
+
+
+class HitAccumulator:
+    """Acumula hits por (tabela, id) e grava em lote."""
+
+    def __init__(self, max_pending: int = CACHE_HIT_MAX_PENDING):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # tabela -> id -> [hits, último acesso ISO, hit_count lido (fallback sem RPC)]
+        self._pending: Dict[str, Dict[Any, list]] = {table: {} for table in TRACKED_TABLES}
+        self.flushed_hits = 0
+        self.flush_errors = 0
+        self._rpc_available = True
+
+    def record_hit(self, table: str, row_id: Any, current_hit_count: int = None) -> None:
+        """Registra um hit (O(1), sem I/O)."""
+        if not CACHE_HIT_TRACKING_ENABLED or row_id is None or table not in self._pending:
+            return
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            entry = self._pending[table].get(row_id)
+            if entry is None:
+                self._pending[table][row_id] = [1, now, current_hit_count]
+            else:
+                entry[0] += 1
+                entry[1] = now
+            pending = sum(len(rows) for rows in self._pending.values())
+
+        # Pico de tráfego: não deixa o acumulador crescer sem limite
+        if pending >= self.max_pending and not self._flush_lock.locked():
+            threading.Thread(target=self.flush, name="cache-hits-flush", daemon=True).start()
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(len(rows) for rows in self._pending.values())
+
+    def _drain(self) -> Dict[str, Dict[Any, list]]:
+        with self._lock:
+            drained = self._pending
+            self._pending = {table: {} for table in TRACKED_TABLES}
+        return drained
+
+    def _requeue(self, table: str, rows: Dict[Any, list]) -> None:
+        """Devolve hits não gravados ao acumulador (somando com os novos)."""
+        with self._lock:
+            current = self._pending[table]
+            for row_id, (hits, last_used, base) in rows.items():
+                entry = current.get(row_id)
+                if entry is None:
+                    current[row_id] = [hits, last_used, base]
+                else:
+                    entry[0] += hits
+                    entry[1] = max(entry[1], last_used)
+
+    def flush(self) -> int:
+        """Grava os hits acumulados. Retorna o número de linhas atualizadas."""
+        with self._flush_lock:
+            drained = self._drain()
+            if not any(drained.values()):
+                return 0
+
+            supabase = get_supabase_client()
+            if not supabase:
+                return 0
+
+            updated = 0
+            for table, rows in drained.items():
+                if not rows:
+                    continue
+                try:
+                    updated += self._flush_table(supabase, table, rows)
+                except Exception as e:
+                    self.flush_errors += 1
+                    logger.warning(f"⚠️ Erro ao gravar hits de {table} ({e}). Tentando no próximo ciclo.")
+                    self._requeue(table, rows)
+
+            if updated:
+                logger.info(f"📈 Hits de cache gravados em lote: {updated} linha(s)")
+            return updated
+
+    def _flush_table(self, supabase, table: str, rows: Dict[Any, list]) -> int:
+        if self._rpc_available:
+            payload = [
+                {"id": str(row_id), "hits": hits, "last_used": last_used}
+                for row_id, (hits, last_used, _) in rows.items()
+            ]
+            try:
+                supabase.rpc("flush_cache_hits", {"p_table": table, "p_hits": payload}).execute()
+                self.flushed_hits += sum(hits for hits, _, _ in rows.values())
+                return len(rows)
+            except Exception as rpc_error:
+                # Erro transitório (rede, timeout): sobe e o lote volta inteiro para o acumulador
+                if not is_missing_function(rpc_error):
+                    raise
+                logger.warning(f"⚠️ RPC flush_cache_hits não existe ({rpc_error}), usando UPDATE por linha")
+                self._rpc_available = False
+        return self._flush_table_per_row(supabase, table, rows)
+
+    def _flush_table_per_row(self, supabase, table: str, rows: Dict[Any, list]) -> int:
+        """UPDATE por linha; só as linhas que falharam voltam ao acumulador (sem contar duas vezes)."""
+        failed: Dict[Any, list] = {}
+        for row_id, (hits, last_used, base) in rows.items():
+            update: Dict[str, Any] = {"last_used": last_used}
+            if base is not None:
+                update["hit_count"] = base + hits
+            try:
+                supabase.table(table).update(update).eq("id", row_id).execute()
+                self.flushed_hits += hits
+            except Exception as e:
+                logger.debug(f"UPDATE de hits falhou ({table}, {row_id}): {e}")
+                failed[row_id] = [hits, last_used, base]
+        if failed:
+            self.flush_errors += 1
+            logger.warning(f"⚠️ {len(failed)} linha(s) de {table} sem hits gravados. Tentando no próximo ciclo.")
+            self._requeue(table, failed)
+        return len(rows) - len(failed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending_count(),
+            "flushed_hits": self.flushed_hits,
+            "flush_errors": self.flush_errors,
+        }
+
+
+def is_missing_function(error: Exception) -> bool:
+    """RPC não criada no banco (PostgREST PGRST202)."""
+    return "PGRST202" in str(error) or "Could not find the function" in str(error)
+
+
+# Instância global
+hit_accumulator = HitAccumulator()
+
+
+class PartialLookupStats:
+    """
+    Hit rate do cache parcial no tráfego real (desde o início do processo).
+
+    `prewarm_hits` separa os hits servidos por entradas do pre-warming
+    (cache_prewarm.py), para medir o ganho: hit rate sem pre-warm =
+    (hits - prewarm_hits) / lookups.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def record(
+        self,
+        component_type: str,
+        hit: bool,
+        prewarmed: bool = False,
+        similar: bool = False,
+        retry: bool = False,
+    ) -> None:
+        """
+        Um lookup por componente por análise: `similar` e `retry` (busca exata
+        repetida com os gaps reais) vêm depois de um MISS já contado, então só
+        somam o hit - nunca outro lookup.
+        """
+        with self._lock:
+            counters = self._counters.setdefault(
+                component_type, {"lookups": 0, "hits": 0, "prewarm_hits": 0, "similar_hits": 0}
+            )
+            if similar:
+                counters["similar_hits"] += 1
+                counters["hits"] += 1
+            elif retry:
+                counters["hits"] += int(hit)
+            else:
+                counters["lookups"] += 1
+                counters["hits"] += int(hit)
+            counters["prewarm_hits"] += int(hit and prewarmed)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot = {component: dict(c) for component, c in self._counters.items()}
+        for counters in snapshot.values():
+            lookups = counters["lookups"] or 1
+            counters["hit_rate"] = round(counters["hits"] / lookups, 4)
+            counters["hit_rate_without_prewarm"] = round((counters["hits"] - counters["prewarm_hits"]) / lookups, 4)
+        return snapshot
+
+
+partial_lookup_stats = PartialLookupStats()
+
+
+def record_hit(table: str, row_id: Any, current_hit_count: int = None) -> None:
+    hit_accumulator.record_hit(table, row_id, current_hit_count)
+
+
+def register_cache_usage_job() -> None:
+    """Registra o flush periódico dos hits (se CACHE_HIT_TRACKING_ENABLED=true)."""
+    if not CACHE_HIT_TRACKING_ENABLED:
+        return
+    from background_jobs import register_periodic_job
+    register_periodic_job("cache_hits_flush", CACHE_HIT_FLUSH_SECONDS, hit_accumulator.flush)
@@ -0,0 +1,222 @@
+"""
+Competitor Digest - Resumo estruturado dos CVs de concorrentes, por hash do arquivo
+
+🎯 PROBLEMA:
+- Os PDFs de concorrentes eram extraídos um por um e até 15.000 caracteres
+  de CADA um iam no prompt do agente de competidores
+- Benchmarks repetidos contra os mesmos concorrentes re-parseavam e
+  re-enviavam o texto inteiro
+
+✅ SOLUÇÃO:
+1. Cada CV de concorrente vira UMA vez um digest compacto e determinístico
+   (sem IA): área, senioridade, anos de experiência, skills e destaques
+   quantificados - sem linhas de contato (LGPD)
+2. Digest cacheado pelo SHA-256 do arquivo: memória (LRU) -> partial_cache
+   (component_type "competitor_digest")
+3. Só os arquivos sem digest são extraídos, todos de uma vez via
+   extrair_textos_pdf (process pool quando PDF_EXTRACT_PROCESSES > 0)
+4. O prompt recebe os digests (~1-2k chars por concorrente) no lugar do texto
+
+COMPETITOR_DIGEST_ENABLED=false volta ao texto completo (até 15.000 chars).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPETITOR_DIGEST_ENABLED = os.getenv("COMPETITOR_DIGEST_ENABLED", "true").lower() == "true"
+COMPETITOR_DIGEST_MEMORY_ITEMS = int(os.getenv("COMPETITOR_DIGEST_MEMORY_ITEMS", "256"))
+COMPETITOR_FULL_TEXT_CHARS = 15000  # Limite antigo por concorrente (modo texto completo)
+DIGEST_VERSION = "v1"  # Mudou a heurística? Incrementa para invalidar os digests antigos
+
+MAX_SKILLS = 15
+MAX_HIGHLIGHTS = 6
+MAX_HIGHLIGHT_CHARS = 220
+
+SENIORITY_PATTERNS = [
+    ("lideranca", re.compile(r"\b(head|diretor|diretora|gerente|coordenador|coordenadora|tech lead|líder|lider)\b")),
+    ("senior", re.compile(r"\b(s[eê]nior|sr\.?)\b")),
+    ("pleno", re.compile(r"\bpleno\b")),
+    ("junior", re.compile(r"\b(j[uú]nior|jr\.?|estagi[áa]rio|trainee)\b")),
+]
+YEARS_EXPERIENCE_RE = re.compile(r"(\d{1,2})\+?\s*anos?\s+de\s+experi[eê]ncia")
+YEAR_RE = re.compile(r"\b(19[89]\d|20[0-4]\d)\b")
+CURRENT_JOB_RE = re.compile(r"\b(atual|presente|atualmente|o momento)\b")
+QUANTIFIED_RE = re.compile(r"(\d+([.,]\d+)?\s*%|R\$\s*\d|US\$\s*\d|\b\d+([.,]\d+)?\s*(mil|mi|k|x)\b)", re.IGNORECASE)
+CONTACT_RE = re.compile(r"@|https?://|www\.|linkedin|\(?\d{2}\)?\s*9?\d{4}[-\s]?\d{4}", re.IGNORECASE)
+
+
+# ============================================================
+# DIGEST (determinístico, sem IA)
+# ============================================================
+
+def build_digest(text: str) -> Dict[str, Any]:
+    """Reduz o texto de um CV a {area, seniority, years_experience, skills, highlights}."""
+    from keyword_engine import keyword_engine
+
+    text = text or ""
+    text_lower = text.lower()
+    profile = keyword_engine.analyze(text)
+
+    seniority = next((level for level, pattern in SENIORITY_PATTERNS if pattern.search(text_lower)), "")
+
+    explicit_years = [int(y) for y in YEARS_EXPERIENCE_RE.findall(text_lower)]
+    years_experience = max(explicit_years) if explicit_years else None
+    if years_experience is None:
+        years = [int(y) for y in YEAR_RE.findall(text)]
+        if CURRENT_JOB_RE.search(text_lower):
+            years.append(datetime.now().year)
+        if len(years) >= 2:
+            years_experience = max(years) - min(years)
+
+    highlights = []
+    for line in text.splitlines():
+        line = " ".join(line.split()).lstrip("•-–* ")
+        if len(line) < 25 or CONTACT_RE.search(line) or not QUANTIFIED_RE.search(line):
+            continue
+        highlights.append(line[:MAX_HIGHLIGHT_CHARS])
+        if len(highlights) >= MAX_HIGHLIGHTS:
+            break
+
+    return {
+        "version": DIGEST_VERSION,
+        "area": profile["area"],
+        "seniority": seniority,
+        "years_experience": years_experience,
+        "skills": list(dict.fromkeys(profile["tech_mentions"]))[:MAX_SKILLS],
+        "highlights": highlights,
+        "source_chars": len(text),
+    }
+
+
+def render_digest(index: int, digest: Dict[str, Any]) -> str:
+    """Bloco do prompt de um concorrente."""
+    lines = [f"--- CONCORRENTE {index} ---", f"Área: {digest.get('area') or 'não identificada'}"]
+    if digest.get("seniority"):
+        lines.append(f"Senioridade: {digest['seniority']}")
+    if digest.get("years_experience") is not None:
+        lines.append(f"Experiência: ~{digest['years_experience']} anos")
+    if digest.get("skills"):
+        lines.append(f"Skills: {', '.join(digest['skills'])}")
+    if digest.get("highlights"):
+        lines.append("Destaques:")
+        lines.extend(f"- {h}" for h in digest["highlights"])
+    return "\n".join(lines)
+
+
+# ============================================================
+# CACHE (memória -> partial_cache)
+# ============================================================
+
+class CompetitorDigestCache:
+    """Digests por hash do arquivo do concorrente."""
+
+    def __init__(self, max_items: int = COMPETITOR_DIGEST_MEMORY_ITEMS):
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, file_hash: str, digest: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items[file_hash] = digest
+            self._items.move_to_end(file_hash)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            digest = self._items.get(file_hash)
+            if digest is not None:
+                self._items.move_to_end(file_hash)
+        if digest is None:
+            try:
+                from cache_manager import get_cache_manager
+                digest = get_cache_manager().check_partial_cache(
+                    "competitor_digest", {"file_hash": file_hash, "version": DIGEST_VERSION}
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao buscar digest de concorrente: {e}")
+            if digest is not None:
+                self._remember(file_hash, digest)
+        if digest is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return digest
+
+    def put(self, file_hash: str, digest: Dict[str, Any]) -> None:
+        self._remember(file_hash, digest)
+        try:
+            from cache_manager import get_cache_manager
+            get_cache_manager().save_partial_cache_safe(
+                "competitor_digest", {"file_hash": file_hash, "version": DIGEST_VERSION}, digest
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao salvar digest de concorrente: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            items = len(self._items)
+        return {"items": items, "hits": self.hits, "misses": self.misses}
+
+
+# Instância global
+competitor_digest_cache = CompetitorDigestCache()
+
+
+# ============================================================
+# API
+# ============================================================
+
+def build_competitors_text(competitor_files: List[Any]) -> str:
+    """
+    Texto de concorrentes para o prompt (vazio se nenhum arquivo legível).
+
+    Aceita bytes ou arquivos (BytesIO/UploadFile.file), como extrair_textos_pdf.
+    """
+    from logic import extrair_textos_pdf
+    from pdf_text import read_source
+
+    datas = [read_source(f) for f in competitor_files or []]
+    datas = [d for d in datas if d]
+    if not datas:
+        return ""
+
+    if not COMPETITOR_DIGEST_ENABLED:
+        texts = extrair_textos_pdf(datas)
+        return "\n".join(
+            f"--- CONCORRENTE {i} ---\n{text[:COMPETITOR_FULL_TEXT_CHARS]}"
+            for i, text in enumerate(texts, 1) if text
+        )
+
+    hashes = [hashlib.sha256(d).hexdigest() for d in datas]
+    # Buscas no cache são I/O (Supabase): todas ao mesmo tempo
+    with ThreadPoolExecutor(max_workers=min(len(hashes), 4)) as executor:
+        digests = list(executor.map(competitor_digest_cache.get, hashes))
+
+    missing = [i for i, digest in enumerate(digests) if digest is None]
+    if missing:
+        texts = extrair_textos_pdf([datas[i] for i in missing])
+        for i, text in zip(missing, texts):
+            if text:
+                digests[i] = build_digest(text)
+                competitor_digest_cache.put(hashes[i], digests[i])
+
+    blocks = [render_digest(n, d) for n, d in enumerate((d for d in digests if d), 1)]
+    logger.info(
+        f"⚔️ {len(blocks)} concorrente(s) resumidos ({len(datas) - len(missing)} do cache, "
+        f"{sum(len(b) for b in blocks)} chars no prompt)"
+    )
+    return "\n\n".join(blocks)
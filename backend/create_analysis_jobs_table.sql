@@ -0,0 +1,79 @@
+-- Fila durável de jobs (job_queue.py) - análises premium fora do processo web
+-- Execução at-least-once: o worker pega o job com um lease; se o processo cair
+-- (restart/deploy), o lease expira e o job volta a ser pego por outro worker.
+
+CREATE TABLE IF NOT EXISTS analysis_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    job_type TEXT NOT NULL,                         -- ex: premium_analysis
+    session_id UUID,                                -- analysis_sessions.id (idempotência)
+    payload JSONB NOT NULL DEFAULT '{}'::jsonb,     -- argumentos (bytes em base64); limpo ao concluir
+    status TEXT NOT NULL DEFAULT 'queued',          -- queued | running | done | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    available_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    lease_until TIMESTAMP WITH TIME ZONE,
+    worker_id TEXT,
+    last_error TEXT,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMP WITH TIME ZONE,
+    finished_at TIMESTAMP WITH TIME ZONE
+);
+
+-- Um job por (sessão, tipo): reenfileirar a mesma sessão não duplica trabalho
+-- (índice completo para servir de alvo do upsert on_conflict; NULLs não conflitam)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_jobs_session_type
+    ON analysis_jobs(session_id, job_type);
+
+-- Busca dos próximos jobs e métricas de profundidade/idade
+CREATE INDEX IF NOT EXISTS idx_analysis_jobs_ready ON analysis_jobs(status, available_at);
+
+comment on table analysis_jobs is 'Fila durável de jobs de análise (lease + at-least-once)';
+
+-- Pega o próximo job disponível (queued, ou running com lease vencido)
+CREATE OR REPLACE FUNCTION claim_analysis_job(p_worker TEXT, p_lease_seconds INTEGER)
+RETURNS SETOF analysis_jobs
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE analysis_jobs j
+    SET status = 'running',
+        attempts = j.attempts + 1,
+        worker_id = p_worker,
+        lease_until = NOW() + make_interval(secs => p_lease_seconds),
+        started_at = COALESCE(j.started_at, NOW())
+    WHERE j.id = (
+        SELECT c.id FROM analysis_jobs c
+        WHERE c.attempts < c.max_attempts
+          AND (
+              (c.status = 'queued' AND c.available_at <= NOW())
+              OR (c.status = 'running' AND c.lease_until < NOW())
+          )
+        ORDER BY c.available_at, c.id
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.*;
+END;
+$$;
+
+-- Jobs cujo worker morreu na última tentativa: marca como failed e devolve as sessões
+CREATE OR REPLACE FUNCTION sweep_analysis_jobs()
+RETURNS TABLE(job_id BIGINT, session_id UUID)
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE analysis_jobs j
+    SET status = 'failed',
+        last_error = COALESCE(j.last_error, 'lease expirado na última tentativa'),
+        finished_at = NOW(),
+        payload = '{}'::jsonb
+    WHERE j.status = 'running'
+      AND j.lease_until < NOW()
+      AND j.attempts >= j.max_attempts
+    RETURNING j.id, j.session_id;
+END;
+$$;
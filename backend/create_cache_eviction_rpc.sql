@@ -0,0 +1,20 @@
+-- Tamanho em disco das tabelas de cache (orçamento de bytes do cache_eviction.py)
+-- Restrito às tabelas de cache para não expor metadados de outras tabelas
+
+CREATE OR REPLACE FUNCTION cache_table_size(p_table TEXT)
+RETURNS BIGINT
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+AS $$
+BEGIN
+    IF p_table NOT IN ('cached_analyses', 'partial_cache') THEN
+        RAISE EXCEPTION 'Tabela não permitida: %', p_table;
+    END IF;
+    RETURN pg_total_relation_size(p_table::regclass);
+END;
+$$;
+
+-- Índices usados pela ordenação LRU/LFU e pela varredura de TTL
+CREATE INDEX IF NOT EXISTS idx_cached_analyses_hit_count_last_used ON cached_analyses(hit_count, last_used);
+CREATE INDEX IF NOT EXISTS idx_partial_cache_hit_count_last_used ON partial_cache(hit_count, last_used);
@@ -0,0 +1,31 @@
+-- Gravação em lote dos hits de cache acumulados em memória (cache_usage.py)
+-- p_hits: [{"id": "...", "hits": 3, "last_used": "2026-01-01T12:00:00"}, ...]
+
+CREATE OR REPLACE FUNCTION flush_cache_hits(p_table TEXT, p_hits JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+DECLARE
+    v_updated INTEGER := 0;
+BEGIN
+    IF p_table = 'cached_analyses' THEN
+        UPDATE cached_analyses c
+        SET hit_count = COALESCE(c.hit_count, 0) + h.hits,
+            last_used = GREATEST(COALESCE(c.last_used, h.last_used), h.last_used)
+        FROM jsonb_to_recordset(p_hits) AS h(id TEXT, hits INTEGER, last_used TIMESTAMPTZ)
+        WHERE c.id = h.id::uuid;
+        GET DIAGNOSTICS v_updated = ROW_COUNT;
+    ELSIF p_table = 'partial_cache' THEN
+        UPDATE partial_cache p
+        SET hit_count = COALESCE(p.hit_count, 0) + h.hits,
+            last_used = GREATEST(COALESCE(p.last_used, h.last_used), h.last_used)
+        FROM jsonb_to_recordset(p_hits) AS h(id TEXT, hits INTEGER, last_used TIMESTAMPTZ)
+        WHERE p.id = h.id::bigint;
+        GET DIAGNOSTICS v_updated = ROW_COUNT;
+    ELSE
+        RAISE EXCEPTION 'Tabela não permitida: %', p_table;
+    END IF;
+    RETURN v_updated;
+END;
+$$;
@@ -0,0 +1,91 @@
+-- Estatísticas do cache agregadas no servidor
+-- Antes: get_cache_stats puxava result_json de TODAS as linhas de cached_analyses
+-- Agora: contadores (área, model_version, dia) mantidos por trigger a cada INSERT/DELETE
+--        + RPC que devolve o agregado (custo proporcional ao nº de áreas, não de linhas)
+
+-- 1. Área extraída do JSON (coluna gerada, sem mudar o save_to_cache)
+ALTER TABLE cached_analyses
+    ADD COLUMN IF NOT EXISTS area TEXT GENERATED ALWAYS AS (result_json->>'area') STORED;
+
+CREATE INDEX IF NOT EXISTS idx_cached_analyses_area ON cached_analyses(area);
+
+-- 2. Contadores incrementais
+CREATE TABLE IF NOT EXISTS cache_stats_counters (
+    area TEXT NOT NULL,
+    model_version TEXT NOT NULL DEFAULT '',
+    day DATE NOT NULL,
+    entries BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (area, model_version, day)
+);
+
+CREATE OR REPLACE FUNCTION cache_stats_counters_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO cache_stats_counters (area, model_version, day, entries)
+        VALUES (COALESCE(NEW.area, ''), COALESCE(NEW.model_version, ''), COALESCE(NEW.created_at, NOW())::date, 1)
+        ON CONFLICT (area, model_version, day)
+        DO UPDATE SET entries = cache_stats_counters.entries + 1;
+        RETURN NEW;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE cache_stats_counters
+        SET entries = GREATEST(entries - 1, 0)
+        WHERE area = COALESCE(OLD.area, '')
+          AND model_version = COALESCE(OLD.model_version, '')
+          AND day = COALESCE(OLD.created_at, NOW())::date;
+        RETURN OLD;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_cache_stats_counters ON cached_analyses;
+CREATE TRIGGER trg_cache_stats_counters
+    AFTER INSERT OR DELETE ON cached_analyses
+    FOR EACH ROW EXECUTE FUNCTION cache_stats_counters_trigger();
+
+-- 3. Backfill a partir das linhas existentes (rodar uma vez)
+INSERT INTO cache_stats_counters (area, model_version, day, entries)
+SELECT COALESCE(area, ''), COALESCE(model_version, ''), created_at::date, COUNT(*)
+FROM cached_analyses
+GROUP BY 1, 2, 3
+ON CONFLICT (area, model_version, day) DO UPDATE SET entries = EXCLUDED.entries;
+
+-- 4. RPC consumida por CacheManager.get_cache_stats
+CREATE OR REPLACE FUNCTION get_cache_stats_rpc(p_top_areas INTEGER DEFAULT 5, p_days INTEGER DEFAULT 7)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    WITH valid AS (
+        SELECT * FROM cache_stats_counters
+        WHERE area <> '' AND area <> 'unknown' AND TRIM(area) <> '' AND entries > 0
+    )
+    SELECT json_build_object(
+        'total_entries', COALESCE((SELECT SUM(entries) FROM valid), 0),
+        'top_areas', COALESCE((
+            SELECT json_agg(json_build_object('area', area, 'count', total) ORDER BY total DESC)
+            FROM (
+                SELECT area, SUM(entries) AS total FROM valid
+                GROUP BY area ORDER BY total DESC LIMIT p_top_areas
+            ) t
+        ), '[]'::json),
+        'by_model_version', COALESCE((
+            SELECT json_object_agg(model_version, total)
+            FROM (SELECT model_version, SUM(entries) AS total FROM valid GROUP BY model_version) t
+        ), '{}'::json),
+        'last_days', COALESCE((
+            SELECT json_agg(json_build_object('day', day, 'count', total) ORDER BY day DESC)
+            FROM (
+                SELECT day, SUM(entries) AS total FROM valid
+                WHERE day > CURRENT_DATE - p_days
+                GROUP BY day
+            ) t
+        ), '[]'::json)
+    );
+$$;
+
+comment on table cache_stats_counters is 'Contadores de cached_analyses por área/modelo/dia (mantidos por trigger)';
@@ -0,0 +1,14 @@
+-- Tabela de locks para Single-Flight entre workers
+-- Evita que o mesmo CV+vaga rode dois pipelines completos em workers diferentes
+
+CREATE TABLE IF NOT EXISTS inflight_locks (
+    lock_key VARCHAR(64) PRIMARY KEY,       -- generate_input_hash / component_hash
+    owner TEXT NOT NULL,                    -- pid-uuid do worker que está processando
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Índice para limpeza de locks expirados
+CREATE INDEX IF NOT EXISTS idx_inflight_locks_expires ON inflight_locks(expires_at);
+
+comment on table inflight_locks is 'Locks leves de computação em andamento (single-flight entre workers)';
@@ -0,0 +1,29 @@
+-- Merge atômico do progresso de uma sessão de análise (session_progress.py)
+-- Substitui o SELECT result_data -> merge em Python -> UPDATE do JSON inteiro:
+-- uma única ida ao banco, e steps concorrentes (cv/library/tactical) não perdem chaves.
+--
+-- p_data: objeto JSON com as chaves novas (mescladas por cima com jsonb ||)
+-- p_step: novo current_step. Um step intermediário atrasado não sobrescreve
+--         um step terminal (completed/failed) já gravado.
+
+CREATE OR REPLACE FUNCTION merge_session_progress(p_session_id UUID, p_data JSONB, p_step TEXT)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    UPDATE analysis_sessions
+    SET result_data = CASE
+            WHEN jsonb_typeof(result_data) = 'object' THEN result_data
+            ELSE '{}'::jsonb
+        END || COALESCE(p_data, '{}'::jsonb),
+        current_step = CASE
+            WHEN current_step IN ('completed', 'failed') AND p_step NOT IN ('completed', 'failed')
+                THEN current_step
+            ELSE p_step
+        END,
+        updated_at = NOW()
+    WHERE id = p_session_id;
+    RETURN FOUND;
+END;
+$$;
@@ -0,0 +1,29 @@
+-- Documentos enviados (document_store.py) - extração do CV feita uma vez por arquivo
+-- document_id = SHA-256 dos bytes; os endpoints de análise aceitam o id no lugar do upload
+
+CREATE TABLE IF NOT EXISTS uploaded_documents (
+    document_id VARCHAR(64) PRIMARY KEY,            -- sha256 hex do arquivo
+    cv_text TEXT NOT NULL,                          -- texto extraído (já truncado/com nota VANT)
+    is_vant_certified BOOLEAN NOT NULL DEFAULT FALSE,
+    page_count INTEGER NOT NULL DEFAULT 0,
+    filename TEXT,
+    byte_size INTEGER NOT NULL DEFAULT 0,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,   -- mesmo TTL dos temp files (24h)
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Limpeza de documentos expirados
+CREATE INDEX IF NOT EXISTS idx_uploaded_documents_expires ON uploaded_documents(expires_at);
+
+comment on table uploaded_documents is 'Cache da extração de CVs enviados, por hash de conteúdo';
+
+-- Quem enviou cada documento: o document_id é só o hash do conteúdo, então as
+-- rotas autenticadas só usam documentos enviados pelo próprio usuário
+CREATE TABLE IF NOT EXISTS uploaded_document_owners (
+    document_id VARCHAR(64) NOT NULL REFERENCES uploaded_documents(document_id) ON DELETE CASCADE,
+    user_id UUID NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (document_id, user_id)
+);
+
+comment on table uploaded_document_owners is 'Usuários que enviaram cada documento (escopo do document_id)';
@@ -0,0 +1,115 @@
+"""
+CV HTML Legacy - Renderer markdown -> HTML anterior à AST (cv_markdown.py), congelado
+
+🎯 PROBLEMA:
+- Linhas de `cached_analyses` com `_cv_compact.fmt == "md"` guardam só o
+  markdown e o HTML é remontado na leitura (cache_codec)
+- As linhas gravadas antes da AST foram verificadas contra ESTE renderer: com
+  o renderer novo (cargos como cabeçalho de vaga, skills como chips, espaços
+  diferentes) elas voltariam com um HTML diferente do que foi mostrado
+
+✅ SOLUÇÃO:
+- Cópia fiel do format_text_to_html V11, usada pelo cache_codec para as
+  linhas md sem versão de renderer ("v11"). NÃO alterar: qualquer mudança
+  quebra a remontagem byte a byte dessas linhas
+"""
+
+import re
+
+
+# ============================================================
+# FORMATADOR HTML V11 (STABLE LAYOUT - DUAL ROW)
+# ============================================================
+def format_text_to_html_v11(text):
+    """Corpo HTML do CV no layout V11 (cópia congelada - não alterar)."""
+    if not text: return ""
+    
+    text = text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    html_output = []
+    lines = text.split('\n')
+    
+    for line in lines:
+        line = line.strip()
+        if not line: continue
+            
+        # 1. NOME & 2. SEÇÕES (Manter igual)
+        if line.startswith('# '):
+            clean = line.replace('# ', '').upper()
+            html_output.append(f'<h1 class="vant-cv-name">{clean}</h1>')
+        elif line.startswith('###'):
+            clean = line.replace('###', '').strip().upper()
+            html_output.append(f'<h2 class="vant-cv-section">{clean}</h2>')
+            
+        # 3. TRATAMENTO DE LISTAS (CARGOS vs TAREFAS)
+        elif line.startswith('- ') or line.startswith('* ') or line.startswith('• '):
+            clean = re.sub(r'^[-*•]\s+', '', line)
+            clean = re.sub(r'\*\*(.*?)\*\*', r'<span class="vant-bold">\1</span>', clean)
+            
+            # --- LÓGICA DE HEADER DE VAGA (ESTRUTURA DE 2 LINHAS) ---
+            if '|' in line:
+                parts = [p.strip() for p in clean.split('|')]
+                
+                # Variáveis padrão
+                cargo = clean
+                empresa = ""
+                data = ""
+                
+                if len(parts) >= 3:
+                    cargo = parts[0]
+                    empresa = parts[1]
+                    data = parts[2].replace('*', '').replace('_', '').strip()
+                elif len(parts) == 2:
+                    cargo = parts[0]
+                    empresa = parts[1].replace('*', '').strip()
+                
+                # Montagem do HTML com quebra forçada
+                job_html = f"""
+                <div class="vant-cv-job-container">
+                    <div class="vant-job-row-primary">
+                        <span class="vant-job-title">{cargo}</span>
+                        <span class="vant-job-sep">|</span>
+                        <span class="vant-job-company">{empresa}</span>
+                    </div>
+                    """
+                
+                # Só adiciona a linha da data se ela existir
+                if data:
+                    job_html += f"""
+                    <div class="vant-job-row-secondary">
+                        <span class="vant-job-date">{data}</span>
+                    </div>
+                    """
+                
+                job_html += "</div>"
+                html_output.append(job_html)
+            
+            # --- LÓGICA DE TAREFAS (Manter igual) ---
+            else:
+                row = f"""
+                <div class="vant-cv-grid-row">
+                    <div class="vant-cv-bullet-col">•</div>
+                    <div class="vant-cv-text-col">{clean}</div>
+                </div>
+                """
+                html_output.append(row)
+
+        # 4. CONTATOS & 5. TEXTO CORRIDO (Manter igual)
+        elif ('|' in line or '@' in line) and len(line) < 300:
+            clean_line = line.replace('**', '')
+            parts = [p.strip() for p in clean_line.split('|')]
+            items_html = []
+            for p in parts:
+                if p:
+                    if ":" in p:
+                        label, val = p.split(":", 1)
+                        block = f'<span class="vant-contact-block"><span class="vant-bold">{label}:</span> {val}</span>'
+                        items_html.append(block)
+                    else:
+                        items_html.append(f'<span class="vant-contact-block">{p}</span>')
+            full_html = '<span class="vant-contact-separator"> • </span>'.join(items_html)
+            html_output.append(f'<div class="vant-cv-contact-line">{full_html}</div>')
+        else:
+            clean = re.sub(r'\*\*(.*?)\*\*', r'<span class="vant-bold">\1</span>', line)
+            html_output.append(f'<p class="vant-cv-paragraph">{clean}</p>')
+            
+    return "\n".join(html_output)
@@ -0,0 +1,324 @@
+"""
+CV Markdown - Parser único do CV (markdown do formatador) para uma AST tipada
+
+🎯 PROBLEMA:
+- O mesmo markdown era interpretado de 3 jeitos: format_text_to_html
+  (tela/PDF), o parser de linhas do DOCX e parse_raw_data_to_struct (que
+  ainda fazia print do resultado inteiro)
+- Cada um classificava as linhas de um jeito: a mesma linha virava
+  cabeçalho de vaga no Word e linha de contato na tela, skills viravam
+  chips num e bullet no outro
+- Gerar tela + PDF + DOCX parseava o CV 3 vezes
+
+✅ SOLUÇÃO:
+1. parse_cv_markdown(): tokenizer de passada única -> CvDocument com blocos
+   tipados (Name, Contacts, Section, JobHeader, Bullet, Chips, Paragraph)
+2. AST imutável, cacheada pelo SHA-256 do texto: o CV é parseado uma vez,
+   não importa quantos formatos sejam gerados
+3. Renderers só consomem a AST: cv_to_html() aqui (tela e PDF) e
+   docx_template.gerar_docx_cv() (Word)
+
+GRAMÁTICA (linha a linha, linhas vazias ignoradas):
+- "# X" -> Name | "###X" -> Section (skills: título com a PALAVRA SKILLS,
+  COMPETÊNCIAS ou HABILIDADES - "EXPERIÊNCIA TÉCNICA" não é skills)
+- Antes da 1ª seção: 1ª linha curta sem cara de contato -> Name;
+  linha com "|", "@" ou rótulo de contato -> Contacts
+- Em seção de skills: itens separados por "•", "|" (ou vírgula) -> Chips, só
+  se TODOS os itens couberem num chip; senão a linha segue como Bullet/Paragraph
+  (nenhum texto é descartado)
+- "Cargo | Empresa | Data" (com bullet, ou qualquer linha dentro de seção) -> JobHeader
+- "- ", "* " ou "• " -> Bullet | resto -> Paragraph
+- Texto inline: **negrito** vira span em negrito; "*" solto é removido
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple, Union
+
+CV_AST_CACHE_ITEMS = int(os.getenv("CV_AST_CACHE_ITEMS", "256"))
+
+CONTACT_KEYWORDS = ("@", "linkedin", "github", "telefone", "email", ".com")
+INVALID_VALUES = ("não informado", "nao informado", "n/a", "null", "none", "")
+
+MAX_NAME_CHARS = 100
+MAX_CONTACT_CHARS = 300
+MAX_CHIP_CHARS = 60
+
+_SKILL_SECTION_RE = re.compile(r"\b(SKILLS?|COMPET[ÊE]NCIAS?|HABILIDADES?)\b")  # Palavra inteira
+_BULLET_RE = re.compile(r"^[-*•]\s+")
+_BOLD_RE = re.compile(r"\*\*(.*?)\*\*")
+_CHIP_SPLIT_RE = re.compile(r"\s*[•|]\s*")
+_CHIP_LIST_SPLIT_RE = re.compile(r"\s*[,;]\s*")
+_CONTACT_SPLIT_RE = re.compile(r"\s*[|•]\s*")
+_CONTACT_LABEL_RE = re.compile(r"^([^:/@]{1,20}):\s*(.+)$")
+
+
+# ============================================================
+# AST
+# ============================================================
+
+Spans = Tuple[Tuple[str, bool], ...]  # ((texto, negrito), ...)
+
+
+class Name(NamedTuple):
+    text: str
+
+
+class ContactItem(NamedTuple):
+    label: str  # "" quando o item não tem rótulo ("Email:", "LinkedIn:")
+    value: str
+
+
+class Contacts(NamedTuple):
+    items: Tuple[ContactItem, ...]
+
+
+class Section(NamedTuple):
+    title: str
+    is_skills: bool
+
+
+class JobHeader(NamedTuple):
+    role: str
+    company: str
+    date: str
+
+
+class Bullet(NamedTuple):
+    spans: Spans
+
+
+class Chips(NamedTuple):
+    items: Tuple[str, ...]
+
+
+class Paragraph(NamedTuple):
+    spans: Spans
+
+
+Block = Union[Name, Contacts, Section, JobHeader, Bullet, Chips, Paragraph]
+
+
+class CvDocument(NamedTuple):
+    blocks: Tuple[Block, ...]
+
+
+# ============================================================
+# TOKENIZER
+# ============================================================
+
+def is_valid(text) -> bool:
+    """Valida se o texto não é lixo ("Não informado", "N/A", ...)."""
+    if not text:
+        return False
+    t = str(text).strip().lower()
+    return t not in INVALID_VALUES and len(t) > 1
+
+
+def is_contact_line(text) -> bool:
+    t = text.lower()
+    return "|" in t or any(kw in t for kw in CONTACT_KEYWORDS)
+
+
+def _plain(text: str) -> str:
+    return text.replace("*", "").strip()
+
+
+def _spans(text: str) -> Spans:
+    parts = _BOLD_RE.split(text)
+    spans = []
+    for i, part in enumerate(parts):
+        bold = i % 2 == 1  # re.split com grupo: [texto, negrito, texto, negrito, ...]
+        part = part if bold else part.replace("*", "")
+        if part:
+            spans.append((part, bold))
+    return tuple(spans)
+
+
+def _contacts(line: str) -> Optional[Contacts]:
+    items = []
+    for part in _CONTACT_SPLIT_RE.split(_plain(line)):
+        match = _CONTACT_LABEL_RE.match(part)
+        label, value = (match.group(1).strip(), match.group(2).strip()) if match else ("", part.strip())
+        if is_valid(value):
+            items.append(ContactItem(label, value))
+    return Contacts(tuple(items)) if items else None
+
+
+def _chips(text: str) -> Optional[Tuple[str, ...]]:
+    """Itens da linha como chips, ou None se algum item não cabe num chip."""
+    splitter = _CHIP_SPLIT_RE if ("•" in text or "|" in text) else _CHIP_LIST_SPLIT_RE
+    items = tuple(item for item in (_plain(part).rstrip(".") for part in splitter.split(text)) if is_valid(item))
+    if not items or any(len(item) > MAX_CHIP_CHARS for item in items):
+        return None
+    return items
+
+
+def _job_header(text: str) -> Optional[JobHeader]:
+    parts = [_plain(p) for p in text.split("|")]
+    if len(parts) < 2 or not is_valid(parts[0]) or not is_valid(parts[1]):
+        return None
+    date = parts[2].replace("_", "").strip() if len(parts) >= 3 else ""
+    return JobHeader(parts[0], parts[1], date if is_valid(date) else "")
+
+
+def _tokenize(text: str) -> CvDocument:
+    blocks = []
+    section: Optional[Section] = None
+    has_name = False
+
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if line.startswith("# "):
+            blocks.append(Name(_plain(line[2:])))
+            has_name = True
+            continue
+
+        if line.startswith("###"):
+            title = _plain(line.lstrip("#"))
+            section = Section(title, bool(_SKILL_SECTION_RE.search(title.upper())))
+            blocks.append(section)
+            continue
+
+        bullet = _BULLET_RE.match(line)
+        body = line[bullet.end():] if bullet else line
+
+        if section is None and not bullet:
+            if is_contact_line(line) and len(line) < MAX_CONTACT_CHARS:
+                contacts = _contacts(line)
+                if contacts:
+                    blocks.append(contacts)
+                continue
+            if not has_name and len(line) < MAX_NAME_CHARS:
+                blocks.append(Name(_plain(line)))
+                has_name = True
+                continue
+
+        if section is not None and section.is_skills:
+            items = _chips(body)
+            if items:
+                blocks.append(Chips(items))
+                continue
+
+        if "|" in body and (bullet or section is not None):
+            header = _job_header(body)
+            if header:
+                blocks.append(header)
+                continue
+
+        blocks.append(Bullet(_spans(body)) if bullet else Paragraph(_spans(line)))
+
+    return CvDocument(tuple(blocks))
+
+
+# ============================================================
+# CACHE (por hash do conteúdo)
+# ============================================================
+
+class _AstCache:
+    def __init__(self, max_items: int = CV_AST_CACHE_ITEMS):
+        self.max_items = max_items
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, CvDocument]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_parse(self, text: str) -> CvDocument:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            document = self._items.get(key)
+            if document is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return document
+            self.misses += 1
+        document = _tokenize(text)
+        with self._lock:
+            self._items[key] = document
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return document
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"items": len(self._items), "hits": self.hits, "misses": self.misses}
+
+
+_ast_cache = _AstCache()
+
+
+def parse_cv_markdown(text: str) -> CvDocument:
+    """AST do CV (cacheada pelo hash do texto; a AST é imutável e compartilhada)."""
+    if not text:
+        return CvDocument(())
+    return _ast_cache.get_or_parse(text)
+
+
+def ast_cache_stats() -> Dict[str, int]:
+    return _ast_cache.stats()
+
+
+# ============================================================
+# RENDER HTML (tela e PDF)
+# ============================================================
+
+_CONTACT_SEPARATOR_HTML = '<span class="vant-contact-separator"> • </span>'
+
+
+def _escape(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _spans_html(spans: Spans) -> str:
+    return "".join(
+        f'<span class="vant-bold">{_escape(text)}</span>' if bold else _escape(text)
+        for text, bold in spans
+    )
+
+
+def _block_html(block: Block) -> str:
+    if isinstance(block, Name):
+        return f'<h1 class="vant-cv-name">{_escape(block.text.upper())}</h1>'
+    if isinstance(block, Section):
+        return f'<h2 class="vant-cv-section">{_escape(block.title.upper())}</h2>'
+    if isinstance(block, Contacts):
+        items = [
+            f'<span class="vant-contact-block"><span class="vant-bold">{_escape(item.label)}:</span> {_escape(item.value)}</span>'
+            if item.label else f'<span class="vant-contact-block">{_escape(item.value)}</span>'
+            for item in block.items
+        ]
+        return f'<div class="vant-cv-contact-line">{_CONTACT_SEPARATOR_HTML.join(items)}</div>'
+    if isinstance(block, JobHeader):
+        date_html = (
+            f'<div class="vant-job-row-secondary"><span class="vant-job-date">{_escape(block.date)}</span></div>'
+            if block.date else ""
+        )
+        return (
+            '<div class="vant-cv-job-container"><div class="vant-job-row-primary">'
+            f'<span class="vant-job-title">{_escape(block.role)}</span>'
+            '<span class="vant-job-sep">|</span>'
+            f'<span class="vant-job-company">{_escape(block.company)}</span>'
+            f'</div>{date_html}</div>'
+        )
+    if isinstance(block, Bullet):
+        return (
+            '<div class="vant-cv-grid-row"><div class="vant-cv-bullet-col">•</div>'
+            f'<div class="vant-cv-text-col">{_spans_html(block.spans)}</div></div>'
+        )
+    if isinstance(block, Chips):
+        chips = "".join(f'<span class="vant-skill-chip">{_escape(item)}</span>' for item in block.items)
+        return f'<div class="vant-skills-container">{chips}</div>'
+    return f'<p class="vant-cv-paragraph">{_spans_html(block.spans)}</p>'
+
+
+def cv_to_html(document: CvDocument) -> str:
+    """Corpo HTML do CV (classes do CSS_V13; envelope fica com quem chama)."""
+    return "\n".join(_block_html(block) for block in document.blocks)
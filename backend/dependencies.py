@@ -16,12 +16,14 @@ import stripe
 from fastapi import File, Form, UploadFile, Request, HTTPException, Header
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from supabase import create_client, Client
+from supabase import Client
 from supabase.lib.client_options import ClientOptions
 
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
+from supabase_client import get_supabase_client
+
 logger = logging.getLogger(__name__)
 
 # ============================================================
@@ -86,9 +88,10 @@ if STRIPE_SECRET_KEY:
 
 supabase_admin: Client | None = None
 if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+    # Mesmo cliente usado por CacheManager e update_session_progress (um pool por processo)
     # Usar timeout padrão por enquanto para evitar ClientOptions incompatível
-    supabase_admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-    logger.info("Cliente Supabase criado com timeout padrão (ClientOptions desabilitado temporariamente)")
+    supabase_admin = get_supabase_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    logger.info("Cliente Supabase compartilhado com timeout padrão (ClientOptions desabilitado temporariamente)")
 
 # ============================================================
 # PRICING (SINGLE SOURCE OF TRUTH)
@@ -354,7 +357,8 @@ def _entitlements_status(user_id: str) -> dict[str, Any]:
     }
 
 
-def _consume_one_credit(user_id: str) -> None:
+def _consume_one_credit(user_id: str) -> dict:
+    """Consome 1 crédito (assinatura primeiro, depois avulsos). Retorna a origem (para _refund_one_credit)."""
     if not supabase_admin or not user_id:
         raise RuntimeError("Banco não configurado")
 
@@ -401,7 +405,7 @@ def _consume_one_credit(user_id: str) -> None:
             # Se used >= limit_val, NÃO levantar erro - cair para créditos avulsos abaixo
 
     if consumed_from_subscription:
-        return
+        return {"source": "usage", "period_start": period_start}
 
     # Consumir de créditos avulsos (fallback quando assinatura esgotada ou inexistente)
     credits = (
@@ -416,6 +420,68 @@ def _consume_one_credit(user_id: str) -> None:
     if balance <= 0:
         raise RuntimeError("Sem créditos")
     supabase_admin.table("user_credits").update({"balance": balance - 1}).eq("user_id", user_id).execute()
+    return {"source": "balance"}
+
+
+def _refund_one_credit(user_id: str, consumed: dict) -> None:
+    """Devolve o crédito consumido por _consume_one_credit (análise que não chegou a ser iniciada)."""
+    if not supabase_admin or not user_id or not consumed:
+        return
+    try:
+        if consumed.get("source") == "usage":
+            usage = (
+                supabase_admin.table("usage")
+                .select("used")
+                .eq("user_id", user_id)
+                .eq("period_start", consumed.get("period_start"))
+                .limit(1)
+                .execute()
+            )
+            row = (usage.data or [])[0] if usage.data else None
+            if row:
+                supabase_admin.table("usage").update({"used": max(0, int(row.get("used", 0)) - 1)}).eq(
+                    "user_id", user_id
+                ).eq("period_start", consumed.get("period_start")).execute()
+        else:
+            credits = (
+                supabase_admin.table("user_credits").select("balance").eq("user_id", user_id).limit(1).execute()
+            )
+            row = (credits.data or [])[0] if credits.data else None
+            if row:
+                supabase_admin.table("user_credits").update({"balance": int(row.get("balance", 0)) + 1}).eq(
+                    "user_id", user_id
+                ).execute()
+        logger.info(f"↩️ Crédito devolvido para usuário {user_id} ({consumed.get('source')})")
+    except Exception as e:
+        logger.error(f"❌ Erro ao devolver crédito do usuário {user_id}: {e}")
+        sentry_sdk.capture_exception(e)
+
+
+def _refund_session_credit(session_id: str) -> bool:
+    """
+    Devolve o crédito gravado na sessão (analysis_sessions.credit_consumed) de uma
+    análise que falhou sem entregar resultado. Idempotente entre processos: só
+    quem consegue zerar `credit_consumed` devolve o crédito.
+    """
+    if not supabase_admin:
+        return False
+    try:
+        response = supabase_admin.table("analysis_sessions").select("user_id, credit_consumed").eq(
+            "id", session_id
+        ).limit(1).execute()
+        session = (response.data or [None])[0]
+        if not session or not session.get("credit_consumed"):
+            return False
+        claimed = supabase_admin.table("analysis_sessions").update({"credit_consumed": None}).eq(
+            "id", session_id
+        ).not_.is_("credit_consumed", "null").execute()
+        if not claimed.data:
+            return False  # Outro processo já devolveu
+    except Exception as e:
+        logger.error(f"❌ Erro ao ler crédito da sessão {session_id}: {e}")
+        return False
+    _refund_one_credit(session["user_id"], session["credit_consumed"])
+    return True
 
 
 def _create_fallback_subscription(payload: ActivateEntitlementsRequest, plan_id: str, plan: dict) -> JSONResponse:
@@ -492,12 +558,36 @@ def _process_analysis_background(
     area_of_interest: str,
     competitors_bytes: list[bytes] | None = None,
     filename: str = None,
-    cv_text_preextracted: str | None = None
+    cv_text_preextracted: str | None = None,
+    final_attempt: bool = True,
 ) -> None:
     """
     Função background para processamento assíncrono da análise.
-    Usa orquestrador streaming com progressive loading.
+    Conta a sessão como em execução no admission control enquanto roda.
+
+    final_attempt=False (job da fila com tentativas sobrando): erros sobem para
+    a fila reexecutar com backoff, em vez de marcar a sessão como failed.
     """
+    from admission import admission_controller
+    with admission_controller.running(session_id):
+        _run_analysis_pipeline(
+            session_id, user_id, file_bytes, job_description, area_of_interest,
+            competitors_bytes, filename, cv_text_preextracted, final_attempt,
+        )
+
+
+def _run_analysis_pipeline(
+    session_id: str,
+    user_id: str,
+    file_bytes: bytes | None,
+    job_description: str,
+    area_of_interest: str,
+    competitors_bytes: list[bytes] | None = None,
+    filename: str = None,
+    cv_text_preextracted: str | None = None,
+    final_attempt: bool = True,
+) -> None:
+    """Extrai o texto e roda o orquestrador streaming com progressive loading."""
     sentry_sdk.set_context("user", {"id": user_id})
     sentry_sdk.set_tag("background_task", "process_analysis")
     
@@ -522,15 +612,11 @@ def _process_analysis_background(
             update_session_progress(session_id, {"error": "PDF vazio ou inválido"}, "failed")
             return
         
-        # Preparar competidores
+        # Preparar competidores (digest por hash do arquivo - competitor_digest.py)
         competitors_text = None
         if competitors_bytes:
-            competitors_texts = []
-            for comp_bytes in competitors_bytes:
-                comp_text = extrair_texto_pdf(io.BytesIO(comp_bytes))
-                if comp_text:
-                    competitors_texts.append(comp_text)
-            competitors_text = "\n\n---\n\n".join(competitors_texts) if competitors_texts else None
+            from competitor_digest import build_competitors_text
+            competitors_text = build_competitors_text(competitors_bytes) or None
         
         # Carregar catálogo de livros
         try:
@@ -553,12 +639,17 @@ def _process_analysis_background(
             books_catalog=books_catalog,
             competitors_text=competitors_text,
             user_id=user_id,
-            original_filename=filename
+            original_filename=filename,
+            final_attempt=final_attempt,
         )
         
         logger.info(f"✅ Orquestrador concluído para sessão {session_id}")
         
     except Exception as e:
+        if not final_attempt:
+            # Fila reexecuta com backoff; a sessão continua "processando"
+            logger.warning(f"🔁 Erro na análise {session_id} ({e}), nova tentativa pela fila")
+            raise
         logger.error(f"❌ Erro fatal no background task {session_id}: {e}")
         sentry_sdk.capture_exception(e)
         
@@ -574,6 +665,161 @@ def _process_analysis_background(
             logger.error(f"❌ Erro ao atualizar status para failed: {update_error}")
 
 
+# ============================================================
+# JOB QUEUE (análises premium duráveis - job_queue.py)
+# ============================================================
+
+PREMIUM_ANALYSIS_JOB = "premium_analysis"
+ORPHAN_SESSION_MINUTES = int(os.getenv("ORPHAN_SESSION_MINUTES", "15"))
+
+
+def _encode_bytes(data: bytes | None) -> str | None:
+    import base64
+    return base64.b64encode(data).decode("ascii") if data else None
+
+
+def _decode_bytes(data: str | None) -> bytes | None:
+    import base64
+    return base64.b64decode(data) if data else None
+
+
+def enqueue_premium_analysis(
+    session_id: str,
+    user_id: str,
+    file_bytes: bytes | None,
+    job_description: str,
+    area_of_interest: str,
+    competitors_bytes: list[bytes] | None = None,
+    filename: str = None,
+    cv_text_preextracted: str | None = None
+) -> bool:
+    """Grava a análise na fila durável. False se a fila estiver desligada/indisponível."""
+    from job_queue import get_job_queue
+
+    queue = get_job_queue()
+    if queue is None:
+        return False
+    payload = {
+        "user_id": user_id,
+        "file_b64": _encode_bytes(file_bytes),
+        "job_description": job_description,
+        "area_of_interest": area_of_interest,
+        "competitors_b64": [_encode_bytes(b) for b in competitors_bytes or []],
+        "filename": filename,
+        "cv_text": cv_text_preextracted,
+    }
+    try:
+        queue.enqueue(PREMIUM_ANALYSIS_JOB, payload, session_id=session_id)
+        return True
+    except Exception as e:
+        logger.error(f"❌ Erro ao enfileirar análise {session_id}: {e}")
+        return False
+
+
+def _run_premium_analysis_job(payload: dict, job: dict) -> None:
+    """
+    Handler idempotente do job premium (pode rodar mais de uma vez):
+    - sessão já concluída/falha -> nada a fazer
+    - reexecução: progresso é mesclado (jsonb ||), Library/Tactical vêm do cache
+      parcial e o histórico não duplica (cached_analyses por _session_id)
+    - erro antes da última tentativa sobe para o JobWorkerPool (retry com backoff)
+    """
+    session_id = str(job["session_id"])
+    if supabase_admin:
+        current = supabase_admin.table("analysis_sessions").select("current_step").eq(
+            "id", session_id
+        ).limit(1).execute()
+        if not current.data:
+            logger.warning(f"⚠️ Job {job['id']}: sessão {session_id} não existe mais, descartando")
+            return
+        if current.data[0].get("current_step") in ("completed", "failed"):
+            logger.info(f"♻️ Job {job['id']}: sessão {session_id} já finalizada, nada a refazer")
+            return
+    attempts = job.get("attempts") or 1
+    if attempts > 1:
+        logger.info(f"🔁 Retomando análise {session_id} (tentativa {attempts})")
+    # Só a última tentativa marca a sessão como failed; antes disso o erro sobe para o retry da fila
+    from job_queue import JOB_QUEUE_MAX_ATTEMPTS
+    final_attempt = attempts >= (job.get("max_attempts") or JOB_QUEUE_MAX_ATTEMPTS)
+
+    _process_analysis_background(
+        session_id,
+        payload.get("user_id"),
+        _decode_bytes(payload.get("file_b64")),
+        payload.get("job_description") or "",
+        payload.get("area_of_interest") or "",
+        [_decode_bytes(b) for b in payload.get("competitors_b64") or []] or None,
+        payload.get("filename"),
+        payload.get("cv_text"),
+        final_attempt,
+    )
+
+
+def recover_analysis_sessions() -> dict:
+    """
+    Startup: fecha jobs cujo worker morreu na última tentativa e sessões
+    órfãs (ainda "processando", sem job ativo e sem update há
+    ORPHAN_SESSION_MINUTES - ex: iniciadas pelo BackgroundTasks antes de um
+    restart), para o frontend parar de esperar. O crédito consumido por essas
+    análises é devolvido (_refund_session_credit).
+
+    Sessões com job na fila não precisam de nada: o lease vencido devolve o
+    job aos workers.
+    """
+    from job_queue import get_job_queue
+    from llm_core import update_session_progress
+
+    report = {"exhausted_jobs": 0, "orphan_sessions": 0, "refunded_credits": 0}
+    queue = get_job_queue()
+    if queue is None or not supabase_admin:
+        return report
+
+    for job in queue.store.sweep():
+        if job.get("session_id"):
+            session_id = str(job["session_id"])
+            update_session_progress(session_id, {"error": "Análise interrompida após várias tentativas"}, "failed")
+            report["refunded_credits"] += int(_refund_session_credit(session_id))
+        report["exhausted_jobs"] += 1
+
+    cutoff = (datetime.utcnow() - timedelta(minutes=ORPHAN_SESSION_MINUTES)).isoformat()
+    stale = supabase_admin.table("analysis_sessions").select("id").not_.in_(
+        "current_step", ["completed", "failed"]
+    ).lt("updated_at", cutoff).limit(200).execute()
+    for row in stale.data or []:
+        if queue.store.has_active_job(row["id"]):
+            continue
+        update_session_progress(
+            row["id"],
+            {"error": "Análise interrompida por reinício do servidor. Tente novamente."},
+            "failed",
+        )
+        report["refunded_credits"] += int(_refund_session_credit(row["id"]))
+        report["orphan_sessions"] += 1
+
+    if report["exhausted_jobs"] or report["orphan_sessions"]:
+        logger.warning(
+            f"🩹 Recuperação: {report['exhausted_jobs']} job(s) esgotado(s), "
+            f"{report['orphan_sessions']} sessão(ões) órfã(s) marcadas como failed, "
+            f"{report['refunded_credits']} crédito(s) devolvido(s)"
+        )
+    return report
+
+
+def start_analysis_job_queue() -> None:
+    """Registra o handler premium, recupera sessões e inicia os workers (se JOB_QUEUE_ENABLED=true)."""
+    from job_queue import get_job_queue
+
+    queue = get_job_queue()
+    if queue is None:
+        return
+    queue.register_handler(PREMIUM_ANALYSIS_JOB, _run_premium_analysis_job)
+    try:
+        recover_analysis_sessions()
+    except Exception as e:
+        logger.error(f"❌ Erro na recuperação de sessões: {e}")
+    queue.start()
+
+
 # ============================================================
 # PYDANTIC MODELS (shared across routers)
 # ============================================================
@@ -0,0 +1,327 @@
+"""
+Document Store - Handle de documento enviado, com cache da extração por hash
+
+🎯 PROBLEMA:
+- Os mesmos bytes do CV eram enviados e parseados em /api/analyze-lite,
+  de novo em /api/analyze-free e de novo em /api/analyze-premium-paid
+- save_temp_files guardava o mesmo arquivo 3 vezes no Storage
+
+✅ SOLUÇÃO:
+1. document_id = SHA-256 dos bytes do arquivo
+2. Na primeira vez que um arquivo aparece (POST /api/documents/upload ou
+   upload direto num endpoint de análise): extrai o texto UMA vez, guarda
+   {texto, VANT certified, nº de páginas} e salva no Storage uma única vez
+3. Os endpoints de análise aceitam `document_id` no lugar do arquivo; um
+   re-upload dos mesmos bytes também reaproveita a extração
+4. Camadas: memória (LRU + TTL) -> tabela `uploaded_documents` (opcional,
+   DOCUMENT_STORE_TABLE_ENABLED, ver create_uploaded_documents_table.sql)
+5. O document_id é só o hash do conteúdo: cada upload registra o user_id de
+   quem enviou (`uploaded_document_owners`) e get(document_id, user_id) só
+   devolve o documento a quem o enviou. A extração continua compartilhada:
+   outro usuário com os mesmos bytes reenvia o arquivo (sem nova extração)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+
+from single_flight import document_flight
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_STORE_TABLE_ENABLED = os.getenv("DOCUMENT_STORE_TABLE_ENABLED", "false").lower() == "true"
+DOCUMENT_STORE_MAX_ITEMS = int(os.getenv("DOCUMENT_STORE_MAX_ITEMS", "500"))
+DOCUMENT_STORE_TTL_HOURS = int(os.getenv("DOCUMENT_STORE_TTL_HOURS", "24"))  # Mesmo TTL dos temp files
+
+_DOCUMENT_ID_LENGTH = 64  # sha256 hex
+
+
+def document_id_for(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def is_valid_document_id(document_id: str) -> bool:
+    return (
+        isinstance(document_id, str)
+        and len(document_id) == _DOCUMENT_ID_LENGTH
+        and all(c in "0123456789abcdef" for c in document_id)
+    )
+
+
+class DocumentStore:
+    """Extração de CV por hash de conteúdo: cada arquivo é parseado uma vez."""
+
+    def __init__(self,
+                 max_items: int = DOCUMENT_STORE_MAX_ITEMS,
+                 ttl_hours: int = DOCUMENT_STORE_TTL_HOURS,
+                 table_enabled: bool = DOCUMENT_STORE_TABLE_ENABLED):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_hours * 3600
+        self.table_enabled = table_enabled
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._owners: Dict[str, Set[str]] = {}  # document_id -> user_ids que enviaram o arquivo
+        self.hits = 0
+        self.misses = 0
+        self.denied = 0
+        self.extractions = 0
+
+    def _client(self):
+        from supabase_client import get_supabase_client
+        return get_supabase_client()
+
+    # ------------------------------------------------------------
+    # MEMÓRIA
+    # ------------------------------------------------------------
+
+    def _remember(self, document: Dict[str, Any]) -> None:
+        with self._lock:
+            self._items[document["document_id"]] = (time.time(), document)
+            self._items.move_to_end(document["document_id"])
+            while len(self._items) > self.max_items:
+                evicted_id, _ = self._items.popitem(last=False)
+                self._owners.pop(evicted_id, None)
+
+    def _recall(self, document_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._items.get(document_id)
+            if not entry:
+                return None
+            stored_at, document = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._items[document_id]
+                self._owners.pop(document_id, None)
+                return None
+            self._items.move_to_end(document_id)
+            return document
+
+    # ------------------------------------------------------------
+    # TABELA (opcional)
+    # ------------------------------------------------------------
+
+    def _load(self, document_id: str) -> Optional[Dict[str, Any]]:
+        if not self.table_enabled:
+            return None
+        supabase = self._client()
+        if not supabase:
+            return None
+        try:
+            result = supabase.table("uploaded_documents") \
+                .select("document_id, cv_text, is_vant_certified, page_count, filename, byte_size") \
+                .eq("document_id", document_id) \
+                .gt("expires_at", datetime.now(timezone.utc).isoformat()) \
+                .limit(1) \
+                .execute()
+            if not result.data:
+                return None
+            row = result.data[0]
+            return {
+                "document_id": row["document_id"],
+                "text": row.get("cv_text") or "",
+                "is_vant_certified": bool(row.get("is_vant_certified")),
+                "page_count": row.get("page_count") or 0,
+                "filename": row.get("filename"),
+                "byte_size": row.get("byte_size") or 0,
+            }
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao ler uploaded_documents: {e}")
+            return None
+
+    def _persist(self, document: Dict[str, Any]) -> None:
+        if not self.table_enabled:
+            return
+        supabase = self._client()
+        if not supabase:
+            return
+        try:
+            supabase.table("uploaded_documents").upsert({
+                "document_id": document["document_id"],
+                "cv_text": document["text"],
+                "is_vant_certified": document["is_vant_certified"],
+                "page_count": document["page_count"],
+                "filename": document.get("filename"),
+                "byte_size": document["byte_size"],
+                "expires_at": (datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)).isoformat(),
+            }, on_conflict="document_id").execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao salvar uploaded_documents: {e}")
+
+    def _load_owner(self, document_id: str, user_id: str) -> bool:
+        if not self.table_enabled:
+            return False
+        supabase = self._client()
+        if not supabase:
+            return False
+        try:
+            result = supabase.table("uploaded_document_owners").select("user_id") \
+                .eq("document_id", document_id) \
+                .eq("user_id", user_id) \
+                .limit(1) \
+                .execute()
+            return bool(result.data)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao ler uploaded_document_owners: {e}")
+            return False
+
+    def _persist_owner(self, document_id: str, user_id: str) -> None:
+        if not self.table_enabled:
+            return
+        supabase = self._client()
+        if not supabase:
+            return
+        try:
+            supabase.table("uploaded_document_owners").upsert(
+                {"document_id": document_id, "user_id": user_id},
+                on_conflict="document_id,user_id",
+            ).execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao salvar uploaded_document_owners: {e}")
+
+    # ------------------------------------------------------------
+    # DONOS (quem enviou o arquivo)
+    # ------------------------------------------------------------
+
+    def _grant(self, document_id: str, user_id: Optional[str]) -> None:
+        if not user_id:
+            return
+        with self._lock:
+            owners = self._owners.setdefault(document_id, set())
+            known = user_id in owners
+            owners.add(user_id)
+        if not known:
+            self._persist_owner(document_id, user_id)
+
+    def _is_owner(self, document_id: str, user_id: str) -> bool:
+        with self._lock:
+            if user_id in self._owners.get(document_id, ()):
+                return True
+        if self._load_owner(document_id, user_id):
+            with self._lock:
+                self._owners.setdefault(document_id, set()).add(user_id)
+            return True
+        return False
+
+    # ------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------
+
+    def get(self, document_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Documento já extraído (memória -> tabela) ou None se desconhecido/expirado.
+
+        Com `user_id` (rotas autenticadas), só devolve o documento se esse
+        usuário o enviou; caso contrário responde como desconhecido.
+        """
+        if not is_valid_document_id(document_id):
+            return None
+        document = self._recall(document_id)
+        if document is None:
+            document = self._load(document_id)
+            if document is not None:
+                self._remember(document)
+        if document is None:
+            self.misses += 1
+            return None
+        if user_id and not self._is_owner(document_id, user_id):
+            self.denied += 1
+            logger.warning(f"🚫 Documento {document_id[:12]} pedido por usuário que não o enviou")
+            return None
+        self.hits += 1
+        return document
+
+    def register(self,
+                 upload,
+                 filename: Optional[str] = None,
+                 job_description: str = "",
+                 user_id: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Retorna (documento, criado). Arquivo novo: extrai o texto e salva os
+        bytes no Storage uma única vez; arquivo conhecido: devolve o cache.
+
+        `upload`: IngestedUpload (upload_ingest - hash já calculado, conteúdo
+        em spool) ou bytes.
+        """
+        if isinstance(upload, (bytes, bytearray)):
+            from io import BytesIO
+
+            document_id = document_id_for(upload)
+            byte_size = len(upload)
+            open_stream = lambda: BytesIO(upload)
+            read_bytes = lambda: bytes(upload)
+        else:
+            document_id = upload.sha256
+            byte_size = upload.size
+            filename = filename or upload.filename
+            open_stream = upload.open
+            read_bytes = upload.read_bytes
+
+        document = self.get(document_id)
+        if document is not None:
+            self._grant(document_id, user_id)
+            return document, False
+
+        def _extract():
+            from logic import extrair_documento_pdf
+
+            extracted = extrair_documento_pdf(open_stream())
+            new_document = {
+                "document_id": document_id,
+                "filename": filename,
+                "byte_size": byte_size,
+                **extracted,
+            }
+            self.extractions += 1
+            if extracted["text"]:
+                # PDF ilegível não entra no cache: um novo upload tenta de novo
+                self._remember(new_document)
+                self._persist(new_document)
+            try:
+                from storage_manager import storage_manager
+                storage_manager.save_temp_files(read_bytes(), job_description, user_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao salvar arquivo no storage: {e}")
+            logger.info(
+                f"📄 Documento {document_id[:12]} extraído "
+                f"({extracted['page_count']} páginas, {len(extracted['text'])} chars)"
+            )
+            return new_document
+
+        # Uploads simultâneos do mesmo arquivo (lite + premium em paralelo) extraem uma vez só
+        document, is_leader = document_flight.do(document_id, _extract)
+        if document["text"]:
+            self._grant(document_id, user_id)
+        return document, is_leader
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            items = len(self._items)
+        return {
+            "items": items,
+            "hits": self.hits,
+            "misses": self.misses,
+            "denied": self.denied,
+            "extractions": self.extractions,
+            "table_enabled": self.table_enabled,
+        }
+
+
+# Instância global
+document_store = DocumentStore()
+
+
+def document_summary(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadados devolvidos ao cliente (sem o texto do CV)."""
+    return {
+        "document_id": document["document_id"],
+        "page_count": document["page_count"],
+        "is_vant_certified": document["is_vant_certified"],
+        "chars": len(document["text"]),
+        "filename": document.get("filename"),
+    }
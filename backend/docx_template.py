@@ -0,0 +1,329 @@
+"""
+DOCX Template - Geração do CV em Word a partir de um template com estilos nomeados
+
+🎯 PROBLEMA:
+- gerar_word_candidato redefinia ~10 helpers a cada chamada, partia de um
+  Document() em branco e aplicava fonte, cor, tamanho, borda e keep-with-next
+  run a run via OXML (dezenas de elementos XML por parágrafo)
+
+✅ SOLUÇÃO:
+1. templates/cv_template.docx já traz margens e os estilos do CV
+   (nome, contato, seção, cargo, data, bullet, chips, texto) - gerado por
+   build_template() / scripts/build_docx_template.py
+2. A geração só insere parágrafos e runs apontando para o estilo (styleId
+   resolvido uma vez por processo): a formatação vem do template
+3. O conteúdo vem da AST de cv_markdown (a mesma da tela/PDF): nome,
+   contatos, seções, cabeçalhos de vaga, bullets e chips são classificados
+   igual nos três formatos
+4. Os bytes do template são lidos uma vez por processo
+
+WORD_TEMPLATE_ENABLED=false volta ao gerador antigo (logic._renderizar_word_old).
+
+Benchmark: scripts/benchmark_docx_generation.py (ms/documento e p95 x antigo)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict
+
+from cv_markdown import Bullet, Chips, Contacts, JobHeader, Name, Paragraph, Section, parse_cv_markdown
+
+logger = logging.getLogger(__name__)
+
+WORD_TEMPLATE_ENABLED = os.getenv("WORD_TEMPLATE_ENABLED", "true").lower() == "true"
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "cv_template.docx")
+
+# ============================================================
+# IDENTIDADE VISUAL (mesmos valores do gerador antigo)
+# ============================================================
+FONT_MAIN = "Segoe UI"
+COLOR_TEXT = "334155"
+COLOR_TITLE = "0F172A"
+COLOR_ACCENT = "10B981"
+COLOR_SUB = "64748B"
+COLOR_CHIP_TEXT = "475569"
+COLOR_BORDER = "E2E8F0"
+COLOR_CHIP_BG = "F1F5F9"
+
+# Estilos de parágrafo
+STYLE_NAME = "VANT Nome"
+STYLE_CONTACT = "VANT Contato"
+STYLE_SECTION = "VANT Seção"
+STYLE_SKILLS = "VANT Skills"
+STYLE_JOB_HEADER = "VANT Cargo"
+STYLE_JOB_DATE = "VANT Data"
+STYLE_BULLET = "VANT Bullet"
+STYLE_BODY = "VANT Texto"
+
+# Estilos de caractere
+CHAR_CONTACT_ITEM = "VANT Contato Item"
+CHAR_ACCENT_SEPARATOR = "VANT Separador"
+CHAR_SECTION_MARKER = "VANT Marcador Seção"
+CHAR_SECTION_TITLE = "VANT Título Seção"
+CHAR_CHIP = "VANT Chip"
+CHAR_JOB_TITLE = "VANT Cargo Título"
+CHAR_SUBTLE_SEPARATOR = "VANT Separador Sutil"
+CHAR_COMPANY = "VANT Empresa"
+CHAR_BULLET_MARKER = "VANT Marcador Bullet"
+CHAR_EMPHASIS = "VANT Destaque"
+
+
+# ============================================================
+# TEMPLATE (estilos nomeados)
+# ============================================================
+
+def _add_style(doc, name: str, style_type, *, font_size=None, bold=None, color=None, font=FONT_MAIN):
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.shared import Pt, RGBColor
+
+    style = doc.styles.add_style(name, style_type)
+    if style_type == WD_STYLE_TYPE.PARAGRAPH:
+        style.base_style = doc.styles["Normal"]
+    style.quick_style = True
+    if font:
+        style.font.name = font
+    if font_size:
+        style.font.size = Pt(font_size)
+    if bold is not None:
+        style.font.bold = bold
+    if color:
+        style.font.color.rgb = RGBColor.from_string(color)
+    return style
+
+
+def _set_border_bottom(style) -> None:
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    pPr = style.element.get_or_add_pPr()
+    pBdr = OxmlElement("w:pBdr")
+    bottom = OxmlElement("w:bottom")
+    bottom.set(qn("w:val"), "single")
+    bottom.set(qn("w:sz"), "4")
+    bottom.set(qn("w:space"), "6")
+    bottom.set(qn("w:color"), COLOR_BORDER)
+    pBdr.append(bottom)
+    pPr.insert_element_before(
+        pBdr, "w:shd", "w:tabs", "w:suppressAutoHyphens", "w:kinsoku", "w:wordWrap",
+        "w:overflowPunct", "w:topLinePunct", "w:autoSpaceDE", "w:autoSpaceDN", "w:bidi",
+        "w:adjustRightInd", "w:snapToGrid", "w:spacing", "w:ind", "w:contextualSpacing",
+        "w:mirrorIndents", "w:suppressOverlap", "w:jc", "w:textDirection", "w:textAlignment",
+        "w:textboxTightWrap", "w:outlineLvl", "w:divId", "w:cnfStyle", "w:rPr", "w:sectPr",
+        "w:pPrChange",
+    )
+
+
+def _set_shading(style, fill: str) -> None:
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    rPr = style.element.get_or_add_rPr()
+    shd = OxmlElement("w:shd")
+    shd.set(qn("w:val"), "clear")
+    shd.set(qn("w:color"), "auto")
+    shd.set(qn("w:fill"), fill)
+    rPr.insert_element_before(
+        shd, "w:fitText", "w:vertAlign", "w:rtl", "w:cs", "w:em", "w:lang",
+        "w:eastAsianLayout", "w:specVanish", "w:oMath",
+    )
+
+
+def build_template():
+    """Document vazio com margens e todos os estilos do CV (fonte do cv_template.docx)."""
+    from docx import Document
+    from docx.enum.style import WD_STYLE_TYPE
+    from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_TAB_ALIGNMENT
+    from docx.shared import Cm, Pt
+
+    doc = Document()
+    section = doc.sections[0]
+    section.top_margin = Cm(1.5)
+    section.bottom_margin = Cm(1.5)
+    section.left_margin = Cm(1.8)
+    section.right_margin = Cm(1.8)
+
+    P, C = WD_STYLE_TYPE.PARAGRAPH, WD_STYLE_TYPE.CHARACTER
+
+    # ---------- Parágrafos ----------
+    name = _add_style(doc, STYLE_NAME, P, font_size=24, bold=True, color=COLOR_TITLE)
+    name.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    name.paragraph_format.space_after = Pt(4)
+    name.paragraph_format.keep_with_next = True
+
+    contact = _add_style(doc, STYLE_CONTACT, P, font=None)
+    contact.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    contact.paragraph_format.space_after = Pt(12)
+
+    section_title = _add_style(doc, STYLE_SECTION, P, font=None)
+    section_title.paragraph_format.space_before = Pt(12)
+    section_title.paragraph_format.space_after = Pt(6)
+    section_title.paragraph_format.keep_with_next = True
+    _set_border_bottom(section_title)
+
+    skills = _add_style(doc, STYLE_SKILLS, P, font=None)
+    skills.paragraph_format.space_after = Pt(8)
+    skills.paragraph_format.line_spacing = 1.3
+
+    job_header = _add_style(doc, STYLE_JOB_HEADER, P, font=None)
+    job_header.paragraph_format.space_before = Pt(10)
+    job_header.paragraph_format.space_after = Pt(1)
+    job_header.paragraph_format.keep_together = True
+
+    job_date = _add_style(doc, STYLE_JOB_DATE, P, font_size=9, color=COLOR_SUB)
+    job_date.paragraph_format.space_after = Pt(3)
+
+    bullet = _add_style(doc, STYLE_BULLET, P, font_size=10.5, color=COLOR_TEXT)
+    bullet.paragraph_format.space_after = Pt(2)
+    bullet.paragraph_format.line_spacing = 1.25
+    bullet.paragraph_format.tab_stops.add_tab_stop(Cm(0.5), WD_TAB_ALIGNMENT.LEFT)
+    bullet.paragraph_format.left_indent = Cm(0.5)
+    bullet.paragraph_format.first_line_indent = Cm(-0.5)
+    bullet.paragraph_format.keep_together = True
+
+    body = _add_style(doc, STYLE_BODY, P, font_size=10.5, color=COLOR_TEXT)
+    body.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+    body.paragraph_format.line_spacing = 1.25
+    body.paragraph_format.space_after = Pt(6)
+
+    # ---------- Caracteres ----------
+    _add_style(doc, CHAR_CONTACT_ITEM, C, font_size=9.5, color=COLOR_SUB)
+    _add_style(doc, CHAR_ACCENT_SEPARATOR, C, bold=True, color=COLOR_ACCENT, font=None)
+    _add_style(doc, CHAR_SECTION_MARKER, C, font_size=14, bold=True, color=COLOR_ACCENT)
+    _add_style(doc, CHAR_SECTION_TITLE, C, font_size=11, bold=True, color=COLOR_TITLE)
+    chip = _add_style(doc, CHAR_CHIP, C, font_size=9.5, color=COLOR_CHIP_TEXT)
+    _set_shading(chip, COLOR_CHIP_BG)
+    _add_style(doc, CHAR_JOB_TITLE, C, font_size=11.5, bold=True, color=COLOR_TITLE)
+    _add_style(doc, CHAR_SUBTLE_SEPARATOR, C, color=COLOR_SUB, font=None)
+    _add_style(doc, CHAR_COMPANY, C, font_size=11, bold=True, color=COLOR_ACCENT)
+    _add_style(doc, CHAR_BULLET_MARKER, C, font_size=12, color=COLOR_ACCENT)
+    _add_style(doc, CHAR_EMPHASIS, C, bold=True, color=COLOR_TITLE, font=None)
+
+    return doc
+
+
+@lru_cache(maxsize=1)
+def _template_bytes() -> bytes:
+    """Bytes do template (arquivo versionado; sem ele, montado em memória uma vez)."""
+    try:
+        with open(TEMPLATE_PATH, "rb") as f:
+            return f.read()
+    except OSError:
+        logger.warning(f"⚠️ Template DOCX não encontrado em {TEMPLATE_PATH}, montando em memória")
+        stream = BytesIO()
+        build_template().save(stream)
+        return stream.getvalue()
+
+
+@lru_cache(maxsize=1)
+def _style_ids() -> Dict[str, str]:
+    """Nome -> styleId do template. Resolver pelo nome no python-docx varre todos
+    os ~160 estilos a cada parágrafo/run (mais caro que o próprio documento)."""
+    return {style.name: style.style_id for style in new_document().styles}
+
+
+def new_document():
+    from docx import Document
+
+    return Document(BytesIO(_template_bytes()))
+
+
+def _paragraph(doc, style: str, text: str = ""):
+    p = doc.add_paragraph(text)
+    p._p.style = _style_ids()[style]
+    return p
+
+
+def _run(paragraph, text: str, style: str):
+    run = paragraph.add_run(text)
+    run._r.style = _style_ids()[style]
+    return run
+
+
+# ============================================================
+# RENDER (consome a AST de cv_markdown)
+# ============================================================
+
+def _add_spans(paragraph, spans) -> None:
+    for text, bold in spans:
+        if bold:
+            _run(paragraph, text, CHAR_EMPHASIS)
+        else:
+            paragraph.add_run(text)
+
+
+def _add_contacts(doc, block) -> None:
+    # No Word só os valores (sem "Email:", "Telefone:"), como sempre foi
+    p = _paragraph(doc, STYLE_CONTACT)
+    for i, item in enumerate(block.items):
+        if i > 0:
+            _run(p, "  •  ", CHAR_ACCENT_SEPARATOR)
+        _run(p, item.value, CHAR_CONTACT_ITEM)
+
+
+def _add_chips(doc, block) -> None:
+    p = _paragraph(doc, STYLE_SKILLS)
+    for i, item in enumerate(block.items):
+        if i > 0:
+            p.add_run("  ")
+        _run(p, f"  {item}  ", CHAR_CHIP)
+
+
+def _add_job_header(doc, block) -> None:
+    p = _paragraph(doc, STYLE_JOB_HEADER)
+    _run(p, block.role, CHAR_JOB_TITLE)
+    _run(p, " | ", CHAR_SUBTLE_SEPARATOR)
+    _run(p, block.company, CHAR_COMPANY)
+    if block.date:
+        _paragraph(doc, STYLE_JOB_DATE, block.date)
+
+
+def _add_bullet(doc, block) -> None:
+    p = _paragraph(doc, STYLE_BULLET)
+    _run(p, "•", CHAR_BULLET_MARKER)
+    p.add_run("\t")
+    _add_spans(p, block.spans)
+
+
+def _add_section(doc, block) -> None:
+    p = _paragraph(doc, STYLE_SECTION)
+    _run(p, "| ", CHAR_SECTION_MARKER)
+    _run(p, block.title.upper(), CHAR_SECTION_TITLE)
+
+
+def _add_paragraph(doc, block) -> None:
+    _add_spans(_paragraph(doc, STYLE_BODY), block.spans)
+
+
+def _add_name(doc, block) -> None:
+    _paragraph(doc, STYLE_NAME, block.text.upper())
+
+
+_BLOCK_RENDERERS = {
+    Name: _add_name,
+    Contacts: _add_contacts,
+    Section: _add_section,
+    JobHeader: _add_job_header,
+    Bullet: _add_bullet,
+    Chips: _add_chips,
+    Paragraph: _add_paragraph,
+}
+
+
+def gerar_docx_cv(raw_text: str) -> BytesIO:
+    """DOCX do CV (cv_otimizado_completo) a partir do template e da AST compartilhada."""
+    doc = new_document()
+
+    blocks = parse_cv_markdown(raw_text).blocks
+    if not blocks:
+        doc.add_paragraph("Currículo vazio")
+    for block in blocks:
+        _BLOCK_RENDERERS[type(block)](doc, block)
+
+    stream = BytesIO()
+    doc.save(stream)
+    stream.seek(0)
+    return stream
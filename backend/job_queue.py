@@ -0,0 +1,410 @@
+"""
+Job Queue - Fila durável + pool de workers para as análises premium
+
+🎯 PROBLEMA:
+- /api/analyze-premium-paid entregava o pipeline inteiro ao BackgroundTasks
+  do processo web: restart/deploy perdia toda análise em andamento (com o
+  crédito já consumido) e não havia limite de análises simultâneas
+
+✅ SOLUÇÃO:
+1. O job (tipo + payload) é gravado numa fila durável ANTES de responder
+2. JOB_QUEUE_WORKERS threads pegam jobs com lease (JOB_QUEUE_LEASE_SECONDS),
+   renovado enquanto o job roda
+3. At-least-once: se o processo morrer, o lease expira e o job é pego de novo
+   (até max_attempts). Os handlers devem ser idempotentes (ver
+   dependencies._run_premium_analysis_job)
+4. Falha com exceção: nova tentativa com backoff; esgotou -> failed
+5. Métricas: profundidade, idade do job mais antigo, running, failed
+
+Backends (JOB_QUEUE_BACKEND):
+- supabase (padrão): tabela `analysis_jobs` + RPCs (create_analysis_jobs_table.sql)
+- sqlite: arquivo local (JOB_QUEUE_SQLITE_PATH) - dev ou host com disco persistente
+
+Habilitar: JOB_QUEUE_ENABLED=true (senão a rota continua com BackgroundTasks)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUE_ENABLED = os.getenv("JOB_QUEUE_ENABLED", "false").lower() == "true"
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "supabase").lower()
+JOB_QUEUE_SQLITE_PATH = os.getenv("JOB_QUEUE_SQLITE_PATH", "analysis_jobs.sqlite3")
+JOB_QUEUE_WORKERS = int(os.getenv("JOB_QUEUE_WORKERS", "2"))
+JOB_QUEUE_POLL_SECONDS = float(os.getenv("JOB_QUEUE_POLL_SECONDS", "5"))
+JOB_QUEUE_LEASE_SECONDS = int(os.getenv("JOB_QUEUE_LEASE_SECONDS", "120"))
+JOB_QUEUE_MAX_ATTEMPTS = int(os.getenv("JOB_QUEUE_MAX_ATTEMPTS", "3"))
+JOB_QUEUE_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_QUEUE_RETRY_BACKOFF_SECONDS", "10"))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _age_seconds(iso_value: Optional[str]) -> Optional[float]:
+    if not iso_value:
+        return None
+    created = datetime.fromisoformat(str(iso_value).replace("Z", "+00:00"))
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return round((_utcnow() - created).total_seconds(), 1)
+
+
+# ============================================================
+# BACKENDS
+# ============================================================
+
+class SupabaseJobStore:
+    """Fila na tabela `analysis_jobs` (claim atômico via FOR UPDATE SKIP LOCKED)."""
+
+    def __init__(self, supabase=None):
+        from supabase_client import get_supabase_client
+        self.supabase = supabase or get_supabase_client()
+
+    def enqueue(self, job_type: str, payload: dict, session_id: str = None, max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS) -> Any:
+        row = {"job_type": job_type, "payload": payload, "session_id": session_id, "max_attempts": max_attempts}
+        response = self.supabase.table("analysis_jobs").upsert(
+            row, on_conflict="session_id,job_type", ignore_duplicates=True
+        ).execute()
+        return response.data[0]["id"] if response.data else None
+
+    def claim(self, worker_id: str, lease_seconds: int) -> Optional[dict]:
+        response = self.supabase.rpc(
+            "claim_analysis_job", {"p_worker": worker_id, "p_lease_seconds": lease_seconds}
+        ).execute()
+        return response.data[0] if response.data else None
+
+    def heartbeat(self, job_id: Any, worker_id: str, lease_seconds: int) -> None:
+        self.supabase.table("analysis_jobs").update({
+            "lease_until": (_utcnow() + timedelta(seconds=lease_seconds)).isoformat()
+        }).eq("id", job_id).eq("worker_id", worker_id).execute()
+
+    def complete(self, job_id: Any) -> None:
+        self.supabase.table("analysis_jobs").update({
+            "status": "done", "finished_at": _utcnow().isoformat(), "payload": {}
+        }).eq("id", job_id).execute()
+
+    def fail(self, job_id: Any, error: str, retry_at: Optional[datetime]) -> None:
+        update: Dict[str, Any] = {"last_error": error[:2000]}
+        if retry_at:
+            update.update({"status": "queued", "available_at": retry_at.isoformat(), "lease_until": None})
+        else:
+            update.update({"status": "failed", "finished_at": _utcnow().isoformat(), "payload": {}})
+        self.supabase.table("analysis_jobs").update(update).eq("id", job_id).execute()
+
+    def sweep(self) -> List[dict]:
+        response = self.supabase.rpc("sweep_analysis_jobs", {}).execute()
+        return response.data or []
+
+    def has_active_job(self, session_id: str) -> bool:
+        response = self.supabase.table("analysis_jobs").select("id").eq("session_id", session_id).in_(
+            "status", ["queued", "running"]
+        ).limit(1).execute()
+        return bool(response.data)
+
+    def stats(self) -> Dict[str, Any]:
+        table = self.supabase.table
+        counts = {
+            status: table("analysis_jobs").select("id", count="exact").eq("status", status).limit(1).execute().count or 0
+            for status in ("queued", "running", "failed")
+        }
+        oldest = table("analysis_jobs").select("created_at").eq("status", "queued").order("created_at").limit(1).execute()
+        return {
+            "depth": counts["queued"],
+            "running": counts["running"],
+            "failed": counts["failed"],
+            "oldest_queued_age_seconds": _age_seconds(oldest.data[0]["created_at"]) if oldest.data else None,
+        }
+
+
+class SQLiteJobStore:
+    """Mesma semântica em SQLite (um arquivo local). Claim sob BEGIN IMMEDIATE."""
+
+    def __init__(self, path: str = JOB_QUEUE_SQLITE_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS analysis_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_type TEXT NOT NULL,
+                session_id TEXT,
+                payload TEXT NOT NULL DEFAULT '{}',
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                available_at REAL NOT NULL,
+                lease_until REAL,
+                worker_id TEXT,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                finished_at REAL
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_analysis_jobs_session_type
+                ON analysis_jobs(session_id, job_type);
+            CREATE INDEX IF NOT EXISTS idx_analysis_jobs_ready ON analysis_jobs(status, available_at);
+        """)
+
+    def _row(self, row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"] or "{}")
+        return job
+
+    def enqueue(self, job_type: str, payload: dict, session_id: str = None, max_attempts: int = JOB_QUEUE_MAX_ATTEMPTS) -> Any:
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO analysis_jobs (job_type, session_id, payload, max_attempts, available_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_type, session_id, json.dumps(payload), max_attempts, now, now),
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def claim(self, worker_id: str, lease_seconds: int) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM analysis_jobs WHERE attempts < max_attempts AND "
+                    "((status = 'queued' AND available_at <= ?) OR (status = 'running' AND lease_until < ?)) "
+                    "ORDER BY available_at, id LIMIT 1",
+                    (now, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE analysis_jobs SET status = 'running', attempts = attempts + 1, worker_id = ?, lease_until = ? "
+                    "WHERE id = ?",
+                    (worker_id, now + lease_seconds, row["id"]),
+                )
+                job = self._conn.execute("SELECT * FROM analysis_jobs WHERE id = ?", (row["id"],)).fetchone()
+                self._conn.execute("COMMIT")
+                return self._row(job)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job_id: Any, worker_id: str, lease_seconds: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE analysis_jobs SET lease_until = ? WHERE id = ? AND worker_id = ?",
+                (time.time() + lease_seconds, job_id, worker_id),
+            )
+
+    def complete(self, job_id: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE analysis_jobs SET status = 'done', finished_at = ?, payload = '{}' WHERE id = ?",
+                (time.time(), job_id),
+            )
+
+    def fail(self, job_id: Any, error: str, retry_at: Optional[datetime]) -> None:
+        with self._lock:
+            if retry_at:
+                self._conn.execute(
+                    "UPDATE analysis_jobs SET status = 'queued', available_at = ?, lease_until = NULL, last_error = ? "
+                    "WHERE id = ?",
+                    (retry_at.timestamp(), error[:2000], job_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE analysis_jobs SET status = 'failed', finished_at = ?, payload = '{}', last_error = ? "
+                    "WHERE id = ?",
+                    (time.time(), error[:2000], job_id),
+                )
+
+    def sweep(self) -> List[dict]:
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, session_id FROM analysis_jobs WHERE status = 'running' AND lease_until < ? "
+                "AND attempts >= max_attempts",
+                (now,),
+            ).fetchall()
+            for row in rows:
+                self._conn.execute(
+                    "UPDATE analysis_jobs SET status = 'failed', finished_at = ?, payload = '{}', "
+                    "last_error = COALESCE(last_error, 'lease expirado na última tentativa') WHERE id = ?",
+                    (now, row["id"]),
+                )
+        return [{"job_id": row["id"], "session_id": row["session_id"]} for row in rows]
+
+    def has_active_job(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM analysis_jobs WHERE session_id = ? AND status IN ('queued', 'running') LIMIT 1",
+                (session_id,),
+            ).fetchone()
+        return row is not None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM analysis_jobs GROUP BY status"
+            ).fetchall())
+            oldest = self._conn.execute(
+                "SELECT MIN(created_at) FROM analysis_jobs WHERE status = 'queued'"
+            ).fetchone()[0]
+        return {
+            "depth": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_queued_age_seconds": round(time.time() - oldest, 1) if oldest else None,
+        }
+
+
+# ============================================================
+# POOL DE WORKERS
+# ============================================================
+
+class JobWorkerPool:
+    """Threads que consomem a fila e executam o handler registrado para cada job_type."""
+
+    def __init__(self,
+                 store,
+                 workers: int = JOB_QUEUE_WORKERS,
+                 poll_seconds: float = JOB_QUEUE_POLL_SECONDS,
+                 lease_seconds: int = JOB_QUEUE_LEASE_SECONDS,
+                 retry_backoff_seconds: float = JOB_QUEUE_RETRY_BACKOFF_SECONDS):
+        self.store = store
+        self.workers = max(workers, 1)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.worker_prefix = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._handlers: Dict[str, Callable[[dict, dict], None]] = {}
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self.active = 0
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+
+    def register_handler(self, job_type: str, fn: Callable[[dict, dict], None]) -> None:
+        """fn(payload, job) - deve ser idempotente (pode rodar mais de uma vez)."""
+        self._handlers[job_type] = fn
+
+    def enqueue(self, job_type: str, payload: dict, session_id: str = None) -> Any:
+        job_id = self.store.enqueue(job_type, payload, session_id=session_id)
+        self._wakeup.set()  # Worker ocioso deste processo pega na hora
+        logger.info(f"📥 Job [{job_type}] enfileirado (id={job_id}, sessão={session_id})")
+        return job_id
+
+    def start(self) -> None:
+        if any(t.is_alive() for t in self._threads):
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._loop, args=(f"{self.worker_prefix}-{i}",), name=f"job-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"👷 Job queue iniciada: {self.workers} worker(s), lease {self.lease_seconds}s")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Para de pegar jobs novos. Jobs em andamento voltam à fila quando o lease expirar."""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _loop(self, worker_id: str) -> None:
+        while not self._stop.is_set():
+            try:
+                job = self.store.claim(worker_id, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"⚠️ Erro ao buscar job ({e})")
+                job = None
+            if job is None:
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+                continue
+            self._run(job, worker_id)
+
+    def _run(self, job: dict, worker_id: str) -> None:
+        handler = self._handlers.get(job["job_type"])
+        stop_heartbeat = threading.Event()
+
+        def _heartbeat():
+            while not stop_heartbeat.wait(self.lease_seconds / 3):
+                try:
+                    self.store.heartbeat(job["id"], worker_id, self.lease_seconds)
+                except Exception as e:
+                    logger.warning(f"⚠️ Falha ao renovar lease do job {job['id']}: {e}")
+
+        heartbeat = threading.Thread(target=_heartbeat, name=f"job-lease-{job['id']}", daemon=True)
+        heartbeat.start()
+        with self._lock:
+            self.active += 1
+        try:
+            if handler is None:
+                raise RuntimeError(f"Sem handler para job_type={job['job_type']}")
+            handler(job.get("payload") or {}, job)
+            self.store.complete(job["id"])
+            with self._lock:
+                self.processed += 1
+        except Exception as e:
+            attempts = job.get("attempts") or 1
+            retry = attempts < (job.get("max_attempts") or JOB_QUEUE_MAX_ATTEMPTS)
+            retry_at = _utcnow() + timedelta(seconds=self.retry_backoff_seconds * (2 ** (attempts - 1))) if retry else None
+            logger.error(f"❌ Job {job['id']} [{job['job_type']}] falhou (tentativa {attempts}): {e}")
+            try:
+                self.store.fail(job["id"], f"{type(e).__name__}: {e}", retry_at)
+            except Exception as store_error:
+                logger.error(f"❌ Erro ao registrar falha do job {job['id']}: {store_error}")
+            with self._lock:
+                if retry:
+                    self.retried += 1
+                else:
+                    self.failed += 1
+        finally:
+            stop_heartbeat.set()
+            with self._lock:
+                self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            queue = self.store.stats()
+        except Exception as e:
+            queue = {"error": str(e)}
+        with self._lock:
+            return {
+                "queue": queue,
+                "workers": self.workers,
+                "active": self.active,
+                "processed": self.processed,
+                "failed": self.failed,
+                "retried": self.retried,
+            }
+
+
+_pool_instance: Optional[JobWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_job_queue() -> Optional[JobWorkerPool]:
+    """Factory lazy do pool do processo (None se JOB_QUEUE_ENABLED=false)."""
+    global _pool_instance
+    if not JOB_QUEUE_ENABLED:
+        return None
+    with _pool_lock:
+        if _pool_instance is None:
+            store = SQLiteJobStore() if JOB_QUEUE_BACKEND == "sqlite" else SupabaseJobStore()
+            _pool_instance = JobWorkerPool(store)
+        return _pool_instance
@@ -0,0 +1,313 @@
+"""
+Keyword Engine - Motor de palavras-chave compilado uma única vez (no import)
+
+🎯 PROBLEMA:
+- `detect_job_area` fazia ~130 `re.search` separados por vaga
+- `CacheManager._extract_keywords` rodava regexes não compiladas a cada chamada
+- `CacheManager._normalize_string` recriava o set de stopwords a cada chamada
+
+✅ SOLUÇÃO:
+- Todos os termos de área viram UMA regex em trie compilada dentro de um
+  lookahead, varrida uma única vez pelo texto (matches sobrepostos incluídos)
+- Termos que são prefixo de outro (ex: "infra" / "infraestrutura") são
+  resolvidos por uma tabela pré-computada, sem nova busca
+- Cargo, senioridade e tecnologias saem da mesma chamada `analyze()`
+- `analyze_batch()` para processar várias vagas de uma vez
+
+O resultado é idêntico ao das funções antigas (os hashes do cache parcial
+dependem de `extract_keywords`); ver test_keyword_engine.py e
+scripts/benchmark_keyword_engine.py.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+# ============================================================
+# DICIONÁRIOS
+# ============================================================
+
+# Frases de vaga genérica (retorna global_soft_skills antes de pontuar áreas)
+GENERIC_PHRASES = [
+    "busco oportunidades profissionais",
+    "estou aberto a posições",
+    "crescimento e contribuição",
+    "objetivos da empresa",
+    "foco em resultados e inovação",
+]
+
+# Termos por área. Sufixo "\b" = exige fim de palavra (mesma semântica da regex antiga)
+AREA_KEYWORDS = {
+    "ti_dados_ai": [
+        r"dados", r"data", r"analytics", r"bi\b", r"business intelligence", r"cientista de dados",
+        r"machine learning", r"ia\b", r"inteligência artificial", r"python", r"pandas", r"sql", r"big data"
+    ],
+    "ti_suporte": [
+        r"suporte", r"help desk", r"service desk", r"infraestrutura", r"infra", r"sysadmin",
+        r"técnico de ti", r"n1", r"n2", r"field service", r"atendimento", r"hardware", r"redes"
+    ],
+    "ti_dev_gen": [
+        r"desenvolvedor", r"developer", r"engenheiro de software", r"software engineer",
+        r"fullstack", r"backend", r"frontend", r"java\b", r"python", r"react"
+    ],
+    "produto_agil": [
+        r"produto", r"product manager", r"product owner", r"po\b", r"pm\b", r"scrum", r"agile", r"kanban",
+        r"agilista", r"roadmap", r"backlog", r"user story"
+    ],
+    "marketing_growth": [
+        r"marketing", r"growth", r"performance", r"tráfego", r"seo\b", r"conteúdo", r"social media",
+        r"branding", r"copywriter", r"crm\b", r"inbound", r"redator", r"designer"
+    ],
+    "vendas_cs": [
+        r"vendas", r"sales", r"comercial", r"sdr\b", r"bdr\b", r"closer", r"executivo de contas", r"account executive",
+        r"customer success", r"sucesso do cliente", r"pós-venda", r"churn", r"negociação"
+    ],
+    "rh_lideranca": [
+        r"rh\b", r"r.h.", r"recursos humanos", r"recrutamento", r"talent", r"people", r"dp\b", r"departamento pessoal",
+        r"tech recruiter", r"bp\b", r"business partner", r"liderança", r"gestão de pessoas", r"coordenador", r"gerente", r"supervisor",
+        r"analista de rh"
+    ],
+    "financeiro_corp": [
+        r"financeiro", r"finanças", r"contábil", r"contabilidade", r"fiscal", r"auditoria", r"controller",
+        r"fp&a", r"tesouraria", r"banco", r"investimento", r"fusões", r"economista"
+    ],
+    "construcao_manual": [
+        r"pedreiro", r"servente", r"mestre de obras", r"obra", r"civil", r"construção",
+        r"elétrica", r"eletricista", r"manutenção", r"engenheiro civil", r"arquitetura"
+    ],
+    "gastronomia": [
+        r"cozinha", r"chef", r"gastronomia", r"culinária", r"restaurante", r"alimento", r"cook"
+    ]
+}
+
+DEFAULT_AREA = "global_soft_skills"
+
+# Palavras de cargo usadas no hash do Tactical (ordem de ocorrência no título)
+TITLE_WORDS_RE = re.compile(
+    r'\b(desenvolvedor|engenheiro|analista|gerente|coordenador|especialista|consultor|representante|assistente|auxiliar|operador|técnico|full|stack|backend|frontend|mobile|web|software|dados|devops|cloud|security|ux|ui|product|project|scrum|master|hr|rh|vendas|comercial|marketing|financeiro|contábil|administrativo|logística|supply|chain)\b'
+)
+TITLE_RE = re.compile(r'^(?:vaga:\s*)?([^\n-]+)')
+
+# Senioridade: checagem por substring (mesma semântica de antes), na ordem de prioridade
+SENIORITY_LEVELS = [
+    ("senior", ("senior", "sênior", "sr")),
+    ("pleno", ("pleno", "pl")),
+    ("junior", ("junior", "júnior", "jr")),
+]
+
+# Tecnologias: uma família por grupo nomeado, resultados na ordem das famílias
+TECH_FAMILIES = [
+    ("frontend", r'react|angular|vue'),
+    ("linguagem", r'node|python|java|go|rust|php|ruby|c\+\+|c#|\.net'),
+    ("banco", r'sql|nosql|mongodb|postgres|mysql'),
+    ("cloud", r'aws|azure|gcp|cloud|docker|kubernetes'),
+    ("metodologia", r'agile|scrum|kanban'),
+]
+TECH_RE = re.compile("|".join(rf"\b(?P<{name}>{alts})\b" for name, alts in TECH_FAMILIES))
+_TECH_ORDER = {name: i for i, (name, _) in enumerate(TECH_FAMILIES)}
+
+# Stopwords do _normalize_string do cache (construídas uma vez)
+NORMALIZE_STOPWORDS = frozenset({
+    'de', 'para', 'the', 'and', 'or', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+    'by', 'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+    'may', 'might', 'must', 'can', 'shall', 'um', 'uma', 'uns', 'umas', 'o', 'a',
+    'os', 'as', 'em', 'no', 'na', 'nos', 'nas', 'por', 'pelo', 'pela', 'pelas',
+    'como', 'com', 'sem', 'se', 'mas', 'mais', 'menos', 'muito', 'muita',
+    'pouco', 'pouca', 'poucos', 'poucas', 'também', 'tambem', 'ainda', 'já', 'ja',
+    'sobre', 'entre', 'após', 'apos', 'ate', 'até', 'desde', 'durante', 'através',
+    'atraves', 'contra', 'sob', 'depois', 'antes'
+})
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex em trie: prefixos comuns fatorados (ex: "infra(?:estrutura)?").
+
+    Com uma alternação plana o `re` testaria os ~130 termos em cada posição;
+    na trie cada posição descarta quase tudo no primeiro caractere.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # Terminal com filhos: continuação opcional gulosa = prefere o termo mais longo
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class KeywordEngine:
+    """
+    Motor de palavras-chave compilado no import (instância global `keyword_engine`).
+
+    Cada termo vira (texto, exige_fim_de_palavra). Os textos formam uma regex
+    em trie com terminais opcionais gulosos, então em cada posição ela captura
+    o MAIOR termo que casa; os demais termos que casam na mesma posição são
+    necessariamente prefixos dele e vêm da tabela `_prefixes`.
+    """
+
+    def __init__(self, area_keywords: Dict[str, List[str]] = None, generic_phrases: List[str] = None):
+        area_keywords = area_keywords or AREA_KEYWORDS
+        generic_phrases = generic_phrases or GENERIC_PHRASES
+
+        self.areas = list(area_keywords)
+        # termo (texto, exige \b) -> ids de área (índice em self.areas; -1 = frase genérica)
+        self._term_areas: Dict[Tuple[str, bool], List[int]] = {}
+        for area_idx, patterns in enumerate(area_keywords.values()):
+            for pattern in patterns:
+                term = (pattern[:-2], True) if pattern.endswith(r"\b") else (pattern, False)
+                self._term_areas.setdefault(term, []).append(area_idx)
+        for phrase in generic_phrases:
+            self._term_areas.setdefault((phrase, False), []).append(-1)
+
+        texts = sorted({text for text, _ in self._term_areas})
+        self._scan_re = re.compile("(?=(" + _trie_pattern(texts) + "))")
+
+        # texto capturado -> termos (incluindo ele mesmo) que começam na mesma posição
+        self._prefixes: Dict[str, List[Tuple[str, bool]]] = {
+            text: [term for term in self._term_areas if text.startswith(term[0])]
+            for text in texts
+        }
+
+    # ------------------------------------------------------------
+    # ÁREA
+    # ------------------------------------------------------------
+
+    def area_scores(self, text_lower: str) -> Tuple[Dict[str, int], bool]:
+        """
+        Pontuação por área (nº de termos distintos encontrados) em uma única varredura.
+
+        Returns:
+            (scores por área, is_generic)
+        """
+        found = set()
+        text_len = len(text_lower)
+        for match in self._scan_re.finditer(text_lower):
+            start = match.start()
+            for term in self._prefixes[match.group(1)]:
+                if term in found:
+                    continue
+                term_text, needs_boundary = term
+                if needs_boundary:
+                    end = start + len(term_text)
+                    if end < text_len and _is_word_char(text_lower[end]):
+                        continue
+                found.add(term)
+
+        scores = {area: 0 for area in self.areas}
+        is_generic = False
+        for term in found:
+            for area_idx in self._term_areas[term]:
+                if area_idx < 0:
+                    is_generic = True
+                else:
+                    scores[self.areas[area_idx]] += 1
+        return scores, is_generic
+
+    def detect_area(self, text: str) -> str:
+        """Área com mais termos (empate: a primeira do dicionário), ou global_soft_skills."""
+        scores, is_generic = self.area_scores(text.lower())
+        if is_generic:
+            return DEFAULT_AREA
+        return self._best_area(scores)
+
+    def _best_area(self, scores: Dict[str, int]) -> str:
+        best_match = DEFAULT_AREA
+        max_count = 0
+        for area in self.areas:
+            if scores[area] > max_count:
+                max_count = scores[area]
+                best_match = area
+        return best_match
+
+    # ------------------------------------------------------------
+    # KEYWORDS DO CACHE (cargo, senioridade, tecnologias)
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def title_keywords(text_lower: str) -> List[str]:
+        title_match = TITLE_RE.search(text_lower)
+        if not title_match:
+            return []
+        return TITLE_WORDS_RE.findall(title_match.group(1))[:4]
+
+    @staticmethod
+    def seniority(text_lower: str) -> str:
+        for level, markers in SENIORITY_LEVELS:
+            if any(marker in text_lower for marker in markers):
+                return level
+        return ""
+
+    @staticmethod
+    def tech_mentions(text_lower: str) -> List[str]:
+        matches = [(_TECH_ORDER[m.lastgroup], m.start(), m.group(m.lastgroup)) for m in TECH_RE.finditer(text_lower)]
+        matches.sort()
+        return [value for _, _, value in matches]
+
+    def extract_keywords(self, text: str) -> List[str]:
+        """Mesma saída do antigo CacheManager._extract_keywords (até 6 keywords únicas)."""
+        text_lower = text.lower()
+        level = self.seniority(text_lower)
+        all_keywords = self.title_keywords(text_lower) + ([level] if level else []) + self.tech_mentions(text_lower)[:3]
+        return list(dict.fromkeys(all_keywords))[:6]
+
+    # ------------------------------------------------------------
+    # API COMPLETA / LOTE
+    # ------------------------------------------------------------
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """
+        Perfil completo da vaga numa chamada.
+
+        Returns:
+            {"area", "area_scores", "is_generic", "title_keywords", "seniority",
+             "tech_mentions", "keywords"}
+        """
+        text_lower = (text or "").lower()
+        scores, is_generic = self.area_scores(text_lower)
+        title = self.title_keywords(text_lower)
+        level = self.seniority(text_lower)
+        tech = self.tech_mentions(text_lower)
+        keywords = list(dict.fromkeys(title + ([level] if level else []) + tech[:3]))[:6]
+        return {
+            "area": DEFAULT_AREA if is_generic else self._best_area(scores),
+            "area_scores": scores,
+            "is_generic": is_generic,
+            "title_keywords": title,
+            "seniority": level,
+            "tech_mentions": tech,
+            "keywords": keywords,
+        }
+
+    def analyze_batch(self, texts: Iterable[str]) -> List[Dict[str, Any]]:
+        """`analyze` para várias vagas (ex: pré-aquecimento de cache, relatórios)."""
+        return [self.analyze(text) for text in texts]
+
+
+def normalize_for_cache(text: str) -> str:
+    """Minúsculas, sem pontuação e stopwords, palavras ordenadas (chave estável de cache)."""
+    if not text:
+        return ""
+    text = PUNCTUATION_RE.sub(' ', text.lower())
+    words = [word for word in text.split() if word not in NORMALIZE_STOPWORDS]
+    words.sort()
+    return ' '.join(words)
+
+
+# Instância global (compilada no import)
+keyword_engine = KeywordEngine()
@@ -9,7 +9,8 @@ from google import genai
 from google.genai import types
 from groq import Groq
 from anthropic import Anthropic
-from cache_manager import CacheManager
+from cache_manager import get_cache_manager
+from single_flight import analysis_flight, component_flight, inflight_locks, INFLIGHT_LOCK_TABLE_ENABLED
 from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente
@@ -49,67 +50,19 @@ def update_session_progress(session_id: str, data_chunk: dict, step_name: str) -
     """
     Atualiza sessão no Supabase com resultados parciais para progressive loading.
     
+    Merge atômico no servidor (RPC merge_session_progress) com coalescência de
+    steps intermediários próximos - ver session_progress.py.
+    
     Args:
         session_id: UUID da sessão de análise
         data_chunk: Dicionário com dados parciais a serem mesclados
         step_name: Nome do passo atual (ex: 'diagnostico_pronto')
     
     Returns:
-        bool: True se atualização foi bem-sucedida, False caso contrário
+        bool: True se atualização foi gravada (ou enfileirada), False caso contrário
     """
-    try:
-        from supabase import create_client
-        import os
-        from datetime import datetime
-        
-        # Conectar ao Supabase
-        supabase_url = os.getenv("SUPABASE_URL")
-        supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        
-        if not supabase_url or not supabase_key:
-            logger.error("❌ Supabase não configurado para update_session_progress")
-            return False
-        
-        supabase = create_client(supabase_url, supabase_key)
-        
-        # Buscar dados atuais da sessão
-        response = supabase.table("analysis_sessions").select("result_data").eq("id", session_id).limit(1).execute()
-        
-        if not response.data:
-            logger.error(f"❌ Sessão {session_id} não encontrada")
-            return False
-        
-        # Recuperar JSON atual
-        current_data = response.data[0].get("result_data", {})
-        
-        # Se for string JSON, fazer parse
-        if isinstance(current_data, str):
-            try:
-                current_data = json.loads(current_data)
-            except json.JSONDecodeError:
-                current_data = {}
-        
-        # Fazer merge dos novos dados
-        if isinstance(current_data, dict) and isinstance(data_chunk, dict):
-            merged_data = {**current_data, **data_chunk}
-        else:
-            merged_data = data_chunk
-        
-        # Atualizar sessão com dados combinados e novo step
-        update_data = {
-            "result_data": merged_data,
-            "current_step": step_name,
-            "updated_at": datetime.now().isoformat()
-        }
-        
-        supabase.table("analysis_sessions").update(update_data).eq("id", session_id).execute()
-        
-        logger.info(f"✅ Sessão {session_id} atualizada: step={step_name}, keys={list(data_chunk.keys())}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"❌ Erro ao atualizar sessão {session_id}: {e}")
-        return False
+    from session_progress import session_progress_writer
+    return session_progress_writer.update(session_id, data_chunk, step_name)
 
 def _vant_error(message: str, agent_name=None, model_name=None):
     payload = {
@@ -560,10 +513,18 @@ def call_llm(system_prompt: str, payload: str, agent_name: str):
             # Usa Google Gemini (padrão)
             return _call_google_cached(system_prompt, payload, agent_name, model)
 
+    from admission import provider_headroom
+    from llm_scheduler import llm_scheduler, priority_class_for_agent
+
+    priority_class = priority_class_for_agent(agent_name)
     last_response = None
     for attempt in range(LLM_RETRY_ATTEMPTS + 1):
-        last_response = _execute()
-        if not _is_transient_llm_error(last_response):
+        # Slot por tentativa: o backoff entre retries não segura o slot
+        with llm_scheduler.slot(priority_class):
+            last_response = _execute()
+        transient = _is_transient_llm_error(last_response)
+        provider_headroom.record(model, transient)
+        if not transient:
             return last_response
 
         if attempt < LLM_RETRY_ATTEMPTS:
@@ -612,23 +573,9 @@ def run_cv_pipeline(cv_text: str, strategy_payload: dict):
         if raw_text:
             # Converter para HTML mesmo no fallback
             from logic import format_text_to_html
-            from styles import CSS_V13
-            body_html = format_text_to_html(raw_text)
-            fallback_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        {CSS_V13}
-    </style>
-</head>
-<body>
-    <div class="cv-paper-sheet">
-        {body_html}
-    </div>
-</body>
-</html>"""
-            return {"cv_otimizado_completo": fallback_html}
+            from cache_codec import render_cv_html, MARKDOWN_KEY
+            fallback_html = render_cv_html(format_text_to_html(raw_text))
+            return {"cv_otimizado_completo": fallback_html, MARKDOWN_KEY: raw_text}
         return {"cv_otimizado_completo": "<p>Erro na formatação final do CV.</p>"}
 
     # Busca a chave correta (seja do JSON limpo ou do fallback)
@@ -639,27 +586,13 @@ def run_cv_pipeline(cv_text: str, strategy_payload: dict):
 
     # Converter texto para HTML formatado com estilos
     from logic import format_text_to_html
-    from styles import CSS_V13
-    
-    body_html = format_text_to_html(final_text)
+    from cache_codec import render_cv_html, MARKDOWN_KEY
     
-    # Criar HTML completo com CSS inline para renderização no frontend
-    full_html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <style>
-        {CSS_V13}
-    </style>
-</head>
-<body>
-    <div class="cv-paper-sheet">
-        {body_html}
-    </div>
-</body>
-</html>"""
-
-    return {"cv_otimizado_completo": full_html}
+    # HTML completo com CSS inline para renderização no frontend.
+    # O markdown vai junto para o cache gravar só o corpo (cache_codec).
+    full_html = render_cv_html(format_text_to_html(final_text))
+
+    return {"cv_otimizado_completo": full_html, MARKDOWN_KEY: final_text}
 
 # ============================================================
 # AGENTES AUXILIARES (COM PROTEÇÃO CONTRA NONE)
@@ -718,6 +651,55 @@ def agent_competitor_analysis(cv, job, competitors):
     )
     return res if res else {}
 
+def regenerate_partial_component(component_type, data):
+    """
+    Gera de novo um componente cacheável a partir do payload do cache parcial
+    (refresh do stale-while-revalidate e pre-warming).
+    
+    Returns:
+        Resultado do agente ou None se vier vazio (não deve ir para o cache)
+    """
+    job, gaps = data.get("job_description", ""), data.get("gaps_fatais", [])
+    if component_type == "library":
+        from logic import _curate_books
+        result = agent_library(job, gaps, _curate_books(data.get("area", "")))
+        return result if result.get("biblioteca_tecnica") else None
+    if component_type == "tactical":
+        result = agent_tactical(job, gaps)
+        return result if result.get("perguntas_entrevista") else None
+    return None
+
+# Chaves obrigatórias para reaproveitar resultado do cache parcial por similaridade
+_SIMILARITY_REQUIRED_KEYS = {
+    "library": ['biblioteca_tecnica'],
+    "tactical": ['projeto_pratico', 'perguntas_entrevista'],
+}
+
+
+def _coalesced_agent(component_type, cache_manager, cache_data, agent_fn, *args):
+    """
+    Executa agente cacheável coalescendo chamadas idênticas em andamento (mesmo component_hash).
+    
+    Antes de chamar a IA, tenta o cache parcial com os gaps REAIS do diagnóstico
+    (a checagem inicial do orquestrador roda com gaps vazios, mas as entradas são
+    salvas - e pré-aquecidas - com os gaps reais) e depois uma vaga/gaps quase
+    idênticos (MinHash/LSH).
+    """
+    required_keys = _SIMILARITY_REQUIRED_KEYS.get(component_type)
+    if cache_data.get("gaps_fatais"):
+        # Lookup já contado pelo check_partial_cache_many do orquestrador
+        cached = cache_manager.check_partial_cache(component_type, cache_data, required_keys, retry=True)
+        if cached:
+            return cached
+    
+    similar = cache_manager.find_similar_partial_cache(component_type, cache_data, required_keys)
+    if similar:
+        return similar
+    
+    component_hash = cache_manager.generate_component_hash(component_type, cache_data)
+    result, _ = component_flight.do(component_hash, agent_fn, *args)
+    return result
+
 # ============================================================
 # ORQUESTRADOR FINAL COM CACHE INTELIGENTE
 # ============================================================
@@ -738,7 +720,7 @@ def run_llm_orchestrator(
     job_description = sanitize_input(job_description)
     
     # Inicializa o cache manager
-    cache_manager = CacheManager()
+    cache_manager = get_cache_manager()
     
     # NÍVEL 1: Cache de Hash (Deduplicação Imediata)
     # Gera hash dos dados de entrada para verificar se já foi processado
@@ -750,6 +732,69 @@ def run_llm_orchestrator(
         logger.info(f"⚡ CACHE HIT! Retornando resultado processado anteriormente")
         return cached_result
     
+    # NÍVEL 1.5: Single-Flight (duplo clique / duas abas compartilham o mesmo pipeline)
+    result, _ = analysis_flight.do(
+        input_hash,
+        _run_llm_orchestrator_locked,
+        cache_manager,
+        input_hash,
+        cv_text,
+        job_description,
+        books_catalog,
+        area,
+        competitors_text,
+        user_id,
+        original_filename,
+    )
+    return result
+
+
+def _run_llm_orchestrator_locked(
+    cache_manager,
+    input_hash,
+    cv_text,
+    job_description,
+    books_catalog,
+    area,
+    competitors_text,
+    user_id,
+    original_filename,
+):
+    """Executa o pipeline segurando o lock entre workers (se habilitado)."""
+    if not INFLIGHT_LOCK_TABLE_ENABLED:
+        return _run_llm_orchestrator_pipeline(
+            cache_manager, input_hash, cv_text, job_description, books_catalog,
+            area, competitors_text, user_id, original_filename,
+        )
+    
+    # Análise em andamento em outro worker: espera e reaproveita o resultado do cache
+    acquired, cached_result = inflight_locks.acquire_or_wait(
+        input_hash, lambda: cache_manager.check_cache(input_hash)
+    )
+    if cached_result:
+        return cached_result
+    
+    try:
+        return _run_llm_orchestrator_pipeline(
+            cache_manager, input_hash, cv_text, job_description, books_catalog,
+            area, competitors_text, user_id, original_filename,
+        )
+    finally:
+        if acquired:
+            inflight_locks.release(input_hash)
+
+
+def _run_llm_orchestrator_pipeline(
+    cache_manager,
+    input_hash,
+    cv_text,
+    job_description,
+    books_catalog,
+    area,
+    competitors_text,
+    user_id,
+    original_filename,
+):
     logger.info(f"🔄 CACHE MISS: Processando com IA...")
     logger.info("⚡ PARALELIZAÇÃO MÁXIMA + CACHE PARCIAL INTELIGENTE")
     
@@ -766,14 +811,15 @@ def run_llm_orchestrator(
         "gaps_fatais": []  # Será preenchido após diagnosis
     }
     
-    # Verificar cache parcial para Diagnosis
-    diag_cached = cache_manager.check_partial_cache("diagnosis", cache_data, required_keys=['analise_por_pilares', 'gaps_fatais'])
-    
-    # Verificar cache parcial para Library (baseado na área)
-    library_cached = cache_manager.check_partial_cache("library", cache_data, required_keys=['biblioteca_tecnica'])
-    
-    # Verificar cache parcial para Tactical (baseado na vaga)
-    tactical_cached = cache_manager.check_partial_cache("tactical", cache_data, required_keys=['projeto_pratico', 'perguntas_entrevista'])
+    # Verificar cache parcial de Diagnosis, Library (área) e Tactical (vaga) numa única query
+    partial_hits = cache_manager.check_partial_cache_many(cache_data, {
+        "diagnosis": ['analise_por_pilares', 'gaps_fatais'],
+        "library": ['biblioteca_tecnica'],
+        "tactical": ['projeto_pratico', 'perguntas_entrevista'],
+    })
+    diag_cached = partial_hits["diagnosis"]
+    library_cached = partial_hits["library"]
+    tactical_cached = partial_hits["tactical"]
     
     logger.info(f"📊 Cache Status: Diagnosis={bool(diag_cached)}, Library={bool(library_cached)}, Tactical={bool(tactical_cached)}")
     
@@ -826,7 +872,10 @@ def run_llm_orchestrator(
             library_result = library_cached
         else:
             logger.info("🔄 Processando Library com IA...")
-            future_library = executor.submit(agent_library, job_description, gaps, books_catalog)
+            future_library = executor.submit(
+                _coalesced_agent, "library", cache_manager, {**cache_data, "gaps_fatais": gaps},
+                agent_library, job_description, gaps, books_catalog,
+            )
             try:
                 library_result = future_library.result(timeout=60)  # Timeout de 60s
             except concurrent.futures.TimeoutError:
@@ -844,7 +893,10 @@ def run_llm_orchestrator(
             tactical_result = tactical_cached
         else:
             logger.info("🔄 Processando Tactical com IA...")
-            future_tactical = executor.submit(agent_tactical, job_description, gaps)
+            future_tactical = executor.submit(
+                _coalesced_agent, "tactical", cache_manager, {**cache_data, "gaps_fatais": gaps},
+                agent_tactical, job_description, gaps,
+            )
             try:
                 tactical_result = future_tactical.result(timeout=60)  # Timeout de 60s
             except concurrent.futures.TimeoutError:
@@ -930,6 +982,10 @@ def run_llm_orchestrator(
         if cache_saved:
             logger.info(f"💾 Resultado salvo no cache para usuário {user_id}")
     
+    # Markdown do CV só serve para o compact_result do cache: não vai para o cliente/sessão
+    from cache_codec import MARKDOWN_KEY
+    result.pop(MARKDOWN_KEY, None)
+    
     logger.info("🏁 Orquestração concluída")
     total_time = time.time() - start_time
     
@@ -1058,7 +1114,8 @@ def analyze_cv_orchestrator_streaming(
     books_catalog: list,
     competitors_text: str | None = None,
     user_id: str | None = None,
-    original_filename: str = None
+    original_filename: str = None,
+    final_attempt: bool = True,
 ) -> None:
     """
     Orquestrador com progressive loading para análise de CV.
@@ -1070,221 +1127,308 @@ def analyze_cv_orchestrator_streaming(
         job_description: Descrição da vaga
         books_catalog: Catálogo de livros para biblioteca
         competitors_text: Texto dos competidores (opcional)
+        final_attempt: False quando a fila ainda vai reexecutar o job: erros
+            sobem em vez de marcar a sessão como failed
     """
     logger.info(f"🚀 Iniciando orquestrador streaming | Sessão: {session_id}")
     
     try:
         # Sanitizar inputs
-        from logic import sanitize_input, analyze_preview_lite
+        from logic import sanitize_input
         cv_text = sanitize_input(cv_text)
         job_description = sanitize_input(job_description)
         
-        # Se for vaga genérica e tiver área de interesse, força a área
-        forced_area = None
-        if area_of_interest and "busco oportunidades profissionais" in job_description.lower():
-            logger.info(f"🎯 Área de interesse detectada: {area_of_interest}")
-            # Usa a área selecionada pelo usuário
-            forced_area = area_of_interest
-            modified_job_description = f"Vaga na área de {area_of_interest.replace('_', ' ').title()}. " + job_description
-        else:
-            modified_job_description = job_description
+        # Single-Flight: mesmo usuário + CV + vaga + área (+ concorrentes) já em andamento reaproveita o pipeline
+        # (user_id na chave: sessão de outro usuário nunca herda o resultado/histórico alheio)
+        flight_job_key = (
+            f"{job_description}\n[AREA]{(area_of_interest or '').strip().lower()}"
+            f"\n[COMP]{competitors_text or ''}\n[USER]{user_id or ''}"
+        )
+        flight_key = get_cache_manager().generate_input_hash(cv_text, flight_job_key, model_version="streaming")
+        final_result, is_leader = analysis_flight.do(
+            flight_key,
+            _run_streaming_pipeline,
+            session_id,
+            cv_text,
+            job_description,
+            area_of_interest,
+            books_catalog,
+            competitors_text,
+            user_id,
+            original_filename,
+            final_attempt,
+        )
+        
+        if not is_leader:
+            # Sessão seguidora: recebe o resultado final da sessão líder
+            if final_result:
+                final_result = {**final_result, "_session_id": session_id}
+                update_session_progress(session_id, final_result, "completed")
+                if user_id:
+                    _save_streaming_history(session_id, user_id, cv_text, job_description, final_result, original_filename)
+                logger.info(f"🔗 Sessão {session_id} concluída com resultado compartilhado (single-flight)")
+            else:
+                update_session_progress(session_id, {"error": "Falha no processamento da análise compartilhada"}, "failed")
         
-        # ETAPA 1: Calcular nota estrutural usando EXATAMENTE a mesma lógica do /analyze-lite (SEM CACHE)
+    except Exception as e:
+        if not final_attempt:
+            raise
+        logger.error(f"❌ Erro fatal no orquestrador streaming {session_id}: {e}")
+        
+        # Atualizar status para falha
+        error_data = {
+            "error": f"Erro fatal no processamento: {str(e)}",
+            "error_type": type(e).__name__
+        }
+        update_session_progress(session_id, error_data, "failed")
+
+
+def _run_streaming_pipeline(
+    session_id: str,
+    cv_text: str,
+    job_description: str,
+    area_of_interest: str,
+    books_catalog: list,
+    competitors_text: str | None,
+    user_id: str | None,
+    original_filename: str | None,
+    final_attempt: bool = True,
+) -> dict | None:
+    """
+    Pipeline do orquestrador streaming (executado pela sessão líder do single-flight).
+    
+    Returns:
+        Resultado final ou None se o diagnóstico falhou na última tentativa
+        (antes dela, o erro do diagnóstico sobe para a fila reexecutar)
+    """
+    from logic import analyze_preview_lite
+    
+    # Se for vaga genérica e tiver área de interesse, força a área
+    forced_area = None
+    if area_of_interest and "busco oportunidades profissionais" in job_description.lower():
+        logger.info(f"🎯 Área de interesse detectada: {area_of_interest}")
+        # Usa a área selecionada pelo usuário
+        forced_area = area_of_interest
+        modified_job_description = f"Vaga na área de {area_of_interest.replace('_', ' ').title()}. " + job_description
+    else:
+        modified_job_description = job_description
+    
+    # ETAPA 1: Calcular nota estrutural usando EXATAMENTE a mesma lógica do /analyze-lite (SEM CACHE)
+    nota_ats_estrutura = None
+    preview_gaps_count = None
+    pilares_estrutura = None
+    try:
+        # SEMPRE processar fresh para garantir consistência com preview
+        # Caminho crítico pago: não pode esperar atrás dos previews grátis no scheduler
+        if forced_area:
+            lite_result = analyze_preview_lite(
+                cv_text, job_description, forced_area=forced_area, priority_class="paid_critical"
+            )
+        else:
+            lite_result = analyze_preview_lite(
+                cv_text, job_description, forced_area=None, priority_class="paid_critical"
+            )
+
+        if isinstance(lite_result, dict):
+            nota_ats_estrutura = int(lite_result.get("nota_ats", 0) or 0)
+            pilares_estrutura = lite_result.get("analise_por_pilares")
+            preview_gaps_count = int(bool(lite_result.get("gap_1"))) + int(bool(lite_result.get("gap_2")))
+        else:
+            logger.warning(f"⚠️ analyze_preview_lite retornou formato inválido: {type(lite_result)}")
+            
+    except Exception as lite_error:
+        logger.warning(f"⚠️ Não foi possível calcular nota estrutural via analyze_preview_lite: {lite_error}")
         nota_ats_estrutura = None
-        preview_gaps_count = None
         pilares_estrutura = None
-        try:
-            # SEMPRE processar fresh para garantir consistência com preview
-            if forced_area:
-                lite_result = analyze_preview_lite(cv_text, job_description, forced_area=forced_area)
-            else:
-                lite_result = analyze_preview_lite(cv_text, job_description, forced_area=None)
+        preview_gaps_count = None
 
-            if isinstance(lite_result, dict):
-                nota_ats_estrutura = int(lite_result.get("nota_ats", 0) or 0)
-                pilares_estrutura = lite_result.get("analise_por_pilares")
-                preview_gaps_count = int(bool(lite_result.get("gap_1"))) + int(bool(lite_result.get("gap_2")))
-            else:
-                logger.warning(f"⚠️ analyze_preview_lite retornou formato inválido: {type(lite_result)}")
-                
-        except Exception as lite_error:
-            logger.warning(f"⚠️ Não foi possível calcular nota estrutural via analyze_preview_lite: {lite_error}")
-            nota_ats_estrutura = None
-            pilares_estrutura = None
-            preview_gaps_count = None
-
-        # ETAPA 2: Diagnosis premium (conteúdo/gaps)
-        logger.info("📊 Etapa 1: Processando diagnosis...")
+    # ETAPA 2: Diagnosis premium (conteúdo/gaps)
+    logger.info("📊 Etapa 1: Processando diagnosis...")
+    
+    try:
+        diag_result = agent_diagnosis(cv_text, modified_job_description, forced_area=forced_area)
         
-        try:
-            diag_result = agent_diagnosis(cv_text, modified_job_description, forced_area=forced_area)
-            
-            nota_ats_conteudo = int(diag_result.get("nota_ats", 0) or 0)
-            
-            # GARANTIR CONSISTÊNCIA: Usar sempre o score do preview (analyze_preview_lite)
-            if nota_ats_estrutura is not None:
-                # Score do preview é autoritativo - usar ele como score principal
-                diag_result["nota_ats"] = int(nota_ats_estrutura)
-                diag_result["nota_ats_estrutura"] = int(nota_ats_estrutura)  # Compatibilidade
-                diag_result["nota_ats_conteudo"] = nota_ats_conteudo  # Para debug se necessário
-            else:
-                # Fallback caso preview falhe
-                diag_result["nota_ats"] = nota_ats_conteudo
-                diag_result["nota_ats_estrutura"] = nota_ats_conteudo
-
-            # Pilares e gaps do preview (autoritativo)
-            if pilares_estrutura:
-                diag_result["analise_por_pilares"] = pilares_estrutura
-                diag_result["analise_por_pilares_estrutura"] = pilares_estrutura  # Compatibilidade
-            if preview_gaps_count is not None:
-                diag_result["preview_gaps_count"] = preview_gaps_count
-            
-            # Armazenar o resultado completo do preview lite para reuso exato no frontend
-            if isinstance(lite_result, dict) and lite_result:
-                diag_result["preview_lite_result"] = lite_result
+        nota_ats_conteudo = int(diag_result.get("nota_ats", 0) or 0)
+        
+        # GARANTIR CONSISTÊNCIA: Usar sempre o score do preview (analyze_preview_lite)
+        if nota_ats_estrutura is not None:
+            # Score do preview é autoritativo - usar ele como score principal
+            diag_result["nota_ats"] = int(nota_ats_estrutura)
+            diag_result["nota_ats_estrutura"] = int(nota_ats_estrutura)  # Compatibilidade
+            diag_result["nota_ats_conteudo"] = nota_ats_conteudo  # Para debug se necessário
+        else:
+            # Fallback caso preview falhe
+            diag_result["nota_ats"] = nota_ats_conteudo
+            diag_result["nota_ats_estrutura"] = nota_ats_conteudo
+
+        # Pilares e gaps do preview (autoritativo)
+        if pilares_estrutura:
+            diag_result["analise_por_pilares"] = pilares_estrutura
+            diag_result["analise_por_pilares_estrutura"] = pilares_estrutura  # Compatibilidade
+        if preview_gaps_count is not None:
+            diag_result["preview_gaps_count"] = preview_gaps_count
+        
+        # Armazenar o resultado completo do preview lite para reuso exato no frontend
+        if isinstance(lite_result, dict) and lite_result:
+            diag_result["preview_lite_result"] = lite_result
 
-            # Salvar diagnóstico parcial
-            update_session_progress(session_id, diag_result, "diagnostico_pronto")
-            logger.info("✅ Diagnóstico salvo no banco")
-            
-            # Extrair gaps para as próximas etapas
-            gaps = diag_result.get("gaps_fatais", [])
-            
-        except Exception as e:
-            logger.error(f"❌ Erro no diagnosis: {e}")
-            update_session_progress(session_id, {"error": f"Erro no diagnóstico: {str(e)}"}, "failed")
-            return
+        # Salvar diagnóstico parcial
+        update_session_progress(session_id, diag_result, "diagnostico_pronto")
+        logger.info("✅ Diagnóstico salvo no banco")
         
-        # ETAPA 2: Processamento paralelo (CV, Library, Tactical)
-        logger.info("⚡ Etapa 2: Iniciando processamento paralelo...")
+        # Extrair gaps para as próximas etapas
+        gaps = diag_result.get("gaps_fatais", [])
         
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            # Future 1: CV Pipeline (crítico)
-            strategy_payload = {
-                "cv_original": cv_text,
-                "diagnostico": diag_result,
-                "vaga": modified_job_description,
-            }
-            future_cv = executor.submit(run_cv_pipeline, cv_text, strategy_payload)
-            
-            # Future 2: Library
-            future_library = executor.submit(agent_library, modified_job_description, gaps, books_catalog, forced_area)
-            
-            # Future 3: Tactical
-            future_tactical = executor.submit(agent_tactical, modified_job_description, gaps, forced_area)
-            
-            # Future 4: Competitor Analysis (se houver, não bloqueia as outras)
-            future_comp = None
-            if competitors_text:
-                future_comp = executor.submit(agent_competitor_analysis, cv_text, job_description, competitors_text)
-            
-            # ETAPA 3: Coleta incremental dos resultados
-            logger.info("🔄 Etapa 3: Aguardando conclusão das tarefas...")
-            
-            results = {}
-            completed_steps = []
-            
-            # Esperar cada future e salvar assim que terminar
-            futures_to_check = [
-                ("cv_pronto", future_cv, "cv_otimizado_completo"),
-                ("library_pronta", future_library, None),
-                ("tactical_pronto", future_tactical, None)
-            ]
-            
-            for step_name, future, result_key in futures_to_check:
-                try:
-                    result = future.result(timeout=120)  # Timeout de 2 minutos por tarefa
-                    
-                    # Mapear resultado para chave correta se necessário
-                    if result_key and result_key in result:
-                        mapped_result = {result_key: result[result_key]}
-                    else:
-                        mapped_result = result
-                    
-                    # Salvar resultado parcial
-                    update_session_progress(session_id, mapped_result, step_name)
-                    logger.info(f"✅ {step_name.replace('_', ' ').title()} salvo")
-                    completed_steps.append(step_name)
-                    
-                    # Acumular resultado para merge final
-                    results.update(mapped_result)
-                    
-                except concurrent.futures.TimeoutError:
-                    logger.error(f"❌ Timeout em {step_name}")
-                    error_msg = f"Timeout no processamento de {step_name}"
-                    update_session_progress(session_id, {"error": error_msg}, step_name.replace("_pronto", "_failed"))
-                    
-                except Exception as e:
-                    logger.error(f"❌ Erro em {step_name}: {e}")
-                    error_msg = f"Erro no processamento de {step_name}: {str(e)}"
-                    update_session_progress(session_id, {"error": error_msg}, step_name.replace("_pronto", "_failed"))
-            
-            # Competitor Analysis (não crítico, processa se houver)
-            if future_comp:
-                try:
-                    comp_result = future_comp.result(timeout=60)
-                    if comp_result:
-                        update_session_progress(session_id, comp_result, "competitor_analysis_ready")
-                        results.update(comp_result)
-                        logger.info("✅ Competitor analysis salvo")
-                        
-                except Exception as e:
-                    logger.warning(f"⚠️ Erro no competitor analysis (não crítico): {e}")
+    except Exception as e:
+        if not final_attempt:
+            raise
+        logger.error(f"❌ Erro no diagnosis: {e}")
+        update_session_progress(session_id, {"error": f"Erro no diagnóstico: {str(e)}"}, "failed")
+        return None
+    
+    # ETAPA 2: Processamento paralelo (CV, Library, Tactical)
+    logger.info("⚡ Etapa 2: Iniciando processamento paralelo...")
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        # Future 1: CV Pipeline (crítico)
+        strategy_payload = {
+            "cv_original": cv_text,
+            "diagnostico": diag_result,
+            "vaga": modified_job_description,
+        }
+        future_cv = executor.submit(run_cv_pipeline, cv_text, strategy_payload)
         
-        # ETAPA 4: Finalização
-        logger.info("🏁 Etapa 4: Finalizando orquestração...")
+        # Future 2: Library
+        future_library = executor.submit(agent_library, modified_job_description, gaps, books_catalog, forced_area)
         
-        # Merge final com diagnóstico
-        final_result = {**diag_result, **results}
+        # Future 3: Tactical
+        future_tactical = executor.submit(agent_tactical, modified_job_description, gaps, forced_area)
         
-        # Persistir área de interesse selecionada pelo usuário
-        if area_of_interest:
-            final_result["_user_area"] = area_of_interest
+        # Future 4: Competitor Analysis (se houver, não bloqueia as outras)
+        future_comp = None
+        if competitors_text:
+            future_comp = executor.submit(agent_competitor_analysis, cv_text, job_description, competitors_text)
         
-        # Garantir campos mínimos
-        if "perguntas_entrevista" not in final_result:
-            final_result["perguntas_entrevista"] = []
-        if "biblioteca_tecnica" not in final_result:
-            final_result["biblioteca_tecnica"] = []
-        if "projeto_pratico" not in final_result:
-            final_result["projeto_pratico"] = {}
-        if "kit_hacker" not in final_result:
-            final_result["kit_hacker"] = {}
+        # ETAPA 3: Coleta incremental dos resultados
+        logger.info("🔄 Etapa 3: Aguardando conclusão das tarefas...")
+        
+        results = {}
+        completed_steps = []
         
-        # Salvar resultado final na sessão
-        update_session_progress(session_id, final_result, "completed")
-        logger.info(f"🎉 Orquestração concluída com sucesso | Sessão: {session_id}")
+        # Esperar cada future e salvar assim que terminar
+        futures_to_check = [
+            ("cv_pronto", future_cv, "cv_otimizado_completo"),
+            ("library_pronta", future_library, None),
+            ("tactical_pronto", future_tactical, None)
+        ]
         
-        # Persistir no cache/histórico (cached_analyses) para o Dashboard
-        if user_id and final_result:
+        for step_name, future, result_key in futures_to_check:
             try:
-                from cache_manager import CacheManager
-                import hashlib
-                cache_manager = CacheManager()
-                input_hash = hashlib.sha256(
-                    f"{cv_text}{job_description}streaming".encode()
-                ).hexdigest()
-                cache_saved = cache_manager.save_to_cache(
-                    input_hash=input_hash,
-                    user_id=user_id,
-                    cv_text=cv_text,
-                    job_description=job_description,
-                    result_json=final_result,
-                    original_filename=original_filename
-                )
-                if cache_saved:
-                    logger.info(f"💾 Resultado salvo no histórico (cached_analyses) para usuário {user_id}")
+                result = future.result(timeout=120)  # Timeout de 2 minutos por tarefa
+                
+                # Mapear resultado para chave correta se necessário
+                if result_key and result_key in result:
+                    mapped_result = {result_key: result[result_key]}
                 else:
-                    logger.warning(f"⚠️ Falha ao salvar no histórico para usuário {user_id}")
-            except Exception as cache_err:
-                logger.error(f"❌ Erro ao salvar no histórico: {cache_err}")
-        
-    except Exception as e:
-        logger.error(f"❌ Erro fatal no orquestrador streaming {session_id}: {e}")
+                    mapped_result = result
+                
+                # Salvar resultado parcial
+                update_session_progress(session_id, mapped_result, step_name)
+                logger.info(f"✅ {step_name.replace('_', ' ').title()} salvo")
+
+                if step_name == "cv_pronto":
+                    # PDF/DOCX prontos antes do primeiro clique em "baixar"
+                    from render_cache import render_cache
+                    render_cache.schedule_prerender(mapped_result.get("cv_otimizado_completo", ""))
+                completed_steps.append(step_name)
+                
+                # Acumular resultado para merge final
+                results.update(mapped_result)
+                
+            except concurrent.futures.TimeoutError:
+                logger.error(f"❌ Timeout em {step_name}")
+                error_msg = f"Timeout no processamento de {step_name}"
+                update_session_progress(session_id, {"error": error_msg}, step_name.replace("_pronto", "_failed"))
+                
+            except Exception as e:
+                logger.error(f"❌ Erro em {step_name}: {e}")
+                error_msg = f"Erro no processamento de {step_name}: {str(e)}"
+                update_session_progress(session_id, {"error": error_msg}, step_name.replace("_pronto", "_failed"))
         
-        # Atualizar status para falha
-        error_data = {
-            "error": f"Erro fatal no processamento: {str(e)}",
-            "error_type": type(e).__name__
-        }
-        update_session_progress(session_id, error_data, "failed")
+        # Competitor Analysis (não crítico, processa se houver)
+        if future_comp:
+            try:
+                comp_result = future_comp.result(timeout=60)
+                if comp_result:
+                    update_session_progress(session_id, comp_result, "competitor_analysis_ready")
+                    results.update(comp_result)
+                    logger.info("✅ Competitor analysis salvo")
+                    
+            except Exception as e:
+                logger.warning(f"⚠️ Erro no competitor analysis (não crítico): {e}")
+    
+    # ETAPA 4: Finalização
+    logger.info("🏁 Etapa 4: Finalizando orquestração...")
+    
+    # Merge final com diagnóstico
+    final_result = {**diag_result, **results}
+    
+    # Persistir área de interesse selecionada pelo usuário
+    if area_of_interest:
+        final_result["_user_area"] = area_of_interest
+    
+    # Garantir campos mínimos
+    if "perguntas_entrevista" not in final_result:
+        final_result["perguntas_entrevista"] = []
+    if "biblioteca_tecnica" not in final_result:
+        final_result["biblioteca_tecnica"] = []
+    if "projeto_pratico" not in final_result:
+        final_result["projeto_pratico"] = {}
+    if "kit_hacker" not in final_result:
+        final_result["kit_hacker"] = {}
+    
+    # Salvar resultado final na sessão
+    update_session_progress(session_id, final_result, "completed")
+    logger.info(f"🎉 Orquestração concluída com sucesso | Sessão: {session_id}")
+    
+    # Persistir no cache/histórico (cached_analyses) para o Dashboard
+    if user_id and final_result:
+        _save_streaming_history(session_id, user_id, cv_text, job_description, final_result, original_filename)
+    
+    return final_result
+
+
+def _save_streaming_history(
+    session_id: str,
+    user_id: str,
+    cv_text: str,
+    job_description: str,
+    final_result: dict,
+    original_filename: str | None,
+) -> None:
+    """Grava a análise da sessão no histórico (cached_analyses) do usuário."""
+    try:
+        from cache_manager import get_cache_manager
+        import hashlib
+        cache_manager = get_cache_manager()
+        input_hash = hashlib.sha256(
+            f"{cv_text}{job_description}streaming".encode()
+        ).hexdigest()
+        # Job reexecutado (fila at-least-once): não duplica a entrada do histórico
+        if cache_manager.has_session_analysis(session_id):
+            logger.info(f"♻️ Sessão {session_id} já está no histórico, pulando gravação")
+            return
+        cache_saved = cache_manager.save_to_cache(
+            input_hash=input_hash,
+            user_id=user_id,
+            cv_text=cv_text,
+            job_description=job_description,
+            result_json={**final_result, "_session_id": session_id},
+            original_filename=original_filename
+        )
+        if cache_saved:
+            logger.info(f"💾 Resultado salvo no histórico (cached_analyses) para usuário {user_id}")
+        else:
+            logger.warning(f"⚠️ Falha ao salvar no histórico para usuário {user_id}")
+    except Exception as cache_err:
+        logger.error(f"❌ Erro ao salvar no histórico: {cache_err}")
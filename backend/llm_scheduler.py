@@ -0,0 +1,187 @@
+"""
+LLM Scheduler - Prioridade por tier entre análises pagas e previews grátis
+
+🎯 PROBLEMA:
+- /api/analyze-lite e /api/analyze-free disputam a mesma cota de IA e as
+  mesmas threads das análises premium: num pico de previews grátis, quem
+  pagou espera atrás de quem não pagou
+
+✅ SOLUÇÃO:
+1. Toda chamada a provedor de IA pega um slot (LLM_SCHEDULER_MAX_CONCURRENCY)
+   - call_llm (pipeline premium) e os previews de logic.py
+2. Slots livres vão para a classe de maior prioridade:
+   - paid_critical: caminho crítico pago (diagnóstico e escrita do CV)
+   - paid: demais agentes pagos (tática, biblioteca, competidores...)
+   - free: previews grátis
+3. Anti-starvation: a cada LLM_SCHEDULER_AGING_SECONDS de espera a chamada
+   sobe uma classe - um preview nunca fica preso para sempre
+4. Métricas por classe (espera p50/p95, violações de SLO de espera) em
+   GET /api/admin/llm-scheduler
+
+A fila de jobs (job_queue.py) só carrega análises pagas, então a ordem de
+claim lá não muda; a prioridade é aplicada aqui, onde pagos e grátis se
+encontram.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() == "true"
+LLM_SCHEDULER_MAX_CONCURRENCY = int(os.getenv("LLM_SCHEDULER_MAX_CONCURRENCY", "12"))
+LLM_SCHEDULER_AGING_SECONDS = float(os.getenv("LLM_SCHEDULER_AGING_SECONDS", "10"))
+
+# Classes em ordem de prioridade (índice menor = despacha primeiro)
+PRIORITY_CLASSES = ("paid_critical", "paid", "free")
+
+# SLO de espera na fila do scheduler, por classe (ms)
+DEFAULT_WAIT_SLO_MS = {
+    "paid_critical": int(os.getenv("LLM_SLO_WAIT_MS_PAID_CRITICAL", "500")),
+    "paid": int(os.getenv("LLM_SLO_WAIT_MS_PAID", "2000")),
+    "free": int(os.getenv("LLM_SLO_WAIT_MS_FREE", "15000")),
+}
+
+# Agentes do caminho crítico da análise paga
+CRITICAL_AGENTS = frozenset({"diagnosis", "cv_writer_semantic", "cv_formatter"})
+
+
+def priority_class_for_agent(agent_name: str) -> str:
+    """Classe de prioridade de uma chamada feita via call_llm (sempre trabalho pago)."""
+    return "paid_critical" if agent_name in CRITICAL_AGENTS else "paid"
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "enqueued_at", "granted")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+
+
+class _ClassMetrics:
+    def __init__(self, slo_ms: int, samples: int = 500):
+        self.slo_ms = slo_ms
+        self.calls = 0
+        self.slo_violations = 0
+        self.promoted = 0
+        self.waits_ms: Deque[float] = deque(maxlen=samples)
+
+    def to_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.waits_ms)
+
+        def pct(p: float) -> float:
+            if not ordered:
+                return 0.0
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1)
+
+        return {
+            "calls": self.calls,
+            "wait_p50_ms": pct(0.50),
+            "wait_p95_ms": pct(0.95),
+            "slo_wait_ms": self.slo_ms,
+            "slo_violations": self.slo_violations,
+            "promoted_by_aging": self.promoted,
+        }
+
+
+class PriorityScheduler:
+    """Semáforo com fila de prioridade (e aging) para chamadas aos provedores de IA."""
+
+    def __init__(self,
+                 max_concurrency: int = LLM_SCHEDULER_MAX_CONCURRENCY,
+                 aging_seconds: float = LLM_SCHEDULER_AGING_SECONDS,
+                 wait_slo_ms: Optional[Dict[str, int]] = None,
+                 enabled: bool = LLM_SCHEDULER_ENABLED):
+        self.max_concurrency = max(max_concurrency, 1)
+        self.aging_seconds = aging_seconds
+        self.enabled = enabled
+        self._cond = threading.Condition()
+        self._active = 0
+        self._waiting: List[_Ticket] = []
+        self._seq = itertools.count()
+        slo = {**DEFAULT_WAIT_SLO_MS, **(wait_slo_ms or {})}
+        self._metrics = {cls: _ClassMetrics(slo[cls]) for cls in PRIORITY_CLASSES}
+
+    def _effective_priority(self, ticket: _Ticket, now: float) -> int:
+        if self.aging_seconds <= 0:
+            return ticket.priority
+        return max(0, ticket.priority - int((now - ticket.enqueued_at) / self.aging_seconds))
+
+    def _dispatch(self) -> None:
+        """Entrega slots livres aos tickets de maior prioridade efetiva (chamar com lock)."""
+        now = time.monotonic()
+        while self._waiting and self._active < self.max_concurrency:
+            best = min(self._waiting, key=lambda t: (self._effective_priority(t, now), t.seq))
+            self._waiting.remove(best)
+            best.granted = True
+            self._active += 1
+        self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority_class: str):
+        """Segura um slot de chamada de IA durante o bloco."""
+        if not self.enabled:
+            yield
+            return
+
+        if priority_class not in self._metrics:
+            priority_class = "free"
+        base_priority = PRIORITY_CLASSES.index(priority_class)
+
+        with self._cond:
+            ticket = _Ticket(base_priority, next(self._seq))
+            self._waiting.append(ticket)
+            self._dispatch()
+            # O tick de timeout reavalia o aging mesmo sem ninguém liberar slot
+            while not ticket.granted:
+                self._cond.wait(timeout=max(self.aging_seconds, 0.5))
+                if not ticket.granted:
+                    self._dispatch()
+
+            waited_ms = (time.monotonic() - ticket.enqueued_at) * 1000
+            metrics = self._metrics[priority_class]
+            metrics.calls += 1
+            metrics.waits_ms.append(waited_ms)
+            if waited_ms > metrics.slo_ms:
+                metrics.slo_violations += 1
+            if self._effective_priority(ticket, time.monotonic()) < base_priority:
+                metrics.promoted += 1
+
+        if waited_ms > metrics.slo_ms:
+            logger.warning(f"⏳ Chamada de IA [{priority_class}] esperou {waited_ms:.0f}ms por slot")
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            waiting_by_class = {cls: 0 for cls in PRIORITY_CLASSES}
+            for ticket in self._waiting:
+                waiting_by_class[PRIORITY_CLASSES[ticket.priority]] += 1
+            return {
+                "enabled": self.enabled,
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "waiting": waiting_by_class,
+                "aging_seconds": self.aging_seconds,
+                "classes": {cls: m.to_dict() for cls, m in self._metrics.items()},
+            }
+
+
+# Instância global
+llm_scheduler = PriorityScheduler()
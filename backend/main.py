@@ -82,6 +82,7 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],  # Polling condicional (If-None-Match) vindo de outra origem
 )
 
 # Monitoring
@@ -101,6 +102,50 @@ else:
     print("   Tokens serão consumidos")
     print("="*60 + "\n")
 
+# ============================================================
+# BACKGROUND JOBS
+# ============================================================
+
+@app.on_event("startup")
+def _start_background_jobs() -> None:
+    from background_jobs import start_background_jobs
+    from cache_eviction import register_cache_eviction_job
+    from cache_prewarm import register_cache_prewarm_job
+    from cache_usage import register_cache_usage_job
+
+    register_cache_eviction_job()
+    register_cache_usage_job()
+    register_cache_prewarm_job()
+    start_background_jobs()
+
+    from dependencies import start_analysis_job_queue
+    start_analysis_job_queue()
+
+    from pdf_renderer import start_render_pool
+    start_render_pool()
+
+
+@app.on_event("shutdown")
+def _stop_background_jobs() -> None:
+    from background_jobs import stop_background_jobs
+    from cache_usage import hit_accumulator
+    from session_progress import session_progress_writer
+
+    from job_queue import get_job_queue
+    from pdf_text import shutdown_pdf_pool
+    from pdf_renderer import shutdown_render_pool
+    from render_cache import render_cache
+
+    stop_background_jobs()
+    if get_job_queue():
+        get_job_queue().stop()  # Jobs em andamento voltam à fila quando o lease expirar
+    hit_accumulator.flush()  # Não perde os hits acumulados desde o último ciclo
+    session_progress_writer.flush()  # Steps ainda na janela de coalescência
+    shutdown_pdf_pool()
+    render_cache.shutdown()
+    shutdown_render_pool()
+
+
 # ============================================================
 # REGISTER ROUTERS
 # ============================================================
@@ -0,0 +1,140 @@
+"""
+PDF Renderer - WeasyPrint aquecido: stylesheets e fontes preparados uma vez
+
+🎯 PROBLEMA:
+- gerar_pdf_candidato injetava CSS_V13 inline no HTML E passava
+  CSS(string=CSS_PDF) (que já contém o CSS_V13): o mesmo CSS era parseado
+  duas vezes a cada render
+- A configuração de fontes do WeasyPrint era resolvida a cada chamada
+- O render (CPU puro, segura o GIL) rodava na thread do request
+
+✅ SOLUÇÃO:
+1. Cada processo prepara UMA vez FontConfiguration + CSS(CSS_PDF) e os
+   reutiliza em todos os renders (sem <style> inline duplicado: CSS_PDF já
+   tem todas as regras do CSS_V13 e vence a cascata do mesmo jeito)
+2. Modo process-pool (PDF_RENDER_PROCESSES > 0, padrão 1): renders rodam em
+   processos spawn aquecidos no startup - o request thread só espera o
+   resultado. Os workers importam só este módulo, styles e weasyprint; o
+   HTML do CV é montado no processo principal
+3. Pool quebrado (worker morto por OOM) -> render no processo atual e o
+   pool é recriado na próxima chamada
+
+Benchmark: scripts/benchmark_pdf_render.py (renders/s e p95 x função antiga)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PDF_RENDER_PROCESSES = int(os.getenv("PDF_RENDER_PROCESSES", "1"))  # 0 = render no processo atual
+PDF_RENDER_TIMEOUT_SECONDS = int(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "60"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# FontConfiguration não é thread-safe: um estado aquecido por thread
+# (nos workers do pool há uma thread só, então é um por processo)
+_local = threading.local()
+
+
+def build_document_html(body_html: str) -> str:
+    """Envelope HTML do CV (o CSS entra como stylesheet pré-parseado, não inline)."""
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+    </head>
+    <body>
+        <div class="cv-paper-sheet">{body_html}</div>
+    </body>
+    </html>
+    """
+
+
+def warm_renderer() -> None:
+    """Prepara fontes e stylesheet do processo/thread atual (idempotente)."""
+    if getattr(_local, "stylesheet", None) is not None:
+        return
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    from styles import CSS_PDF
+
+    font_config = FontConfiguration()
+    _local.stylesheet = CSS(string=CSS_PDF, font_config=font_config)
+    _local.font_config = font_config
+
+
+def _render_html(full_html: str) -> bytes:
+    """Render com o estado aquecido (roda no worker ou no processo atual)."""
+    from weasyprint import HTML
+
+    warm_renderer()
+    return HTML(string=full_html).write_pdf(
+        stylesheets=[_local.stylesheet],
+        font_config=_local.font_config,
+    )
+
+
+# ============================================================
+# POOL DE PROCESSOS
+# ============================================================
+
+def get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de renderização (None se PDF_RENDER_PROCESSES=0)."""
+    global _pool
+    if PDF_RENDER_PROCESSES <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_RENDER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=warm_renderer,
+            )
+            logger.info(f"🖨️ Pool de render PDF iniciado ({PDF_RENDER_PROCESSES} processos)")
+        return _pool
+
+
+def start_render_pool() -> None:
+    """Sobe e aquece os workers no startup (o 1º download não paga o spawn)."""
+    pool = get_render_pool()
+    if pool is None:
+        return
+    for _ in range(PDF_RENDER_PROCESSES):
+        pool.submit(warm_renderer)
+
+
+def shutdown_render_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def render_pdf(body_html: str) -> bytes:
+    """
+    PDF do CV a partir do HTML do corpo (format_text_to_html).
+    Exceções do WeasyPrint sobem para o chamador (fallback em gerar_pdf_candidato).
+    """
+    full_html = build_document_html(body_html)
+    pool = get_render_pool()
+    if pool is None:
+        return _render_html(full_html)
+    try:
+        return pool.submit(_render_html, full_html).result(timeout=PDF_RENDER_TIMEOUT_SECONDS)
+    except BrokenProcessPool as e:
+        logger.warning(f"⚠️ Pool de render PDF quebrado ({e}), renderizando no processo atual")
+        shutdown_render_pool()
+        return _render_html(full_html)
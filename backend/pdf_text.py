@@ -0,0 +1,236 @@
+"""
+PDF Text - Extração de texto de PDFs por página, com parada antecipada
+
+🎯 PROBLEMA:
+- extrair_texto_pdf concatenava (`+=`) o texto de TODAS as páginas e só
+  depois truncava em 25.000 caracteres: um portfólio de 40 páginas era
+  parseado inteiro para jogar a maior parte fora
+- Competidores eram extraídos um por um, no mesmo processo
+
+✅ SOLUÇÃO:
+1. Extração página a página que para assim que o orçamento de caracteres
+   é atingido (partes em lista + join, sem `+=`)
+2. Modo process-pool (PDF_EXTRACT_PROCESSES > 0):
+   - PDFs grandes (>= PDF_PARALLEL_MIN_PAGES) são divididos em blocos de
+     páginas extraídos em paralelo, em lotes - o próximo lote só é enviado
+     se o orçamento ainda não foi atingido
+   - Vários arquivos (competidores) são extraídos em paralelo
+3. Os workers só importam este módulo e o pypdf (spawn, sem weasyprint/IA)
+4. Aceita streams (spool do upload_ingest): o PdfReader lê do arquivo sem
+   materializar os bytes, exceto quando eles vão para o pool
+
+Benchmark: scripts/benchmark_pdf_extraction.py (ms/página e pico de memória)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PDF_EXTRACT_PROCESSES = int(os.getenv("PDF_EXTRACT_PROCESSES", "0"))  # 0 = sem process pool
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "4"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+# ============================================================
+# EXTRAÇÃO SEQUENCIAL (com parada antecipada)
+# ============================================================
+
+def collect_until_budget(page_texts: Iterable[str], max_chars: int) -> Tuple[List[str], int]:
+    """
+    Consome textos de página até somar `max_chars` caracteres.
+
+    `page_texts` deve ser preguiçoso (gerador): páginas depois do orçamento
+    nunca são extraídas. Retorna (partes, páginas consumidas).
+    """
+    parts: List[str] = []
+    total = 0
+    for page_text in page_texts:
+        parts.append(page_text)
+        total += len(page_text)
+        if total >= max_chars:
+            break
+    return parts, len(parts)
+
+
+def _page_texts(reader, start: int, end: int):
+    for index in range(start, end):
+        yield reader.pages[index].extract_text() or ""
+
+
+def read_source(source) -> bytes:
+    """Aceita bytes, BytesIO ou qualquer arquivo com .read() (UploadFile.file, etc.)."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read()
+
+
+def open_source(source):
+    """Stream legível pelo PdfReader sem copiar arquivos (spool de upload, BytesIO...)."""
+    if isinstance(source, (bytes, bytearray)):
+        return BytesIO(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source
+
+
+def _extract_range(data: bytes, start: int, end: int, max_chars: int) -> str:
+    """Worker: extrai as páginas [start, end) parando no orçamento."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(BytesIO(data))
+    parts, _ = collect_until_budget(_page_texts(reader, start, min(end, len(reader.pages))), max_chars)
+    return "".join(parts)
+
+
+# ============================================================
+# PROCESS POOL
+# ============================================================
+
+def get_pdf_pool() -> Optional[ProcessPoolExecutor]:
+    """Pool de processos para extração (None se PDF_EXTRACT_PROCESSES=0)."""
+    global _pool
+    if PDF_EXTRACT_PROCESSES <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            import multiprocessing
+
+            _pool = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACT_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(f"📄 Pool de extração de PDF iniciado ({PDF_EXTRACT_PROCESSES} processos)")
+        return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _run_in_pool(fn: Callable[[ProcessPoolExecutor], Any], fallback: Callable[[], Any]):
+    """Executa no pool; se ele quebrou (worker morto), recria na próxima e usa o caminho sequencial."""
+    pool = get_pdf_pool()
+    if pool is None:
+        return fallback()
+    try:
+        return fn(pool)
+    except BrokenProcessPool as e:
+        logger.warning(f"⚠️ Pool de extração de PDF quebrado ({e}), extraindo no processo atual")
+        shutdown_pdf_pool()
+        return fallback()
+
+
+def _extract_chunks_parallel(pool: ProcessPoolExecutor, data: bytes, start: int, total_pages: int,
+                             max_chars: int) -> Tuple[List[str], int]:
+    """Blocos de páginas em lotes de N workers; para de enviar lotes quando o orçamento fecha."""
+    chunks = [
+        (first, min(first + PDF_PAGES_PER_CHUNK, total_pages))
+        for first in range(start, total_pages, PDF_PAGES_PER_CHUNK)
+    ]
+    parts: List[str] = []
+    pages_read = 0
+    total = 0
+    batch_size = max(PDF_EXTRACT_PROCESSES, 1)
+    for offset in range(0, len(chunks), batch_size):
+        batch = chunks[offset:offset + batch_size]
+        futures = [pool.submit(_extract_range, data, first, end, max_chars) for first, end in batch]
+        for (first, end), future in zip(batch, futures):
+            text = future.result()
+            parts.append(text)
+            pages_read += end - first
+            total += len(text)
+            if total >= max_chars:
+                for pending in futures:
+                    pending.cancel()
+                return parts, pages_read
+    return parts, pages_read
+
+
+# ============================================================
+# API
+# ============================================================
+
+def extract_pdf_text(source, max_chars: int = 25000, parallel: bool = True) -> Tuple[str, Dict[str, Any]]:
+    """
+    Extrai texto até `max_chars` (pode passar um pouco: a última página entra inteira).
+    `parallel=False` força o caminho sequencial (usado dentro dos workers do pool).
+
+    Retorna (texto, info) com info = {pages, pages_read, creator, tail_text}.
+    `tail_text` é o texto da última página quando a extração parou antes dela
+    (usado para detectar a marca d'água do VANT no rodapé).
+    """
+    from pypdf import PdfReader
+
+    reader = PdfReader(open_source(source))
+    total_pages = len(reader.pages)
+
+    if parallel and PDF_EXTRACT_PROCESSES > 0 and total_pages >= PDF_PARALLEL_MIN_PAGES:
+        # A 1ª página sai no processo atual: CVs curtos em PDFs grandes já fecham o orçamento aqui
+        parts, pages_read = collect_until_budget(_page_texts(reader, 0, 1), max_chars)
+        if sum(len(p) for p in parts) < max_chars:
+            remaining = max_chars - sum(len(p) for p in parts)
+            data = read_source(source)  # Bytes só quando precisam ir para outro processo
+            more, more_pages = _run_in_pool(
+                lambda pool: _extract_chunks_parallel(pool, data, 1, total_pages, remaining),
+                lambda: collect_until_budget(_page_texts(reader, 1, total_pages), remaining),
+            )
+            parts += more
+            pages_read += more_pages
+    else:
+        parts, pages_read = collect_until_budget(_page_texts(reader, 0, total_pages), max_chars)
+
+    tail_text = ""
+    if pages_read < total_pages:
+        tail_text = reader.pages[total_pages - 1].extract_text() or ""
+        logger.info(f"📄 Extração parou na página {pages_read}/{total_pages} (orçamento de {max_chars} chars)")
+
+    info = {
+        "pages": total_pages,
+        "pages_read": pages_read,
+        "creator": reader.metadata.get("/Creator") if reader.metadata else None,
+        "tail_text": tail_text,
+    }
+    return "".join(parts), info
+
+
+def _extract_or_empty(data: bytes, max_chars: int) -> Tuple[str, Dict[str, Any]]:
+    """Worker de arquivo inteiro: erro de parse vira texto vazio (mesma regra de extrair_texto_pdf)."""
+    try:
+        return extract_pdf_text(data, max_chars, parallel=False)
+    except Exception as e:
+        logger.error(f"Erro crítico ao ler PDF: {e}")
+        return "", {"pages": 0, "pages_read": 0, "creator": None, "tail_text": ""}
+
+
+def extract_many(sources: List[Any], max_chars: int = 25000) -> List[Tuple[str, Dict[str, Any]]]:
+    """Extrai vários PDFs (ex: competidores), em paralelo quando o pool está ligado."""
+    datas = [read_source(source) for source in sources]
+
+    def sequential():
+        return [_extract_or_empty(data, max_chars) for data in datas]
+
+    if len(datas) < 2:
+        return sequential()
+    return _run_in_pool(
+        lambda pool: list(pool.map(_extract_or_empty, datas, [max_chars] * len(datas))),
+        sequential,
+    )
@@ -0,0 +1,158 @@
+"""
+Progress Bus - Barramento de eventos em memória do progresso das análises
+
+🎯 PROBLEMA:
+- O frontend fazia polling em /api/analysis/status/{session_id}: cada poll é
+  uma query no Supabase que devolve o result_data inteiro (com o HTML do CV)
+
+✅ SOLUÇÃO:
+- O orquestrador publica cada step aqui (via session_progress.update)
+- O bus guarda o estado acumulado da sessão e transforma cada step num
+  DELTA: só as chaves novas ou alteradas
+- Cada evento tem um `seq` crescente (resume token): o stream SSE
+  (GET /api/analysis/stream/{session_id}) reenvia só os eventos com
+  seq > Last-Event-ID numa reconexão
+- Assinantes async recebem os eventos via call_soon_threadsafe (o publish
+  acontece nas threads dos workers de IA)
+
+Limite: o bus é por processo. Um stream aberto noutro worker não vê os
+eventos e cai para leitura do Supabase (ver routers/analysis.py). O polling
+continua disponível como fallback.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_BUS_RETENTION_SECONDS = int(os.getenv("PROGRESS_BUS_RETENTION_SECONDS", "600"))
+PROGRESS_BUS_MAX_SESSIONS = int(os.getenv("PROGRESS_BUS_MAX_SESSIONS", "500"))
+
+TERMINAL_STEPS = frozenset({"completed", "failed"})
+
+
+class _SessionChannel:
+    def __init__(self):
+        self.state: Dict[str, Any] = {}
+        self.events: List[Dict[str, Any]] = []
+        self.subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.finished_at: Optional[float] = None
+        self.touched_at = time.time()
+
+
+class ProgressBus:
+    """Eventos de progresso por sessão, com replay a partir de um seq."""
+
+    def __init__(self,
+                 retention_seconds: int = PROGRESS_BUS_RETENTION_SECONDS,
+                 max_sessions: int = PROGRESS_BUS_MAX_SESSIONS):
+        self.retention_seconds = retention_seconds
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._channels: Dict[str, _SessionChannel] = {}
+
+    # ------------------------------------------------------------
+    # PUBLICAÇÃO
+    # ------------------------------------------------------------
+
+    def publish(self, session_id: str, step: str, data_chunk: Optional[dict]) -> Optional[Dict[str, Any]]:
+        """Registra um step e notifica os assinantes. Retorna o evento (ou None se não houve mudança)."""
+        with self._lock:
+            self._prune()
+            channel = self._channels.setdefault(session_id, _SessionChannel())
+            delta = {
+                key: value for key, value in (data_chunk or {}).items()
+                if key not in channel.state or channel.state[key] != value
+            }
+            last_step = channel.events[-1]["step"] if channel.events else None
+            if not delta and step == last_step:
+                return None
+
+            channel.state.update(delta)
+            event = {"seq": len(channel.events) + 1, "step": step, "data": delta, "ts": time.time()}
+            channel.events.append(event)
+            channel.touched_at = event["ts"]
+            if step in TERMINAL_STEPS:
+                channel.finished_at = event["ts"]
+            subscribers = list(channel.subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                pass  # Loop do assinante já foi fechado
+        return event
+
+    # ------------------------------------------------------------
+    # LEITURA
+    # ------------------------------------------------------------
+
+    def knows(self, session_id: str) -> bool:
+        with self._lock:
+            return session_id in self._channels
+
+    def events_since(self, session_id: str, seq: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            channel = self._channels.get(session_id)
+            return [e for e in channel.events if e["seq"] > seq] if channel else []
+
+    def subscribe(self, session_id: str, seq: int = 0) -> Tuple[asyncio.Queue, List[Dict[str, Any]]]:
+        """
+        Assina a sessão a partir de `seq`. Deve ser chamado dentro do event loop.
+
+        Retorna (fila de eventos futuros, eventos já publicados após seq) - as
+        duas partes são obtidas sob o mesmo lock, sem buraco entre elas.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            channel = self._channels.setdefault(session_id, _SessionChannel())
+            channel.subscribers.append((loop, queue))
+            backlog = [e for e in channel.events if e["seq"] > seq]
+        return queue, backlog
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            channel = self._channels.get(session_id)
+            if channel:
+                channel.subscribers = [(l, q) for l, q in channel.subscribers if q is not queue]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._channels),
+                "subscribers": sum(len(c.subscribers) for c in self._channels.values()),
+                "events": sum(len(c.events) for c in self._channels.values()),
+            }
+
+    # ------------------------------------------------------------
+    # LIMPEZA
+    # ------------------------------------------------------------
+
+    def _prune(self) -> None:
+        """Remove sessões terminadas há mais de retention_seconds e limita o total (chamar com lock)."""
+        now = time.time()
+        expired = [
+            sid for sid, c in self._channels.items()
+            if not c.subscribers and now - (c.finished_at or c.touched_at) > self.retention_seconds
+        ]
+        for sid in expired:
+            del self._channels[sid]
+
+        overflow = len(self._channels) - self.max_sessions
+        if overflow > 0:
+            idle = sorted(
+                (c.touched_at, sid) for sid, c in self._channels.items() if not c.subscribers
+            )
+            for _, sid in idle[:overflow]:
+                del self._channels[sid]
+
+
+# Instância global
+progress_bus = ProgressBus()
@@ -0,0 +1,65 @@
+"""
+Refresh Queue - Fila de atualizações em background com deduplicação por chave
+
+Usada pelo stale-while-revalidate do cache parcial: a entrada vencida é
+servida na hora e a atualização é enfileirada aqui. Várias leituras da mesma
+entrada vencida geram UMA única atualização (chave = component_hash).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshQueue:
+    """Executa `fn(*args)` em background no máximo uma vez por chave pendente."""
+
+    def __init__(self, name: str, max_workers: int = 2, max_pending: int = 100):
+        self.name = name
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"refresh-{name}")
+        self._lock = threading.Lock()
+        self._pending: set = set()
+        self._counters: Dict[str, int] = {"enqueued": 0, "deduplicated": 0, "dropped": 0, "completed": 0, "failed": 0}
+
+    def enqueue(self, key: str, fn: Callable[..., Any], *args) -> bool:
+        """Enfileira a atualização. Retorna False se já estava pendente ou a fila está cheia."""
+        with self._lock:
+            if key in self._pending:
+                self._counters["deduplicated"] += 1
+                return False
+            if len(self._pending) >= self.max_pending:
+                self._counters["dropped"] += 1
+                logger.warning(f"⚠️ Fila de refresh [{self.name}] cheia ({self.max_pending}). Atualização de {key[:8]}... descartada")
+                return False
+            self._pending.add(key)
+            self._counters["enqueued"] += 1
+
+        self._executor.submit(self._run, key, fn, args)
+        return True
+
+    def _run(self, key: str, fn: Callable[..., Any], args: tuple) -> None:
+        try:
+            fn(*args)
+            with self._lock:
+                self._counters["completed"] += 1
+        except Exception as e:
+            with self._lock:
+                self._counters["failed"] += 1
+            logger.error(f"❌ Refresh [{self.name}] de {key[:8]}... falhou: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"pending": len(self._pending), **self._counters}
+
+
+# Instância global do cache parcial
+partial_cache_refresh_queue = RefreshQueue("partial_cache")
@@ -0,0 +1,177 @@
+"""
+Render Cache - PDF/DOCX renderizados, por hash do CV e versão do renderer
+
+🎯 PROBLEMA:
+- /api/generate-pdf, /api/generate-word, /api/render/pdf e /api/render/docx
+  rodavam WeasyPrint / python-docx do zero a cada clique
+- O usuário baixa o MESMO CV várias vezes (preview, download, re-download)
+
+✅ SOLUÇÃO:
+1. Bytes renderizados guardados em memória (LRU limitado em bytes), chave =
+   formato + SHA-256 do cv_otimizado_completo + RENDERER_VERSION (inclui o
+   hash do CSS: mudou o estilo, o cache antigo deixa de valer sozinho)
+2. Renders simultâneos do mesmo CV (pré-render + clique) rodam uma vez só
+   (single-flight)
+3. Quando a etapa `cv_pronto` termina, PDF e DOCX são pré-renderizados em
+   background: o download vira leitura de cache
+
+Só entra no cache render bem-sucedido (o PDF de erro do fallback não).
+RENDER_CACHE_ENABLED=false desliga cache e pré-render.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from single_flight import render_flight
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "true").lower() == "true"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_MB", "64")) * 1024 * 1024
+PRERENDER_ENABLED = os.getenv("PRERENDER_ENABLED", "true").lower() == "true"
+
+# Mudou o código de gerar_pdf_candidato / gerar_word_candidato? Incrementa.
+RENDERER_CODE_VERSION = "v4"
+
+FORMATS = ("pdf", "docx")
+
+
+def _renderer_version() -> str:
+    from styles import CSS_PDF, CSS_V13
+
+    css_hash = hashlib.sha256((CSS_V13 + CSS_PDF).encode("utf-8")).hexdigest()[:12]
+    return f"{RENDERER_CODE_VERSION}-{css_hash}"
+
+
+RENDERER_VERSION = _renderer_version()
+
+
+def render_key(fmt: str, cv_text: str) -> str:
+    content_hash = hashlib.sha256((cv_text or "").encode("utf-8")).hexdigest()
+    return f"{fmt}:{RENDERER_VERSION}:{content_hash}"
+
+
+class RenderCache:
+    """LRU de documentos renderizados, limitado pelo total de bytes."""
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES, enabled: bool = RENDER_CACHE_ENABLED):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+        self.prerenders = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, fmt: str, cv_text: str, render: Callable[[str], bytes]) -> bytes:
+        """
+        Bytes do documento: do cache ou de `render(cv_text)`.
+        Exceções do renderer sobem (e nada é cacheado).
+        """
+        if not self.enabled:
+            return render(cv_text)
+
+        key = render_key(fmt, cv_text)
+        data = self.get(key)
+        if data is not None:
+            logger.info(f"📦 Render cache hit ({fmt}, {len(data)} bytes)")
+            return data
+
+        def _render():
+            # Outro request pode ter terminado o render enquanto este esperava a vez
+            with self._lock:
+                cached = self._items.get(key)
+            if cached is not None:
+                return cached
+            rendered = render(cv_text)
+            self.put(key, rendered)
+            return rendered
+
+        data, _ = render_flight.do(key, _render)
+        return data
+
+    # ------------------------------------------------------------
+    # PRÉ-RENDER
+    # ------------------------------------------------------------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 1 thread: pré-render é CPU e não pode competir com as análises
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prerender")
+            return self._executor
+
+    def _prerender(self, cv_text: str) -> None:
+        from logic import gerar_pdf_candidato, gerar_word_candidato
+
+        try:
+            gerar_pdf_candidato({"cv_otimizado_completo": cv_text})
+            gerar_word_candidato({"cv_otimizado_completo": cv_text})
+            self.prerenders += 1
+            logger.info(f"🖨️ PDF e DOCX pré-renderizados ({len(cv_text)} chars)")
+        except Exception as e:
+            logger.warning(f"⚠️ Erro no pré-render: {e}")
+
+    def schedule_prerender(self, cv_text: str) -> bool:
+        """Agenda PDF + DOCX em background. Retorna False se nada foi agendado."""
+        if not (self.enabled and PRERENDER_ENABLED and cv_text):
+            return False
+        if all(render_key(fmt, cv_text) in self._items for fmt in FORMATS):
+            return False
+        self._get_executor().submit(self._prerender, cv_text)
+        return True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "items": len(self._items),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "prerenders": self.prerenders,
+                "renderer_version": RENDERER_VERSION,
+            }
+
+
+# Instância global
+render_cache = RenderCache()
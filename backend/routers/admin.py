@@ -25,11 +25,24 @@ def get_cache_stats() -> JSONResponse:
     sentry_sdk.set_tag("endpoint", "admin_cache_stats")
     
     try:
-        from cache_manager import CacheManager
+        from cache_manager import get_cache_manager
         
-        cache_manager = CacheManager()
+        cache_manager = get_cache_manager()
         stats = cache_manager.get_cache_stats()
         
+        from cache_usage import hit_accumulator
+        from refresh_queue import partial_cache_refresh_queue
+        stats["hit_tracking"] = hit_accumulator.stats()
+        stats["swr_refresh_queue"] = partial_cache_refresh_queue.stats()
+        from document_store import document_store
+        stats["document_store"] = document_store.stats()
+        from competitor_digest import competitor_digest_cache
+        stats["competitor_digests"] = competitor_digest_cache.stats()
+        from render_cache import render_cache
+        stats["rendered_documents"] = render_cache.stats()
+        from cv_markdown import ast_cache_stats
+        stats["cv_ast"] = ast_cache_stats()
+        
         return JSONResponse(content=stats)
         
     except Exception as e:
@@ -41,22 +54,30 @@ def get_cache_stats() -> JSONResponse:
         )
 
 
+def _check_admin_token(x_admin_token: str | None) -> JSONResponse | None:
+    """Valida o header X-Admin-Token. Retorna a resposta de erro ou None se válido."""
+    try:
+        from dependencies import settings
+    except Exception:
+        settings = None
+
+    expected_token = settings.ADMIN_CLEANUP_TOKEN if settings else os.getenv("ADMIN_CLEANUP_TOKEN")
+    if not expected_token:
+        return JSONResponse(status_code=500, content={"error": "ADMIN_CLEANUP_TOKEN não configurado"})
+    if x_admin_token != expected_token:
+        return JSONResponse(status_code=401, content={"error": "Token inválido"})
+    return None
+
+
 @router.post("/cleanup-temp-files")
 def cleanup_temp_files(x_admin_token: str | None = Header(default=None)) -> JSONResponse:
     """Endpoint admin para limpar arquivos temporários expirados."""
     sentry_sdk.set_tag("endpoint", "admin_cleanup_temp_files")
 
     try:
-        try:
-            from dependencies import settings
-        except Exception:
-            settings = None
-
-        expected_token = settings.ADMIN_CLEANUP_TOKEN if settings else os.getenv("ADMIN_CLEANUP_TOKEN")
-        if not expected_token:
-            return JSONResponse(status_code=500, content={"error": "ADMIN_CLEANUP_TOKEN não configurado"})
-        if x_admin_token != expected_token:
-            return JSONResponse(status_code=401, content={"error": "Token inválido"})
+        token_error = _check_admin_token(x_admin_token)
+        if token_error:
+            return token_error
 
         from storage_manager import storage_manager
 
@@ -70,3 +91,134 @@ def cleanup_temp_files(x_admin_token: str | None = Header(default=None)) -> JSON
             status_code=500,
             content={"error": f"{type(e).__name__}: {e}"}
         )
+
+
+@router.post("/cache-eviction")
+def run_cache_eviction(dry_run: bool = True, x_admin_token: str | None = Header(default=None)) -> JSONResponse:
+    """
+    Executa a política de eviction do cache (TTL + orçamento de linhas/bytes).
+    Por padrão é dry-run: só reporta o que seria removido e o espaço liberado.
+    """
+    sentry_sdk.set_tag("endpoint", "admin_cache_eviction")
+
+    try:
+        token_error = _check_admin_token(x_admin_token)
+        if token_error:
+            return token_error
+
+        from cache_eviction import CacheEvictor
+
+        return JSONResponse(content=CacheEvictor().run(dry_run=dry_run))
+
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        logger.error(f"❌ Erro no eviction do cache: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"{type(e).__name__}: {e}"}
+        )
+
+
+@router.get("/cache-prewarm")
+def get_cache_prewarm_report() -> JSONResponse:
+    """Relatório do pre-warming: entradas geradas, hits recebidos e ganho de hit rate no tráfego real."""
+    sentry_sdk.set_tag("endpoint", "admin_cache_prewarm_report")
+
+    try:
+        from cache_prewarm import get_cache_prewarmer
+
+        return JSONResponse(content=get_cache_prewarmer().report())
+
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        logger.error(f"❌ Erro no relatório de pre-warming: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"{type(e).__name__}: {e}"}
+        )
+
+
+@router.post("/cache-prewarm")
+def run_cache_prewarm(dry_run: bool = True, force: bool = False, x_admin_token: str | None = Header(default=None)) -> JSONResponse:
+    """
+    Executa um ciclo de pre-warming. Por padrão é dry-run (lista o que seria gerado);
+    force=true ignora a janela fora de pico (o teto de custo continua valendo).
+    """
+    sentry_sdk.set_tag("endpoint", "admin_cache_prewarm")
+
+    try:
+        token_error = _check_admin_token(x_admin_token)
+        if token_error:
+            return token_error
+
+        from cache_prewarm import get_cache_prewarmer
+
+        return JSONResponse(content=get_cache_prewarmer().run(force=force, dry_run=dry_run))
+
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        logger.error(f"❌ Erro no pre-warming: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"{type(e).__name__}: {e}"}
+        )
+
+
+@router.get("/job-queue")
+def get_job_queue_stats() -> JSONResponse:
+    """Métricas da fila durável de análises: profundidade, idade do mais antigo, workers ativos."""
+    sentry_sdk.set_tag("endpoint", "admin_job_queue")
+
+    try:
+        from job_queue import get_job_queue
+
+        queue = get_job_queue()
+        if queue is None:
+            return JSONResponse(content={"enabled": False})
+        return JSONResponse(content={"enabled": True, **queue.stats()})
+
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        logger.error(f"❌ Erro nas métricas da fila de jobs: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"{type(e).__name__}: {e}"}
+        )
+
+
+@router.get("/admission")
+def get_admission_stats() -> JSONResponse:
+    """Admission control das análises premium: em execução, na fila, recusadas e folga dos provedores."""
+    sentry_sdk.set_tag("endpoint", "admin_admission")
+
+    try:
+        from admission import admission_controller
+
+        return JSONResponse(content=admission_controller.stats())
+
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        logger.error(f"❌ Erro nas métricas de admission control: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"{type(e).__name__}: {e}"}
+        )
+
+
+@router.get("/llm-scheduler")
+def get_llm_scheduler_stats() -> JSONResponse:
+    """Scheduler de chamadas de IA: slots ativos, fila por classe e SLO de espera (pago vs grátis)."""
+    sentry_sdk.set_tag("endpoint", "admin_llm_scheduler")
+
+    try:
+        from llm_scheduler import llm_scheduler
+
+        return JSONResponse(content=llm_scheduler.stats())
+
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        logger.error(f"❌ Erro nas métricas do scheduler de IA: {e}")
+        return JSONResponse(
+            status_code=500,
+            content={"error": f"{type(e).__name__}: {e}"}
+        )
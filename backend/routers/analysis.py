@@ -3,8 +3,12 @@ Endpoints de análise de CV (lite, free, premium-paid, generate-pdf/word, status
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import io
+import json
 import logging
+import os
 import time
 from datetime import datetime
 from typing import Any
@@ -21,11 +25,14 @@ from dependencies import (
     validate_user_id,
     _entitlements_status,
     _consume_one_credit,
+    _refund_one_credit,
+    _refund_session_credit,
     settings,
     IS_DEV,
 )
-from logic import analyze_preview_lite, extrair_texto_pdf, gerar_pdf_candidato, gerar_word_candidato
+from logic import analyze_preview_lite, gerar_pdf_candidato, gerar_word_candidato
 from mock_data import MOCK_PREVIEW_DATA, MOCK_PREMIUM_DATA
+from status_polling import resolve_status
 
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -36,10 +43,42 @@ limiter = Limiter(key_func=get_remote_address)
 
 router = APIRouter(prefix="/api", tags=["analysis"])
 
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_DB_POLL_SECONDS = float(os.getenv("SSE_DB_POLL_SECONDS", "2.5"))
+SSE_MAX_SECONDS = float(os.getenv("SSE_MAX_SECONDS", "300"))
+
+
+async def _fetch_analysis_session(session_id: str):
+    """Lê a sessão no Supabase sem bloquear o event loop (retry assíncrono em erro de leitura)."""
+    def _query():
+        return supabase_admin.table("analysis_sessions").select(
+            "status, current_step, result_data, created_at, updated_at"
+        ).eq("id", session_id).limit(1).execute()
+
+    for attempt in range(3):
+        try:
+            response = await asyncio.to_thread(_query)
+            return response.data[0] if response.data else None
+        except Exception as e:
+            is_read_error = isinstance(e, httpx.ReadError)
+            is_winerror = "WinError 10035" in str(e)
+            if attempt < 2 and (is_read_error or is_winerror):
+                await asyncio.sleep(0.5)
+                continue
+            raise
+
 
 @router.get("/analysis/status/{session_id}")
-def get_analysis_status(session_id: str) -> JSONResponse:
-    """Endpoint para polling do status da análise com progressive loading."""
+async def get_analysis_status(session_id: str, request: Request, since_step: str = None, wait: float = 0) -> Response:
+    """
+    Endpoint para polling do status da análise com progressive loading.
+
+    - ETag / If-None-Match: 304 enquanto a sessão não mudar (updated_at + step)
+    - since_step: devolve em result_data só as chaves gravadas depois desse step
+      (`delta: true`); sem histórico no processo, devolve tudo (`delta: false`)
+    - wait=N: long-poll - segura até o próximo step ou N segundos (máx
+      STATUS_LONG_POLL_MAX_SECONDS), sem bloquear threads do worker
+    """
     sentry_sdk.set_tag("endpoint", "get_analysis_status")
     
     if not supabase_admin:
@@ -49,38 +88,234 @@ def get_analysis_status(session_id: str) -> JSONResponse:
         )
     
     try:
-        response = None
-        for attempt in range(3):
-            try:
-                response = supabase_admin.table("analysis_sessions").select(
-                    "status, current_step, result_data, created_at, updated_at"
-                ).eq("id", session_id).limit(1).execute()
-                break
-            except Exception as e:
-                is_read_error = isinstance(e, httpx.ReadError)
-                is_winerror = "WinError 10035" in str(e)
-                if attempt < 2 and (is_read_error or is_winerror):
-                    time.sleep(0.5)
-                    continue
-                raise
-
-        if not response or not response.data:
+        session = await _fetch_analysis_session(session_id)
+        if not session:
             return JSONResponse(
                 status_code=404,
                 content={"error": "Sessão não encontrada."}
             )
 
-        session = response.data[0]
+        status_code, headers, content = await resolve_status(
+            session_id,
+            session,
+            _fetch_analysis_session,
+            if_none_match=request.headers.get("if-none-match", ""),
+            since_step=since_step,
+            wait=wait,
+        )
+        if status_code == 304:
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(headers=headers, content=content)
 
-        return JSONResponse(content={
-            "session_id": session_id,
-            "status": session["status"],
-            "current_step": session["current_step"],
-            "result_data": session["result_data"],
-            "created_at": session["created_at"],
-            "updated_at": session["updated_at"]
-        })
+    except Exception as e:
+        sentry_sdk.capture_exception(e)
+        return JSONResponse(status_code=500, content={"error": f"{type(e).__name__}: {e}"})
+
+
+def _sse_event(event: dict, event_id: Any = None) -> str:
+    """Serializa um evento de progresso no formato text/event-stream."""
+    payload = json.dumps({"step": event["step"], "data": event["data"]}, ensure_ascii=False, default=str)
+    event_id = event.get("seq") if event_id is None else event_id
+    return f"id: {event_id}\nevent: progress\ndata: {payload}\n\n"
+
+
+def _fetch_session_progress(session_id: str) -> dict | None:
+    response = supabase_admin.table("analysis_sessions").select(
+        "current_step, result_data, updated_at"
+    ).eq("id", session_id).limit(1).execute()
+    return response.data[0] if response.data else None
+
+
+def _session_delta(session: dict, sent: dict) -> dict:
+    """Chaves do result_data ainda não enviadas (ou alteradas); atualiza `sent`."""
+    result_data = session.get("result_data") or {}
+    delta = {k: v for k, v in result_data.items() if k not in sent or sent[k] != v}
+    sent.update(delta)
+    return delta
+
+
+async def _bus_progress_events(session_id: str, resume_from: int, request: Request):
+    """
+    Eventos do progress_bus (deltas), com replay após o resume token.
+
+    O bus só vê os steps publicados NESTE processo: com a fila durável o job
+    pode rodar em outro worker. Heartbeat sem evento no bus -> lê a sessão no
+    banco; se ela avançou, envia o delta e segue pelo fallback do banco.
+    """
+    from progress_bus import TERMINAL_STEPS, progress_bus
+
+    queue, backlog = progress_bus.subscribe(session_id, resume_from)
+    sent: dict = {}
+    last_step = None
+    try:
+        for event in backlog:
+            sent.update(event["data"])
+            last_step = event["step"]
+            yield _sse_event(event)
+            if event["step"] in TERMINAL_STEPS:
+                return
+
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        while time.monotonic() < deadline:
+            if await request.is_disconnected():
+                return
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                session = await asyncio.to_thread(_fetch_session_progress, session_id) if supabase_admin else None
+                if session is not None:
+                    delta = _session_delta(session, sent)
+                    if delta or session["current_step"] != last_step:
+                        # Run em outro processo: o banco passa a ser a fonte do stream
+                        yield _sse_event({"step": session["current_step"], "data": delta}, event_id=0)
+                        if session["current_step"] in TERMINAL_STEPS:
+                            return
+                        async for chunk in _db_progress_events(
+                            session_id, request, sent=sent, last_updated=session["updated_at"], deadline=deadline
+                        ):
+                            yield chunk
+                        return
+                yield ": ping\n\n"  # Heartbeat (mantém proxies/conexão abertos)
+                continue
+            sent.update(event["data"])
+            last_step = event["step"]
+            yield _sse_event(event)
+            if event["step"] in TERMINAL_STEPS:
+                return
+    finally:
+        progress_bus.unsubscribe(session_id, queue)
+
+
+async def _db_progress_events(
+    session_id: str,
+    request: Request,
+    sent: dict | None = None,
+    last_updated: Any = None,
+    deadline: float | None = None,
+):
+    """
+    Fallback quando o bus não conhece a sessão (ex: processo reiniciado) ou o
+    job roda em outro processo: lê o Supabase periodicamente e envia só as
+    chaves novas/alteradas.
+    """
+    from progress_bus import TERMINAL_STEPS
+
+    sent = {} if sent is None else sent
+    deadline = time.monotonic() + SSE_MAX_SECONDS if deadline is None else deadline
+    while time.monotonic() < deadline:
+        if await request.is_disconnected():
+            return
+        session = await asyncio.to_thread(_fetch_session_progress, session_id)
+        if session is None:
+            yield f"event: error\ndata: {json.dumps({'error': 'Sessão não encontrada.'})}\n\n"
+            return
+
+        if session["updated_at"] != last_updated:
+            last_updated = session["updated_at"]
+            delta = _session_delta(session, sent)
+            # id 0: sem resume token fora do bus (reconexão recebe o estado completo)
+            yield _sse_event({"step": session["current_step"], "data": delta}, event_id=0)
+            if session["current_step"] in TERMINAL_STEPS:
+                return
+        else:
+            yield ": ping\n\n"
+        await asyncio.sleep(SSE_DB_POLL_SECONDS)
+
+
+@router.get("/analysis/stream/{session_id}")
+async def stream_analysis_status(session_id: str, request: Request, last_event_id: int = 0) -> StreamingResponse:
+    """
+    Stream SSE do progresso da análise (alternativa push ao polling de /analysis/status).
+
+    Cada evento `progress` traz {"step", "data"} com só as chaves novas; o
+    cliente acumula. Reconexão: o EventSource reenvia o header Last-Event-ID
+    (ou use ?last_event_id=) e recebe apenas os eventos posteriores.
+    """
+    sentry_sdk.set_tag("endpoint", "stream_analysis_status")
+    from progress_bus import progress_bus
+
+    header_id = request.headers.get("last-event-id", "")
+    resume_from = int(header_id) if header_id.isdigit() else max(last_event_id, 0)
+
+    if progress_bus.knows(session_id):
+        events = _bus_progress_events(session_id, resume_from, request)
+    elif supabase_admin:
+        events = _db_progress_events(session_id, request)
+    else:
+        return JSONResponse(status_code=404, content={"error": "Sessão não encontrada."})
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _resolve_cv_document(
+    file: UploadFile | None,
+    document_id: str,
+    job_description: str,
+    user_id: str | None = None,
+) -> tuple[dict | None, JSONResponse | None]:
+    """
+    Documento do CV pelo document_id (já extraído) ou pelo upload (extrai e
+    salva no Storage só se o hash do arquivo for novo). Retorna (documento, erro).
+    Com user_id, o document_id precisa ter sido enviado por esse usuário.
+    """
+    from document_store import document_store
+    from upload_ingest import UploadRejected, ingest_upload
+
+    if document_id:
+        # Com user_id, só documentos enviados por esse usuário (o id é só o hash do conteúdo)
+        document = document_store.get(document_id, user_id)
+        if document is None:
+            return None, JSONResponse(status_code=404, content={
+                "error": "Documento não encontrado ou expirado. Envie o arquivo novamente.",
+                "code": "document_not_found",
+            })
+        return document, None
+    if file and file.filename:
+        try:
+            with ingest_upload(file) as upload:
+                document, _ = document_store.register(upload, file.filename, job_description, user_id)
+        except UploadRejected as e:
+            return None, JSONResponse(status_code=e.status_code, content=e.to_content())
+        return document, None
+    return None, JSONResponse(status_code=400, content={"error": "Envie um arquivo PDF/DOCX ou forneça document_id."})
+
+
+def _with_document_id(data: Any, document: dict) -> Any:
+    """Inclui o document_id na resposta para o cliente não reenviar o arquivo."""
+    return {**data, "document_id": document["document_id"]} if isinstance(data, dict) else data
+
+
+@router.post("/documents/upload")
+@limiter.limit("10/minute")
+def upload_document(
+    request: Request,
+    file: UploadFile = File(...),
+    job_description: str = Form(""),
+    user_id: str = Form(None),
+) -> JSONResponse:
+    """
+    Envia o CV uma vez e recebe um document_id (SHA-256 do arquivo) aceito por
+    /analyze-lite, /analyze-free e /analyze-premium-paid no lugar do upload.
+    """
+    sentry_sdk.set_tag("endpoint", "upload_document")
 
+    if user_id and not validate_user_id(user_id):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "user_id inválido. Deve ser um UUID válido."}
+        )
+
+    try:
+        from document_store import document_summary
+
+        document, error = _resolve_cv_document(file, "", job_description, user_id)
+        if error:
+            return error
+        return JSONResponse(content=document_summary(document))
     except Exception as e:
         sentry_sdk.capture_exception(e)
         return JSONResponse(status_code=500, content={"error": f"{type(e).__name__}: {e}"})
@@ -88,19 +323,25 @@ def get_analysis_status(session_id: str) -> JSONResponse:
 
 @router.post("/analyze-lite")
 @limiter.limit("5/minute")
-def analyze_lite(request: Request, file: UploadFile = File(...), job_description: str = Form(...), area_of_interest: str = Form("")) -> JSONResponse:
+def analyze_lite(
+    request: Request,
+    file: UploadFile | None = File(None),
+    job_description: str = Form(...),
+    area_of_interest: str = Form(""),
+    document_id: str = Form(""),
+) -> JSONResponse:
     try:
         sentry_sdk.set_tag("endpoint", "analyze_lite")
         
-        file_bytes = file.file.read()
-        from storage_manager import storage_manager
-        storage_manager.save_temp_files(file_bytes, job_description)
+        document, error = _resolve_cv_document(file, document_id, job_description)
+        if error:
+            return error
         
         if DEV_MODE:
             print("🔧 [DEV MODE] Retornando mock de análise lite (sem processar IA)")
-            return JSONResponse(content=MOCK_PREVIEW_DATA)
+            return JSONResponse(content=_with_document_id(MOCK_PREVIEW_DATA, document))
         
-        cv_text = extrair_texto_pdf(io.BytesIO(file_bytes))
+        cv_text = document["text"]
 
         # PREVIEW SEM CACHE: Sempre fresh para garantir consistência com premium
         if area_of_interest:
@@ -108,7 +349,7 @@ def analyze_lite(request: Request, file: UploadFile = File(...), job_description
         else:
             data = analyze_preview_lite(cv_text, job_description, forced_area=None)
         
-        return JSONResponse(content=data)
+        return JSONResponse(content=_with_document_id(data, document))
     except Exception as e:
         sentry_sdk.capture_exception(e)
         return JSONResponse(status_code=500, content={"error": f"{type(e).__name__}: {e}"})
@@ -118,10 +359,11 @@ def analyze_lite(request: Request, file: UploadFile = File(...), job_description
 @limiter.limit("5/minute")
 def analyze_free(
     request: Request,
-    file: UploadFile = File(...), 
+    file: UploadFile | None = File(None), 
     job_description: str = Form(...),
     area_of_interest: str = Form(""),
-    user_id: str = Form(None)
+    user_id: str = Form(None),
+    document_id: str = Form(""),
 ) -> JSONResponse:
     """
     Análise gratuita (primeira análise sem paywall).
@@ -138,9 +380,9 @@ def analyze_free(
         )
     
     try:
-        file_bytes = file.file.read()
-        from storage_manager import storage_manager
-        storage_manager.save_temp_files(file_bytes, job_description, user_id)
+        document, error = _resolve_cv_document(file, document_id, job_description, user_id)
+        if error:
+            return error
         
         # Verifica se usuário já usou análise gratuita (se tiver user_id)
         if user_id and supabase_admin:
@@ -157,18 +399,18 @@ def analyze_free(
         if DEV_MODE:
             print("🔧 [DEV MODE] Retornando mock de análise gratuita (sem processar IA)")
             limited_data = MOCK_PREVIEW_DATA.copy()
-            return JSONResponse(content=limited_data)
+            return JSONResponse(content=_with_document_id(limited_data, document))
         
-        cv_text = extrair_texto_pdf(io.BytesIO(file_bytes))
+        cv_text = document["text"]
 
         # Determinismo: mesmo CV + mesma vaga + mesma área retorna o mesmo resultado (cache de preview)
-        from cache_manager import CacheManager
-        cache_manager = CacheManager()
+        from cache_manager import get_cache_manager
+        cache_manager = get_cache_manager()
         cache_job_key = f"{job_description.strip()}\n[AREA]{(area_of_interest or '').strip().lower()}"
         preview_hash = cache_manager.generate_input_hash(cv_text, cache_job_key, model_version="preview-lite-v1")
         cached_preview = cache_manager.check_cache(preview_hash)
         if cached_preview:
-            return JSONResponse(content=cached_preview)
+            return JSONResponse(content=_with_document_id(cached_preview, document))
         
         if area_of_interest:
             data = analyze_preview_lite(cv_text, job_description, forced_area=area_of_interest)
@@ -182,7 +424,7 @@ def analyze_free(
             job_description=cache_job_key,
             result_json=data,
             model_version="preview-lite-v1",
-            original_filename=file.filename if file and file.filename else None,
+            original_filename=document.get("filename"),
         )
         
         # Registra uso gratuito
@@ -195,7 +437,7 @@ def analyze_free(
             except Exception as e:
                 print(f"⚠️ Erro ao registrar uso gratuito: {e}")
         
-        return JSONResponse(content=data)
+        return JSONResponse(content=_with_document_id(data, document))
     except Exception as e:
         sentry_sdk.capture_exception(e)
         return JSONResponse(status_code=500, content={"error": f"{type(e).__name__}: {e}"})
@@ -305,6 +547,7 @@ def analyze_premium_paid(
     cv_text: str = Form(""),
     area_of_interest: str = Form(""),
     competitor_files: list[UploadFile] | None = File(None),
+    document_id: str = Form(""),
 ) -> JSONResponse:
     sentry_sdk.set_context("user", {"id": user_id})
     sentry_sdk.set_tag("endpoint", "analyze_premium_paid")
@@ -321,13 +564,16 @@ def analyze_premium_paid(
             content={"error": "user_id inválido. Deve ser um UUID válido."}
         )
     
+    session_id = None
+    consumed_credit = None
+    session_created = False
     try:
-        # Se cv_text foi fornecido (reutilização de CV), não precisa de file
-        file_bytes = None
-        if file and file.filename:
-            file_bytes = file.file.read()
-            from storage_manager import storage_manager
-            storage_manager.save_temp_files(file_bytes, job_description, user_id)
+        # Se cv_text foi fornecido (reutilização de CV), não precisa de file/document_id
+        document = None
+        if document_id or (file and file.filename):
+            document, error = _resolve_cv_document(file, document_id, job_description, user_id)
+            if error:
+                return error
         elif not cv_text:
             return JSONResponse(status_code=400, content={"error": "Envie um arquivo PDF/DOCX ou forneça cv_text."})
         
@@ -336,13 +582,32 @@ def analyze_premium_paid(
         if not status.get("payment_verified") or int(status.get("credits_remaining") or 0) <= 0:
             return JSONResponse(status_code=400, content={"error": "Você não tem créditos disponíveis."})
 
-        # Consumir crédito
-        _consume_one_credit(user_id)
-        
-        # Criar sessão de análise para progressive loading
         import uuid
         session_id = str(uuid.uuid4())
+
+        # Admission control: decide ANTES de consumir o crédito (sem capacidade -> 429)
+        from admission import admission_controller
+        admission = None
+        if not DEV_MODE:
+            admission = admission_controller.try_admit(session_id)
+            if not admission.admitted:
+                logger.warning(
+                    f"🚦 Análise recusada por capacidade (user {user_id}), retry em {admission.retry_after}s"
+                )
+                return JSONResponse(
+                    status_code=429,
+                    headers={"Retry-After": str(admission.retry_after)},
+                    content={
+                        "error": "Estamos com alta demanda. Seu crédito não foi consumido; tente novamente em instantes.",
+                        "retry_after": admission.retry_after,
+                        "estimated_start_seconds": admission.estimated_start_seconds,
+                    },
+                )
+
+        # Consumir crédito
+        consumed_credit = _consume_one_credit(user_id)
         
+        # Criar sessão de análise para progressive loading
         try:
             supabase_admin.table("analysis_sessions").insert({
                 "id": session_id,
@@ -350,23 +615,32 @@ def analyze_premium_paid(
                 "status": "processing",
                 "current_step": "starting",
                 "result_data": {},
+                "credit_consumed": consumed_credit,  # Devolvido pela recuperação se a análise se perder
                 "created_at": datetime.now().isoformat(),
                 "updated_at": datetime.now().isoformat()
             }).execute()
             
+            session_created = True
             logger.info(f"✅ Sessão de análise criada: {session_id}")
+            from progress_bus import progress_bus
+            progress_bus.publish(session_id, "starting", {})
         except Exception as e:
             logger.error(f"❌ Erro ao criar sessão: {e}")
+            admission_controller.release(session_id)
+            _refund_one_credit(user_id, consumed_credit)
             return JSONResponse(status_code=500, content={"error": f"Erro ao criar sessão: {e}"})
         
-        # Ler bytes dos competidores se existirem
+        # Ler bytes dos competidores se existirem (mesmo limite/sniffing do CV; inválidos são ignorados)
         competitors_bytes = None
         if competitor_files:
+            from upload_ingest import UploadRejected, ingest_upload
             competitors_bytes = []
             for cf in competitor_files:
-                cf_bytes = cf.file.read()
-                if cf_bytes:
-                    competitors_bytes.append(cf_bytes)
+                try:
+                    with ingest_upload(cf, allowed_kinds=("pdf",)) as upload:
+                        competitors_bytes.append(upload.read_bytes())
+                except UploadRejected as e:
+                    logger.warning(f"⚠️ Arquivo de concorrente ignorado ({e.code}): {cf.filename}")
         
         # Modo DEV: retorna mock instantaneamente
         if DEV_MODE:
@@ -382,12 +656,13 @@ def analyze_premium_paid(
                 "result_data": dev_result,
                 "updated_at": datetime.now().isoformat()
             }).eq("id", session_id).execute()
+            progress_bus.publish(session_id, "completed", dev_result)
             
             # Salvar no histórico (cached_analyses) para aparecer no Dashboard
             try:
                 import hashlib
-                from cache_manager import CacheManager
-                cache_manager = CacheManager()
+                from cache_manager import get_cache_manager
+                cache_manager = get_cache_manager()
                 input_hash = hashlib.sha256(
                     f"{job_description}{session_id}dev".encode()
                 ).hexdigest()
@@ -408,26 +683,59 @@ def analyze_premium_paid(
                 "message": "Análise mock concluída (DEV MODE)"
             })
         
-        # Modo PRODUÇÃO: processar em background
-        from dependencies import _process_analysis_background
-        background_tasks.add_task(
-            _process_analysis_background,
+        # Modo PRODUÇÃO: fila durável (JOB_QUEUE_ENABLED) ou background do processo web
+        from dependencies import _process_analysis_background, enqueue_premium_analysis
+        # O CV já foi extraído (document_store): o job recebe o texto, não os bytes
+        job_args = (
             session_id,
             user_id,
-            file_bytes,
+            None,
             job_description,
             area_of_interest,
             competitors_bytes,
-            file.filename if file and file.filename else "cv_reused.pdf",
-            cv_text if cv_text else None  # Texto pré-extraído do CV
+            (document or {}).get("filename") or "cv_reused.pdf",
+            cv_text if cv_text else document["text"]  # Texto pré-extraído do CV
         )
+        if not enqueue_premium_analysis(*job_args):
+            if admission.queued:
+                # Admitida para a FILA: rodar no BackgroundTasks agora furaria a capacidade
+                from llm_core import update_session_progress
+                admission_controller.release(session_id)
+                update_session_progress(session_id, {"error": "Fila de análises indisponível. Tente novamente."}, "failed")
+                _refund_session_credit(session_id)
+                logger.warning(f"🚦 Fila indisponível para sessão {session_id} admitida como enfileirada, retornando 429")
+                return JSONResponse(
+                    status_code=429,
+                    headers={"Retry-After": str(max(admission.estimated_start_seconds, 5))},
+                    content={
+                        "error": "Estamos com alta demanda. Seu crédito não foi consumido; tente novamente em instantes.",
+                        "retry_after": max(admission.estimated_start_seconds, 5),
+                    },
+                )
+            background_tasks.add_task(_process_analysis_background, *job_args)
         
         return JSONResponse(content={
             "session_id": session_id,
             "status": "processing",
+            "queued": admission.queued,
+            "estimated_start_seconds": admission.estimated_start_seconds,
             "message": "Análise iniciada. Use /api/analysis/status/{session_id} para acompanhar."
         })
         
     except Exception as e:
         sentry_sdk.capture_exception(e)
+        if session_id:
+            # Análise que não chegou à fila/execução: devolve a reserva de admissão e o crédito
+            from admission import admission_controller
+            admission_controller.release(session_id)
+            if session_created:
+                # Sem isso quem acompanha a sessão (status/stream) espera até a varredura de órfãs
+                try:
+                    from llm_core import update_session_progress
+                    update_session_progress(session_id, {"error": f"Erro ao iniciar análise: {e}"}, "failed")
+                except Exception as update_error:
+                    logger.error(f"❌ Erro ao marcar sessão {session_id} como failed: {update_error}")
+                _refund_session_credit(session_id)
+            else:
+                _refund_one_credit(user_id, consumed_credit)
         return JSONResponse(status_code=500, content={"error": f"{type(e).__name__}: {e}"})
@@ -99,9 +99,9 @@ def entitlements_consume_one(payload: ConsumeOneCreditRequest) -> JSONResponse:
 def get_history_detail(id: str) -> JSONResponse:
     """Retorna detalhes de uma análise do histórico."""
     try:
-        from cache_manager import CacheManager
+        from cache_manager import get_cache_manager
         
-        cache_manager = CacheManager()
+        cache_manager = get_cache_manager()
         
         response = cache_manager.supabase.table("cached_analyses").select("*").eq("id", id).execute()
         
@@ -110,7 +110,8 @@ def get_history_detail(id: str) -> JSONResponse:
         
         item = response.data[0]
         
-        return JSONResponse(content={"data": item["result_json"]})
+        from cache_codec import expand_result
+        return JSONResponse(content={"data": expand_result(item["result_json"])})
         
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": f"{type(e).__name__}: {e}"})
@@ -303,10 +304,10 @@ def get_last_cv(user_id: str) -> JSONResponse:
         )
     
     try:
-        from cache_manager import CacheManager
+        from cache_manager import get_cache_manager
         from datetime import datetime, timedelta
         
-        cache_manager = CacheManager()
+        cache_manager = get_cache_manager()
         
         # Busca o histórico mais recente do usuário (limit=1)
         history = cache_manager.get_user_history(user_id, limit=1, offset=0)
@@ -387,8 +388,9 @@ def get_last_cv_file(analysis_id: str, user_id: str) -> JSONResponse:
                 content={"error": "CV não encontrado"}
             )
         
+        from cache_codec import decode_text
         return JSONResponse(content={
-            "cv_text": response.data["cv_text_original"]
+            "cv_text": decode_text(response.data["cv_text_original"])
         })
         
     except Exception as e:
@@ -401,9 +403,9 @@ def get_last_cv_file(analysis_id: str, user_id: str) -> JSONResponse:
 @router.get("/user/history")
 def get_user_history(user_id: str, page: int = 1, page_size: int = 6) -> JSONResponse:
     try:
-        from cache_manager import CacheManager
+        from cache_manager import get_cache_manager
         
-        cache_manager = CacheManager()
+        cache_manager = get_cache_manager()
         offset = (max(1, page) - 1) * page_size
         total = cache_manager.get_user_history_count(user_id)
         history = cache_manager.get_user_history(user_id, limit=page_size, offset=offset)
@@ -0,0 +1,201 @@
+"""
+Session Progress - Gravação do progresso das análises (progressive loading)
+
+🎯 PROBLEMA:
+- Cada step fazia SELECT result_data -> merge em Python -> UPDATE do JSON
+  inteiro: duas idas ao banco e reescrita completa por step
+- cv/library/tactical terminando juntos corriam entre o SELECT e o UPDATE
+  e um deles perdia as chaves do outro
+
+✅ SOLUÇÃO:
+1. RPC `merge_session_progress` (create_session_progress_rpc.sql): merge
+   `jsonb ||` + current_step numa única instrução atômica, pelo cliente
+   compartilhado
+2. Coalescência: steps intermediários que chegam dentro de
+   SESSION_PROGRESS_COALESCE_MS são juntados numa só escrita (o frontend
+   acumula result_data, então pular um step intermediário não perde dados)
+3. Steps terminais (completed/failed) gravam na hora, levando junto o que
+   estiver pendente. As escritas de uma sessão são serializadas, então um
+   step atrasado nunca chega depois do terminal
+
+4. Cada step também é publicado no progress_bus (stream SSE), sem esperar
+   a janela
+
+Sem a RPC (migração não aplicada) cai para o fluxo antigo SELECT + UPDATE.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from progress_bus import TERMINAL_STEPS, progress_bus
+
+logger = logging.getLogger(__name__)
+
+SESSION_PROGRESS_COALESCE_MS = int(os.getenv("SESSION_PROGRESS_COALESCE_MS", "250"))
+
+
+class SessionProgressWriter:
+    """Grava o progresso das sessões com merge no servidor e coalescência por janela."""
+
+    def __init__(self, coalesce_ms: int = SESSION_PROGRESS_COALESCE_MS):
+        self.coalesce_seconds = max(coalesce_ms, 0) / 1000
+        self._lock = threading.Lock()
+        # session_id -> {"data": dict, "step": str, "timer": Timer}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # session_id -> lock que serializa as escritas da sessão
+        self._write_locks: Dict[str, threading.Lock] = {}
+        self._rpc_available = True
+        self.writes = 0
+        self.coalesced_steps = 0
+
+    def _session_lock(self, session_id: str) -> threading.Lock:
+        with self._lock:
+            return self._write_locks.setdefault(session_id, threading.Lock())
+
+    def _take_pending(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            pending = self._pending.pop(session_id, None)
+        if pending and pending.get("timer"):
+            pending["timer"].cancel()
+        return pending
+
+    # ------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------
+
+    def update(self, session_id: str, data_chunk: dict, step_name: str) -> bool:
+        """
+        Registra um step. Intermediários podem ser adiados pela janela de
+        coalescência (retorna True ao enfileirar); terminais gravam na hora.
+        """
+        # Push imediato para os streams SSE (só as chaves novas), antes da coalescência
+        try:
+            progress_bus.publish(session_id, step_name, data_chunk)
+        except Exception as e:
+            logger.warning(f"⚠️ Falha ao publicar progresso da sessão {session_id}: {e}")
+
+        if step_name in TERMINAL_STEPS or not self.coalesce_seconds:
+            with self._session_lock(session_id):
+                pending = self._take_pending(session_id)
+                data = {**pending["data"], **(data_chunk or {})} if pending else data_chunk
+                if pending:
+                    self.coalesced_steps += 1
+                ok = self._write(session_id, data, step_name)
+            if step_name in TERMINAL_STEPS:
+                with self._lock:
+                    self._write_locks.pop(session_id, None)
+            return ok
+
+        with self._lock:
+            pending = self._pending.get(session_id)
+            if pending is None:
+                timer = threading.Timer(self.coalesce_seconds, self.flush, args=(session_id,))
+                timer.daemon = True
+                self._pending[session_id] = {"data": dict(data_chunk or {}), "step": step_name, "timer": timer}
+                timer.start()
+            else:
+                pending["data"].update(data_chunk or {})
+                pending["step"] = step_name
+                self.coalesced_steps += 1
+        return True
+
+    def flush(self, session_id: str = None) -> None:
+        """Grava o que estiver pendente (de uma sessão ou de todas)."""
+        if session_id is None:
+            with self._lock:
+                session_ids = list(self._pending)
+            for pending_id in session_ids:
+                self.flush(pending_id)
+            return
+
+        with self._session_lock(session_id):
+            pending = self._take_pending(session_id)
+            if pending:
+                self._write(session_id, pending["data"], pending["step"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending_sessions": pending,
+            "writes": self.writes,
+            "coalesced_steps": self.coalesced_steps,
+            "rpc_available": self._rpc_available,
+        }
+
+    # ------------------------------------------------------------
+    # ESCRITA
+    # ------------------------------------------------------------
+
+    def _write(self, session_id: str, data_chunk: dict, step_name: str) -> bool:
+        from supabase_client import get_supabase_client
+
+        try:
+            supabase = get_supabase_client()
+            if not supabase:
+                logger.error("❌ Supabase não configurado para update_session_progress")
+                return False
+
+            if self._rpc_available:
+                try:
+                    response = supabase.rpc("merge_session_progress", {
+                        "p_session_id": session_id,
+                        "p_data": data_chunk or {},
+                        "p_step": step_name,
+                    }).execute()
+                    ok = bool(response.data)
+                except Exception as rpc_error:
+                    logger.warning(f"⚠️ RPC merge_session_progress falhou ({rpc_error}), usando SELECT + UPDATE")
+                    # Função não criada no banco: não tenta mais a RPC neste processo
+                    if "PGRST202" in str(rpc_error) or "Could not find the function" in str(rpc_error):
+                        self._rpc_available = False
+                    ok = self._write_legacy(supabase, session_id, data_chunk, step_name)
+            else:
+                ok = self._write_legacy(supabase, session_id, data_chunk, step_name)
+
+            if not ok:
+                logger.error(f"❌ Sessão {session_id} não encontrada")
+                return False
+
+            self.writes += 1
+            logger.info(f"✅ Sessão {session_id} atualizada: step={step_name}, keys={list((data_chunk or {}).keys())}")
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erro ao atualizar sessão {session_id}: {e}")
+            return False
+
+    def _write_legacy(self, supabase, session_id: str, data_chunk: dict, step_name: str) -> bool:
+        """Fluxo antigo (sem a RPC): lê o JSON atual, mescla em Python e regrava."""
+        response = supabase.table("analysis_sessions").select("result_data").eq("id", session_id).limit(1).execute()
+        if not response.data:
+            return False
+
+        current_data = response.data[0].get("result_data", {})
+        if isinstance(current_data, str):
+            try:
+                current_data = json.loads(current_data)
+            except json.JSONDecodeError:
+                current_data = {}
+
+        if isinstance(current_data, dict) and isinstance(data_chunk, dict):
+            merged_data = {**current_data, **data_chunk}
+        else:
+            merged_data = data_chunk
+
+        supabase.table("analysis_sessions").update({
+            "result_data": merged_data,
+            "current_step": step_name,
+            "updated_at": datetime.now().isoformat()
+        }).eq("id", session_id).execute()
+        return True
+
+
+# Instância global
+session_progress_writer = SessionProgressWriter()
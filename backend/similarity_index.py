@@ -0,0 +1,176 @@
+"""
+Similarity Index - Reuso do cache parcial por similaridade (MinHash + LSH)
+
+🎯 PROBLEMA:
+- O hash exato de componente quase nunca bate: duas vagas de "Analista de Dados
+  Pleno" diferem no texto institucional, então `partial_cache` vive em MISS
+
+✅ SOLUÇÃO:
+- Assinatura MinHash sobre shingles (3-gramas de palavras) da vaga normalizada
+  + tokens dos gaps
+- Buckets LSH (bandas da assinatura) gravados em `partial_cache.lsh_buckets`;
+  candidatos são buscados por sobreposição de bucket (índice GIN)
+- Reuso só acima de SIMILARITY_CACHE_THRESHOLD e se passar no guarda de
+  qualidade (mesma área, mesma senioridade, gaps parecidos)
+
+Migração: add_partial_cache_similarity.sql
+Relatório (hit rate x threshold): scripts/similarity_cache_report.py
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+SIMILARITY_CACHE_ENABLED = os.getenv("SIMILARITY_CACHE_ENABLED", "false").lower() == "true"
+SIMILARITY_CACHE_THRESHOLD = float(os.getenv("SIMILARITY_CACHE_THRESHOLD", "0.8"))
+SIMILARITY_GAP_THRESHOLD = float(os.getenv("SIMILARITY_GAP_THRESHOLD", "0.5"))
+SIMILARITY_MAX_CANDIDATES = int(os.getenv("SIMILARITY_MAX_CANDIDATES", "20"))
+
+# 64 permutações em 16 bandas de 4 linhas: pares com Jaccard >= 0.8 caem no
+# mesmo bucket com ~99.9% de chance; com Jaccard 0.3, ~12%
+NUM_PERM = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = 3
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Coeficientes fixos (seed constante) para que assinaturas gravadas no banco
+# continuem comparáveis entre deploys
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+]
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokens em minúsculas, descartando palavras curtas (artigos/preposições)."""
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 2]
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Conjunto de n-gramas de palavras (textos curtos viram um único shingle)."""
+    tokens = tokenize(text)
+    if len(tokens) < size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def _base_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def minhash_signature(features: Iterable[str]) -> List[int]:
+    """Assinatura MinHash de NUM_PERM valores (vazia se não houver features)."""
+    hashes = [_base_hash(f) for f in set(features)]
+    if not hashes:
+        return []
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def lsh_buckets(component_type: str, signature: List[int]) -> List[str]:
+    """Chaves de bucket por banda, prefixadas pelo componente (ex: 'tactical:03:9f1c...')."""
+    if len(signature) != NUM_PERM:
+        return []
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.md5(",".join(map(str, rows)).encode()).hexdigest()[:12]
+        buckets.append(f"{component_type}:{band:02d}:{digest}")
+    return buckets
+
+
+def estimate_jaccard(sig_a: List[int], sig_b: List[int]) -> float:
+    """Similaridade de Jaccard estimada pela fração de posições iguais."""
+    if not sig_a or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def jaccard(a: Iterable[str], b: Iterable[str]) -> float:
+    set_a, set_b = set(a), set(b)
+    if not set_a and not set_b:
+        return 1.0
+    if not set_a or not set_b:
+        return 0.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def passes_quality_guard(
+    query_meta: Dict[str, Any],
+    candidate_meta: Dict[str, Any],
+    gap_threshold: float = SIMILARITY_GAP_THRESHOLD,
+) -> bool:
+    """
+    Guarda de qualidade: texto parecido não basta.
+
+    Exige mesma área, mesma senioridade e sobreposição mínima dos tokens de gaps,
+    para não reaproveitar perguntas de entrevista/livros de outro perfil.
+    """
+    if not candidate_meta:
+        return False
+    if query_meta.get("area", "") != candidate_meta.get("area", ""):
+        return False
+    if query_meta.get("level", "") != candidate_meta.get("level", ""):
+        return False
+    return jaccard(query_meta.get("gap_tokens", []), candidate_meta.get("gap_tokens", [])) >= gap_threshold
+
+
+class LSHIndex:
+    """
+    Índice LSH em memória (usado pelo relatório offline e nos testes).
+
+    Em produção os buckets ficam em `partial_cache.lsh_buckets`; aqui a mesma
+    lógica roda sobre um dicionário bucket -> ids.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, List[Any]] = {}
+        self._entries: Dict[Any, Tuple[List[int], Dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: Any, component_type: str, signature: List[int], meta: Dict[str, Any]) -> None:
+        self._entries[key] = (signature, meta)
+        for bucket in lsh_buckets(component_type, signature):
+            self._buckets.setdefault(bucket, []).append(key)
+
+    def best_match(
+        self,
+        component_type: str,
+        signature: List[int],
+        meta: Dict[str, Any],
+        threshold: float = SIMILARITY_CACHE_THRESHOLD,
+        gap_threshold: float = SIMILARITY_GAP_THRESHOLD,
+        guard: bool = True,
+    ) -> Optional[Tuple[Any, float]]:
+        """Melhor candidato (chave, similaridade) acima do threshold e do guarda, ou None."""
+        candidates = set()
+        for bucket in lsh_buckets(component_type, signature):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        best = None
+        for key in candidates:
+            cand_signature, cand_meta = self._entries[key]
+            score = estimate_jaccard(signature, cand_signature)
+            if score < threshold:
+                continue
+            if guard and not passes_quality_guard(meta, cand_meta, gap_threshold):
+                continue
+            if best is None or score > best[1]:
+                best = (key, score)
+        return best
@@ -0,0 +1,221 @@
+"""
+Single-Flight - Coalescência de requisições idênticas em andamento
+
+🎯 PROBLEMA:
+- Duplo clique em "analisar" ou duas abas com o mesmo CV+vaga disparam dois
+  pipelines completos, porque `cached_analyses` só é gravado no final
+
+✅ SOLUÇÃO:
+- Registro em memória por chave (input_hash / component_hash)
+- A primeira chamada (líder) executa; chamadas concorrentes com a mesma chave
+  (seguidoras) esperam e recebem o MESMO resultado (ou a mesma exceção)
+- Entre workers: tabela `inflight_locks` (ver create_inflight_locks_table.sql),
+  habilitada com INFLIGHT_LOCK_TABLE_ENABLED=true
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    """Computação em andamento para uma chave."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Registro thread-safe de computações em andamento, indexado por chave."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[..., Any], *args, **kwargs) -> Tuple[Any, bool]:
+        """
+        Executa `fn(*args, **kwargs)` uma única vez por chave em andamento.
+
+        Returns:
+            (resultado, is_leader) - is_leader=False quando o resultado veio de
+            outra chamada que já estava em andamento
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                is_leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                is_leader = True
+
+        if not is_leader:
+            logger.info(f"🔗 SINGLE-FLIGHT [{self.name}]: anexado à computação em andamento {key[:8]}...")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+            if call.followers:
+                logger.info(f"⚡ SINGLE-FLIGHT [{self.name}]: resultado de {key[:8]}... compartilhado com {call.followers} requisição(ões)")
+
+        return call.result, True
+
+    def in_flight(self) -> int:
+        """Número de chaves em andamento (para métricas/debug)."""
+        with self._lock:
+            return len(self._calls)
+
+
+# Instâncias globais
+analysis_flight = SingleFlight("analysis")    # chave: generate_input_hash
+component_flight = SingleFlight("component")  # chave: generate_component_hash
+document_flight = SingleFlight("document")    # chave: document_id (sha256 do arquivo)
+render_flight = SingleFlight("render")        # chave: render_cache.render_key
+
+
+# ============================================================
+# LOCK ENTRE WORKERS (TABELA inflight_locks)
+# ============================================================
+
+INFLIGHT_LOCK_TABLE_ENABLED = os.getenv("INFLIGHT_LOCK_TABLE_ENABLED", "false").lower() == "true"
+INFLIGHT_LOCK_TTL_SECONDS = int(os.getenv("INFLIGHT_LOCK_TTL_SECONDS", "300"))
+INFLIGHT_LOCK_MAX_WAITS = int(os.getenv("INFLIGHT_LOCK_MAX_WAITS", "3"))
+# Espera TOTAL de uma requisição pelo lock de outro worker (na ordem do timeout da requisição)
+INFLIGHT_LOCK_MAX_WAIT_SECONDS = float(os.getenv("INFLIGHT_LOCK_MAX_WAIT_SECONDS", "60"))
+
+
+class InflightLockTable:
+    """
+    Lock leve entre workers usando a tabela `inflight_locks` (PK = lock_key).
+
+    O INSERT falha se outro worker já tiver a chave; locks expirados
+    (worker morto no meio da análise) são assumidos pelo próximo.
+    """
+
+    def __init__(self, ttl_seconds: int = INFLIGHT_LOCK_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def _client(self):
+        from supabase_client import get_supabase_client
+        return get_supabase_client()
+
+    def try_acquire(self, key: str) -> bool:
+        """Tenta obter o lock. Em erro de infraestrutura, não bloqueia (retorna True)."""
+        supabase = self._client()
+        if not supabase:
+            return True
+
+        now = datetime.now(timezone.utc)
+        row = {
+            "lock_key": key,
+            "owner": self.owner,
+            "expires_at": (now + timedelta(seconds=self.ttl_seconds)).isoformat(),
+        }
+        try:
+            supabase.table("inflight_locks").insert(row).execute()
+            return True
+        except Exception:
+            pass
+
+        try:
+            # Assume lock expirado de outro worker
+            taken = supabase.table("inflight_locks").update(row).eq("lock_key", key).lt(
+                "expires_at", now.isoformat()
+            ).execute()
+            return bool(taken.data)
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao verificar inflight_locks ({e}). Seguindo sem lock entre workers.")
+            return True
+
+    def release(self, key: str) -> None:
+        supabase = self._client()
+        if not supabase:
+            return
+        try:
+            supabase.table("inflight_locks").delete().eq("lock_key", key).eq("owner", self.owner).execute()
+        except Exception as e:
+            logger.warning(f"⚠️ Erro ao liberar inflight_lock {key[:8]}...: {e}")
+
+    def wait_for_release(self, key: str, poll_seconds: float = 1.0, timeout: Optional[float] = None) -> None:
+        """Espera (até `timeout`, padrão o TTL) o lock de outro worker ser liberado ou expirar."""
+        supabase = self._client()
+        if not supabase:
+            return
+        deadline = time.monotonic() + (self.ttl_seconds if timeout is None else timeout)
+        while time.monotonic() < deadline:
+            try:
+                response = supabase.table("inflight_locks").select("expires_at").eq("lock_key", key).limit(1).execute()
+            except Exception:
+                return
+            if not response.data:
+                return
+            expires_at = datetime.fromisoformat(response.data[0]["expires_at"].replace('Z', '+00:00'))
+            if expires_at < datetime.now(timezone.utc):
+                return
+            time.sleep(max(0.0, min(poll_seconds, deadline - time.monotonic())))
+
+    def acquire_or_wait(
+        self,
+        key: str,
+        check_done: Callable[[], Any],
+        max_waits: int = INFLIGHT_LOCK_MAX_WAITS,
+        max_wait_seconds: float = INFLIGHT_LOCK_MAX_WAIT_SECONDS,
+    ) -> Tuple[bool, Any]:
+        """
+        Obtém o lock ou espera o worker que o tem terminar.
+
+        A espera bloqueia a thread da requisição: no total dura no máximo
+        max_wait_seconds (não max_waits x TTL).
+
+        Returns:
+            (adquiriu, resultado): resultado != None quando check_done() encontrou
+            o que o outro worker produziu. Se o lock continuar ocupado após
+            max_waits esperas ou max_wait_seconds, retorna (False, None) e o
+            chamador calcula localmente, sem lock.
+        """
+        deadline = time.monotonic() + max_wait_seconds
+        for _ in range(max_waits):
+            if self.try_acquire(key):
+                return True, None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            logger.info(f"🔗 Lock {key[:8]}... em uso por outro worker. Aguardando...")
+            self.wait_for_release(key, timeout=remaining)
+            result = check_done()
+            if result:
+                return False, result
+        if self.try_acquire(key):
+            return True, None
+        logger.warning(
+            f"⚠️ Lock {key[:8]}... continua ocupado após {max_waits} espera(s) / {max_wait_seconds:g}s. "
+            f"Seguindo sem lock."
+        )
+        return False, None
+
+
+inflight_locks = InflightLockTable()
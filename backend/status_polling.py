@@ -0,0 +1,146 @@
+"""
+Status Polling - Respostas condicionais, delta e long-poll do status da análise
+
+🎯 PROBLEMA:
+- Cada poll em /api/analysis/status/{session_id} devolvia o result_data
+  inteiro (com o HTML do CV), mesmo quando nada tinha mudado
+
+✅ SOLUÇÃO (usado por routers/analysis.get_analysis_status):
+1. ETag (updated_at + current_step): If-None-Match igual -> 304 sem corpo.
+   O ETag precisa estar em expose_headers do CORS (main.py): o frontend
+   chama a API de outra origem
+2. since_step: result_data só com as chaves gravadas depois desse step
+   (deltas do progress_bus); sem histórico no processo, devolve tudo
+3. wait=N: long-poll até o próximo step ou N segundos (máx
+   STATUS_LONG_POLL_MAX_SECONDS), esperando no progress_bus quando o processo
+   conhece a sessão e com leituras curtas no banco quando não conhece
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+STATUS_LONG_POLL_MAX_SECONDS = float(os.getenv("STATUS_LONG_POLL_MAX_SECONDS", "25"))
+STATUS_LONG_POLL_INTERVAL = float(os.getenv("STATUS_LONG_POLL_INTERVAL", "1.0"))
+
+TERMINAL_STEPS = ("completed", "failed")
+
+FetchSession = Callable[[str], Awaitable[Optional[dict]]]
+
+
+def _default_bus():
+    from progress_bus import progress_bus
+    return progress_bus
+
+
+def session_etag(session: dict) -> str:
+    version = f"{session.get('updated_at')}|{session.get('current_step')}"
+    return 'W/"' + hashlib.sha1(version.encode()).hexdigest()[:16] + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def keys_since_step(session_id: str, since_step: str, bus=None) -> Optional[Set[str]]:
+    """Chaves gravadas depois do último evento `since_step` (None se o bus não tem o histórico)."""
+    bus = bus or _default_bus()
+    events = bus.events_since(session_id)
+    last_index = max((i for i, e in enumerate(events) if e["step"] == since_step), default=None)
+    if last_index is None:
+        return None
+    keys = set()
+    for event in events[last_index + 1:]:
+        keys.update(event["data"])
+    return keys
+
+
+async def wait_for_session_change(
+    session_id: str,
+    session: dict,
+    timeout: float,
+    fetch: FetchSession,
+    bus=None,
+) -> dict:
+    """
+    Long-poll: espera o próximo step (evento do progress_bus ou, sem ele, leitura
+    periódica) até `timeout`. Devolve a sessão mais recente (pode ser a mesma).
+    """
+    bus = bus or _default_bus()
+    etag = session_etag(session)
+    deadline = time.monotonic() + timeout
+    queue = None
+    if bus.knows(session_id):
+        queue, _ = bus.subscribe(session_id, len(bus.events_since(session_id)))
+    try:
+        bus_event_seen = False
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return session
+            if queue is not None and not bus_event_seen:
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=remaining)
+                    bus_event_seen = True
+                except asyncio.TimeoutError:
+                    return session
+            else:
+                # Sem bus, ou o banco ainda não refletiu o evento (coalescência): leitura curta
+                await asyncio.sleep(min(STATUS_LONG_POLL_INTERVAL if queue is None else 0.25, remaining))
+            latest = await fetch(session_id)
+            if latest and session_etag(latest) != etag:
+                return latest
+    finally:
+        if queue is not None:
+            bus.unsubscribe(session_id, queue)
+
+
+async def resolve_status(
+    session_id: str,
+    session: dict,
+    fetch: FetchSession,
+    if_none_match: str = "",
+    since_step: Optional[str] = None,
+    wait: float = 0,
+    bus=None,
+) -> Tuple[int, Dict[str, str], Optional[Dict[str, Any]]]:
+    """
+    Resposta do status a partir da sessão lida: (status_code, headers, corpo).
+    Corpo None quando o status é 304.
+    """
+    etag = session_etag(session)
+    unchanged = etag_matches(if_none_match, etag) or (since_step and since_step == session["current_step"])
+    if wait > 0 and unchanged and session["current_step"] not in TERMINAL_STEPS:
+        session = await wait_for_session_change(
+            session_id, session, min(wait, STATUS_LONG_POLL_MAX_SECONDS), fetch, bus
+        )
+        etag = session_etag(session)
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return 304, headers, None
+
+    result_data = session["result_data"] or {}
+    delta = False
+    if since_step and isinstance(result_data, dict):
+        keys = keys_since_step(session_id, since_step, bus)
+        if keys is not None:
+            result_data = {k: v for k, v in result_data.items() if k in keys}
+            delta = True
+
+    return 200, headers, {
+        "session_id": session_id,
+        "status": session["status"],
+        "current_step": session["current_step"],
+        "result_data": result_data,
+        "delta": delta,
+        "created_at": session["created_at"],
+        "updated_at": session["updated_at"],
+    }
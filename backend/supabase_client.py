@@ -0,0 +1,57 @@
+"""
+Cliente Supabase compartilhado (singleton por processo).
+
+🎯 OBJETIVO:
+- Um único `Client` por worker, reutilizado por CacheManager, routers e orquestradores
+- O cliente PostgREST interno mantém uma sessão httpx com keep-alive, então
+  reutilizar o mesmo `Client` reaproveita conexões TCP/TLS já abertas
+- Evita o custo de `create_client(...)` + handshake a cada request/step
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from typing import Optional
+
+from supabase import create_client, Client
+
+logger = logging.getLogger(__name__)
+
+_client_instance: Optional[Client] = None
+_client_lock = threading.Lock()
+
+
+def get_supabase_client(url: str | None = None, key: str | None = None) -> Optional[Client]:
+    """
+    Retorna o cliente Supabase (service role) compartilhado do processo.
+
+    Na primeira chamada o cliente é criado com `url`/`key` (ou, se omitidos,
+    SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY do ambiente). Chamadas seguintes
+    devolvem a mesma instância.
+
+    Returns:
+        Client compartilhado ou None se as credenciais não estiverem configuradas
+    """
+    global _client_instance
+    if _client_instance is not None:
+        return _client_instance
+
+    with _client_lock:
+        if _client_instance is None:
+            supabase_url = url or os.getenv("SUPABASE_URL")
+            supabase_key = key or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+            if not supabase_url or not supabase_key:
+                logger.error("❌ Supabase não configurado (SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY)")
+                return None
+            _client_instance = create_client(supabase_url, supabase_key)
+            logger.info("🔌 Cliente Supabase compartilhado criado (pool httpx reutilizado)")
+    return _client_instance
+
+
+def reset_supabase_client() -> None:
+    """Descarta o cliente compartilhado (útil em testes ou após troca de credenciais)."""
+    global _client_instance
+    with _client_lock:
+        _client_instance = None
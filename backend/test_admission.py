@@ -0,0 +1,82 @@
+"""
+Teste do admission control (slots, fila, 429 com Retry-After e folga dos provedores)
+Execute: python test_admission.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from admission import AdmissionController, ProviderHeadroom
+
+
+def test_admits_until_capacity_then_rejects_without_queue():
+    controller = AdmissionController(max_inflight=2, max_queued=5, queue_enabled=False)
+
+    assert controller.try_admit("a").admitted
+    assert controller.try_admit("b").admitted
+    decision = controller.try_admit("c")
+
+    assert not decision.admitted
+    assert decision.retry_after > 0
+
+
+def test_queues_with_estimated_start_when_queue_enabled():
+    controller = AdmissionController(max_inflight=1, max_queued=1, queue_enabled=True)
+
+    assert not controller.try_admit("a").queued
+    queued = controller.try_admit("b")
+    assert queued.admitted and queued.queued and queued.estimated_start_seconds > 0
+    assert not controller.try_admit("c").admitted
+
+
+def test_released_and_finished_sessions_free_slots():
+    controller = AdmissionController(max_inflight=1, max_queued=0, queue_enabled=False)
+
+    controller.try_admit("a")
+    controller.release("a")
+    controller.try_admit("b")
+    with controller.running("b"):
+        assert not controller.try_admit("c").admitted
+    assert controller.try_admit("c").admitted
+    assert controller.stats()["rejected"] == 1
+
+
+def test_transient_errors_shrink_capacity():
+    headroom = ProviderHeadroom(min_samples=4)
+    controller = AdmissionController(max_inflight=4, headroom=headroom, queue_enabled=False)
+    for transient in (True, True, True, False):
+        headroom.record("gemini", transient)
+
+    assert headroom.headroom() == 0.25
+    assert controller.capacity() == 1
+
+
+def test_capacity_capped_by_queue_workers():
+    controller = AdmissionController(max_inflight=4, max_queued=10, queue_enabled=True, queue_workers=2)
+
+    assert controller.capacity() == 2
+    assert not controller.try_admit("a").queued
+    assert not controller.try_admit("b").queued
+    third = controller.try_admit("c")
+    assert third.queued and third.estimated_start_seconds > 0  # 3ª análise espera um worker
+
+    # Sem fila (BackgroundTasks no processo web) vale o ADMISSION_MAX_INFLIGHT
+    assert AdmissionController(max_inflight=4, queue_enabled=False, queue_workers=2).capacity() == 4
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO ADMISSION CONTROL")
+    print("=" * 60)
+    test_admits_until_capacity_then_rejects_without_queue()
+    print("   ✅ Aceita até a capacidade e recusa com Retry-After")
+    test_queues_with_estimated_start_when_queue_enabled()
+    print("   ✅ Com fila de jobs, aceita na fila com início estimado")
+    test_released_and_finished_sessions_free_slots()
+    print("   ✅ Reservas devolvidas e análises concluídas liberam slots")
+    test_transient_errors_shrink_capacity()
+    print("   ✅ Erros transitórios dos provedores reduzem a capacidade")
+    test_capacity_capped_by_queue_workers()
+    print("   ✅ Com fila, a capacidade não passa do número de workers")
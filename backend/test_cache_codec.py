@@ -0,0 +1,117 @@
+"""
+Teste do formato compacto de `cached_analyses` (cache_codec)
+Execute: python test_cache_codec.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cache_codec
+from cache_codec import COMPACT_KEY, compact_result, expand_result, render_cv_html
+from styles import CSS_V13
+
+BODY_HTML = '<div class="cv-header"><h1>RODRIGO</h1></div><div class="section-title">RESUMO</div>'
+
+
+def test_html_envelope_is_stored_without_css_and_rebuilt_exactly():
+    original = {"nota_ats": 80, "cv_otimizado_completo": render_cv_html(BODY_HTML)}
+
+    compact = compact_result(original)
+
+    assert "cv_otimizado_completo" not in compact
+    assert compact[COMPACT_KEY] == {"css": "v13", "fmt": "html", "body": BODY_HTML}
+    assert CSS_V13 not in str(compact)
+    assert expand_result(compact) == original
+    assert "cv_otimizado_completo" in original  # Não altera o dict de entrada
+
+
+def test_markdown_is_preferred_when_it_renders_the_same_body(monkeypatch):
+    monkeypatch.setattr(
+        cache_codec, "_markdown_to_body",
+        lambda md, renderer=cache_codec.CURRENT_MARKDOWN_RENDERER: BODY_HTML if md == "# RODRIGO" else "",
+    )
+    original = {"cv_otimizado_completo": render_cv_html(BODY_HTML), cache_codec.MARKDOWN_KEY: "# RODRIGO"}
+
+    compact = compact_result(original)
+
+    assert compact[COMPACT_KEY]["fmt"] == "md"
+    assert compact[COMPACT_KEY]["body"] == "# RODRIGO"
+    assert compact[COMPACT_KEY]["renderer"] == cache_codec.CURRENT_MARKDOWN_RENDERER
+    assert cache_codec.MARKDOWN_KEY not in compact
+    assert expand_result(compact)["cv_otimizado_completo"] == original["cv_otimizado_completo"]
+
+
+# Mesma entrada, saídas diferentes: V11 estiliza como contato, a AST como cabeçalho de vaga
+VERSIONED_MARKDOWN = "# Ana Lima\n### EXPERIÊNCIA\nAnalista | Empresa Y | 2019 - 2021"
+
+
+def test_md_rows_without_renderer_expand_with_frozen_v11_renderer():
+    from cv_html_legacy import format_text_to_html_v11
+
+    legacy_row = {COMPACT_KEY: {"css": "v13", "fmt": "md", "body": VERSIONED_MARKDOWN}}
+    html = expand_result(legacy_row)["cv_otimizado_completo"]
+
+    body = format_text_to_html_v11(VERSIONED_MARKDOWN)
+    assert html == render_cv_html(body)
+    assert 'class="vant-cv-contact-line"' in body and 'class="vant-cv-job-container"' not in body
+
+
+def test_md_rows_round_trip_with_current_renderer():
+    body = cache_codec._markdown_to_body(VERSIONED_MARKDOWN)
+    original = {"cv_otimizado_completo": render_cv_html(body), cache_codec.MARKDOWN_KEY: VERSIONED_MARKDOWN}
+
+    compact = compact_result(original)
+
+    assert compact[COMPACT_KEY]["renderer"] == cache_codec.CURRENT_MARKDOWN_RENDERER
+    assert expand_result(compact) == {"cv_otimizado_completo": original["cv_otimizado_completo"]}
+    assert 'class="vant-cv-job-container"' in body
+
+
+def test_unknown_markdown_renderer_is_an_error():
+    row = {COMPACT_KEY: {"css": "v13", "fmt": "md", "body": "# Ana", "renderer": "futuro"}}
+    with pytest.raises(cache_codec.CacheCodecError):
+        expand_result(row)
+
+
+def test_non_envelope_content_is_left_untouched():
+    for value in ["### Experiência Profissional...", "🔒", "<p>Erro na formatação final do CV.</p>"]:
+        original = {"cv_otimizado_completo": value}
+        assert compact_result(original) == original
+        assert expand_result(original) == original
+
+
+def test_compact_is_idempotent():
+    compact = compact_result({"cv_otimizado_completo": render_cv_html(BODY_HTML)})
+    assert compact_result(compact) == compact
+
+
+def test_text_without_zstd_prefix_passes_through():
+    assert cache_codec.decode_text("CV em texto puro") == "CV em texto puro"
+    assert cache_codec.decode_text(None) is None
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO FORMATO COMPACTO DO CACHE")
+    print("=" * 60)
+    test_html_envelope_is_stored_without_css_and_rebuilt_exactly()
+    print("   ✅ HTML gravado sem o CSS e remontado byte a byte")
+    with pytest.MonkeyPatch.context() as mp:
+        test_markdown_is_preferred_when_it_renders_the_same_body(mp)
+    print("   ✅ Markdown preferido quando reproduz o mesmo corpo")
+    test_md_rows_without_renderer_expand_with_frozen_v11_renderer()
+    print("   ✅ Linhas md antigas remontadas com o renderer V11 congelado")
+    test_md_rows_round_trip_with_current_renderer()
+    print("   ✅ Linhas md novas gravam e usam a versão do renderer atual")
+    test_unknown_markdown_renderer_is_an_error()
+    print("   ✅ Renderer desconhecido é erro explícito")
+    test_non_envelope_content_is_left_untouched()
+    print("   ✅ Conteúdo fora do envelope fica intacto")
+    test_compact_is_idempotent()
+    print("   ✅ Compactação idempotente")
+    test_text_without_zstd_prefix_passes_through()
+    print("   ✅ Texto puro passa direto pelo decode")
@@ -0,0 +1,190 @@
+"""
+Teste do eviction do cache (TTL, orçamento de linhas/bytes, LRU/LFU, lotes)
+Execute: python test_cache_eviction.py
+"""
+
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("supabase")
+
+from cache_eviction import CacheEvictor, EvictionPolicy
+
+
+class _Response:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Query:
+    def __init__(self, fake, table):
+        self._fake = fake
+        self._table = table
+        self._delete = False
+        self._filters = []
+        self._orders = []
+        self._limit = None
+
+    def select(self, columns, count=None):
+        return self
+
+    def delete(self):
+        self._delete = True
+        return self
+
+    def lt(self, column, value):
+        self._filters.append(lambda row: row[column] < value)
+        return self
+
+    def in_(self, column, values):
+        self._filters.append(lambda row: row[column] in values)
+        return self
+
+    def order(self, column, desc=False):
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def execute(self):
+        rows = [r for r in self._fake.tables[self._table] if all(f(r) for f in self._filters)]
+        if self._delete:
+            self._fake.deletes.append(sorted(r["id"] for r in rows))
+            self._fake.tables[self._table] = [r for r in self._fake.tables[self._table] if r not in rows]
+            return _Response(rows)
+        for column, desc in reversed(self._orders):  # Sort estável: última ordem primeiro
+            rows.sort(key=lambda r: r[column], reverse=desc)
+        return _Response([dict(r) for r in rows[:self._limit]], count=len(rows))
+
+
+class FakeSupabase:
+    def __init__(self, rows, table_bytes=None):
+        self.tables = {"cached_analyses": rows}
+        self.table_bytes = table_bytes
+        self.deletes = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        fake = self
+
+        class _Call:
+            def execute(self):
+                if fake.table_bytes is None:
+                    raise Exception("PGRST202: Could not find the function cache_table_size")
+                return _Response(fake.table_bytes)
+        return _Call()
+
+
+def _row(row_id, days_unused, hits):
+    return {
+        "id": row_id,
+        "last_used": (datetime.utcnow() - timedelta(days=days_unused)).isoformat(),
+        "hit_count": hits,
+    }
+
+
+def _rows():
+    # id: (dias sem uso, hits)
+    return [_row(1, 1, 50), _row(2, 5, 1), _row(3, 3, 20), _row(4, 10, 2), _row(5, 2, 1)]
+
+
+def _remaining(supabase):
+    return sorted(r["id"] for r in supabase.tables["cached_analyses"])
+
+
+def _policy(**overrides):
+    options = {"table": "cached_analyses", "ttl_column": "last_used", "ttl_days": 0, "max_rows": 0}
+    options.update(overrides)
+    return EvictionPolicy(**options)
+
+
+def test_lru_removes_least_recently_used_over_row_budget():
+    supabase = FakeSupabase(_rows())
+
+    report = CacheEvictor(supabase).evict(_policy(max_rows=3, strategy="lru"))
+
+    assert report["budget_removed"] == 2
+    assert _remaining(supabase) == [1, 3, 5]  # Saem os 2 sem uso há mais tempo (4 e 2)
+
+
+def test_lfu_removes_least_hit_then_oldest():
+    supabase = FakeSupabase(_rows())
+
+    CacheEvictor(supabase).evict(_policy(max_rows=3, strategy="lfu"))
+
+    assert _remaining(supabase) == [1, 3, 4]  # hit_count 1 (2 e 5), empate desfeito por last_used
+
+
+def test_ttl_runs_before_budget():
+    supabase = FakeSupabase(_rows())
+
+    report = CacheEvictor(supabase).evict(_policy(ttl_days=4, max_rows=2))
+
+    assert (report["ttl_removed"], report["budget_removed"]) == (2, 1)  # 4 e 2 expirados, depois 3
+    assert _remaining(supabase) == [1, 5]
+
+
+def test_deletes_are_batched_and_capped_per_run():
+    supabase = FakeSupabase(_rows())
+
+    report = CacheEvictor(supabase, batch_size=2, max_batches=2).evict(_policy(max_rows=0, ttl_days=0.5))
+
+    assert report["ttl_candidates"] == 5 and report["ttl_removed"] == 4
+    assert report["batches"] == 2 and report["pending"] == 1  # Fica para a próxima execução
+    assert [len(ids) for ids in supabase.deletes] == [2, 2]
+
+
+def test_byte_budget_uses_average_row_size():
+    supabase = FakeSupabase(_rows(), table_bytes=5000)  # 1000 bytes por linha
+
+    report = CacheEvictor(supabase).evict(_policy(max_bytes=2500))
+
+    assert report["budget_candidates"] == 3
+    assert report["estimated_bytes_reclaimed"] == 3000
+    assert _remaining(supabase) == [1, 5]
+
+
+def test_dry_run_only_reports():
+    supabase = FakeSupabase(_rows())
+
+    report = CacheEvictor(supabase).evict(_policy(ttl_days=4, max_rows=2), dry_run=True)
+
+    assert report["would_remove"] == 3
+    assert report["estimated_bytes_reclaimed"] is None  # Sem a RPC cache_table_size
+    assert [row["id"] for row in report["budget_preview"]] == [4]
+    assert supabase.deletes == [] and _remaining(supabase) == [1, 2, 3, 4, 5]
+
+
+def test_invalid_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        _policy(strategy="fifo")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO CACHE EVICTION")
+    print("=" * 60)
+    test_lru_removes_least_recently_used_over_row_budget()
+    print("   ✅ LRU: remove os menos usados recentemente além do orçamento")
+    test_lfu_removes_least_hit_then_oldest()
+    print("   ✅ LFU: menos hits primeiro, empate por last_used")
+    test_ttl_runs_before_budget()
+    print("   ✅ TTL antes do orçamento")
+    test_deletes_are_batched_and_capped_per_run()
+    print("   ✅ DELETEs em lotes, com teto por execução")
+    test_byte_budget_uses_average_row_size()
+    print("   ✅ Orçamento de bytes pelo tamanho médio da linha")
+    test_dry_run_only_reports()
+    print("   ✅ dry_run só reporta")
+    test_invalid_strategy_is_rejected()
+    print("   ✅ Estratégia inválida recusada")
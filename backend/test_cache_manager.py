@@ -0,0 +1,273 @@
+"""
+Teste do CacheManager com um Supabase falso em memória
+(estatísticas via RPC, cache parcial em lote, stale-while-revalidate)
+Execute: python test_cache_manager.py
+"""
+
+import sys
+import time
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("supabase")
+
+import cache_manager
+from cache_manager import CacheManager
+from refresh_queue import RefreshQueue
+
+
+class _Response:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _Query:
+    """Subconjunto do query builder do PostgREST sobre listas de dicts."""
+
+    def __init__(self, fake, table):
+        self._fake = fake
+        self.table = table
+        self.action = "select"
+        self.payload = None
+        self.options = {}
+        self.filters = []
+        self._limit = None
+
+    def select(self, columns="*", count=None):
+        return self
+
+    def insert(self, row):
+        self.action, self.payload = "insert", row
+        return self
+
+    def upsert(self, row, **options):
+        self.action, self.payload, self.options = "upsert", row, options
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(("eq", column, value))
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(("in_", column, list(values)))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def _matches(self, row):
+        for op, column, value in self.filters:
+            if op == "eq" and row.get(column) != value:
+                return False
+            if op == "in_" and row.get(column) not in value:
+                return False
+        return True
+
+    def execute(self):
+        self._fake.queries.append(self)
+        rows = self._fake.tables.setdefault(self.table, [])
+        if self.action == "insert":
+            rows.append(dict(self.payload))
+            return _Response([self.payload])
+        if self.action == "upsert":
+            key = self.options["on_conflict"]
+            existing = next((r for r in rows if r.get(key) == self.payload[key]), None)
+            if existing is None:
+                rows.append(dict(self.payload))
+            elif not self.options.get("ignore_duplicates"):
+                existing.update(self.payload)
+            return _Response([self.payload])
+        matched = [r for r in rows if self._matches(r)]
+        if self.action == "delete":
+            self._fake.tables[self.table] = [r for r in rows if r not in matched]
+        return _Response([dict(r) for r in matched[:self._limit]])
+
+
+class FakeSupabase:
+    """Tabelas em memória; `rpc_results[nome]` é o retorno (ou a exceção) de cada RPC."""
+
+    def __init__(self, tables=None, rpc_results=None):
+        self.tables = tables or {}
+        self.rpc_results = rpc_results or {}
+        self.queries = []
+        self.rpc_calls = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def rpc(self, name, params):
+        self.rpc_calls.append((name, params))
+        result = self.rpc_results[name]
+
+        class _Call:
+            def execute(self):
+                if isinstance(result, Exception):
+                    raise result
+                return _Response(result)
+        return _Call()
+
+
+def _manager(supabase):
+    manager = CacheManager.__new__(CacheManager)  # Sem get_supabase_client
+    manager.supabase = supabase
+    return manager
+
+
+DATA = {
+    "area": "dados",
+    "job_description": "Engenheiro de Dados Sênior - Python, Spark, Airflow",
+    "gaps_fatais": [{"titulo": "Falta de métricas"}, {"titulo": "Sem cloud"}],
+}
+
+
+def _partial_row(manager, row_id, component_type, result, age_days=0):
+    return {
+        "id": row_id,
+        "component_hash": manager.generate_component_hash(component_type, DATA),
+        "component_type": component_type,
+        "result_json": result,
+        "created_at": (datetime.utcnow() - timedelta(days=age_days)).isoformat(),
+        "hit_count": 3,
+    }
+
+
+# ============================================================
+# ESTATÍSTICAS
+# ============================================================
+
+def test_cache_stats_come_from_rpc():
+    stats = {"total_entries": 42, "top_areas": [{"area": "dados", "count": 30}]}
+    supabase = FakeSupabase(rpc_results={"get_cache_stats_rpc": stats})
+
+    result = _manager(supabase).get_cache_stats(top_n=3)
+
+    assert result["total_entries"] == 42 and result["top_areas"][0]["area"] == "dados"
+    assert supabase.rpc_calls == [("get_cache_stats_rpc", {"p_top_areas": 3})]
+
+
+def test_missing_stats_rpc_reports_error_without_table_scan():
+    supabase = FakeSupabase(
+        tables={"cached_analyses": [{"id": 1, "result_json": {"area": "dados"}}]},
+        rpc_results={"get_cache_stats_rpc": Exception("PGRST202: Could not find the function get_cache_stats_rpc")},
+    )
+
+    result = _manager(supabase).get_cache_stats()
+
+    assert result["error"] == "rpc missing"
+    assert result["top_areas"] == []
+    assert supabase.queries == []  # Nada de varrer cached_analyses
+
+
+# ============================================================
+# CACHE PARCIAL EM LOTE
+# ============================================================
+
+def test_partial_cache_many_uses_one_query_and_one_batch_delete():
+    supabase = FakeSupabase()
+    manager = _manager(supabase)
+    supabase.tables["partial_cache"] = [
+        _partial_row(manager, "lib-1", "library", {"biblioteca_tecnica": ["Livro A"]}),
+        _partial_row(manager, "tac-1", "tactical", {"perguntas_entrevista": []}),   # Chave obrigatória vazia
+        {**_partial_row(manager, "tac-2", "tactical", {"perguntas_entrevista": ["P1"]}, age_days=60),
+         "component_hash": "outro-hash"},                                            # Outro payload: não entra
+    ]
+
+    results = manager.check_partial_cache_many(DATA, {
+        "library": ["biblioteca_tecnica"],
+        "tactical": ["perguntas_entrevista"],
+        "diagnosis": ["gaps_fatais"],  # Personalizado: nunca vem do cache
+    })
+
+    assert results == {"library": {"biblioteca_tecnica": ["Livro A"]}, "tactical": None, "diagnosis": None}
+
+    selects = [q for q in supabase.queries if q.action == "select"]
+    assert len(selects) == 1  # Uma query para todos os componentes
+    assert selects[0].filters == [("in_", "component_hash", [
+        manager.generate_component_hash("library", DATA),
+        manager.generate_component_hash("tactical", DATA),
+    ])]
+
+    deletes = [q for q in supabase.queries if q.action == "delete"]
+    assert len(deletes) == 1 and deletes[0].filters == [("in_", "id", ["tac-1"])]
+    assert [r["id"] for r in supabase.tables["partial_cache"]] == ["lib-1", "tac-2"]
+
+
+def test_partial_cache_many_skips_query_when_no_component_is_cacheable():
+    supabase = FakeSupabase()
+
+    results = _manager(supabase).check_partial_cache_many(DATA, {"diagnosis": None, "cv_writer": None})
+
+    assert results == {"diagnosis": None, "cv_writer": None}
+    assert supabase.queries == []
+
+
+# ============================================================
+# STALE-WHILE-REVALIDATE
+# ============================================================
+
+def test_stale_entry_is_served_refreshed_once_then_fresh(monkeypatch):
+    supabase = FakeSupabase()
+    manager = _manager(supabase)
+    supabase.tables["partial_cache"] = [
+        _partial_row(manager, "lib-1", "library", {"biblioteca_tecnica": ["Livro antigo"]}, age_days=10),
+    ]
+    queue = RefreshQueue("teste")
+    monkeypatch.setattr(cache_manager, "partial_cache_refresh_queue", queue)
+    monkeypatch.setattr(CacheManager, "PARTIAL_CACHE_SWR_ENABLED", True)
+    regenerated = []
+
+    def regenerate_partial_component(component_type, data):
+        time.sleep(0.05)  # Leituras concorrentes chegam enquanto o refresh roda
+        regenerated.append(component_type)
+        return {"biblioteca_tecnica": ["Livro novo"]}
+
+    monkeypatch.setitem(sys.modules, "llm_core", types.SimpleNamespace(
+        regenerate_partial_component=regenerate_partial_component,
+    ))
+    required = {"library": ["biblioteca_tecnica"]}
+
+    # Vencida (7 dias) mas dentro da janela SWR: servida na hora, refresh em background
+    first = manager.check_partial_cache_many(DATA, required)
+    second = manager.check_partial_cache_many(DATA, required)
+    assert first["library"] == second["library"] == {"biblioteca_tecnica": ["Livro antigo"]}
+
+    deadline = time.monotonic() + 5
+    while queue.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert regenerated == ["library"]  # Duas leituras vencidas, um único refresh
+    assert queue.stats()["deduplicated"] == 1
+
+    row = supabase.tables["partial_cache"][0]
+    assert row["hit_count"] == 3  # Refresh preserva a popularidade da entrada
+
+    third = manager.check_partial_cache_many(DATA, required)
+    assert third["library"] == {"biblioteca_tecnica": ["Livro novo"]}
+    assert queue.stats()["enqueued"] == 1  # Fresca: nada novo agendado
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO CACHE MANAGER")
+    print("=" * 60)
+    test_cache_stats_come_from_rpc()
+    print("   ✅ Estatísticas agregadas pela RPC")
+    test_missing_stats_rpc_reports_error_without_table_scan()
+    print("   ✅ RPC inexistente devolve erro, sem varrer cached_analyses")
+    test_partial_cache_many_uses_one_query_and_one_batch_delete()
+    print("   ✅ Cache parcial em lote: um `in_` e um DELETE das linhas inválidas")
+    test_partial_cache_many_skips_query_when_no_component_is_cacheable()
+    print("   ✅ Sem componente cacheável, nenhuma query")
+    with pytest.MonkeyPatch.context() as mp:
+        test_stale_entry_is_served_refreshed_once_then_fresh(mp)
+    print("   ✅ SWR: vencida servida, um refresh, depois fresca")
@@ -0,0 +1,192 @@
+"""
+Teste do pre-warming do cache parcial (candidatos, teto de custo e relatório)
+Execute: python test_cache_prewarm.py
+"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("supabase")
+
+import cache_prewarm
+from cache_prewarm import CachePrewarmer
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, fake, table):
+        self._fake = fake
+        self._table = table
+        self._filters = []
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self._filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        field = column.split("->>")[-1]  # result_json->>area: as linhas já trazem o alias `area`
+        self._filters.append(lambda row: row.get(field) in values)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        self._fake.queries.append(self._table)
+        rows = self._fake.tables.get(self._table, [])
+        return _Response([r for r in rows if all(f(r) for f in self._filters)])
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.queries = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+class FakeCacheManager:
+    """Top áreas, hash simplificado e gravação em memória."""
+
+    def __init__(self, tables):
+        self.supabase = FakeSupabase(tables)
+        self.saved = []
+
+    def get_cache_stats(self, top_n=5):
+        return {"top_areas": [{"area": "dados", "count": 9}]}
+
+    def generate_component_hash(self, component_type, data):
+        return f"{component_type}-{data['area']}-{len(data['gaps_fatais'])}"
+
+    def save_partial_cache_safe(self, component_type, data, result, source=None):
+        self.saved.append((component_type, source))
+        return True
+
+
+GAPS = [{"titulo": "Falta de métricas"}, {"titulo": "Sem cloud"}]
+
+HISTORY = [
+    {"area": "dados", "job_description": "Engenheiro de Dados", "gaps": GAPS},
+    {"area": "dados", "job_description": "Engenheiro de Dados Sr", "gaps": GAPS},
+    {"area": "dados", "job_description": "Data Engineer", "gaps": GAPS},
+    {"area": "dados", "job_description": "Analista", "gaps": GAPS[:1]},  # Frequência 1: abaixo do mínimo
+    {"area": "dados", "job_description": "Sem gaps", "gaps": []},
+]
+
+
+def _prewarmer(monkeypatch, partial_cache):
+    calls = []
+
+    def regenerate_partial_component(component_type, data):
+        calls.append(component_type)
+        return {"gerado": component_type}
+
+    monkeypatch.setitem(sys.modules, "llm_core", types.SimpleNamespace(
+        regenerate_partial_component=regenerate_partial_component,
+    ))
+    manager = FakeCacheManager({"cached_analyses": HISTORY, "partial_cache": partial_cache})
+    return CachePrewarmer(cache_manager=manager), manager, calls
+
+
+def test_run_generates_only_missing_frequent_combinations(monkeypatch):
+    prewarmer, manager, calls = _prewarmer(monkeypatch, [{"component_hash": "tactical-dados-2"}])
+
+    report = prewarmer.run(force=True)
+
+    assert report["candidates"] == 2 and report["already_cached"] == 1
+    assert [entry["component_type"] for entry in report["generated"]] == ["library"]
+    assert report["generated"][0]["frequency"] == 3
+    assert calls == ["library"] and manager.saved == [("library", "prewarm")]
+    assert report["llm_calls"] == 1 and report["skipped_budget"] == 0
+
+
+def test_run_respects_llm_call_budget(monkeypatch):
+    monkeypatch.setattr(cache_prewarm, "PREWARM_MAX_LLM_CALLS", 1)
+    prewarmer, _, calls = _prewarmer(monkeypatch, [])
+
+    report = prewarmer.run(force=True)
+
+    assert len(calls) == 1
+    assert report["skipped_budget"] == 1
+
+
+def test_dry_run_lists_without_calling_the_llm(monkeypatch):
+    prewarmer, manager, calls = _prewarmer(monkeypatch, [])
+
+    report = prewarmer.run(force=True, dry_run=True)
+
+    assert len(report["generated"]) == 2
+    assert calls == [] and manager.saved == []
+
+
+def test_report_counts_prewarmed_entries_and_hits(monkeypatch):
+    partial_cache = [
+        {"component_hash": "library-dados-2", "source": "prewarm", "hit_count": 4},  # 3 hits reais
+        {"component_hash": "tactical-dados-2", "source": "prewarm", "hit_count": 1},
+        {"component_hash": "library-outra", "source": "live", "hit_count": 9},
+    ]
+    prewarmer, _, _ = _prewarmer(monkeypatch, partial_cache)
+    prewarmer.run(force=True)
+
+    report = prewarmer.report()
+
+    assert report["prewarmed"] == {"entries": 2, "hits": 3}
+    assert report["last_run"]["already_cached"] == 2
+    assert report["calls_today"] == 0  # Tudo já estava em cache
+    assert "live_traffic" in report
+
+
+def test_already_cached_lookup_is_chunked(monkeypatch):
+    prewarmer, manager, _ = _prewarmer(monkeypatch, [{"component_hash": "h-150"}])
+
+    cached = prewarmer._already_cached([f"h-{i}" for i in range(250)])
+
+    assert cached == {"h-150"}
+    assert manager.supabase.queries.count("partial_cache") == 3  # 100 + 100 + 50
+
+
+def test_offpeak_window_wraps_midnight():
+    from datetime import datetime
+
+    assert cache_prewarm._in_offpeak_window(datetime(2026, 1, 1, 23), hours="22-4")
+    assert cache_prewarm._in_offpeak_window(datetime(2026, 1, 1, 3), hours="22-4")
+    assert not cache_prewarm._in_offpeak_window(datetime(2026, 1, 1, 12), hours="22-4")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO PRE-WARMING DO CACHE")
+    print("=" * 60)
+    with pytest.MonkeyPatch.context() as mp:
+        test_run_generates_only_missing_frequent_combinations(mp)
+    print("   ✅ Gera só as combinações frequentes que faltam no cache")
+    with pytest.MonkeyPatch.context() as mp:
+        test_run_respects_llm_call_budget(mp)
+    print("   ✅ Respeita o teto de chamadas de IA")
+    with pytest.MonkeyPatch.context() as mp:
+        test_dry_run_lists_without_calling_the_llm(mp)
+    print("   ✅ dry_run lista sem chamar a IA")
+    with pytest.MonkeyPatch.context() as mp:
+        test_report_counts_prewarmed_entries_and_hits(mp)
+    print("   ✅ Relatório com entradas pré-aquecidas e hits")
+    with pytest.MonkeyPatch.context() as mp:
+        test_already_cached_lookup_is_chunked(mp)
+    print("   ✅ Consulta do que já está em cache em blocos")
+    test_offpeak_window_wraps_midnight()
+    print("   ✅ Janela fora de pico que vira o dia")
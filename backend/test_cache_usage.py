@@ -0,0 +1,130 @@
+"""
+Teste do acumulador de hits de cache (write-behind)
+Execute: python test_cache_usage.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("supabase")
+
+import cache_usage
+from cache_usage import HitAccumulator, PartialLookupStats
+
+
+class _Call:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def eq(self, column, value):
+        return _Call(lambda: self._fn(value))
+
+    def execute(self):
+        return self._fn()
+
+
+class FakeSupabase:
+    """RPC e UPDATE por linha com falhas configuráveis."""
+
+    def __init__(self, rpc_error=None, failing_ids=()):
+        self.rpc_error = rpc_error
+        self.failing_ids = set(failing_ids)
+        self.rpc_calls = 0
+        self.updated = {}
+
+    def rpc(self, name, params):
+        def run():
+            self.rpc_calls += 1
+            if self.rpc_error:
+                raise self.rpc_error
+        return _Call(run)
+
+    def table(self, table):
+        fake = self
+
+        class _Table:
+            def update(self, values):
+                def run(row_id=None):
+                    if row_id in fake.failing_ids:
+                        raise ConnectionError("timeout")
+                    fake.updated[row_id] = values
+                return _Call(run)
+        return _Table()
+
+
+def _accumulator(monkeypatch, supabase):
+    monkeypatch.setattr(cache_usage, "get_supabase_client", lambda: supabase)
+    monkeypatch.setattr(cache_usage, "CACHE_HIT_TRACKING_ENABLED", True)
+    accumulator = HitAccumulator()
+    for row_id in ("a", "b", "c"):
+        accumulator.record_hit("partial_cache", row_id, current_hit_count=10)
+    return accumulator
+
+
+def test_transient_rpc_error_requeues_without_per_row_fallback(monkeypatch):
+    supabase = FakeSupabase(rpc_error=ConnectionError("connection reset"))
+    accumulator = _accumulator(monkeypatch, supabase)
+
+    assert accumulator.flush() == 0
+    assert supabase.updated == {}
+    assert accumulator.pending_count() == 3
+    assert accumulator._rpc_available
+
+
+def test_missing_rpc_falls_back_to_per_row_updates(monkeypatch):
+    supabase = FakeSupabase(rpc_error=Exception("PGRST202: Could not find the function flush_cache_hits"))
+    accumulator = _accumulator(monkeypatch, supabase)
+
+    assert accumulator.flush() == 3
+    assert supabase.updated["a"]["hit_count"] == 11
+    assert not accumulator._rpc_available
+
+    accumulator.record_hit("partial_cache", "a", current_hit_count=11)
+    accumulator.flush()
+    assert supabase.rpc_calls == 1  # RPC inexistente não é tentada de novo
+
+
+def test_per_row_failure_requeues_only_failed_rows(monkeypatch):
+    supabase = FakeSupabase(failing_ids={"b"})
+    accumulator = _accumulator(monkeypatch, supabase)
+    accumulator._rpc_available = False
+
+    assert accumulator.flush() == 2
+    assert set(supabase.updated) == {"a", "c"}
+    assert accumulator.pending_count() == 1
+    assert accumulator.flushed_hits == 2
+
+
+def test_retry_lookup_is_not_counted_twice():
+    stats = PartialLookupStats()
+    stats.record("library", hit=False)               # check_partial_cache_many (gaps vazios)
+    stats.record("library", hit=True, retry=True)    # _coalesced_agent (gaps reais)
+    stats.record("tactical", hit=False)
+    stats.record("tactical", hit=False, retry=True)
+    stats.record("tactical", hit=True, similar=True)
+
+    report = stats.report()
+    assert (report["library"]["lookups"], report["library"]["hits"]) == (1, 1)
+    assert (report["tactical"]["lookups"], report["tactical"]["hits"]) == (1, 1)
+    assert report["tactical"]["hit_rate"] == 1.0
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO ACUMULADOR DE HITS DE CACHE")
+    print("=" * 60)
+    with pytest.MonkeyPatch.context() as mp:
+        test_transient_rpc_error_requeues_without_per_row_fallback(mp)
+    print("   ✅ Erro transitório da RPC devolve o lote (sem UPDATE por linha)")
+    with pytest.MonkeyPatch.context() as mp:
+        test_missing_rpc_falls_back_to_per_row_updates(mp)
+    print("   ✅ RPC inexistente cai para UPDATE por linha")
+    with pytest.MonkeyPatch.context() as mp:
+        test_per_row_failure_requeues_only_failed_rows(mp)
+    print("   ✅ Falha parcial devolve só as linhas que falharam")
+    test_retry_lookup_is_not_counted_twice()
+    print("   ✅ Nova tentativa exata não conta outro lookup")
@@ -0,0 +1,71 @@
+"""
+Teste dos digests de concorrentes (resumo determinístico e cache por hash do arquivo)
+Execute: python test_competitor_digest.py
+"""
+
+import sys
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import competitor_digest
+from competitor_digest import CompetitorDigestCache, build_competitors_text, build_digest, render_digest
+
+COMPETITOR_CV = """Maria Souza
+maria@email.com | (11) 98765-4321 | linkedin.com/in/maria
+Engenheira de Software Sênior - 8 anos de experiência
+Backend com Python, Django, AWS e Docker
+• Reduziu o custo de infraestrutura em 35% migrando serviços para AWS
+• Liderou squad de 6 pessoas que entregou R$ 2 mi em novas receitas
+Empresa X (2016 - atual)
+"""
+
+
+def test_digest_keeps_profile_and_drops_contact_lines():
+    digest = build_digest(COMPETITOR_CV)
+    rendered = render_digest(1, digest)
+
+    assert digest["seniority"] == "senior"
+    assert digest["years_experience"] == 8
+    assert "python" in digest["skills"]
+    assert len(digest["highlights"]) == 2
+    assert "maria@email.com" not in rendered and "98765" not in rendered
+    assert len(rendered) < len(COMPETITOR_CV) * 2
+
+
+def test_repeated_competitors_are_extracted_once(monkeypatch):
+    extracted = []
+
+    def extrair_textos_pdf(datas):
+        extracted.extend(datas)
+        return [COMPETITOR_CV for _ in datas]
+
+    saved = {}
+    fake_cache_manager = types.SimpleNamespace(
+        check_partial_cache=lambda component, data: saved.get(data["file_hash"]),
+        save_partial_cache_safe=lambda component, data, result: saved.__setitem__(data["file_hash"], result),
+    )
+    monkeypatch.setitem(sys.modules, "logic", types.SimpleNamespace(extrair_textos_pdf=extrair_textos_pdf))
+    monkeypatch.setitem(sys.modules, "cache_manager", types.SimpleNamespace(get_cache_manager=lambda: fake_cache_manager))
+    monkeypatch.setattr(competitor_digest, "competitor_digest_cache", CompetitorDigestCache())
+
+    first = build_competitors_text([b"%PDF a", b"%PDF b"])
+    competitor_digest.competitor_digest_cache._items.clear()  # Força leitura do partial_cache
+    second = build_competitors_text([b"%PDF a", b"%PDF b"])
+
+    assert first == second
+    assert "--- CONCORRENTE 2 ---" in first
+    assert extracted == [b"%PDF a", b"%PDF b"]
+
+
+if __name__ == "__main__":
+    import pytest
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DOS DIGESTS DE CONCORRENTES")
+    print("=" * 60)
+    test_digest_keeps_profile_and_drops_contact_lines()
+    print("   ✅ Digest mantém perfil e destaques, sem linhas de contato")
+    with pytest.MonkeyPatch.context() as mp:
+        test_repeated_competitors_are_extracted_once(mp)
+    print("   ✅ Concorrentes repetidos não são extraídos de novo")
@@ -0,0 +1,150 @@
+"""
+Teste do parser único de CV (markdown -> AST) e do render HTML
+Execute: python test_cv_markdown.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import cv_markdown
+from cv_markdown import (
+    Bullet, Chips, ContactItem, Contacts, JobHeader, Name, Paragraph, Section,
+    cv_to_html, parse_cv_markdown,
+)
+
+# Layout do SYSTEM_AGENT_CV_FORMATTER
+FORMATTER_CV = """# João Souza
+**Email:** joao@email.com | **Telefone:** (11) 98888-7777 | **LinkedIn:** https://linkedin.com/in/joao | **Local:** Não informado
+
+### RESUMO PROFISSIONAL
+Gerente de vendas com **12 anos** de experiência.
+
+### SKILLS TÉCNICAS
+• CRM • Negociação • Power BI
+
+### EXPERIÊNCIA PROFISSIONAL
+- **Gerente de Vendas** | ACME | *Jan 2020 - Atual*
+- **Expansão**: abri 3 filiais <com> meta batida
+"""
+
+
+def test_formatter_layout_blocks():
+    blocks = parse_cv_markdown(FORMATTER_CV).blocks
+
+    assert [type(b) for b in blocks] == [
+        Name, Contacts, Section, Paragraph, Section, Chips, Section, JobHeader, Bullet,
+    ]
+    assert blocks[0] == Name("João Souza")
+    assert blocks[5] == Chips(("CRM", "Negociação", "Power BI"))
+    assert blocks[7] == JobHeader("Gerente de Vendas", "ACME", "Jan 2020 - Atual")
+    assert blocks[8].spans == (("Expansão", True), (": abri 3 filiais <com> meta batida", False))
+
+
+def test_contacts_keep_labels_and_drop_placeholders():
+    contacts = parse_cv_markdown(FORMATTER_CV).blocks[1]
+
+    assert contacts.items == (
+        ContactItem("Email", "joao@email.com"),
+        ContactItem("Telefone", "(11) 98888-7777"),
+        ContactItem("LinkedIn", "https://linkedin.com/in/joao"),  # "https:" não vira rótulo
+    )
+
+
+def test_pipe_line_inside_section_is_job_header():
+    blocks = parse_cv_markdown("# Ana\n### EXPERIÊNCIA\nAnalista | Empresa Y | 2019 - 2021").blocks
+
+    assert blocks[-1] == JobHeader("Analista", "Empresa Y", "2019 - 2021")
+
+
+def test_only_whole_word_skill_titles_are_skill_sections():
+    titles = {
+        block.title: block.is_skills
+        for block in parse_cv_markdown(
+            "# Ana\n### SKILLS TÉCNICAS\n### COMPETÊNCIAS\n### HABILIDADES\n### EXPERIÊNCIA TÉCNICA"
+        ).blocks
+        if isinstance(block, Section)
+    }
+
+    assert titles == {
+        "SKILLS TÉCNICAS": True, "COMPETÊNCIAS": True, "HABILIDADES": True, "EXPERIÊNCIA TÉCNICA": False,
+    }
+    blocks = parse_cv_markdown("# Ana\n### EXPERIÊNCIA TÉCNICA\n- Migrei pipelines, reduzi custos e liderei o time").blocks
+    assert blocks[-1] == Bullet((("Migrei pipelines, reduzi custos e liderei o time", False),))
+
+
+def test_skill_line_with_long_item_keeps_all_text():
+    long_item = "Experiência sólida em arquitetura de dados distribuídos em larga escala com Spark"
+    blocks = parse_cv_markdown(f"# Ana\n### COMPETÊNCIAS\nPython, SQL, {long_item}").blocks
+
+    assert blocks[-1] == Paragraph(((f"Python, SQL, {long_item}", False),))
+    assert long_item in cv_to_html(parse_cv_markdown(f"# Ana\n### COMPETÊNCIAS\n- Python • {long_item}"))
+
+
+def test_first_line_without_hash_is_name():
+    blocks = parse_cv_markdown("Ana Lima\nana@email.com\n### RESUMO\nTexto").blocks
+
+    assert blocks[0] == Name("Ana Lima")
+    assert isinstance(blocks[1], Contacts)
+
+
+def test_ast_is_cached_by_content():
+    first = parse_cv_markdown(FORMATTER_CV)
+    second = parse_cv_markdown(FORMATTER_CV)
+
+    assert first is second
+    assert parse_cv_markdown(FORMATTER_CV + "\nextra") is not first
+
+
+def test_html_escapes_and_uses_design_system_classes():
+    html = cv_to_html(parse_cv_markdown(FORMATTER_CV))
+
+    assert '<h1 class="vant-cv-name">JOÃO SOUZA</h1>' in html
+    assert '<span class="vant-skill-chip">Power BI</span>' in html
+    assert '<span class="vant-bold">Email:</span> joao@email.com' in html
+    assert '<span class="vant-bold">12 anos</span>' in html
+    assert "&lt;com&gt;" in html and "<com>" not in html
+    assert "Não informado" not in html
+
+
+def test_html_and_docx_share_one_parse(monkeypatch):
+    pytest.importorskip("docx")
+    from docx_template import gerar_docx_cv
+
+    calls = []
+    tokenize = cv_markdown._tokenize
+    monkeypatch.setattr(cv_markdown, "_tokenize", lambda text: calls.append(text) or tokenize(text))
+    text = FORMATTER_CV + "\n### IDIOMAS\nInglês fluente"
+
+    cv_to_html(parse_cv_markdown(text))
+    gerar_docx_cv(text)
+
+    assert len(calls) == 1
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO PARSER ÚNICO DE CV (AST)")
+    print("=" * 60)
+    test_formatter_layout_blocks()
+    print("   ✅ Layout do formatador vira blocos tipados")
+    test_contacts_keep_labels_and_drop_placeholders()
+    print("   ✅ Contatos com rótulo, sem placeholders")
+    test_pipe_line_inside_section_is_job_header()
+    print("   ✅ Linha com | dentro de seção é cabeçalho de vaga")
+    test_only_whole_word_skill_titles_are_skill_sections()
+    print("   ✅ Seção de skills só pela palavra inteira (EXPERIÊNCIA TÉCNICA não)")
+    test_skill_line_with_long_item_keeps_all_text()
+    print("   ✅ Item longo demais para chip mantém a linha inteira")
+    test_first_line_without_hash_is_name()
+    print("   ✅ Primeira linha sem # é o nome")
+    test_ast_is_cached_by_content()
+    print("   ✅ AST cacheada pelo conteúdo")
+    test_html_escapes_and_uses_design_system_classes()
+    print("   ✅ HTML escapado e com as classes do design system")
+    with pytest.MonkeyPatch.context() as mp:
+        test_html_and_docx_share_one_parse(mp)
+    print("   ✅ HTML e DOCX compartilham um único parse")
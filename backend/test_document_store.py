@@ -0,0 +1,98 @@
+"""
+Teste do document store (id por hash, extração única por arquivo)
+Execute: python test_document_store.py
+"""
+
+import sys
+import threading
+import time
+import types
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from document_store import DocumentStore, document_id_for, is_valid_document_id
+
+
+def _fake_extraction(monkeypatch, calls):
+    """Substitui logic (weasyprint/IA) e storage_manager (Supabase) por fakes que contam chamadas."""
+    def extrair_documento_pdf(stream):
+        calls.append(stream.read())
+        time.sleep(0.05)
+        return {"text": "CV " * 50, "is_vant_certified": False, "page_count": 2}
+
+    monkeypatch.setitem(sys.modules, "logic", types.SimpleNamespace(extrair_documento_pdf=extrair_documento_pdf))
+    storage = types.SimpleNamespace(save_temp_files=lambda *args: calls.append("storage"))
+    monkeypatch.setitem(sys.modules, "storage_manager", types.SimpleNamespace(storage_manager=storage))
+
+
+def test_same_bytes_are_extracted_once(monkeypatch):
+    calls = []
+    _fake_extraction(monkeypatch, calls)
+    store = DocumentStore(table_enabled=False)
+
+    first, created = store.register(b"%PDF cv", "cv.pdf")
+    again, created_again = store.register(b"%PDF cv", "outro_nome.pdf")
+
+    assert created and not created_again
+    assert first["document_id"] == again["document_id"] == document_id_for(b"%PDF cv")
+    assert calls.count(b"%PDF cv") == 1 and calls.count("storage") == 1
+    assert store.get(first["document_id"])["page_count"] == 2
+
+
+def test_concurrent_uploads_share_one_extraction(monkeypatch):
+    calls = []
+    _fake_extraction(monkeypatch, calls)
+    store = DocumentStore(table_enabled=False)
+
+    threads = [threading.Thread(target=store.register, args=(b"%PDF paralelo",)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert calls.count(b"%PDF paralelo") == 1
+
+
+def test_unknown_or_malformed_ids_are_rejected():
+    store = DocumentStore(table_enabled=False)
+
+    assert store.get(document_id_for(b"nunca enviado")) is None
+    assert not is_valid_document_id("../../etc/passwd")
+    assert store.get("abc") is None
+
+
+def test_document_is_scoped_to_uploader(monkeypatch):
+    calls = []
+    _fake_extraction(monkeypatch, calls)
+    store = DocumentStore(table_enabled=False)
+
+    document, _ = store.register(b"%PDF cv da ana", "cv.pdf", user_id="ana")
+    document_id = document["document_id"]
+
+    assert store.get(document_id, "ana") is not None
+    assert store.get(document_id, "bruno") is None  # Conhecer o hash não basta
+    assert store.stats()["denied"] == 1
+
+    # Bruno com os mesmos bytes: reaproveita a extração e passa a ter acesso
+    store.register(b"%PDF cv da ana", "cv.pdf", user_id="bruno")
+    assert store.get(document_id, "bruno") is not None
+    assert calls.count(b"%PDF cv da ana") == 1
+
+
+if __name__ == "__main__":
+    import pytest
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO DOCUMENT STORE")
+    print("=" * 60)
+    with pytest.MonkeyPatch.context() as mp:
+        test_same_bytes_are_extracted_once(mp)
+    print("   ✅ Mesmos bytes: uma extração e um upload no Storage")
+    with pytest.MonkeyPatch.context() as mp:
+        test_concurrent_uploads_share_one_extraction(mp)
+    print("   ✅ Uploads simultâneos compartilham a mesma extração")
+    test_unknown_or_malformed_ids_are_rejected()
+    print("   ✅ Ids desconhecidos ou malformados são recusados")
+    with pytest.MonkeyPatch.context() as mp:
+        test_document_is_scoped_to_uploader(mp)
+    print("   ✅ Documento só é devolvido a quem o enviou")
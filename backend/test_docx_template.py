@@ -0,0 +1,294 @@
+"""
+Teste do DOCX via template: estrutura efetiva comparada com dois fixtures
+1. golden/cv_docx_structure.json: saída do gerador ANTIGO (_renderizar_word_old)
+   para LEGACY_SAMPLE_CV. Os blocos que não mudaram com a AST (nome, contatos,
+   títulos, resumo, cabeçalhos de cargo, bullets, formação) precisam continuar
+   iguais; só as mudanças deliberadas (_without_deliberate_changes) são ignoradas
+2. golden/cv_docx_ast_snapshot.json: snapshot do comportamento novo (chips de
+   skills, negrito só em **...**, contatos rotulados) para SAMPLE_CV
+Execute: python test_docx_template.py
+Regenerar o golden (gerador antigo, ambiente completo):
+    python test_docx_template.py --update-golden
+Regenerar o snapshot (depois de uma mudança VISUAL intencional, revise o diff):
+    python test_docx_template.py --update-snapshot
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("docx")
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from cv_markdown import _SKILL_SECTION_RE
+from docx_template import build_template, gerar_docx_cv
+
+GOLDEN_PATH = Path(__file__).parent / "golden" / "cv_docx_structure.json"
+SNAPSHOT_PATH = Path(__file__).parent / "golden" / "cv_docx_ast_snapshot.json"
+
+# Entrada do golden do gerador antigo: não altere sem regenerar com --update-golden
+LEGACY_SAMPLE_CV = """# Maria Silva
+maria.silva@email.com | (11) 99999-0000 | linkedin.com/in/mariasilva
+
+### RESUMO PROFISSIONAL
+Engenheira de dados com 8 anos de experiência em pipelines de alto volume, liderança técnica e redução de custos em nuvem.
+
+### EXPERIÊNCIA PROFISSIONAL
+**Engenheira de Dados Sênior** | Empresa X | 2020 - Atual
+- Custo: reduzi em 40% o custo de processamento migrando jobs batch para Spark
+- Liderei time de 5 pessoas na construção do data lake
+Engenheira de Dados | Empresa Y
+• Automação: ingestão de 200 fontes com Airflow
+
+### COMPETÊNCIAS TÉCNICAS
+Python, SQL, Apache Spark, Airflow e Kafka, Modelagem de Dados, Docker
+
+### SOFT SKILLS
+Liderança de times e Comunicação clara com Negociação
+
+### FORMAÇÃO
+Bacharelado em Ciência da Computação | USP | 2015
+"""
+
+SAMPLE_CV = """# Maria Silva
+**Email:** maria.silva@email.com | **Telefone:** (11) 99999-0000 | **LinkedIn:** linkedin.com/in/mariasilva
+
+### RESUMO PROFISSIONAL
+Engenheira de dados com 8 anos de experiência em pipelines de alto volume, liderança técnica e redução de custos em nuvem.
+
+### SKILLS TÉCNICAS
+• Python • SQL • Apache Spark • Airflow
+
+### EXPERIÊNCIA PROFISSIONAL
+- **Engenheira de Dados Sênior** | Empresa X | *2020 - Atual*
+- **Custo**: reduzi em 40% o custo de processamento migrando jobs batch para Spark
+- Liderei time de 5 pessoas na construção do data lake
+Engenheira de Dados | Empresa Y
+• Automação: ingestão de 200 fontes com Airflow
+
+### COMPETÊNCIAS
+Modelagem de Dados, Docker, Kafka
+
+### FORMAÇÃO
+Bacharelado em Ciência da Computação | USP | 2015
+"""
+
+
+# ============================================================
+# ESTRUTURA EFETIVA (direta -> estilo de caractere -> estilo de parágrafo)
+# ============================================================
+
+def _chain(style):
+    while style is not None:
+        yield style
+        style = style.base_style
+
+
+def _first(values):
+    return next((v for v in values if v is not None), None)
+
+
+def _run_shading(run):
+    for element in [run._r] + [s.element for s in _chain(run.style)]:
+        rPr = element.find(qn("w:rPr"))
+        shd = rPr.find(qn("w:shd")) if rPr is not None else None
+        if shd is not None:
+            return shd.get(qn("w:fill"))
+    return None
+
+
+def _paragraph_border(paragraph):
+    for element in [paragraph._p] + [s.element for s in _chain(paragraph.style)]:
+        pPr = element.find(qn("w:pPr"))
+        bottom = pPr.find(qn("w:pBdr") + "/" + qn("w:bottom")) if pPr is not None else None
+        if bottom is not None:
+            return bottom.get(qn("w:color"))
+    return None
+
+
+def _describe_run(run, paragraph):
+    styles = list(_chain(run.style)) + list(_chain(paragraph.style))
+    fonts = [run.font] + [s.font for s in styles]
+    color = _first(f.color.rgb if f.color.type is not None else None for f in fonts)
+    size = _first(f.size for f in fonts)
+    return {
+        "text": run.text,
+        "bold": _first(f.bold for f in fonts),
+        "size": size.pt if size is not None else None,
+        "color": str(color) if color is not None else None,
+        "font": _first(f.name for f in fonts),
+        "shading": _run_shading(run),
+    }
+
+
+def _describe_paragraph(paragraph):
+    formats = [paragraph.paragraph_format] + [s.paragraph_format for s in _chain(paragraph.style)]
+
+    def prop(name, convert=None):
+        value = _first(getattr(f, name) for f in formats)
+        return convert(value) if (convert and value is not None) else value
+
+    tabs = _first(
+        [round(t.position.cm, 2) for t in f.tab_stops] or None for f in formats
+    )
+    return {
+        "text": paragraph.text,
+        "alignment": prop("alignment", lambda a: a.name),
+        "space_before": prop("space_before", lambda v: v.pt),
+        "space_after": prop("space_after", lambda v: v.pt),
+        "line_spacing": prop("line_spacing"),
+        "left_indent": prop("left_indent", lambda v: round(v.cm, 2)),
+        "first_line_indent": prop("first_line_indent", lambda v: round(v.cm, 2)),
+        "keep_with_next": prop("keep_with_next"),
+        "keep_together": prop("keep_together"),
+        "tab_stops": tabs,
+        "border_bottom": _paragraph_border(paragraph),
+        # Runs só de espaço/tab não aparecem: a formatação deles é invisível
+        "runs": [_describe_run(r, paragraph) for r in paragraph.runs if r.text.strip()],
+    }
+
+
+def describe_docx(stream):
+    stream.seek(0)
+    doc = Document(stream)
+    section = doc.sections[0]
+    return {
+        "margins_cm": [
+            round(m.cm, 2) for m in (section.top_margin, section.bottom_margin,
+                                     section.left_margin, section.right_margin)
+        ],
+        "paragraphs": [_describe_paragraph(p) for p in doc.paragraphs],
+    }
+
+
+def _merge_label_prefix(paragraph):
+    """Bullet "Rótulo: texto": o gerador antigo punha o rótulo em negrito; a AST só negrita **...**."""
+    runs = paragraph["runs"]
+    if (paragraph["text"].startswith("•") and len(runs) >= 3
+            and runs[1]["bold"] and not runs[2]["bold"] and runs[1]["text"].rstrip().endswith(":")):
+        merged = {**runs[2], "text": runs[1]["text"] + runs[2]["text"]}
+        return {**paragraph, "runs": runs[:1] + [merged] + runs[3:]}
+    return paragraph
+
+
+def _without_deliberate_changes(structure):
+    """
+    Estrutura sem o que a AST mudou de propósito: o conteúdo das seções de
+    skills (agora chips) e o negrito automático de "Rótulo:" nos bullets.
+    Todo o resto precisa bater com o gerador antigo.
+    """
+    paragraphs = []
+    in_skills = False
+    for paragraph in structure["paragraphs"]:
+        if paragraph["border_bottom"]:  # Título de seção
+            in_skills = bool(_SKILL_SECTION_RE.search(paragraph["text"].upper()))
+        elif in_skills:
+            continue
+        paragraphs.append(_merge_label_prefix(paragraph))
+    return {**structure, "paragraphs": paragraphs}
+
+
+# ============================================================
+# TESTES
+# ============================================================
+
+def test_unchanged_blocks_match_legacy_golden():
+    golden = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+    output = describe_docx(gerar_docx_cv(LEGACY_SAMPLE_CV))
+
+    assert len(output["paragraphs"]) == len(golden["paragraphs"])  # Nenhum bloco some ou aparece
+    assert _without_deliberate_changes(output) == _without_deliberate_changes(golden)
+
+
+def test_deliberate_changes_are_only_skills_and_label_bold():
+    golden = json.loads(GOLDEN_PATH.read_text(encoding="utf-8"))
+    kept = _without_deliberate_changes(golden)["paragraphs"]
+
+    # O filtro não pode esconder blocos inteiros: só o conteúdo das 2 seções de skills sai
+    removed = [p["text"] for p in golden["paragraphs"] if p["text"] not in {k["text"] for k in kept}]
+    assert len(removed) == 2
+    assert removed[0].startswith("Python, SQL")
+    # ...e só os 2 bullets com rótulo têm os runs normalizados
+    original = [p for p in golden["paragraphs"] if p["text"] not in removed]
+    normalized = [k["text"] for k, p in zip(kept, original) if k != p]
+    assert normalized == [
+        "•\tCusto: reduzi em 40% o custo de processamento migrando jobs batch para Spark",
+        "•\tAutomação: ingestão de 200 fontes com Airflow",
+    ]
+
+
+def test_output_structure_matches_ast_snapshot():
+    snapshot = json.loads(SNAPSHOT_PATH.read_text(encoding="utf-8"))
+
+    assert describe_docx(gerar_docx_cv(SAMPLE_CV)) == snapshot
+
+
+def test_paragraphs_only_reference_named_styles():
+    stream = gerar_docx_cv(SAMPLE_CV)
+    stream.seek(0)
+    doc = Document(stream)
+
+    for paragraph in doc.paragraphs:
+        assert paragraph.style.name.startswith("VANT ")
+        for run in paragraph.runs:
+            assert run._r.rPr is None or run._r.rPr.find(qn("w:color")) is None  # Nada de cor direta
+
+
+def test_empty_cv():
+    stream = gerar_docx_cv("")
+    stream.seek(0)
+
+    assert [p.text for p in Document(stream).paragraphs] == ["Currículo vazio"]
+
+
+def test_template_has_no_body_content():
+    assert build_template().paragraphs == []
+
+
+def _write_structure(path, structure):
+    path.parent.mkdir(exist_ok=True)
+    path.write_text(json.dumps(structure, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def _update_golden():
+    # Sempre do gerador antigo: o golden não pode ser gerado pelo código que ele testa
+    from logic import _renderizar_word_old
+
+    _write_structure(GOLDEN_PATH, describe_docx(_renderizar_word_old(LEGACY_SAMPLE_CV)))
+    print(f"✅ Golden atualizado: {GOLDEN_PATH}")
+
+
+def _update_snapshot():
+    _write_structure(SNAPSHOT_PATH, describe_docx(gerar_docx_cv(SAMPLE_CV)))
+    print(f"✅ Snapshot atualizado: {SNAPSHOT_PATH}")
+
+
+if __name__ == "__main__":
+    if "--update-golden" in sys.argv:
+        _update_golden()
+        sys.exit(0)
+    if "--update-snapshot" in sys.argv:
+        _update_snapshot()
+        sys.exit(0)
+
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO DOCX VIA TEMPLATE")
+    print("=" * 60)
+    test_unchanged_blocks_match_legacy_golden()
+    print("   ✅ Blocos inalterados iguais ao golden do gerador antigo")
+    test_deliberate_changes_are_only_skills_and_label_bold()
+    print("   ✅ Mudanças deliberadas restritas a skills e negrito de rótulo")
+    test_output_structure_matches_ast_snapshot()
+    print("   ✅ Estrutura igual ao snapshot da AST")
+    test_paragraphs_only_reference_named_styles()
+    print("   ✅ Só estilos nomeados, sem formatação direta")
+    test_empty_cv()
+    print("   ✅ CV vazio")
+    test_template_has_no_body_content()
+    print("   ✅ Template sem conteúdo no corpo")
@@ -0,0 +1,96 @@
+"""
+Teste da fila durável de jobs (backend SQLite)
+Execute: python test_job_queue.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from job_queue import JobWorkerPool, SQLiteJobStore
+
+
+def _store(tmp_path):
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_enqueue_is_idempotent_per_session(tmp_path):
+    store = _store(tmp_path)
+
+    first = store.enqueue("premium_analysis", {"a": 1}, session_id="s1")
+    second = store.enqueue("premium_analysis", {"a": 2}, session_id="s1")
+
+    assert first is not None and second is None
+    assert store.stats()["depth"] == 1
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    store = _store(tmp_path)
+    store.enqueue("premium_analysis", {}, session_id="s1")
+
+    job = store.claim("worker-a", lease_seconds=-1)  # Worker "morre" com o lease vencido
+    assert job["attempts"] == 1
+
+    retaken = store.claim("worker-b", lease_seconds=60)
+    assert retaken["id"] == job["id"] and retaken["attempts"] == 2
+    assert store.claim("worker-c", lease_seconds=60) is None
+
+
+def test_exhausted_jobs_are_swept(tmp_path):
+    store = _store(tmp_path)
+    store.enqueue("premium_analysis", {}, session_id="s1")
+    store._conn.execute("UPDATE analysis_jobs SET max_attempts = 1")
+
+    store.claim("worker-a", lease_seconds=-1)
+
+    assert store.claim("worker-b", lease_seconds=60) is None
+    assert store.sweep() == [{"job_id": 1, "session_id": "s1"}]
+    assert store.stats()["failed"] == 1
+
+
+def test_pool_runs_handler_and_retries_failures(tmp_path):
+    store = _store(tmp_path)
+    pool = JobWorkerPool(store, workers=2, poll_seconds=0.05, lease_seconds=30, retry_backoff_seconds=0)
+    calls = []
+    done = threading.Event()
+
+    def handler(payload, job):
+        calls.append((payload["n"], job["attempts"]))
+        if payload["n"] == 2 and job["attempts"] == 1:
+            raise RuntimeError("falha transitória")
+        if len(calls) == 3:
+            done.set()
+
+    pool.register_handler("premium_analysis", handler)
+    pool.enqueue("premium_analysis", {"n": 1}, session_id="s1")
+    pool.enqueue("premium_analysis", {"n": 2}, session_id="s2")
+    pool.start()
+    try:
+        assert done.wait(5)
+        time.sleep(0.1)
+    finally:
+        pool.stop()
+
+    assert sorted(calls) == [(1, 1), (2, 1), (2, 2)]
+    stats = pool.stats()
+    assert stats["processed"] == 2 and stats["retried"] == 1
+    assert stats["queue"]["depth"] == 0
+
+
+if __name__ == "__main__":
+    import tempfile
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DA FILA DURÁVEL DE JOBS")
+    print("=" * 60)
+    for test, label in [
+        (test_enqueue_is_idempotent_per_session, "Enfileirar a mesma sessão não duplica o job"),
+        (test_expired_lease_is_claimed_again, "Lease vencido devolve o job à fila"),
+        (test_exhausted_jobs_are_swept, "Jobs esgotados são marcados como failed"),
+        (test_pool_runs_handler_and_retries_failures, "Pool executa handlers e refaz falhas"),
+    ]:
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+        print(f"   ✅ {label}")
@@ -0,0 +1,169 @@
+"""
+Teste do motor de keywords compilado (equivalência com as funções antigas)
+Execute: python test_keyword_engine.py
+
+As implementações LEGADAS abaixo reproduzem detect_job_area (um re.search por
+termo) e CacheManager._extract_keywords/_normalize_string antes do
+keyword_engine: os hashes do cache parcial dependem de a saída ser idêntica.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from keyword_engine import AREA_KEYWORDS, GENERIC_PHRASES, keyword_engine, normalize_for_cache
+
+SAMPLE_JOBS = [
+    "Vaga: Analista de Dados Pleno - São Paulo\nSQL, Python, pandas, Power BI e AWS. Big data e machine learning.",
+    "Desenvolvedor Full Stack Sênior - Remoto\nReact, Node, Docker, Kubernetes, Postgres. Scrum e Kanban.",
+    "Técnico de TI N1/N2 - Suporte em infraestrutura, help desk, redes e hardware.",
+    "Infra: sysadmin para service desk e field service.",
+    "Product Owner (PO) - roadmap, backlog, user story, agile. PM bem-vindo.",
+    "Analista de Marketing - growth, SEO, CRM, inbound, social media e tráfego pago. Designer e redator.",
+    "Executivo de Contas (SDR/BDR) - vendas, negociação, churn, pós-venda, customer success.",
+    "Analista de RH - R.H. recrutamento, recursos humanos, tech recruiter, BP, business partner, gestão de pessoas.",
+    "Controller Financeiro - FP&A, tesouraria, contabilidade, contábil, fiscal, auditoria, banco, fusões.",
+    "Mestre de obras / pedreiro / servente - construção civil, elétrica, eletricista, manutenção.",
+    "Chef de cozinha para restaurante - gastronomia, culinária, alimento, cook.",
+    "Busco oportunidades profissionais com foco em resultados e inovação.",
+    "Engenheiro de Software Java Jr - C++, C#, .NET, asp.net, Go, Rust, PHP, Ruby, MySQL, NoSQL, MongoDB, GCP, Azure.",
+    "Cientista de dados - inteligência artificial, IA, analytics, business intelligence, data lake, database.",
+    "Coordenador / Gerente / Supervisor de DP - departamento pessoal, people, talent, liderança.",
+    "Especialista DevOps Cloud - mobile web UX UI security, supply chain, logística, administrativo.",
+    "biology mobi po pm seo crm dp bp rh ia bi javascript python3 reactive",
+    "",
+    "vaga: consultor comercial plpleno",
+    "Operador de produção - sem requisitos especiais",
+]
+
+
+def legacy_detect_job_area(job_description):
+    job_lower = job_description.lower()
+    generic_keywords = [re.escape(p) for p in GENERIC_PHRASES]
+    for pattern in generic_keywords:
+        if re.search(pattern, job_lower):
+            return "global_soft_skills"
+    keyword_map = {
+        area: [re.escape(p[:-2]) + r"\b" if p.endswith(r"\b") else re.escape(p) for p in patterns]
+        for area, patterns in AREA_KEYWORDS.items()
+    }
+    best_match = "global_soft_skills"
+    max_count = 0
+    for area, patterns in keyword_map.items():
+        count = 0
+        for pattern in patterns:
+            if re.search(pattern, job_lower):
+                count += 1
+        if count > max_count:
+            max_count = count
+            best_match = area
+    return best_match
+
+
+def legacy_extract_keywords(text):
+    text_lower = text.lower()
+    title_match = re.search(r'^(?:vaga:\s*)?([^\n-]+)', text_lower)
+    title_keywords = []
+    if title_match:
+        title = title_match.group(1)
+        title_words = re.findall(r'\b(desenvolvedor|engenheiro|analista|gerente|coordenador|especialista|consultor|representante|assistente|auxiliar|operador|técnico|full|stack|backend|frontend|mobile|web|software|dados|devops|cloud|security|ux|ui|product|project|scrum|master|hr|rh|vendas|comercial|marketing|financeiro|contábil|administrativo|logística|supply|chain)\b', title)
+        title_keywords = title_words[:4]
+    level_keywords = []
+    if any(word in text_lower for word in ['senior', 'sênior', 'sr']):
+        level_keywords.append('senior')
+    elif any(word in text_lower for word in ['pleno', 'pl']):
+        level_keywords.append('pleno')
+    elif any(word in text_lower for word in ['junior', 'júnior', 'jr']):
+        level_keywords.append('junior')
+    tech_patterns = [
+        r'\b(react|angular|vue)\b',
+        r'\b(node|python|java|go|rust|php|ruby|c\+\+|c#|\.net)\b',
+        r'\b(sql|nosql|mongodb|postgres|mysql)\b',
+        r'\b(aws|azure|gcp|cloud|docker|kubernetes)\b',
+        r'\b(agile|scrum|kanban)\b'
+    ]
+    tech_keywords = []
+    for pattern in tech_patterns:
+        tech_keywords.extend(re.findall(pattern, text_lower))
+    all_keywords = title_keywords + level_keywords + tech_keywords[:3]
+    seen = set()
+    unique_keywords = []
+    for kw in all_keywords:
+        if kw not in seen:
+            seen.add(kw)
+            unique_keywords.append(kw)
+    return unique_keywords[:6]
+
+
+def legacy_normalize_string(text):
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    stopwords = {
+        'de', 'para', 'the', 'and', 'or', 'in', 'on', 'at', 'to', 'for', 'of', 'with',
+        'by', 'from', 'as', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should',
+        'may', 'might', 'must', 'can', 'shall', 'um', 'uma', 'uns', 'umas', 'o', 'a',
+        'os', 'as', 'em', 'no', 'na', 'nos', 'nas', 'por', 'pelo', 'pela', 'pelas',
+        'como', 'com', 'sem', 'se', 'mas', 'mais', 'menos', 'muito', 'muita', 'muito',
+        'pouco', 'pouca', 'poucos', 'poucas', 'também', 'tambem', 'ainda', 'já', 'ja',
+        'sobre', 'entre', 'após', 'apos', 'ate', 'até', 'desde', 'durante', 'através',
+        'atraves', 'contra', 'sem', 'sob', 'sobre', 'depois', 'antes', 'durante'
+    }
+    words = [word.strip() for word in text.split() if word.strip() not in stopwords]
+    words.sort()
+    return ' '.join(words)
+
+
+def test_detect_area_matches_legacy():
+    for job in SAMPLE_JOBS:
+        assert keyword_engine.detect_area(job) == legacy_detect_job_area(job), job
+
+
+def test_area_scores_match_legacy_counts():
+    for job in SAMPLE_JOBS:
+        job_lower = job.lower()
+        scores, _ = keyword_engine.area_scores(job_lower)
+        for area, patterns in AREA_KEYWORDS.items():
+            expected = sum(
+                1 for p in patterns
+                if re.search(re.escape(p[:-2]) + r"\b" if p.endswith(r"\b") else re.escape(p), job_lower)
+            )
+            assert scores[area] == expected, (area, job)
+
+
+def test_extract_keywords_matches_legacy():
+    for job in SAMPLE_JOBS:
+        assert keyword_engine.extract_keywords(job) == legacy_extract_keywords(job), job
+
+
+def test_normalize_matches_legacy():
+    for job in SAMPLE_JOBS:
+        assert normalize_for_cache(job) == legacy_normalize_string(job), job
+
+
+def test_analyze_batch():
+    profiles = keyword_engine.analyze_batch(SAMPLE_JOBS[:2])
+    assert profiles[0]["area"] == "ti_dados_ai"
+    assert profiles[0]["seniority"] == "pleno"
+    assert profiles[1]["seniority"] == "senior"
+    assert profiles[1]["keywords"] == legacy_extract_keywords(SAMPLE_JOBS[1])
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO KEYWORD ENGINE")
+    print("=" * 60)
+    test_detect_area_matches_legacy()
+    print("   ✅ detect_area idêntico ao legado")
+    test_area_scores_match_legacy_counts()
+    print("   ✅ Pontuação por área idêntica ao legado")
+    test_extract_keywords_matches_legacy()
+    print("   ✅ extract_keywords idêntico ao legado")
+    test_normalize_matches_legacy()
+    print("   ✅ normalize_for_cache idêntico ao legado")
+    test_analyze_batch()
+    print("   ✅ analyze_batch")
@@ -0,0 +1,122 @@
+"""
+Teste do scheduler de IA (pago antes de grátis, aging anti-starvation, métricas)
+Execute: python test_llm_scheduler.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from llm_scheduler import PriorityScheduler, priority_class_for_agent
+
+
+def _run_queued(scheduler, classes):
+    """Ocupa o único slot, enfileira `classes` em ordem e devolve a ordem de despacho."""
+    order = []
+    release = threading.Event()
+
+    def hold():
+        with scheduler.slot("paid"):
+            release.wait()
+
+    def call(cls):
+        with scheduler.slot(cls):
+            order.append(cls)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.05)
+    threads = []
+    for cls in classes:
+        t = threading.Thread(target=call, args=(cls,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.05)
+    release.set()
+    for t in [holder, *threads]:
+        t.join(timeout=5)
+    return order
+
+
+def test_paid_dispatches_before_free():
+    scheduler = PriorityScheduler(max_concurrency=1, aging_seconds=60, enabled=True)
+
+    order = _run_queued(scheduler, ["free", "paid", "paid_critical"])
+
+    assert order == ["paid_critical", "paid", "free"]
+
+
+def test_aging_prevents_starvation():
+    scheduler = PriorityScheduler(max_concurrency=1, aging_seconds=0.05, enabled=True)
+
+    # Depois de esperar 2 períodos de aging o preview alcança a classe crítica (e chegou antes)
+    order = _run_queued(scheduler, ["free", "paid_critical"])
+
+    assert order[0] == "free"
+    assert scheduler.stats()["classes"]["free"]["promoted_by_aging"] == 1
+
+
+def test_metrics_track_wait_and_slo_violations():
+    scheduler = PriorityScheduler(max_concurrency=1, aging_seconds=60,
+                                  wait_slo_ms={"free": 10}, enabled=True)
+
+    _run_queued(scheduler, ["free"])
+    free = scheduler.stats()["classes"]["free"]
+
+    assert free["calls"] == 1
+    assert free["slo_violations"] == 1
+    assert free["wait_p95_ms"] >= 10
+
+
+def test_agent_classes():
+    assert priority_class_for_agent("cv_writer_semantic") == "paid_critical"
+    assert priority_class_for_agent("diagnosis") == "paid_critical"
+    assert priority_class_for_agent("library") == "paid"
+
+
+def test_paid_pipeline_runs_preview_as_paid_critical(monkeypatch):
+    pytest.importorskip("google.genai")
+    import llm_core
+    import logic
+
+    calls = []
+
+    def fake_preview(cv_text, job_description, forced_area=None, priority_class="free"):
+        calls.append(priority_class)
+        return {"nota_ats": 70}
+
+    def failing_diagnosis(*args, **kwargs):
+        raise RuntimeError("diagnóstico indisponível")  # Encerra o pipeline logo após a nota estrutural
+
+    monkeypatch.setattr(logic, "analyze_preview_lite", fake_preview)
+    monkeypatch.setattr(llm_core, "agent_diagnosis", failing_diagnosis)
+    monkeypatch.setattr(llm_core, "update_session_progress", lambda *args: True)
+
+    result = llm_core._run_streaming_pipeline(
+        "s1", "cv", "vaga", None, [], None, "u1", None, final_attempt=True
+    )
+
+    assert result is None
+    assert calls == ["paid_critical"]
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO LLM SCHEDULER")
+    print("=" * 60)
+    test_paid_dispatches_before_free()
+    print("   ✅ Trabalho pago (crítico primeiro) despacha antes do grátis")
+    test_aging_prevents_starvation()
+    print("   ✅ Aging impede starvation dos previews")
+    test_metrics_track_wait_and_slo_violations()
+    print("   ✅ Métricas de espera e violações de SLO por classe")
+    test_agent_classes()
+    print("   ✅ Classes dos agentes do pipeline pago")
+    with pytest.MonkeyPatch.context() as mp:
+        test_paid_pipeline_runs_preview_as_paid_critical(mp)
+    print("   ✅ Nota estrutural do pipeline pago como paid_critical")
@@ -0,0 +1,62 @@
+"""
+Teste do renderer de PDF aquecido (envelope HTML e fallback do pool)
+Execute: python test_pdf_renderer.py
+"""
+
+import sys
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import pdf_renderer
+
+
+class BrokenPool:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker morto")
+
+    def shutdown(self, *args, **kwargs):
+        pass
+
+
+def test_envelope_has_no_inline_css():
+    html = pdf_renderer.build_document_html("<h1>Maria</h1>")
+
+    assert '<div class="cv-paper-sheet"><h1>Maria</h1></div>' in html
+    assert "<style>" not in html  # CSS entra como stylesheet pré-parseado
+
+
+def test_broken_pool_falls_back_to_current_process(monkeypatch):
+    rendered = []
+    monkeypatch.setattr(pdf_renderer, "PDF_RENDER_PROCESSES", 1)
+    monkeypatch.setattr(pdf_renderer, "_pool", BrokenPool())
+    monkeypatch.setattr(pdf_renderer, "_render_html", lambda html: rendered.append(html) or b"%PDF-1.7")
+
+    assert pdf_renderer.render_pdf("<p>cv</p>") == b"%PDF-1.7"
+    assert len(rendered) == 1
+    assert pdf_renderer._pool is None  # Recriado na próxima chamada
+
+
+def test_without_pool_renders_in_process(monkeypatch):
+    monkeypatch.setattr(pdf_renderer, "PDF_RENDER_PROCESSES", 0)
+    monkeypatch.setattr(pdf_renderer, "_render_html", lambda html: b"%PDF-1.7")
+
+    assert pdf_renderer.get_render_pool() is None
+    assert pdf_renderer.render_pdf("<p>cv</p>") == b"%PDF-1.7"
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO RENDERER DE PDF")
+    print("=" * 60)
+    test_envelope_has_no_inline_css()
+    print("   ✅ Envelope sem CSS inline duplicado")
+    with pytest.MonkeyPatch.context() as mp:
+        test_broken_pool_falls_back_to_current_process(mp)
+    print("   ✅ Pool quebrado -> render no processo atual")
+    with pytest.MonkeyPatch.context() as mp:
+        test_without_pool_renders_in_process(mp)
+    print("   ✅ PDF_RENDER_PROCESSES=0 renderiza no processo atual")
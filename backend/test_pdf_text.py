@@ -0,0 +1,47 @@
+"""
+Teste da extração de PDF com parada antecipada (orçamento de caracteres)
+Execute: python test_pdf_text.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pdf_text import collect_until_budget
+
+
+def _lazy_pages(texts, extracted):
+    for text in texts:
+        extracted.append(text)
+        yield text
+
+
+def test_stops_extracting_once_budget_is_met():
+    extracted = []
+    pages = ["a" * 10_000] * 40
+
+    parts, pages_read = collect_until_budget(_lazy_pages(pages, extracted), 25_000)
+
+    assert pages_read == 3
+    assert len(extracted) == 3  # As 37 páginas restantes nunca foram extraídas
+    assert len("".join(parts)) == 30_000
+
+
+def test_short_documents_are_read_entirely():
+    extracted = []
+
+    parts, pages_read = collect_until_budget(_lazy_pages(["cv ", "", "skills"], extracted), 25_000)
+
+    assert pages_read == 3
+    assert "".join(parts) == "cv skills"
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DA EXTRAÇÃO DE PDF")
+    print("=" * 60)
+    test_stops_extracting_once_budget_is_met()
+    print("   ✅ Para de extrair páginas quando o orçamento fecha")
+    test_short_documents_are_read_entirely()
+    print("   ✅ Documentos curtos são lidos inteiros")
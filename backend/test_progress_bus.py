@@ -0,0 +1,73 @@
+"""
+Teste do barramento de progresso (deltas, resume token e entrega entre threads)
+Execute: python test_progress_bus.py
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from progress_bus import ProgressBus
+
+
+def test_events_carry_only_new_or_changed_keys():
+    bus = ProgressBus()
+
+    bus.publish("s1", "diagnostico_pronto", {"veredito": "ok", "nota_ats": 70})
+    bus.publish("s1", "cv_pronto", {"cv_otimizado_completo": "<html>"})
+    final = bus.publish("s1", "completed", {"veredito": "ok", "nota_ats": 72, "cv_otimizado_completo": "<html>"})
+
+    assert final["data"] == {"nota_ats": 72}
+    assert [e["seq"] for e in bus.events_since("s1")] == [1, 2, 3]
+
+
+def test_resume_token_replays_only_later_events():
+    bus = ProgressBus()
+    for step in ("starting", "diagnostico_pronto", "cv_pronto"):
+        bus.publish("s2", step, {step: True})
+
+    assert [e["step"] for e in bus.events_since("s2", 2)] == ["cv_pronto"]
+
+
+def test_subscriber_receives_events_published_from_worker_thread():
+    bus = ProgressBus()
+    bus.publish("s3", "starting", {})
+
+    async def consume():
+        queue, backlog = bus.subscribe("s3", 0)
+        worker = threading.Thread(target=bus.publish, args=("s3", "completed", {"nota_ats": 90}))
+        worker.start()
+        event = await asyncio.wait_for(queue.get(), timeout=2)
+        worker.join()
+        bus.unsubscribe("s3", queue)
+        return backlog, event
+
+    backlog, event = asyncio.run(consume())
+    assert [e["step"] for e in backlog] == ["starting"]
+    assert event["step"] == "completed" and event["data"] == {"nota_ats": 90}
+
+
+def test_finished_sessions_are_pruned_after_retention():
+    bus = ProgressBus(retention_seconds=-1)
+    bus.publish("old", "completed", {"a": 1})
+    bus.publish("new", "starting", {})
+
+    assert not bus.knows("old")
+    assert bus.knows("new")
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO PROGRESS BUS")
+    print("=" * 60)
+    test_events_carry_only_new_or_changed_keys()
+    print("   ✅ Eventos levam só as chaves novas/alteradas")
+    test_resume_token_replays_only_later_events()
+    print("   ✅ Resume token reenvia só eventos posteriores")
+    test_subscriber_receives_events_published_from_worker_thread()
+    print("   ✅ Assinante async recebe eventos publicados em outra thread")
+    test_finished_sessions_are_pruned_after_retention()
+    print("   ✅ Sessões terminadas são removidas após a retenção")
@@ -0,0 +1,80 @@
+"""
+Teste da fila de refresh em background (deduplicação por chave)
+Execute: python test_refresh_queue.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from refresh_queue import RefreshQueue
+
+
+def _wait_idle(queue, timeout=5):
+    deadline = time.monotonic() + timeout
+    while queue.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_pending_key_is_refreshed_once():
+    queue = RefreshQueue("teste")
+    release = threading.Event()
+    calls = []
+
+    def refresh(key):
+        release.wait(timeout=5)
+        calls.append(key)
+
+    assert queue.enqueue("hash-a", refresh, "hash-a")
+    assert not queue.enqueue("hash-a", refresh, "hash-a")  # Mesma entrada vencida lida de novo
+    assert queue.enqueue("hash-b", refresh, "hash-b")
+    release.set()
+    _wait_idle(queue)
+
+    assert sorted(calls) == ["hash-a", "hash-b"]
+    stats = queue.stats()
+    assert (stats["enqueued"], stats["deduplicated"], stats["completed"]) == (2, 1, 2)
+
+
+def test_key_can_be_refreshed_again_after_completion():
+    queue = RefreshQueue("teste")
+    calls = []
+
+    queue.enqueue("hash-a", calls.append, 1)
+    _wait_idle(queue)
+    assert queue.enqueue("hash-a", calls.append, 2)
+    _wait_idle(queue)
+
+    assert calls == [1, 2]
+
+
+def test_full_queue_drops_and_failures_are_counted():
+    queue = RefreshQueue("teste", max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    def failing():
+        release.wait(timeout=5)
+        raise RuntimeError("IA indisponível")
+
+    assert queue.enqueue("hash-a", failing)
+    assert not queue.enqueue("hash-b", failing)  # Fila cheia
+    release.set()
+    _wait_idle(queue)
+
+    stats = queue.stats()
+    assert (stats["dropped"], stats["failed"], stats["pending"]) == (1, 1, 0)
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DA FILA DE REFRESH")
+    print("=" * 60)
+    test_pending_key_is_refreshed_once()
+    print("   ✅ Chave pendente é atualizada uma única vez")
+    test_key_can_be_refreshed_again_after_completion()
+    print("   ✅ Depois de concluída, a chave pode ser atualizada de novo")
+    test_full_queue_drops_and_failures_are_counted()
+    print("   ✅ Fila cheia descarta e falhas são contadas")
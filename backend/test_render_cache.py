@@ -0,0 +1,102 @@
+"""
+Teste do cache de documentos renderizados (PDF/DOCX)
+Execute: python test_render_cache.py
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from render_cache import RenderCache, render_key
+
+
+class CountingRenderer:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self, cv_text):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"%PDF {cv_text}".encode()
+
+
+def test_same_cv_renders_once():
+    cache = RenderCache(max_bytes=1024 * 1024, enabled=True)
+    render = CountingRenderer()
+
+    first = cache.get_or_render("pdf", "CV A", render)
+    second = cache.get_or_render("pdf", "CV A", render)
+
+    assert first == second == b"%PDF CV A"
+    assert render.calls == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_formats_and_contents_have_distinct_keys():
+    assert render_key("pdf", "CV A") != render_key("docx", "CV A")
+    assert render_key("pdf", "CV A") != render_key("pdf", "CV B")
+
+
+def test_concurrent_downloads_share_one_render():
+    cache = RenderCache(max_bytes=1024 * 1024, enabled=True)
+    render = CountingRenderer(delay=0.2)
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_render("pdf", "CV C", render)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert render.calls == 1
+    assert results == [b"%PDF CV C"] * 4
+
+
+def test_failed_render_is_not_cached():
+    cache = RenderCache(max_bytes=1024 * 1024, enabled=True)
+
+    def broken(cv_text):
+        raise RuntimeError("weasyprint caiu")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_render("pdf", "CV D", broken)
+    assert cache.stats()["items"] == 0
+
+
+def test_lru_is_bounded_by_bytes():
+    cache = RenderCache(max_bytes=25, enabled=True)
+    render = CountingRenderer()
+
+    for text in ("CV 1", "CV 2", "CV 3"):
+        cache.get_or_render("pdf", text, render)  # 9 bytes cada
+
+    stats = cache.stats()
+    assert stats["items"] == 2
+    assert stats["bytes"] <= 25
+    cache.get_or_render("pdf", "CV 1", render)  # Foi despejado: renderiza de novo
+    assert render.calls == 4
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO CACHE DE DOCUMENTOS RENDERIZADOS")
+    print("=" * 60)
+    test_same_cv_renders_once()
+    print("   ✅ Mesmo CV renderizado uma única vez")
+    test_formats_and_contents_have_distinct_keys()
+    print("   ✅ Chaves distintas por formato e conteúdo")
+    test_concurrent_downloads_share_one_render()
+    print("   ✅ Downloads simultâneos compartilham um render")
+    test_failed_render_is_not_cached()
+    print("   ✅ Render com erro não entra no cache")
+    test_lru_is_bounded_by_bytes()
+    print("   ✅ LRU limitado em bytes")
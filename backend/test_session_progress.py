@@ -0,0 +1,82 @@
+"""
+Teste da gravação de progresso das sessões (coalescência de steps)
+Execute: python test_session_progress.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from session_progress import SessionProgressWriter
+
+
+class RecordingWriter(SessionProgressWriter):
+    """Writer que registra as escritas em vez de chamar o Supabase."""
+
+    def __init__(self, coalesce_ms):
+        super().__init__(coalesce_ms=coalesce_ms)
+        self.calls = []
+
+    def _write(self, session_id, data_chunk, step_name):
+        self.calls.append((session_id, dict(data_chunk), step_name))
+        return True
+
+
+def test_steps_within_window_are_written_once():
+    writer = RecordingWriter(coalesce_ms=100)
+
+    writer.update("s1", {"cv_otimizado_completo": "<html>"}, "cv_pronto")
+    writer.update("s1", {"biblioteca_tecnica": []}, "library_pronta")
+    writer.update("s1", {"kit_hacker": {}}, "tactical_pronto")
+    assert writer.calls == []
+
+    time.sleep(0.3)
+    assert writer.calls == [
+        ("s1", {"cv_otimizado_completo": "<html>", "biblioteca_tecnica": [], "kit_hacker": {}}, "tactical_pronto")
+    ]
+
+
+def test_terminal_step_writes_immediately_with_pending_data():
+    writer = RecordingWriter(coalesce_ms=10_000)
+
+    writer.update("s2", {"biblioteca_tecnica": ["livro"]}, "library_pronta")
+    writer.update("s2", {"nota_ats": 80}, "completed")
+
+    assert writer.calls == [("s2", {"biblioteca_tecnica": ["livro"], "nota_ats": 80}, "completed")]
+    time.sleep(0.05)
+    assert writer.stats()["pending_sessions"] == 0
+
+
+def test_zero_window_writes_every_step():
+    writer = RecordingWriter(coalesce_ms=0)
+
+    writer.update("s3", {"a": 1}, "diagnostico_pronto")
+    writer.update("s3", {"b": 2}, "cv_pronto")
+
+    assert [call[2] for call in writer.calls] == ["diagnostico_pronto", "cv_pronto"]
+
+
+def test_sessions_are_coalesced_independently():
+    writer = RecordingWriter(coalesce_ms=10_000)
+
+    writer.update("a", {"x": 1}, "cv_pronto")
+    writer.update("b", {"y": 2}, "cv_pronto")
+    writer.flush()
+
+    assert sorted(writer.calls) == [("a", {"x": 1}, "cv_pronto"), ("b", {"y": 2}, "cv_pronto")]
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO PROGRESSO DE SESSÃO")
+    print("=" * 60)
+    test_steps_within_window_are_written_once()
+    print("   ✅ Steps dentro da janela viram uma única escrita")
+    test_terminal_step_writes_immediately_with_pending_data()
+    print("   ✅ Step terminal grava na hora levando o pendente")
+    test_zero_window_writes_every_step()
+    print("   ✅ Janela 0 grava todos os steps")
+    test_sessions_are_coalesced_independently()
+    print("   ✅ Sessões coalescidas de forma independente")
@@ -0,0 +1,84 @@
+"""
+Teste do índice de similaridade (MinHash + LSH) do cache parcial
+Execute: python test_similarity_index.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from similarity_index import (
+    LSHIndex,
+    estimate_jaccard,
+    lsh_buckets,
+    minhash_signature,
+    passes_quality_guard,
+    shingles,
+)
+
+VAGA_BASE = (
+    "Analista de Dados Pleno. Requisitos: SQL avançado, Python com pandas, "
+    "experiência com Power BI e modelagem dimensional, construção de pipelines "
+    "de ETL em ambiente cloud AWS, comunicação com áreas de negócio e "
+    "elaboração de dashboards executivos para tomada de decisão."
+)
+VAGA_MESMA_COM_BOILERPLATE = VAGA_BASE + " Benefícios: vale refeição e plano de saúde."
+VAGA_DIFERENTE = (
+    "Desenvolvedor Frontend React Sênior para squad de pagamentos, com TypeScript, "
+    "testes automatizados, design system e acessibilidade."
+)
+
+META = {"area": "dados", "level": "pleno", "gap_tokens": ["power", "sql"]}
+
+
+def test_signature_is_deterministic():
+    assert minhash_signature(shingles(VAGA_BASE)) == minhash_signature(shingles(VAGA_BASE))
+    assert minhash_signature(set()) == []
+
+
+def test_near_duplicates_score_high_and_share_buckets():
+    sig_a = minhash_signature(shingles(VAGA_BASE))
+    sig_b = minhash_signature(shingles(VAGA_MESMA_COM_BOILERPLATE))
+    sig_c = minhash_signature(shingles(VAGA_DIFERENTE))
+
+    assert estimate_jaccard(sig_a, sig_b) >= 0.7
+    assert estimate_jaccard(sig_a, sig_c) <= 0.2
+    assert set(lsh_buckets("tactical", sig_a)) & set(lsh_buckets("tactical", sig_b))
+
+
+def test_quality_guard_blocks_other_profiles():
+    assert passes_quality_guard(META, dict(META))
+    assert not passes_quality_guard(META, {**META, "level": "senior"})
+    assert not passes_quality_guard(META, {**META, "area": "marketing"})
+    assert not passes_quality_guard(META, {**META, "gap_tokens": ["kubernetes"]})
+    assert not passes_quality_guard(META, {})
+
+
+def test_index_best_match_respects_threshold_and_guard():
+    index = LSHIndex()
+    index.add("base", "tactical", minhash_signature(shingles(VAGA_BASE)), META)
+    index.add("outra", "tactical", minhash_signature(shingles(VAGA_DIFERENTE)), META)
+
+    query = minhash_signature(shingles(VAGA_MESMA_COM_BOILERPLATE))
+    match = index.best_match("tactical", query, META, threshold=0.7)
+    assert match is not None and match[0] == "base"
+
+    assert index.best_match("tactical", query, META, threshold=1.01) is None
+    assert index.best_match("tactical", query, {**META, "level": "junior"}, threshold=0.7) is None
+    # Buckets são separados por componente
+    assert index.best_match("library", query, META, threshold=0.7) is None
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO ÍNDICE DE SIMILARIDADE (MinHash + LSH)")
+    print("=" * 60)
+    test_signature_is_deterministic()
+    print("   ✅ Assinatura determinística")
+    test_near_duplicates_score_high_and_share_buckets()
+    print("   ✅ Vagas quase idênticas ficam no mesmo bucket")
+    test_quality_guard_blocks_other_profiles()
+    print("   ✅ Guarda de qualidade bloqueia outros perfis")
+    test_index_best_match_respects_threshold_and_guard()
+    print("   ✅ Índice respeita threshold e guarda")
@@ -0,0 +1,188 @@
+"""
+Teste do Single-Flight (coalescência de requisições idênticas em andamento)
+Execute: python test_single_flight.py
+"""
+
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from single_flight import InflightLockTable, SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight("test")
+    executions = []
+    results = []
+    leaders = []
+
+    def slow_pipeline(value):
+        executions.append(value)
+        time.sleep(0.2)
+        return {"nota_ats": value}
+
+    def worker():
+        result, is_leader = flight.do("hash-abc", slow_pipeline, 87)
+        results.append(result)
+        leaders.append(is_leader)
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(executions) == 1
+    assert results == [{"nota_ats": 87}] * 5
+    assert leaders.count(True) == 1
+    assert flight.in_flight() == 0
+
+
+def test_followers_receive_leader_exception():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    errors = []
+
+    def failing_pipeline():
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("LLM indisponível")
+
+    def worker():
+        try:
+            flight.do("hash-err", failing_pipeline)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=worker)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=worker)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert errors == ["LLM indisponível", "LLM indisponível"]
+    assert flight.in_flight() == 0
+
+
+def test_sequential_calls_are_not_coalesced():
+    flight = SingleFlight("test")
+    calls = []
+
+    for i in range(3):
+        result, is_leader = flight.do("hash-seq", lambda: calls.append(i) or i)
+        assert is_leader
+
+    assert len(calls) == 3
+
+
+class _FakeLockTable(InflightLockTable):
+    """Lock ocupado por outro worker até `free_after` tentativas."""
+
+    def __init__(self, free_after, wait_seconds=0.0):
+        super().__init__()
+        self.free_after = free_after
+        self.wait_seconds = wait_seconds
+        self.attempts = 0
+        self.waits = 0
+        self.timeouts = []
+
+    def try_acquire(self, key):
+        self.attempts += 1
+        return self.attempts > self.free_after
+
+    def wait_for_release(self, key, poll_seconds=1.0, timeout=None):
+        self.waits += 1
+        self.timeouts.append(timeout)
+        time.sleep(min(self.wait_seconds, timeout))
+
+
+def test_lock_waits_and_reuses_other_worker_result():
+    locks = _FakeLockTable(free_after=99)
+    acquired, result = locks.acquire_or_wait("hash-abc", lambda: {"nota_ats": 90})
+
+    assert (acquired, result) == (False, {"nota_ats": 90})
+    assert locks.waits == 1
+
+
+def test_lock_is_acquired_before_running_when_result_missing():
+    locks = _FakeLockTable(free_after=2)
+    acquired, result = locks.acquire_or_wait("hash-abc", lambda: None)
+
+    assert (acquired, result) == (True, None)
+    assert locks.attempts == 3 and locks.waits == 2
+
+
+def test_lock_gives_up_after_max_waits():
+    locks = _FakeLockTable(free_after=99)
+    acquired, result = locks.acquire_or_wait("hash-abc", lambda: None, max_waits=2)
+
+    assert (acquired, result) == (False, None)
+    assert locks.waits == 2
+
+
+def test_lock_total_wait_is_bounded():
+    locks = _FakeLockTable(free_after=99, wait_seconds=0.2)  # Cada espera "dura" 0.2s
+    start = time.monotonic()
+    acquired, result = locks.acquire_or_wait("hash-abc", lambda: None, max_waits=10, max_wait_seconds=0.3)
+
+    assert (acquired, result) == (False, None)  # Desiste e calcula localmente
+    assert time.monotonic() - start < 1.0
+    assert locks.waits == 2 and locks.timeouts[0] <= 0.3 and locks.timeouts[1] < 0.2
+
+
+class _HeldLockClient:
+    """Supabase com o lock sempre ocupado (expira só daqui a uma hora)."""
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        expires_at = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+        return type("Response", (), {"data": [{"expires_at": expires_at}]})()
+
+
+def test_wait_for_release_honours_timeout():
+    locks = InflightLockTable(ttl_seconds=300)
+    locks._client = lambda: _HeldLockClient()
+
+    start = time.monotonic()
+    locks.wait_for_release("hash-abc", poll_seconds=0.05, timeout=0.2)
+
+    assert time.monotonic() - start < 0.5
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO SINGLE-FLIGHT")
+    print("=" * 60)
+    test_concurrent_identical_calls_share_one_execution()
+    print("   ✅ Chamadas concorrentes idênticas executam uma única vez")
+    test_followers_receive_leader_exception()
+    print("   ✅ Seguidores recebem a exceção do líder")
+    test_sequential_calls_are_not_coalesced()
+    print("   ✅ Chamadas sequenciais não são coalescidas")
+    test_lock_waits_and_reuses_other_worker_result()
+    print("   ✅ Lock ocupado: espera e reaproveita o resultado do outro worker")
+    test_lock_is_acquired_before_running_when_result_missing()
+    print("   ✅ Sem resultado pronto: só executa depois de obter o lock")
+    test_lock_gives_up_after_max_waits()
+    print("   ✅ Lock preso: desiste após o limite de esperas")
+    test_lock_total_wait_is_bounded()
+    print("   ✅ Espera total pelo lock limitada (depois calcula localmente)")
+    test_wait_for_release_honours_timeout()
+    print("   ✅ wait_for_release respeita o timeout")
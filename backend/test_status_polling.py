@@ -0,0 +1,147 @@
+"""
+Teste do status condicional / delta / long-poll da análise
+Execute: python test_status_polling.py
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from progress_bus import ProgressBus
+from status_polling import resolve_status, session_etag
+
+
+def _session(step, result_data, updated_at="2026-01-01T00:00:00"):
+    return {
+        "status": "processing",
+        "current_step": step,
+        "result_data": result_data,
+        "created_at": "2026-01-01T00:00:00",
+        "updated_at": updated_at,
+    }
+
+
+def _fetcher(*sessions):
+    """fetch() que devolve as sessões na ordem (repete a última)."""
+    reads = list(sessions)
+
+    async def fetch(session_id):
+        return reads.pop(0) if len(reads) > 1 else reads[0]
+    return fetch
+
+
+def test_matching_etag_returns_304_without_body():
+    session = _session("cv_pronto", {"nota_ats": 70})
+    etag = session_etag(session)
+
+    status, headers, body = asyncio.run(
+        resolve_status("s1", session, _fetcher(session), if_none_match=f'"x", {etag}')
+    )
+
+    assert (status, body) == (304, None)
+    assert headers["ETag"] == etag
+
+
+def test_changed_session_returns_full_body_and_new_etag():
+    session = _session("cv_pronto", {"nota_ats": 70})
+    old_etag = session_etag(_session("diagnostico_pronto", {}))
+
+    status, headers, body = asyncio.run(
+        resolve_status("s1", session, _fetcher(session), if_none_match=old_etag)
+    )
+
+    assert status == 200
+    assert headers["ETag"] == session_etag(session) != old_etag
+    assert body["result_data"] == {"nota_ats": 70} and body["delta"] is False
+
+
+def test_since_step_returns_only_keys_written_after_it():
+    bus = ProgressBus()
+    bus.publish("s2", "diagnostico_pronto", {"nota_ats": 70, "gaps_fatais": []})
+    bus.publish("s2", "cv_pronto", {"cv_otimizado_completo": "<html>"})
+    session = _session("cv_pronto", {"nota_ats": 70, "gaps_fatais": [], "cv_otimizado_completo": "<html>"})
+
+    status, _, body = asyncio.run(
+        resolve_status("s2", session, _fetcher(session), since_step="diagnostico_pronto", bus=bus)
+    )
+
+    assert status == 200
+    assert body["delta"] is True
+    assert body["result_data"] == {"cv_otimizado_completo": "<html>"}
+
+
+def test_since_step_without_history_returns_everything():
+    session = _session("cv_pronto", {"nota_ats": 70})
+
+    _, _, body = asyncio.run(
+        resolve_status("s3", session, _fetcher(session), since_step="diagnostico_pronto", bus=ProgressBus())
+    )
+
+    assert body["delta"] is False and body["result_data"] == {"nota_ats": 70}
+
+
+def test_long_poll_times_out_with_304_when_nothing_changes():
+    session = _session("cv_pronto", {"nota_ats": 70})
+    etag = session_etag(session)
+
+    t0 = time.monotonic()
+    status, _, _ = asyncio.run(
+        resolve_status("s4", session, _fetcher(session), if_none_match=etag, wait=0.3, bus=ProgressBus())
+    )
+
+    assert status == 304
+    assert 0.25 <= time.monotonic() - t0 < 2
+
+
+def test_long_poll_returns_as_soon_as_the_bus_publishes():
+    bus = ProgressBus()
+    bus.publish("s5", "diagnostico_pronto", {"nota_ats": 70})
+    before = _session("diagnostico_pronto", {"nota_ats": 70})
+    after = _session("cv_pronto", {"nota_ats": 70, "cv_otimizado_completo": "<html>"}, updated_at="2026-01-01T00:00:05")
+
+    publisher = threading.Timer(0.1, bus.publish, args=("s5", "cv_pronto", {"cv_otimizado_completo": "<html>"}))
+    publisher.start()
+    t0 = time.monotonic()
+    status, _, body = asyncio.run(
+        resolve_status("s5", before, _fetcher(after), since_step="diagnostico_pronto", wait=5, bus=bus)
+    )
+    publisher.join()
+
+    assert status == 200 and time.monotonic() - t0 < 2
+    assert body["current_step"] == "cv_pronto"
+    assert body["result_data"] == {"cv_otimizado_completo": "<html>"}
+
+
+def test_terminal_session_does_not_long_poll():
+    session = _session("completed", {"nota_ats": 70})
+
+    t0 = time.monotonic()
+    status, _, _ = asyncio.run(
+        resolve_status("s6", session, _fetcher(session), since_step="completed", wait=5, bus=ProgressBus())
+    )
+
+    assert status == 200 and time.monotonic() - t0 < 0.5
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DO STATUS CONDICIONAL / DELTA / LONG-POLL")
+    print("=" * 60)
+    test_matching_etag_returns_304_without_body()
+    print("   ✅ If-None-Match igual ao ETag -> 304 sem corpo")
+    test_changed_session_returns_full_body_and_new_etag()
+    print("   ✅ Sessão alterada -> 200 com ETag novo")
+    test_since_step_returns_only_keys_written_after_it()
+    print("   ✅ since_step devolve só as chaves novas")
+    test_since_step_without_history_returns_everything()
+    print("   ✅ Sem histórico no bus, devolve tudo (delta: false)")
+    test_long_poll_times_out_with_304_when_nothing_changes()
+    print("   ✅ Long-poll sem mudança expira em 304")
+    test_long_poll_returns_as_soon_as_the_bus_publishes()
+    print("   ✅ Long-poll responde assim que o bus publica")
+    test_terminal_session_does_not_long_poll()
+    print("   ✅ Sessão terminal não segura a conexão")
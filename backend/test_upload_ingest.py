@@ -0,0 +1,88 @@
+"""
+Teste da ingestão de uploads (blocos, limite de tamanho, sniffing e spool)
+Execute: python test_upload_ingest.py
+"""
+
+import hashlib
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import upload_ingest
+from upload_ingest import UploadRejected, ingest_stream, sniff_kind
+
+
+class CountingStream(io.BytesIO):
+    """BytesIO que conta quantos bytes foram lidos."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_pdf_is_hashed_and_kept_intact():
+    data = b"%PDF-1.7\n" + b"x" * 200_000
+
+    with ingest_stream(io.BytesIO(data), "cv.pdf", max_bytes=1024 * 1024) as upload:
+        assert upload.kind == "pdf"
+        assert upload.size == len(data)
+        assert upload.sha256 == hashlib.sha256(data).hexdigest()
+        assert upload.read_bytes() == data
+
+
+def test_junk_is_rejected_on_first_chunk():
+    stream = CountingStream(b"<html>" + b"x" * 1_000_000)
+
+    with pytest.raises(UploadRejected) as exc:
+        ingest_stream(stream, "cv.pdf", max_bytes=5 * 1024 * 1024)
+
+    assert exc.value.status_code == 415
+    assert stream.bytes_read == upload_ingest.UPLOAD_CHUNK_BYTES
+
+
+def test_oversized_upload_stops_reading_at_the_cap():
+    stream = CountingStream(b"%PDF-1.4\n" + b"x" * 3_000_000)
+
+    with pytest.raises(UploadRejected) as exc:
+        ingest_stream(stream, "cv.pdf", max_bytes=1024 * 1024)
+
+    assert exc.value.status_code == 413
+    assert stream.bytes_read <= 1024 * 1024 + upload_ingest.UPLOAD_CHUNK_BYTES
+
+
+def test_large_files_spool_to_disk(monkeypatch):
+    monkeypatch.setattr(upload_ingest, "UPLOAD_SPOOL_MAX_MEMORY_BYTES", 100_000)
+
+    with ingest_stream(io.BytesIO(b"%PDF-1.4\n" + b"x" * 300_000), "cv.pdf", max_bytes=1024 * 1024) as upload:
+        assert upload.spool._rolled
+
+
+def test_docx_sniffing():
+    assert sniff_kind(b"PK\x03\x04....[Content_Types].xml....") == "docx"
+    assert sniff_kind(b"PK\x03\x04 qualquer zip", "fotos.zip") is None
+
+
+if __name__ == "__main__":
+    print("\n" + "=" * 60)
+    print("🧪 TESTE DA INGESTÃO DE UPLOADS")
+    print("=" * 60)
+    test_pdf_is_hashed_and_kept_intact()
+    print("   ✅ PDF com hash calculado em blocos e conteúdo intacto")
+    test_junk_is_rejected_on_first_chunk()
+    print("   ✅ Lixo recusado (415) já no primeiro bloco")
+    test_oversized_upload_stops_reading_at_the_cap()
+    print("   ✅ Upload acima do limite (413) para de ler no limite")
+    with pytest.MonkeyPatch.context() as mp:
+        test_large_files_spool_to_disk(mp)
+    print("   ✅ Arquivos grandes vão para disco")
+    test_docx_sniffing()
+    print("   ✅ Sniffing de DOCX")
@@ -0,0 +1,152 @@
+"""
+Upload Ingest - Leitura de uploads em blocos, com limite de tamanho e sniffing
+
+🎯 PROBLEMA:
+- Os handlers faziam `file.file.read()`: o corpo inteiro ia para a memória
+  antes de qualquer checagem (instância de 512 MB)
+- MAX_PDF_SIZE_MB existia no config mas não era aplicado nas rotas de análise
+- Lixo (imagem, zip qualquer, HTML) só falhava lá no parse do PDF
+
+✅ SOLUÇÃO:
+1. ingest_upload() lê o upload em blocos de UPLOAD_CHUNK_BYTES:
+   - o 1º bloco passa pelo sniffing de magic bytes (PDF / DOCX) -> 415
+   - cada bloco atualiza o SHA-256 (document_id) e o contador de tamanho
+   - passou de MAX_PDF_SIZE_MB -> 413, sem ler o resto
+2. Os bytes vão para um SpooledTemporaryFile: arquivos acima de
+   UPLOAD_SPOOL_MAX_MEMORY_BYTES ficam em disco, não na RAM
+3. O parse (pypdf) lê direto do spool; bytes só são materializados quando
+   precisam sair do processo (Storage, fila de jobs, process pool)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import tempfile
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+UPLOAD_SPOOL_MAX_MEMORY_BYTES = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY_BYTES", str(512 * 1024)))
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+PDF_HEADER_WINDOW = 1024  # A especificação aceita lixo antes do header nos primeiros 1024 bytes
+
+ALLOWED_KINDS = ("pdf", "docx")
+
+
+def max_upload_bytes() -> int:
+    """Limite de upload de CV (MAX_PDF_SIZE_MB do config centralizado, 5 MB por padrão)."""
+    try:
+        from config import settings
+    except ImportError:
+        settings = None
+    size_mb = settings.MAX_PDF_SIZE_MB if settings else int(os.getenv("MAX_PDF_SIZE_MB", "5"))
+    return size_mb * 1024 * 1024
+
+
+class UploadRejected(Exception):
+    """Upload recusado na ingestão (tamanho ou tipo). Vira resposta HTTP na rota."""
+
+    def __init__(self, status_code: int, message: str, code: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+        self.code = code
+
+    def to_content(self) -> dict:
+        return {"error": self.message, "code": self.code}
+
+
+def sniff_kind(head: bytes, filename: Optional[str] = None) -> Optional[str]:
+    """Tipo do arquivo pelos primeiros bytes: "pdf", "docx" ou None."""
+    if PDF_MAGIC in head[:PDF_HEADER_WINDOW]:
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        # DOCX é um zip; o 1º bloco normalmente já traz "[Content_Types].xml" / "word/"
+        if b"word/" in head or b"[Content_Types].xml" in head or (filename or "").lower().endswith(".docx"):
+            return "docx"
+    return None
+
+
+class IngestedUpload:
+    """Upload já validado: hash, tamanho, tipo e o conteúdo num spool (memória/disco)."""
+
+    def __init__(self, spool, sha256: str, size: int, kind: str, filename: Optional[str]):
+        self.spool = spool
+        self.sha256 = sha256
+        self.size = size
+        self.kind = kind
+        self.filename = filename
+
+    def open(self):
+        """Stream posicionado no início (para PdfReader, etc.)."""
+        self.spool.seek(0)
+        return self.spool
+
+    def read_bytes(self) -> bytes:
+        return self.open().read()
+
+    def close(self) -> None:
+        self.spool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _chunks(fileobj, chunk_size: int):
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def ingest_stream(fileobj,
+                  filename: Optional[str] = None,
+                  max_bytes: Optional[int] = None,
+                  allowed_kinds: Tuple[str, ...] = ALLOWED_KINDS) -> IngestedUpload:
+    """
+    Lê `fileobj` em blocos validando tipo (1º bloco) e tamanho (a cada bloco).
+
+    Raises:
+        UploadRejected: 400 (vazio), 415 (tipo não suportado) ou 413 (grande demais)
+    """
+    max_bytes = max_bytes if max_bytes is not None else max_upload_bytes()
+    spool = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_MEMORY_BYTES)
+    digest = hashlib.sha256()
+    size = 0
+    kind = None
+    try:
+        for chunk in _chunks(fileobj, UPLOAD_CHUNK_BYTES):
+            if kind is None:
+                kind = sniff_kind(chunk, filename)
+                if kind not in allowed_kinds:
+                    raise UploadRejected(415, "Formato não suportado. Envie um arquivo PDF ou DOCX.", "unsupported_file_type")
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadRejected(
+                    413, f"Arquivo muito grande. Máximo {max_bytes // (1024 * 1024)}MB.", "file_too_large"
+                )
+            digest.update(chunk)
+            spool.write(chunk)
+        if size == 0:
+            raise UploadRejected(400, "Arquivo vazio.", "empty_file")
+    except UploadRejected as e:
+        spool.close()
+        logger.warning(f"🚫 Upload recusado ({e.code}): {filename or 'sem nome'}")
+        raise
+
+    return IngestedUpload(spool, digest.hexdigest(), size, kind, filename)
+
+
+def ingest_upload(upload, max_bytes: Optional[int] = None,
+                  allowed_kinds: Tuple[str, ...] = ALLOWED_KINDS) -> IngestedUpload:
+    """ingest_stream para um UploadFile do FastAPI."""
+    return ingest_stream(upload.file, upload.filename, max_bytes, allowed_kinds)
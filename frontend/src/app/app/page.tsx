@@ -136,6 +136,22 @@ function getApiUrl(): string {
     return url;
 }
 
+// document_id do backend (SHA-256 do arquivo): o mesmo CV não é reenviado nem reprocessado
+function rememberDocumentId(file: File | null, documentId: unknown) {
+    if (typeof window === "undefined" || !file || typeof documentId !== "string") return;
+    localStorage.setItem("vant_document_id", JSON.stringify({ key: `${file.name}:${file.size}`, id: documentId }));
+}
+
+function getDocumentId(file: File | null): string | null {
+    if (typeof window === "undefined" || !file) return null;
+    try {
+        const saved = JSON.parse(localStorage.getItem("vant_document_id") || "null");
+        return saved && saved.key === `${file.name}:${file.size}` ? saved.id : null;
+    } catch {
+        return null;
+    }
+}
+
 // V3 Layout: Split into separate sections for above-the-fold CRO optimization
 const HERO_HEADER_HTML = `
     <div class="hero-section">
@@ -314,6 +330,79 @@ function calculateDynamicCvCount(): number {
     return currentCount + daySeed;
 }
 
+const STREAM_STEP_STATUS: Record<string, [string, number]> = {
+    starting: ["🔒 PAGAMENTO VERIFICADO. INICIANDO IA GENERATIVA...", 10],
+    extracting_text: ["📄 EXTRAINDO TEXTO DO PDF...", 15],
+    diagnostico_pronto: ["🔍 DIAGNÓSTICO CONCLUÍDO!", 25],
+    cv_pronto: ["✍️ CV OTIMIZADO PRONTO!", 50],
+    library_pronta: ["📚 BIBLIOTECA PRONTA!", 75],
+    tactical_pronto: ["🎯 ESTRATÉGIAS PRONTAS!", 85],
+    completed: ["🎉 ANÁLISE CONCLUÍDA!", 100],
+};
+
+// Progressive loading via SSE: cada evento traz só as chaves novas (delta).
+// Se o stream não estiver disponível ou cair antes do fim, volta para o polling.
+async function streamAnalysisProgress(
+    sessionId: string,
+    updateStatus: (text: string, percent: number) => Promise<void>,
+    setReportData: (data: any) => void,
+    setStage: (stage: AppStage) => void,
+    setCreditsRemaining: (credits: number) => void
+) {
+    if (typeof EventSource === "undefined") {
+        return pollAnalysisProgress(sessionId, updateStatus, setReportData, setStage, setCreditsRemaining);
+    }
+
+    const apiUrl = getApiUrl();
+    const report: Record<string, any> = {};
+
+    const finished = await new Promise<boolean>((resolve, reject) => {
+        const source = new EventSource(`${apiUrl}/api/analysis/stream/${sessionId}`);
+        let errors = 0;
+
+        source.addEventListener("progress", async (evt) => {
+            errors = 0;
+            const { step, data } = JSON.parse((evt as MessageEvent).data);
+            Object.assign(report, data || {});
+
+            const status = STREAM_STEP_STATUS[step];
+            if (status) {
+                await updateStatus(status[0], status[1]);
+            }
+            if (step === "failed") {
+                source.close();
+                reject(new Error(report.error || "Falha no processamento"));
+                return;
+            }
+            if (step !== "starting" && step !== "extracting_text" && Object.keys(report).length > 0) {
+                setReportData({ ...report });
+                setStage("paid");
+            }
+            if (step === "completed") {
+                source.close();
+                if (report.credits_remaining !== undefined) {
+                    setCreditsRemaining(report.credits_remaining);
+                }
+                resolve(true);
+            }
+        });
+
+        // O EventSource reconecta sozinho (com Last-Event-ID); desiste após falhas seguidas
+        source.onerror = () => {
+            errors++;
+            if (errors >= 3) {
+                source.close();
+                resolve(false);
+            }
+        };
+    });
+
+    if (!finished) {
+        console.warn("[SSE] Stream indisponível, voltando para polling");
+        await pollAnalysisProgress(sessionId, updateStatus, setReportData, setStage, setCreditsRemaining);
+    }
+}
+
 // Função auxiliar para polling do progressive loading
 async function pollAnalysisProgress(
     sessionId: string,
@@ -325,17 +414,35 @@ async function pollAnalysisProgress(
     const apiUrl = getApiUrl();
     const maxAttempts = 60; // ~2.5 minutos com polling a cada 2.5s
     let attempts = 0;
+    // Long-poll + delta: o backend segura até o próximo step e devolve só as chaves novas
+    let lastStep = "";
+    let etag = "";
+    let accumulated: Record<string, any> = {};
 
     while (attempts < maxAttempts) {
         try {
-            const response = await fetch(`${apiUrl}/api/analysis/status/${sessionId}`);
+            const query = lastStep ? `?since_step=${encodeURIComponent(lastStep)}&wait=20` : "";
+            const response = await fetch(`${apiUrl}/api/analysis/status/${sessionId}${query}`, {
+                headers: etag ? { "If-None-Match": etag } : {},
+            });
+
+            if (response.status === 304) {
+                attempts++;
+                continue;
+            }
+
             const data = await response.json();
 
             if (!response.ok) {
                 throw new Error(`HTTP ${response.status}: ${data.error || 'Erro desconhecido'}`);
             }
 
-            const { status, current_step, result_data } = data;
+            etag = response.headers.get("ETag") || "";
+            lastStep = data.current_step || "";
+            accumulated = data.delta ? { ...accumulated, ...(data.result_data || {}) } : (data.result_data || {});
+
+            const { status, current_step } = data;
+            const result_data = accumulated;
 
             console.log(`[Polling] Status: ${status}, Step: ${current_step}`);
 
@@ -403,7 +510,7 @@ async function pollAnalysisProgress(
             }
 
             // Esperar antes do próximo polling
-            await new Promise(resolve => setTimeout(resolve, 2500));
+            await new Promise(resolve => setTimeout(resolve, lastStep ? 250 : 2500)); // Long-poll já espera no servidor
             attempts++;
 
         } catch (error) {
@@ -2415,6 +2522,8 @@ export default function AppPage() {
                     form.append("cv_text", cvTextPreextracted);
                     localStorage.removeItem("vant_cv_text_preextracted");
                     console.log("[LastCV] Enviando cv_text pré-extraído ao invés de arquivo PDF");
+                } else if (getDocumentId(file)) {
+                    form.append("document_id", getDocumentId(file) as string);
                 } else {
                     form.append("file", file);
                 }
@@ -2430,14 +2539,29 @@ export default function AppPage() {
                     }
                 }
 
-                const resp = await fetch(`${getApiUrl()}/api/analyze-premium-paid`, {
+                let resp = await fetch(`${getApiUrl()}/api/analyze-premium-paid`, {
                     method: "POST",
                     body: form,
                     signal: abortControllerRef.current.signal
                 });
-                const payload = (await resp.json()) as JsonObject;
+                let payload = (await resp.json()) as JsonObject;
+                // document_id expirado no backend: reenvia o arquivo uma vez
+                if (resp.status === 404 && payload.code === "document_not_found" && file) {
+                    form.delete("document_id");
+                    form.append("file", file);
+                    resp = await fetch(`${getApiUrl()}/api/analyze-premium-paid`, {
+                        method: "POST",
+                        body: form,
+                        signal: abortControllerRef.current.signal
+                    });
+                    payload = (await resp.json()) as JsonObject;
+                }
                 if (!resp.ok) {
-                    const err = typeof payload.error === "string" ? payload.error : `HTTP ${resp.status}`;
+                    let err = typeof payload.error === "string" ? payload.error : `HTTP ${resp.status}`;
+                    // 429 do admission control: crédito preservado, informa quando tentar de novo
+                    if (resp.status === 429 && typeof payload.retry_after === "number") {
+                        err = `${err} (aprox. ${Math.ceil(payload.retry_after / 60)} min)`;
+                    }
                     throw new Error(err);
                 }
 
@@ -2448,8 +2572,8 @@ export default function AppPage() {
                     // Salvar session_id no estado
                     setSessionId(payload.session_id as string);
 
-                    // Iniciar polling para acompanhar progresso
-                    await pollAnalysisProgress(
+                    // Acompanhar progresso via SSE (polling como fallback)
+                    await streamAnalysisProgress(
                         payload.session_id as string,
                         updateStatus,
                         setReportData,
@@ -2587,6 +2711,7 @@ export default function AppPage() {
             }
 
             const data = (await resp.json()) as unknown;
+            rememberDocumentId(file, (data as JsonObject).document_id);
 
             // Garantir timeline visual fixa de 10s e sincronizada com as fases
             await visualTimelinePromise;
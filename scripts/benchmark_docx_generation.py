@@ -0,0 +1,59 @@
+"""
+Benchmark: DOCX via template (docx_template) x gerador antigo
+(Document() em branco + formatação run a run via OXML).
+
+Corpus: diretório com textos de CV otimizados (.txt, formato
+cv_otimizado_completo). Sem diretório, usa o CV de test_docx_template.
+Reporta ms/documento (média e p95) e documentos/segundo (sem render_cache).
+
+Execute:
+    python scripts/benchmark_docx_generation.py [diretorio_txt] [iteracoes]
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from docx_template import gerar_docx_cv
+from logic import _renderizar_word_old
+from test_docx_template import SAMPLE_CV
+
+
+def _measure(label, fn, corpus, iterations):
+    durations = []
+    for _ in range(iterations):
+        for text in corpus:
+            t0 = time.perf_counter()
+            fn(text)
+            durations.append((time.perf_counter() - t0) * 1000)
+    durations.sort()
+    p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+    print(
+        f"{label:<30} {statistics.mean(durations):7.2f} ms/doc  p95={p95:7.2f}ms  "
+        f"{1000 / statistics.mean(durations):7.1f} docs/s"
+    )
+
+
+def main():
+    corpus_dir = Path(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1] != "-" else None
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    corpus = [f.read_text(encoding="utf-8") for f in sorted(corpus_dir.glob("*.txt"))] if corpus_dir else []
+    if not corpus:
+        corpus = [SAMPLE_CV]
+
+    print("=" * 90)
+    print(f"⏱️  BENCHMARK GERAÇÃO DOCX ({len(corpus)} CVs, {iterations} iterações)")
+    print("=" * 90)
+
+    gerar_docx_cv(corpus[0])  # Carrega o template (lido uma vez por processo)
+    _measure("Antigo (formatação por run)", _renderizar_word_old, corpus, iterations)
+    _measure("Novo (template + estilos)", gerar_docx_cv, corpus, iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Micro-benchmark: keyword_engine x funções antigas (detect_job_area,
+_extract_keywords, _normalize_string).
+
+Corpus: vagas de exemplo de backend/test_keyword_engine.py, ou um arquivo
+texto com uma vaga por bloco separado por linha em branco dupla.
+
+Execute: python scripts/benchmark_keyword_engine.py [iteracoes] [corpus.txt]
+"""
+
+import sys
+import time
+import statistics
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from keyword_engine import keyword_engine, normalize_for_cache
+from test_keyword_engine import (
+    SAMPLE_JOBS,
+    legacy_detect_job_area,
+    legacy_extract_keywords,
+    legacy_normalize_string,
+)
+
+
+def _load_corpus():
+    if len(sys.argv) > 2:
+        text = Path(sys.argv[2]).read_text(encoding="utf-8")
+        return [block.strip() for block in text.split("\n\n\n") if block.strip()]
+    # Vagas reais têm ~2-4k caracteres: repete o texto institucional
+    boilerplate = " Benefícios: vale refeição, plano de saúde, gympass. Modelo híbrido." * 30
+    return [job + boilerplate for job in SAMPLE_JOBS]
+
+
+def _timeit(fn, corpus, iterations):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn(corpus)
+        samples.append((time.perf_counter() - t0) * 1000 / len(corpus))
+    return samples
+
+
+def _report(label, samples):
+    p95 = sorted(samples)[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+    print(f"{label:<45} média={statistics.mean(samples) * 1000:8.1f}µs/vaga  p95={p95 * 1000:8.1f}µs/vaga")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    corpus = _load_corpus()
+    avg_len = sum(len(job) for job in corpus) / len(corpus)
+
+    print("=" * 80)
+    print(f"⏱️  BENCHMARK KEYWORD ENGINE ({len(corpus)} vagas, ~{avg_len:.0f} chars, {iterations} iterações)")
+    print("=" * 80)
+
+    benchmarks = [
+        ("detect_job_area", lambda c: [legacy_detect_job_area(j) for j in c],
+                            lambda c: [keyword_engine.detect_area(j) for j in c]),
+        ("_extract_keywords", lambda c: [legacy_extract_keywords(j) for j in c],
+                              lambda c: [keyword_engine.extract_keywords(j) for j in c]),
+        ("_normalize_string", lambda c: [legacy_normalize_string(j) for j in c],
+                              lambda c: [normalize_for_cache(j) for j in c]),
+        ("área + keywords (2 chamadas x analyze_batch)",
+            lambda c: [(legacy_detect_job_area(j), legacy_extract_keywords(j)) for j in c],
+            lambda c: keyword_engine.analyze_batch(c)),
+    ]
+
+    for name, legacy_fn, engine_fn in benchmarks:
+        before = _timeit(legacy_fn, corpus, iterations)
+        after = _timeit(engine_fn, corpus, iterations)
+        print(f"\n{name}")
+        _report("  ANTES  (regex por termo / set por chamada)", before)
+        _report("  DEPOIS (keyword_engine)", after)
+        print(f"  ✅ {statistics.mean(before) / max(statistics.mean(after), 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: extração de texto de PDFs (pdf_text) x extração antiga (todas as
+páginas com `+=` e truncamento no final).
+
+Corpus: diretório com PDFs reais de CVs/portfólios (não versionados - use
+os seus). Reporta ms/página lida, páginas lidas x total e pico de memória
+(tracemalloc no processo atual; no modo pool, maxrss dos processos filhos).
+
+Execute:
+    python scripts/benchmark_pdf_extraction.py <diretorio_pdfs> [iteracoes] [max_chars]
+    PDF_EXTRACT_PROCESSES=4 python scripts/benchmark_pdf_extraction.py <diretorio_pdfs>
+"""
+
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from pypdf import PdfReader
+
+import pdf_text
+from pdf_text import extract_many, extract_pdf_text
+
+
+def legacy_extract(data, max_chars):
+    reader = PdfReader(BytesIO(data))
+    full_text = ""
+    for page in reader.pages:
+        full_text += page.extract_text() or ""
+    return full_text[:max_chars], len(reader.pages)
+
+
+def new_extract(data, max_chars):
+    text, info = extract_pdf_text(data, max_chars)
+    return text, info["pages_read"]
+
+
+def _measure(label, fn, corpus, iterations, max_chars):
+    ms_per_page = []
+    pages_read = 0
+    tracemalloc.start()
+    for _ in range(iterations):
+        pages_read = 0
+        t0 = time.perf_counter()
+        for data in corpus:
+            _, pages = fn(data, max_chars)
+            pages_read += pages
+        ms_per_page.append((time.perf_counter() - t0) * 1000 / max(pages_read, 1))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total_ms = statistics.mean(ms_per_page) * pages_read
+    print(
+        f"{label:<28} {statistics.mean(ms_per_page):8.2f} ms/página  "
+        f"{total_ms / len(corpus):8.1f} ms/arquivo  páginas lidas={pages_read:<5} "
+        f"pico={peak / 1024 / 1024:6.1f} MB"
+    )
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    corpus_dir = Path(sys.argv[1])
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    max_chars = int(sys.argv[3]) if len(sys.argv) > 3 else 25000
+
+    files = sorted(corpus_dir.glob("*.pdf"))
+    corpus = [f.read_bytes() for f in files]
+    if not corpus:
+        print(f"❌ Nenhum PDF em {corpus_dir}")
+        sys.exit(1)
+    total_pages = sum(len(PdfReader(BytesIO(data)).pages) for data in corpus)
+
+    print("=" * 100)
+    print(
+        f"⏱️  BENCHMARK EXTRAÇÃO PDF ({len(corpus)} arquivos, {total_pages} páginas, "
+        f"max_chars={max_chars}, {iterations} iterações, processos={pdf_text.PDF_EXTRACT_PROCESSES})"
+    )
+    print("=" * 100)
+
+    _measure("Antigo (+= e truncamento)", legacy_extract, corpus, iterations, max_chars)
+    _measure("Novo (parada antecipada)", new_extract, corpus, iterations, max_chars)
+
+    if pdf_text.PDF_EXTRACT_PROCESSES > 0:
+        t0 = time.perf_counter()
+        extract_many(corpus, max_chars)  # Aquece o pool (spawn dos processos)
+        warmup_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            extract_many(corpus, max_chars)
+        elapsed_ms = (time.perf_counter() - t0) * 1000 / iterations
+        children_peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+        print(
+            f"{'Pool (extract_many)':<28} {elapsed_ms / len(corpus):8.1f} ms/arquivo  "
+            f"aquecimento={warmup_ms:.0f}ms  pico por processo filho={children_peak:6.1f} MB"
+        )
+        pdf_text.shutdown_pdf_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Micro-benchmark: custo de setup do cliente Supabase por request.
+
+Compara:
+- ANTES: `create_client(...)` a cada CacheManager() / update_session_progress
+- DEPOIS: `get_supabase_client()` (singleton do processo)
+
+Se SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY estiverem configuradas, mede também
+uma query real (cold = cliente novo por query, warm = conexão reaproveitada).
+
+Execute: python scripts/benchmark_supabase_client.py [iteracoes]
+"""
+
+import os
+import sys
+import time
+import statistics
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from dotenv import load_dotenv
+load_dotenv(PROJECT_ROOT / ".env")
+load_dotenv(PROJECT_ROOT / "backend" / ".env")
+
+from supabase import create_client
+from supabase_client import get_supabase_client, reset_supabase_client
+
+
+def _timeit(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def _report(label, samples):
+    p95 = sorted(samples)[int(len(samples) * 0.95) - 1] if len(samples) > 1 else samples[0]
+    print(f"{label:<45} média={statistics.mean(samples):8.3f}ms  p95={p95:8.3f}ms  total={sum(samples):9.1f}ms")
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    url = os.getenv("SUPABASE_URL") or "https://benchmark-project.supabase.co"
+    # JWT sintético só para construir o cliente (create_client não faz I/O)
+    key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or (
+        "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9."
+        "eyJyb2xlIjoic2VydmljZV9yb2xlIn0."
+        "c2lnbmF0dXJl"
+    )
+
+    print("=" * 80)
+    print(f"⏱️  BENCHMARK CLIENTE SUPABASE ({iterations} iterações)")
+    print("=" * 80)
+
+    reset_supabase_client()
+    before = _timeit(lambda: create_client(url, key).table("cached_analyses"), iterations)
+    _report("ANTES  create_client() por request", before)
+
+    reset_supabase_client()
+    get_supabase_client(url, key)
+    after = _timeit(lambda: get_supabase_client().table("cached_analyses"), iterations)
+    _report("DEPOIS get_supabase_client() compartilhado", after)
+
+    saved = statistics.mean(before) - statistics.mean(after)
+    print(f"\n✅ Setup removido por request: {saved:.3f}ms ({statistics.mean(before) / max(statistics.mean(after), 1e-6):.0f}x)")
+
+    if os.getenv("SUPABASE_URL") and os.getenv("SUPABASE_SERVICE_ROLE_KEY"):
+        round_trips = min(iterations, 20)
+        print(f"\n🌐 Round-trip real ({round_trips} queries em analysis_sessions)")
+
+        cold = _timeit(
+            lambda: create_client(url, key).table("analysis_sessions").select("id").limit(1).execute(),
+            round_trips,
+        )
+        _report("ANTES  cliente novo + query (handshake TLS)", cold)
+
+        shared = get_supabase_client()
+        warm = _timeit(
+            lambda: shared.table("analysis_sessions").select("id").limit(1).execute(),
+            round_trips,
+        )
+        _report("DEPOIS cliente compartilhado + query (keep-alive)", warm)
+    else:
+        print("\n[AVISO] SUPABASE_URL não configurada - round-trip real não medido")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Gera backend/templates/cv_template.docx a partir de docx_template.build_template().
+
+Rode depois de mudar estilos/cores em docx_template.py e versione o .docx.
+Se a mudança alterar o documento final, incremente RENDERER_CODE_VERSION
+(render_cache) e regenere o golden:
+
+    python scripts/build_docx_template.py
+    cd backend && python test_docx_template.py --update-golden
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from docx_template import TEMPLATE_PATH, build_template
+
+
+def main():
+    Path(TEMPLATE_PATH).parent.mkdir(exist_ok=True)
+    build_template().save(TEMPLATE_PATH)
+    print(f"✅ Template salvo em {TEMPLATE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
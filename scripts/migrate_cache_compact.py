@@ -0,0 +1,157 @@
+"""
+Migração: reescreve `cached_analyses` no formato compacto (cache_codec).
+
+Para cada linha ainda no formato antigo:
+- `cv_otimizado_completo` (HTML com CSS_V13 embutido) -> corpo + versão do CSS
+- `cv_text_original` -> zstd (se CACHE_ZSTD_ENABLED=true e `zstandard` instalado)
+
+Só reescreve quando o formato compacto remonta exatamente o HTML original e
+ocupa menos espaço. Sem --apply apenas mede (relatório antes/depois).
+
+Execute:
+    python scripts/migrate_cache_compact.py                 # dry-run
+    python scripts/migrate_cache_compact.py --apply [--batch-size 200] [--limit 5000]
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from dotenv import load_dotenv
+load_dotenv(PROJECT_ROOT / ".env")
+load_dotenv(PROJECT_ROOT / "backend" / ".env")
+
+from cache_codec import COMPACT_KEY, compact_result, encode_text, expand_result
+
+
+def _json_bytes(value):
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def _text_bytes(value):
+    return len((value or "").encode("utf-8"))
+
+
+def _table_bytes(supabase):
+    try:
+        response = supabase.rpc("cache_table_size", {"p_table": "cached_analyses"}).execute()
+        return int(response.data) if response.data is not None else None
+    except Exception:
+        return None
+
+
+def _fmt_bytes(value):
+    if value is None:
+        return "n/d"
+    return f"{value / 1024 / 1024:.2f} MB"
+
+
+def migrate_row(row):
+    """(update, bytes_antes, bytes_depois, formato). update=None quando não há ganho."""
+    result_json = row.get("result_json") or {}
+    if isinstance(result_json, str):
+        result_json = json.loads(result_json)
+    cv_text = row.get("cv_text_original")
+
+    before = _json_bytes(result_json) + _text_bytes(cv_text)
+    compact = compact_result(result_json)
+    packed_cv = encode_text(cv_text)
+    after = _json_bytes(compact) + _text_bytes(packed_cv)
+
+    fmt = compact[COMPACT_KEY]["fmt"] if COMPACT_KEY in compact else "inalterado"
+    if COMPACT_KEY in result_json:
+        fmt = "já compacto"
+    if after >= before:
+        return None, before, before, fmt
+
+    # Segurança: o leitor precisa devolver exatamente o HTML original
+    original_html = result_json.get("cv_otimizado_completo")
+    if COMPACT_KEY in compact and expand_result(compact).get("cv_otimizado_completo") != original_html:
+        return None, before, before, "divergente"
+
+    update = {}
+    if compact != result_json:
+        update["result_json"] = compact
+    if packed_cv != cv_text:
+        update["cv_text_original"] = packed_cv
+    return update or None, before, after, fmt
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra cached_analyses para o formato compacto")
+    parser.add_argument("--apply", action="store_true", help="Grava as alterações (padrão: dry-run)")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=0, help="Máximo de linhas analisadas (0 = todas)")
+    args = parser.parse_args()
+
+    from supabase_client import get_supabase_client
+    supabase = get_supabase_client()
+    if not supabase:
+        print("❌ SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY não configuradas")
+        sys.exit(1)
+
+    table_before = _table_bytes(supabase)
+    totals = {"rows": 0, "rewritten": 0, "errors": 0, "before": 0, "after": 0}
+    formats = Counter()
+    start = time.perf_counter()
+
+    offset = 0
+    while True:
+        size = args.batch_size
+        if args.limit:
+            size = min(size, args.limit - totals["rows"])
+            if size <= 0:
+                break
+        response = supabase.table("cached_analyses").select(
+            "id, cv_text_original, result_json"
+        ).order("created_at").range(offset, offset + size - 1).execute()
+        rows = response.data or []
+        if not rows:
+            break
+
+        for row in rows:
+            totals["rows"] += 1
+            try:
+                update, before, after, fmt = migrate_row(row)
+            except Exception as e:
+                totals["errors"] += 1
+                print(f"⚠️ Linha {row.get('id')}: {e}")
+                continue
+            totals["before"] += before
+            totals["after"] += after
+            formats[fmt] += 1
+            if update:
+                totals["rewritten"] += 1
+                if args.apply:
+                    supabase.table("cached_analyses").update(update).eq("id", row["id"]).execute()
+
+        offset += len(rows)
+        print(f"   ... {totals['rows']} linha(s) analisada(s)")
+
+    saved = totals["before"] - totals["after"]
+    pct = (saved / totals["before"] * 100) if totals["before"] else 0.0
+
+    print("\n" + "=" * 60)
+    print(f"📦 MIGRAÇÃO FORMATO COMPACTO ({'APLICADA' if args.apply else 'DRY-RUN'})")
+    print("=" * 60)
+    print(f"Linhas analisadas:   {totals['rows']}")
+    print(f"Linhas reescritas:   {totals['rewritten']}{'' if args.apply else ' (seriam)'}")
+    print(f"Erros:               {totals['errors']}")
+    print(f"Formatos:            {dict(formats)}")
+    print(f"Payload antes:       {_fmt_bytes(totals['before'])}")
+    print(f"Payload depois:      {_fmt_bytes(totals['after'])}  (-{pct:.1f}%)")
+    print(f"Tabela antes:        {_fmt_bytes(table_before)}")
+    if args.apply:
+        # O espaço em disco só cai de fato após o VACUUM do Postgres (autovacuum)
+        print(f"Tabela depois:       {_fmt_bytes(_table_bytes(supabase))}  (antes do VACUUM)")
+    print(f"Tempo:               {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Relatório: hit rate do cache parcial por similaridade x threshold.
+
+Reproduz em ordem cronológica as análises históricas de `cached_analyses`
+(ou de um arquivo JSON exportado) e mede, para cada threshold, quantas
+análises teriam reaproveitado Tactical/Library de uma análise anterior:
+- EXATO: mesmo component_hash (comportamento atual)
+- SIMILAR: MinHash/LSH acima do threshold + guarda de qualidade
+- SEM GUARDA: só o threshold (mostra quanto o guarda está filtrando)
+
+Execute:
+    python scripts/similarity_cache_report.py [--limit 2000]
+    python scripts/similarity_cache_report.py --input analyses.json
+      (lista de {"job_description": ..., "result_json": {...}})
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from dotenv import load_dotenv
+load_dotenv(PROJECT_ROOT / ".env")
+load_dotenv(PROJECT_ROOT / "backend" / ".env")
+
+from cache_manager import CacheManager
+from similarity_index import LSHIndex, minhash_signature
+
+THRESHOLDS = [0.5, 0.6, 0.7, 0.8, 0.9, 0.95]
+COMPONENTS = ["tactical", "library"]
+
+
+def _load_rows(args):
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            return json.load(f)
+
+    from supabase_client import get_supabase_client
+    supabase = get_supabase_client()
+    if not supabase:
+        print("❌ SUPABASE_URL/SUPABASE_SERVICE_ROLE_KEY não configuradas (use --input)")
+        sys.exit(1)
+    response = supabase.table("cached_analyses").select(
+        "job_description, result_json, created_at"
+    ).order("created_at").limit(args.limit).execute()
+    return response.data or []
+
+
+def _component_data(row):
+    result_json = row.get("result_json") or {}
+    if isinstance(result_json, str):
+        try:
+            result_json = json.loads(result_json)
+        except json.JSONDecodeError:
+            result_json = {}
+    return {
+        "area": result_json.get("area", ""),
+        "job_description": row.get("job_description") or "",
+        "gaps_fatais": result_json.get("gaps_fatais", []),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="Arquivo JSON com análises exportadas")
+    parser.add_argument("--limit", type=int, default=2000, help="Máximo de análises lidas do Supabase")
+    args = parser.parse_args()
+
+    rows = _load_rows(args)
+    if not rows:
+        print("[AVISO] Nenhuma análise histórica encontrada")
+        return
+
+    manager = CacheManager()
+
+    for component_type in COMPONENTS:
+        index = LSHIndex()
+        seen_hashes = set()
+        exact_hits = 0
+        similar_hits = {t: 0 for t in THRESHOLDS}
+        unguarded_hits = {t: 0 for t in THRESHOLDS}
+
+        for i, row in enumerate(rows):
+            data = _component_data(row)
+            component_hash = manager.generate_component_hash(component_type, data)
+            features, meta = manager._similarity_features(component_type, data)
+            signature = minhash_signature(features)
+
+            exact = component_hash in seen_hashes
+            exact_hits += exact
+            for t in THRESHOLDS:
+                if exact or (signature and index.best_match(component_type, signature, meta, threshold=t)):
+                    similar_hits[t] += 1
+                if exact or (signature and index.best_match(component_type, signature, meta, threshold=t, guard=False)):
+                    unguarded_hits[t] += 1
+
+            seen_hashes.add(component_hash)
+            if signature:
+                index.add(i, component_type, signature, meta)
+
+        total = len(rows)
+        print("=" * 64)
+        print(f"📊 {component_type.upper()} - {total} análises históricas")
+        print("=" * 64)
+        print(f"{'threshold':>10} {'EXATO':>10} {'SIMILAR':>10} {'SEM GUARDA':>12}")
+        for t in THRESHOLDS:
+            print(
+                f"{t:>10.2f} {exact_hits / total:>9.1%} {similar_hits[t] / total:>9.1%} "
+                f"{unguarded_hits[t] / total:>11.1%}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()